@@ -22,7 +22,7 @@ def __sanitize_specification(spec: dict[str, Any]) -> dict[str, Any]:
         **spec,
         "description": {
             **spec["description"],
-            "long": re.sub(r"\n +(request_id|query).+", "", spec["description"]["long"])
+            "long": re.sub(r"\n +(request_id|query|filters).+", "", spec["description"]["long"])
             .replace("\n    ", "\n")
             .replace("Args:", "Args:\n"),
         },
@@ -72,6 +72,7 @@ def execute(
     query: str,
     user: User,
     request_id: Optional[str] = None,
+    filters: Optional[list] = None,
     **kwargs,
 ) -> list[dict[str, Any]]:
     """Execute a specification
@@ -81,6 +82,7 @@ def execute(
         query (str): The query to run this action on
         user (dict[str, Any]): The user running this action
         request_id (str, None): A user-provided ID, can be used to track the progress of their excecution via websockets
+        filters (list, None): Structured filters narrowing the hits matched by the query, such as a set of ids
 
     Returns:
         list[dict[str, Any]]: A report on the execution
@@ -113,7 +115,7 @@ def execute(
             }
         ]
 
-    report = automation.execute(query=query, request_id=request_id, user=user, **kwargs)
+    report = automation.execute(query=query, request_id=request_id, user=user, filters=filters, **kwargs)
 
     return __sanitize_report(report)
 
@@ -14,11 +14,14 @@ OPERATION_ID = "add_label"
 CATEGORIES = list(Label.fields().keys())
 
 
-def execute(query: str, category: str = "generic", label: Optional[str] = None, **kwargs):
+def execute(
+    query: str, category: str = "generic", label: Optional[str] = None, filters: Optional[list] = None, **kwargs
+):
     """Add a label to a hit.
 
     Args:
         query (str): The query on which to apply this automation.
+        filters (list, optional): Structured filters narrowing the hits matched by the query, such as a set of ids.
         category (str, optional): The category of label to add. Defaults to "generic".
         label (str): The label content. Defaults to None.
     """
@@ -49,6 +52,7 @@ def execute(query: str, category: str = "generic", label: Optional[str] = None,
     skipped_hits = ds.hit.search(
         f"({query}) AND howler.labels.{category}:{sanitize_lucene_query((label))}",
         fl="howler.id",
+        filters=filters,
     )["items"]
 
     if len(skipped_hits) > 0:
@@ -65,6 +69,7 @@ def execute(query: str, category: str = "generic", label: Optional[str] = None,
         ds.hit.update_by_query(
             query,
             [hit_helper.list_add(f"howler.labels.{category}", label, if_missing=True)],
+            filters=filters,
         )
 
         report.append(
@@ -12,11 +12,12 @@ hit_helper = OdmHelper(Hit)
 OPERATION_ID = "add_to_bundle"
 
 
-def execute(query: str, bundle_id: Optional[str] = None, **kwargs):
+def execute(query: str, bundle_id: Optional[str] = None, filters: Optional[list] = None, **kwargs):
     """Add a set of hits matching the query to the specified bundle.
 
     Args:
         query (str): The query containing the matching hits
+        filters (list, optional): Structured filters narrowing the hits matched by the query, such as a set of ids.
         bundle_id (str): The `howler.id` of the bundle to add the hits to.
     """
     report = []
@@ -49,6 +50,7 @@ def execute(query: str, bundle_id: Optional[str] = None, **kwargs):
         skipped_hits_bundles = ds.hit.search(
             f"({query}) AND howler.is_bundle:true",
             fl="howler.id",
+            filters=filters,
         )["items"]
 
         if len(skipped_hits_bundles) > 0:
@@ -64,6 +66,7 @@ def execute(query: str, bundle_id: Optional[str] = None, **kwargs):
         skipped_hits_already_added = ds.hit.search(
             f"({query}) AND (howler.bundles:{sanitize_lucene_query(bundle_id)})",
             fl="howler.id",
+            filters=filters,
         )["items"]
 
         if len(skipped_hits_already_added) > 0:
@@ -77,7 +80,7 @@ def execute(query: str, bundle_id: Optional[str] = None, **kwargs):
             )
 
         safe_query = f"({query}) AND (-howler.bundles:({sanitize_lucene_query(bundle_id)}) AND howler.is_bundle:false)"
-        matching_hits = ds.hit.search(safe_query)["items"]
+        matching_hits = ds.hit.search(safe_query, filters=filters)["items"]
         if len(matching_hits) < 1:
             report.append(
                 {
@@ -92,6 +95,7 @@ def execute(query: str, bundle_id: Optional[str] = None, **kwargs):
         ds.hit.update_by_query(
             safe_query,
             [hit_helper.list_add("howler.bundles", sanitize_lucene_query(bundle_id), if_missing=True)],
+            filters=filters,
         )
 
         operations = [
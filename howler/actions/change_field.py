@@ -1,3 +1,5 @@
+from typing import Optional
+
 from howler.common.loader import datastore
 from howler.datastore.operations import OdmHelper
 from howler.odm.models.action import VALID_TRIGGERS
@@ -8,11 +10,12 @@ hit_helper = OdmHelper(Hit)
 OPERATION_ID = "change_field"
 
 
-def execute(query: str, field: str, value: str, **kwargs):
+def execute(query: str, field: str, value: str, filters: Optional[list] = None, **kwargs):
     """Change one of the fields of a hit
 
     Args:
         query (str): The query to run this action on
+        filters (list, optional): Structured filters narrowing the hits matched by the query, such as a set of ids.
         field (str): The field to update.
         value (str): The value to set it to. Must be a string.
     """
@@ -32,6 +35,7 @@ def execute(query: str, field: str, value: str, **kwargs):
         datastore().hit.update_by_query(
             query,
             [hit_helper.update(field, value)],
+            filters=filters,
         )
 
         report.append(
@@ -27,12 +27,14 @@ def execute(
     assessment: Optional[str] = None,
     rationale: Optional[str] = None,
     user: Optional[User] = None,
+    filters: Optional[list] = None,
     **kwargs,
 ):
     """Demote a hit.
 
     Args:
         query (str): The query on which to apply this automation.
+        filters (list, optional): Structured filters narrowing the hits matched by the query, such as a set of ids.
         escalation (str, optional): The escalation to demote to. Defaults to "hit".
         assessment (str, optional): The assessment to apply if demoting to miss. Required if escalation is "miss".
         rationale (str, optional): The optional rationale to apply if demoting to miss.
@@ -54,6 +56,7 @@ def execute(
     skipped_hits = ds.hit.search(
         f"({query}) AND howler.escalation:{sanitize_lucene_query(escalation)}",
         fl="howler.id",
+        filters=filters,
     )["items"]
 
     if len(skipped_hits) > 0:
@@ -75,6 +78,7 @@ def execute(
                     odm_helper.update("howler.assessment", None),
                     odm_helper.update("howler.rationale", None),
                 ],
+                filters=filters,
             )
         else:
             if not assessment:
@@ -98,6 +102,7 @@ def execute(
                     ),
                     odm_helper.update("howler.status", HitStatus.RESOLVED),
                 ],
+                filters=filters,
             )
 
         report.append(
@@ -1,13 +1,16 @@
+from typing import Optional
+
 from howler.odm.models.action import VALID_TRIGGERS
 
 OPERATION_ID = "example_plugin"
 
 
-def execute(query: str, arg1: str, arg2: str, **kwargs):
+def execute(query: str, arg1: str, arg2: str, filters: Optional[list] = None, **kwargs):
     """This function is called either when triggered manually or any of the accepted triggers are met.
 
     Args:
         query (str): The query this action is running on
+        filters (list, optional): Structured filters narrowing the hits matched by the query, such as a set of ids.
         arg1 (str, optional): The provided value for the matching argument below. One of "a", "b", "c".
         arg2 (str, optional): The provided value for the matching argument below. Freeform text.
     """
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from howler.common.loader import datastore
 from howler.datastore.operations import OdmHelper
 from howler.odm.models.action import VALID_TRIGGERS
@@ -10,11 +12,12 @@ OPERATION_ID = "prioritization"
 VALID_FIELDS = ["reliability", "severity", "volume", "confidence", "score"]
 
 
-def execute(query: str, field: str = "score", value: str = "0.0", **kwargs):
+def execute(query: str, field: str = "score", value: str = "0.0", filters: Optional[list] = None, **kwargs):
     """Change one of the priorization fields of a hit
 
     Args:
         query (str): The query to run this action on
+        filters (list, optional): Structured filters narrowing the hits matched by the query, such as a set of ids.
         field (str, optional): The field to update. Defaults to "score".
         value (str, optional): The value to set it to. Must be a float in string format. Defaults to "0.0".
     """
@@ -39,6 +42,7 @@ def execute(query: str, field: str = "score", value: str = "0.0", **kwargs):
         datastore().hit.update_by_query(
             query,
             [hit_helper.update(f"howler.{field}", value)],
+            filters=filters,
         )
 
         report.append(
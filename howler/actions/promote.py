@@ -24,12 +24,14 @@ def execute(
     escalation: Escalation = Escalation.ALERT,
     assessment: Optional[str] = None,
     rationale: Optional[str] = None,
+    filters: Optional[list] = None,
     **kwargs,
 ):
     """Promote a hit.
 
     Args:
         query (str): The query on which to apply this automation.
+        filters (list, optional): Structured filters narrowing the hits matched by the query, such as a set of ids.
         escalation (str, optional): The escalation to promote to. Defaults to "alert".
         assessment (str, optional): Required if escalation is evidence, assessment to apply.
         rationale (str, optional): The optional rationale to apply if promoting to evidence.
@@ -51,6 +53,7 @@ def execute(
     skipped_hits = ds.hit.search(
         f"({query}) AND howler.escalation:{sanitize_lucene_query(escalation)}",
         fl="howler.id",
+        filters=filters,
     )["items"]
 
     if len(skipped_hits) > 0:
@@ -72,6 +75,7 @@ def execute(
                     odm_helper.update("howler.assessment", None),
                     odm_helper.update("howler.rationale", None),
                 ],
+                filters=filters,
             )
         else:
             if not assessment:
@@ -85,7 +89,7 @@ def execute(
                 )
                 return report
 
-            ds.hit.update_by_query(query, hit_helper.assess_hit(assessment, rationale))
+            ds.hit.update_by_query(query, hit_helper.assess_hit(assessment, rationale), filters=filters)
 
         report.append(
             {
@@ -13,11 +13,12 @@ hit_helper = OdmHelper(Hit)
 OPERATION_ID = "remove_from_bundle"
 
 
-def execute(query: str, bundle_id: Optional[str] = None, **kwargs):
+def execute(query: str, bundle_id: Optional[str] = None, filters: Optional[list] = None, **kwargs):
     """Remove a set of hits matching the query from the specified bundle.
 
     Args:
         query (str): The query containing the matching hits
+        filters (list, optional): Structured filters narrowing the hits matched by the query, such as a set of ids.
         bundle_id (str): The `howler.id` of the bundle to remove the hits from.
     """
     report = []
@@ -50,6 +51,7 @@ def execute(query: str, bundle_id: Optional[str] = None, **kwargs):
         skipped_hits = ds.hit.search(
             f"({query}) AND -howler.bundles:{sanitize_lucene_query(bundle_id)}",
             fl="howler.id",
+            filters=filters,
         )["items"]
 
         if len(skipped_hits) > 0:
@@ -64,7 +66,7 @@ def execute(query: str, bundle_id: Optional[str] = None, **kwargs):
 
         safe_query = f"{query} AND (howler.bundles:{bundle_id})"
 
-        matching_hits = ds.hit.search(safe_query)["items"]
+        matching_hits = ds.hit.search(safe_query, filters=filters)["items"]
         if len(matching_hits) < 1:
             report.append(
                 {
@@ -79,11 +81,15 @@ def execute(query: str, bundle_id: Optional[str] = None, **kwargs):
         ds.hit.update_by_query(
             safe_query,
             [hit_helper.list_remove("howler.bundles", bundle_id)],
+            filters=filters,
         )
 
         hit_service.update_hit(
             bundle_id,
-            [hit_helper.list_remove("howler.hits", h["howler"]["id"]) for h in ds.hit.search(safe_query)["items"]],
+            [
+                hit_helper.list_remove("howler.hits", h["howler"]["id"])
+                for h in ds.hit.search(safe_query, filters=filters)["items"]
+            ],
         )
 
         if len(ds.hit.get(bundle_id).howler.hits) < 1:
@@ -57,6 +57,7 @@ def execute(
     transition: str,
     user: User,
     request_id: Optional[str] = None,
+    filters: Optional[list] = None,
     **kwargs,
 ):
     """Attempt to excute a transition on a hit.
@@ -66,12 +67,13 @@ def execute(
 
     Args:
         query (str): The query on which to apply this automation.
+        filters (list, optional): Structured filters narrowing the hits matched by the query, such as a set of ids.
         request_id (str): The id of this automation run. Used to track the progress via websockets.
         status (str): The status from which to transition.
         transition (str): The transition to attempt to execute.
     """
     rows = 1000 if "automation_advanced" in user.type else 10
-    hits = datastore().hit.search(f"({query}) AND howler.status:{status}", rows=rows, fl="howler.id")
+    hits = datastore().hit.search(f"({query}) AND howler.status:{status}", rows=rows, fl="howler.id", filters=filters)
 
     ids = [hit.howler.id for hit in hits["items"]]
 
@@ -97,7 +99,7 @@ def execute(
             }
         )
 
-    num_skipped = datastore().hit.search(f"({query}) AND -howler.status:{status}", rows=1)["total"]
+    num_skipped = datastore().hit.search(f"({query}) AND -howler.status:{status}", rows=1, filters=filters)["total"]
 
     if num_skipped > 0:
         report.append(
@@ -1,14 +1,22 @@
+import dataclasses
+import decimal
+import uuid
+from datetime import date
 from sys import exc_info
 from traceback import format_tb
 from typing import Any, Union
 
-from flask import Blueprint, Response, jsonify, make_response, request
+from flask import Blueprint, Response, make_response, request
 from flask import session as flsk_session
-from prometheus_client import Counter
+from prometheus_client import Counter, Histogram
+from werkzeug.http import http_date
 
+from howler.common.instrumentation import COMPONENTS, stop_tracking_request, timed, track_request
 from howler.common.loader import APP_NAME
 from howler.common.logging import get_logger, log_with_traceback
-from howler.config import QUOTA_TRACKER, get_version
+from howler.config import QUOTA_TRACKER, config, get_version
+from howler.helper.compression import StreamCompressor, negotiate_encoding
+from howler.utils import json_utils
 from howler.utils.str_utils import safe_str
 
 API_PREFIX = "/api"
@@ -18,14 +26,83 @@ RAW_API_COUNTER = Counter(
     ["method", "path", "status"],
 )
 
+REQUEST_SECONDS = Histogram(
+    f"{APP_NAME.replace('-', '_')}_http_request_duration_seconds",
+    "The time spent handling HTTP requests, broken down by method and path",
+    ["method", "path"],
+)
+COMPONENT_CALLS_PER_REQUEST = Histogram(
+    f"{APP_NAME.replace('-', '_')}_http_request_component_calls",
+    "The number of calls made to each component (elasticsearch, redis, etc.) while handling a single HTTP request",
+    ["path", "component"],
+    buckets=(0, 1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 50, 100, 500),
+)
+COMPONENT_SECONDS_PER_REQUEST = Histogram(
+    f"{APP_NAME.replace('-', '_')}_http_request_component_seconds",
+    "The time spent in each component (elasticsearch, redis, etc.) while handling a single HTTP request",
+    ["path", "component"],
+)
+
 logger = get_logger(__file__)
 
 
+def start_request_tracking():
+    "Start tracking the calls made to instrumented components while handling the current request"
+    track_request()
+
+
+def end_request_tracking(response: Response) -> Response:
+    """Export the calls made to each instrumented component while handling the current request, and the time spent.
+
+    If enabled, they are also returned to the client in a Server-Timing header.
+    """
+    stats = stop_tracking_request()
+    if stats is None:
+        return response
+
+    path = str(request.url_rule)
+    REQUEST_SECONDS.labels(request.method, path).observe(stats.elapsed)
+    for component in COMPONENTS:
+        COMPONENT_CALLS_PER_REQUEST.labels(path, component).observe(stats.calls[component])
+        COMPONENT_SECONDS_PER_REQUEST.labels(path, component).observe(stats.durations[component])
+
+    if config.ui.server_timing:
+        response.headers["Server-Timing"] = ", ".join(
+            [
+                *(
+                    f'{component};dur={stats.durations[component] * 1000:.2f};desc="{stats.calls[component]} calls"'
+                    for component in COMPONENTS
+                    if stats.calls[component] > 0
+                ),
+                f"total;dur={stats.elapsed * 1000:.2f}",
+            ]
+        )
+
+    return response
+
+
 def make_subapi_blueprint(name, api_version=1):
     """Create a flask Blueprint for a subapi in a standard way."""
     return Blueprint(name, name, url_prefix="/".join([API_PREFIX, f"v{api_version}", name]))
 
 
+def _default(o: Any) -> Any:
+    "Convert the values flask's jsonify supports but JSON doesn't the same way it does, to keep responses unchanged"
+    if isinstance(o, date):
+        return http_date(o)
+
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
 def _make_api_response(
     data: Any, err: Union[str, Exception] = "", warnings: list[str] = [], status_code: int = 200, cookies: Any = None
 ) -> Response:
@@ -39,18 +116,19 @@ def _make_api_response(
         err = "".join(["\n"] + format_tb(trace) + ["%s: %s\n" % (err.__class__.__name__, str(err))]).rstrip("\n")
         log_with_traceback(trace, "Exception", is_exception=True)
 
-    resp = make_response(
-        jsonify(
+    with timed("serialization"):
+        body = json_utils.dumpb(
             {
                 "api_response": data,
                 "api_error_message": err,
                 "api_warning": warnings,
                 "api_server_version": get_version(),
                 "api_status_code": status_code,
-            }
-        ),
-        status_code,
-    )
+            },
+            default=_default,
+        )
+
+    resp = make_response(Response(body, mimetype="application/json"), status_code)
 
     if isinstance(cookies, dict):
         for k, v in cookies.items():
@@ -239,3 +317,59 @@ def stream_binary_response(reader, status_code=200):
             yield data
 
     return Response(generate(), status=status_code, mimetype="application/octet-stream")
+
+
+def stream_ndjson_response(chunks, compress=None, status_code=200):
+    """Returns a streamed newline delimited JSON response with arbitrary status code
+
+    Each chunk is a list of JSON serializable objects written out as one line each. The response is gzip compressed if
+    compress is True, sent as is if it is False, and compressed according to the client's Accept-Encoding header
+    otherwise.
+    """
+    # The request keeps using its quota slot until the whole response has been streamed
+    quota_user = flsk_session.pop("quota_user", None)
+    quota_set = flsk_session.pop("quota_set", False)
+    quota_held = bool(quota_user and quota_set)
+
+    def end_quota():
+        nonlocal quota_held
+        if quota_held:
+            quota_held = False
+            QUOTA_TRACKER.end(quota_user)
+
+    if compress is None:
+        encoding = negotiate_encoding()
+    else:
+        encoding = "gzip" if compress else None
+
+    # The request context is gone by the time the response is generated
+    path = str(request.url_rule)
+
+    def generate():
+        try:
+            compressor = StreamCompressor(encoding, path) if encoding else None
+            for chunk in chunks:
+                data = b"".join(json_utils.dumpb(line) + b"\n" for line in chunk)
+                if compressor and data:
+                    data = compressor.compress(data)
+
+                if data:
+                    yield data
+
+            if compressor:
+                yield compressor.flush()
+        finally:
+            end_quota()
+
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+
+    RAW_API_COUNTER.labels(request.method, path, status_code).inc()
+    logger.info("%s %s - %s", request.method, request.path, status_code)
+
+    response = Response(generate(), status=status_code, mimetype="application/x-ndjson", headers=headers)
+    # Covers responses closed before the generator was ever started
+    response.call_on_close(end_quota)
+
+    return response
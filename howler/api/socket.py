@@ -1,17 +1,17 @@
 import base64
-import json
 import os
 from typing import Any
 
 from flask import Blueprint, request
 
 import howler.services.event_service as event_service
-from howler.api import ok, unauthorized
+from howler.api import bad_request, ok, unauthorized
 from howler.common.logging import get_logger
 from howler.datastore.operations import OdmHelper
 from howler.helper.ws import ConnectionClosed, Server
 from howler.odm.models.hit import Hit
 from howler.security.socket import websocket_auth, ws_response
+from howler.utils import json_utils
 from howler.utils.socket_utils import check_action
 
 HWL_INTERPOD_COMMS_SECRET = os.getenv("HWL_INTERPOD_COMMS_SECRET", "secret")
@@ -39,7 +39,12 @@ def emit(event: str):
     if auth_data != HWL_INTERPOD_COMMS_SECRET:
         return unauthorized(err="Invalid auth data")
 
-    event_service.emit(event, request.json)
+    try:
+        data = json_utils.loads(request.get_data())
+    except ValueError:
+        return bad_request(err="Invalid JSON data block.")
+
+    event_service.emit(event, data)
 
     return ok()
 
@@ -79,7 +84,7 @@ def connect(ws: Server, *args: Any, ws_id: str, **kwargs):
         while ws.connected:
             data = ws.receive(10)
             if data:
-                obj = json.loads(data)
+                obj = json_utils.loads(data)
 
                 if "id" not in obj or "action" not in obj or "broadcast" not in obj:
                     ws.close(
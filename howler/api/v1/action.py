@@ -14,6 +14,7 @@ from howler.api import (
     not_found,
     ok,
 )
+from howler.api.v1.utils.etag import ok_if_collection_modified
 from howler.common.exceptions import HowlerException
 from howler.common.loader import datastore
 from howler.common.logging.audit import audit
@@ -36,6 +37,9 @@ action_api._doc = "Endpoints relating to bulk actions and automation"
 def get_actions(**_) -> Response:
     """Get a list of existing actions
 
+    The response has an ETag header. Pass it back in an If-None-Match header to get a 304 response instead of the
+    list, as long as no action changed.
+
     Variables:
     None
 
@@ -47,7 +51,7 @@ def get_actions(**_) -> Response:
         ...actions    # A list of actions the user can see
     ]
     """
-    return ok(datastore().action.search("*:*", as_obj=False)["items"])
+    return ok_if_collection_modified("action", lambda: datastore().action.search("*:*", as_obj=False)["items"])
 
 
 def validate_action(new_action: Any) -> Optional[Response]:
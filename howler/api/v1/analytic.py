@@ -11,11 +11,12 @@ from howler.api import (
     not_found,
     ok,
 )
+from howler.api.v1.utils.etag import ok_if_collection_modified
 from howler.common.exceptions import HowlerException
 from howler.common.loader import datastore
 from howler.common.logging import get_logger
 from howler.common.swagger import generate_swagger_docs
-from howler.cronjobs.rules import register_rules
+from howler.cronjobs.rules import register_rules, reset_watermark
 from howler.datastore.exceptions import DataStoreException
 from howler.datastore.operations import OdmHelper
 from howler.odm.models.analytic import Analytic, Comment
@@ -40,6 +41,9 @@ analytic_helper = OdmHelper(Analytic)
 def get_analytics(**kwargs: Any) -> Response:
     """Get a list of analytics used to create hits in howler
 
+    The response has an ETag header. Pass it back in an If-None-Match header to get a 304 response instead of the
+    list, as long as no analytic changed.
+
     Variables:
     None
 
@@ -51,7 +55,9 @@ def get_analytics(**kwargs: Any) -> Response:
         ...analytics    # A list of analytics
     ]
     """
-    return ok(datastore().analytic.search("*:*", as_obj=False, rows=1000)["items"])
+    return ok_if_collection_modified(
+        "analytic", lambda: datastore().analytic.search("*:*", as_obj=False, rows=1000)["items"]
+    )
 
 
 @generate_swagger_docs()
@@ -255,9 +261,51 @@ def delete_rule(id: str, user: User, **kwargs):
     except DataStoreException as e:
         return bad_request(err=str(e))
 
+    reset_watermark(analytic.analytic_id)
+
     return no_content()
 
 
+@generate_swagger_docs()
+@analytic_api.route("/<id>/backfill", methods=["POST"])
+@api_login(required_priv=["R", "W"])
+def backfill_rule(id: str, user: User, **kwargs):
+    """Re-run a rule on all hits
+
+    Rules are normally only evaluated on the hits ingested since their last run. This discards that progress, so that
+    the rule is evaluated on every matching hit on its next scheduled run.
+
+    Variables:
+    id  => id of the rule analytic to backfill
+
+    Optional Arguments:
+    None
+
+    Data Block:
+    None
+
+    Result Example:
+    {
+        ...analytic     # The rule analytic being backfilled
+    }
+    """
+    if not analytic_service.does_analytic_exist(id):
+        return not_found(err=f"Analytic {id} does not exist")
+
+    analytic: Analytic = analytic_service.get_analytic(id, as_obj=True)
+
+    if not analytic.rule:
+        return bad_request(err="This is not a rule analytic, and cannot be backfilled.")
+
+    if user["uname"] != analytic.owner and "admin" not in user["type"]:
+        return forbidden(err="You cannot backfill this analytic.")
+
+    # The scheduler picks up the missing watermark on the rule's next run, wherever it is running
+    reset_watermark(analytic.analytic_id)
+
+    return ok(analytic.as_primitives())
+
+
 @generate_swagger_docs()
 @analytic_api.route("/<id>/comments", methods=["POST"])
 @api_login(audit=False, required_priv=["W"])
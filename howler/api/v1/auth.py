@@ -173,6 +173,7 @@ def delete_apikey(name, **kwargs):
 
     user_data.apikeys.pop(name)
     storage.user.save(user["uname"], user_data)
+    auth_service.invalidate_apikey_cache(user["uname"], name)
 
     return no_content()
 
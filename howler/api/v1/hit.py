@@ -2,7 +2,7 @@ import difflib
 import json
 from typing import Any, Optional, cast
 
-from flask import request
+from flask import request, stream_with_context
 from mergedeep import Strategy, merge
 
 from howler.api import (
@@ -15,6 +15,7 @@ from howler.api import (
     no_content,
     not_found,
     ok,
+    stream_ndjson_response,
 )
 from howler.api.v1.utils.etag import add_etag
 from howler.common.exceptions import (
@@ -25,7 +26,7 @@ from howler.common.exceptions import (
 from howler.common.loader import datastore
 from howler.common.logging import get_logger
 from howler.common.swagger import generate_swagger_docs
-from howler.datastore.collection import ESCollection
+from howler.datastore.collection import ESCollection, terms_filter
 from howler.datastore.exceptions import DataStoreException, VersionConflictException
 from howler.datastore.operations import OdmHelper, OdmUpdateOperation
 from howler.helper.workflow import WorkflowException
@@ -33,10 +34,20 @@ from howler.odm.models.hit import Hit
 from howler.odm.models.howler_data import Comment, HitOperationType, HitStatusTransition
 from howler.odm.models.user import User
 from howler.security import api_login
-from howler.services import action_service, analytic_service, event_service, hit_service
+from howler.services import (
+    action_service,
+    analytic_service,
+    dedup_service,
+    event_service,
+    hit_service,
+    overview_service,
+    template_service,
+)
 from howler.utils.str_utils import sanitize_lucene_query
 
 MAX_COMMENT_LEN = 5000
+MAX_NDJSON_CHUNK_SIZE = 5000
+MAX_RESOLVE_SIZE = 1000
 
 SUB_API = "hit"
 hit_api = make_subapi_blueprint(SUB_API, api_version=1)
@@ -52,7 +63,7 @@ hit_helper = OdmHelper(Hit)
 @generate_swagger_docs()
 @hit_api.route("/", methods=["POST"])
 @api_login(required_priv=["W"])
-def create_hits(user: User, **kwargs):
+def create_hits(user: User, **kwargs):  # noqa: C901
     """Create hits.
 
     Variables:
@@ -92,6 +103,12 @@ def create_hits(user: User, **kwargs):
                 "input": { ...hit },
                 "error": "Object 'HowlerData' expected a parameter named: score"
             }
+        ],
+        "duplicates": [         # Only present when deduplication is enabled
+            {
+                "input": { ...hit },
+                "original": "5wK4YDZmtOErXXRKDgakRr"
+            }
         ]
     }
     """
@@ -101,15 +118,18 @@ def create_hits(user: User, **kwargs):
         return bad_request(err="No hits were sent.")
 
     response_body: dict[str, list[Any]] = {"valid": [], "invalid": []}
+    if dedup_service.config.system.deduplication.enabled:
+        response_body["duplicates"] = []
     odms = []
+    inputs = []
     ignore_extra_values: bool = bool(request.args.get("ignore_extra_values", False, type=lambda v: v.lower() == "true"))
     logger.debug(f"ignore_extra_values = {ignore_extra_values}")
     warnings = []
     for hit in hits:
         try:
             odm, _warnings = hit_service.convert_hit(hit, unique=True, ignore_extra_values=ignore_extra_values)
-            response_body["valid"].append(odm.as_primitives())
             odms.append(odm)
+            inputs.append(hit)
             warnings.extend(_warnings)
         except HowlerException as e:
             logger.warning(f"{type(e).__name__} when saving new hit!")
@@ -118,16 +138,42 @@ def create_hits(user: User, **kwargs):
 
     if len(response_body["invalid"]) == 0:
         if len(odms) > 0:
-            for odm in odms:
-                # Ensure all ids are consistent
-                if odm.event is not None:
-                    odm.event.id = odm.howler.id
-                hit_service.create_hit(odm.howler.id, odm, user=user["uname"])
-                analytic_service.save_from_hit(odm, user)
+            duplicates = dedup_service.find_duplicates(odms)
+
+            created_odms = []
+            try:
+                for hit, odm in zip(inputs, odms):
+                    if odm.howler.id in duplicates:
+                        response_body["duplicates"].append({"input": hit, "original": duplicates[odm.howler.id]})
+                        continue
+
+                    # Ensure all ids are consistent
+                    if odm.event is not None:
+                        odm.event.id = odm.howler.id
+                    hit_service.create_hit(odm.howler.id, odm, user=user["uname"])
+                    created_odms.append(odm)
+                    analytic_service.save_from_hit(odm, user)
+
+                    response_body["valid"].append(odm.as_primitives())
+            except Exception:
+                # The hashes claimed for the hits that were not created must not suppress them when they are resent
+                created_ids = {odm.howler.id for odm in created_odms}
+                dedup_service.release(
+                    [odm for odm in odms if odm.howler.id not in duplicates and odm.howler.id not in created_ids]
+                )
+                raise
 
             datastore().hit.commit()
 
-            action_service.bulk_execute_on_query(f"howler.id:({' OR '.join(odm.howler.id for odm in odms)})", user=user)
+            if duplicates:
+                dedup_service.fold_duplicates(duplicates)
+
+            if created_odms:
+                action_service.bulk_execute_on_query(
+                    "howler.id:*",
+                    user=user,
+                    filters=[terms_filter("howler.id", [odm.howler.id for odm in created_odms])],
+                )
 
         response_body["warnings"] = warnings
 
@@ -138,6 +184,59 @@ def create_hits(user: User, **kwargs):
         return bad_request(response_body, err=err_msg, warnings=warnings)
 
 
+@generate_swagger_docs()
+@hit_api.route("/ndjson", methods=["POST"])
+@api_login(required_priv=["W"])
+def create_hits_stream(user: User, **kwargs):
+    """Create hits from newline delimited JSON.
+
+    The request body is read and written to the datastore chunk by chunk, so there is no limit on the number of hits
+    that can be created at once. Unlike the regular hit creation endpoint, valid hits are created even if other lines
+    are invalid, and the status of each line is streamed back as soon as its chunk has been processed.
+
+    Variables:
+    None
+
+    Arguments:
+    None
+
+    Optional Arguments:
+    ignore_extra_values     =>  Only warn about invalid extra values instead of rejecting the hit (Default: False)
+    chunk_size              =>  Number of hits to write to the datastore at once (Default: 500)
+
+    Data Block:
+    { ...hit }
+    { ...hit }
+    ...
+
+    Result Example:
+    {"line": 1, "id": "3Xcp1wBGoRzSFf2ncdk0ls"}
+    {"line": 2, "id": "5wK4YDZmtOErXXRKDgakRr", "warnings": ["howler.foo is deprecated."]}
+    {"line": 3, "error": "Object 'HowlerData' expected a parameter named: score"}
+    {"line": 4, "duplicate_of": "3Xcp1wBGoRzSFf2ncdk0ls"}
+    """
+    ignore_extra_values: bool = bool(request.args.get("ignore_extra_values", False, type=lambda v: v.lower() == "true"))
+
+    try:
+        chunk_size = int(request.args.get("chunk_size", 500))
+    except ValueError:
+        return bad_request(err="Invalid chunk size.")
+
+    if chunk_size < 1 or chunk_size > MAX_NDJSON_CHUNK_SIZE:
+        return bad_request(err=f"Chunk size must be between 1 and {MAX_NDJSON_CHUNK_SIZE}.")
+
+    return stream_ndjson_response(
+        stream_with_context(
+            hit_service.create_hits_from_stream(
+                request.stream,
+                user,
+                ignore_extra_values=ignore_extra_values,
+                chunk_size=chunk_size,
+            )
+        )
+    )
+
+
 @generate_swagger_docs()
 @hit_api.route("/", methods=["DELETE"])
 @api_login(required_priv=["W"])
@@ -249,10 +348,76 @@ def validate_hits(**kwargs):
     return ok(validation)
 
 
+@generate_swagger_docs()
+@hit_api.route("/resolve", methods=["POST"])
+@api_login(audit=False, required_priv=["R"])
+def resolve_hits(user: User, **kwargs):
+    """Get the overview and template to use to render each of the given hits
+
+    Overviews and templates are resolved from their (analytic, detection) pair, preferring the ones of the detection
+    over the ones of the analytic, and personal templates over global ones.
+
+    Variables:
+    None
+
+    Arguments:
+    None
+
+    Data Block:
+    [
+        "hit_id_1",     # The ids of the hits to resolve
+        "hit_id_2"
+    ]
+
+    Result Example:
+    {
+        "hit_id_1": {
+            "overview": { ...overview },    # The overview to use, or null if there is none
+            "template": { ...template }     # The template to use, or null if there is none
+        },
+        "hit_id_2": {
+            "overview": null,
+            "template": null
+        }
+    }
+    """
+    hit_ids = request.json
+    if not isinstance(hit_ids, list) or not all(isinstance(hit_id, str) for hit_id in hit_ids):
+        return bad_request(err="You must provide a list of hit ids.")
+
+    if len(hit_ids) > MAX_RESOLVE_SIZE:
+        return bad_request(err=f"You cannot resolve more than {MAX_RESOLVE_SIZE} hits at once.")
+
+    if not hit_ids:
+        return ok({})
+
+    hits = datastore().hit.search(
+        "howler.id:*",
+        filters=[terms_filter("howler.id", set(hit_ids))],
+        fl="howler.id,howler.analytic,howler.detection",
+        rows=len(hit_ids),
+        as_obj=False,
+    )["items"]
+
+    return ok(
+        {
+            hit["howler"]["id"]: {
+                "overview": overview_service.resolve_overview(
+                    hit["howler"]["analytic"], hit["howler"].get("detection", None)
+                ),
+                "template": template_service.resolve_template(
+                    hit["howler"]["analytic"], hit["howler"].get("detection", None), user.uname
+                ),
+            }
+            for hit in hits
+        }
+    )
+
+
 @generate_swagger_docs()
 @hit_api.route("/<id>", methods=["GET"])
 @api_login(audit=False, required_priv=["R"])
-@add_etag(getter=hit_service.get_hit, check_if_match=False)
+@add_etag(getter=hit_service.get_hit, check_if_match=False, cached=True)
 def get_hit(id: str, server_version: str, **kwargs):
     """Get a hit.
 
@@ -270,7 +435,7 @@ def get_hit(id: str, server_version: str, **kwargs):
     if not hit:
         return not_found(err="Hit %s does not exist" % id)
 
-    return ok(hit.as_primitives()), server_version
+    return ok(hit_service.resolve_data(hit.as_primitives())), server_version
 
 
 @generate_swagger_docs()
@@ -307,9 +472,13 @@ def overwrite_hit(id: str, server_version: str, **kwargs):
         return bad_request(err="The JSON payload must be a subset of a valid Hit object.")
 
     try:
+        new_fields = hit_service.flatten(new_fields)
+        if "howler.data" in new_fields:
+            hit_service.check_data(new_fields["howler.data"])
+
         new_hit = merge(
             hit_service.flatten(hit.as_primitives(), odm=Hit),
-            hit_service.flatten(new_fields),
+            new_fields,
             strategy=Strategy.REPLACE
             if bool(request.args.get("replace", False, type=lambda v: v.lower() == "true"))
             else Strategy.ADDITIVE,
@@ -425,6 +594,9 @@ def update_by_query(**kwargs):
         for operation, key, value in operations:
             # Just using this for validation
             OdmUpdateOperation(operation, key, value)
+            if key == "howler.data":
+                hit_service.check_data(value)
+
             explanation.append(f"- `{operation}` - `{key}` - `{json.dumps(value)}`")
 
         operations.append(
@@ -675,7 +847,7 @@ def transition(id: str, user: User, **kwargs):
 @generate_swagger_docs()
 @hit_api.route("/<id>/comments/<comment_id>", methods=["GET"])
 @api_login(audit=False, required_priv=["R"])
-@add_etag(getter=hit_service.get_hit, check_if_match=False)
+@add_etag(getter=hit_service.get_hit, check_if_match=False, cached=True)
 def get_comment(id: str, comment_id: str, user: User, server_version: str, **kwargs):
     """Get a comment associated with a particular hit
 
@@ -10,6 +10,7 @@ from howler.api import (
     not_found,
     ok,
 )
+from howler.api.v1.utils.etag import ok_if_collection_modified
 from howler.common.exceptions import HowlerException
 from howler.common.loader import datastore
 from howler.common.logging import get_logger
@@ -17,7 +18,7 @@ from howler.common.swagger import generate_swagger_docs
 from howler.odm.models.overview import Overview
 from howler.odm.models.user import User
 from howler.security import api_login
-from howler.utils.str_utils import sanitize_lucene_query
+from howler.services import overview_service
 
 SUB_API = "overview"
 overview_api = make_subapi_blueprint(SUB_API, api_version=1)
@@ -32,6 +33,9 @@ logger = get_logger(__file__)
 def get_overviews(**kwargs):
     """Get a list of overviews the user can use to render hits
 
+    The response has an ETag header. Pass it back in an If-None-Match header to get a 304 response instead of the
+    list, as long as no overview changed.
+
     Variables:
     None
 
@@ -44,13 +48,7 @@ def get_overviews(**kwargs):
     ]
     """
     try:
-        return ok(
-            datastore().overview.search(
-                "overview_id:*",
-                as_obj=False,
-                rows=10000,
-            )["items"]
-        )
+        return ok_if_collection_modified("overview", overview_service.get_overviews)
     except ValueError as e:
         return bad_request(err=str(e))
 
@@ -86,24 +84,15 @@ def create_overview(**kwargs):
     if "content" not in overview_data:
         return bad_request(err="You must specify content when creating an overview!")
 
-    storage = datastore()
-
     try:
         overview = Overview(overview_data)
 
         overview.owner = kwargs["user"]["uname"]
 
-        query_str = f"analytic:{sanitize_lucene_query(overview.analytic)}"
-
-        if overview.detection:
-            query_str += f" AND detection:{overview.detection}"
-        else:
-            query_str += " AND -_exists_:detection"
-
-        if storage.overview.search(query_str)["total"] > 0:
+        if overview_service.get_overview(overview.analytic, overview.detection):
             return conflict(err="An overview covering this case already exists.")
 
-        storage.overview.save(overview.overview_id, overview)
+        overview_service.save_overview(overview)
         return created(overview.as_primitives())
     except HowlerException as e:
         return bad_request(err=str(e))
@@ -139,7 +128,7 @@ def delete_overview(id: str, user: User, **kwargs):
     if existing_overview.owner != user.uname and "admin" not in user.type:
         return forbidden(err="You cannot delete an overview that is not owned by you.")
 
-    result = storage.overview.delete(id)
+    result = overview_service.delete_overview(id)
     if result:
         return no_content()
     else:
@@ -183,7 +172,7 @@ def update_overview_content(id: str, user: User, **kwargs):
 
     existing_overview.content = content
 
-    storage.overview.save(existing_overview.overview_id, existing_overview)
+    overview_service.save_overview(existing_overview)
 
     try:
         return ok(storage.overview.get_if_exists(existing_overview.overview_id, as_obj=False))
@@ -1,4 +1,5 @@
-from typing import Union
+from itertools import chain
+from typing import Any, Callable, Union
 
 from elasticsearch import BadRequestError
 from flask import request
@@ -7,7 +8,17 @@ from sigma.rule import SigmaRule
 from werkzeug.exceptions import BadRequest
 from yaml.scanner import ScannerError
 
-from howler.api import bad_request, make_subapi_blueprint, ok
+from howler.api import (
+    accepted,
+    bad_request,
+    forbidden,
+    make_subapi_blueprint,
+    no_content,
+    not_found,
+    ok,
+    stream_ndjson_response,
+)
+from howler.common.exceptions import AccessDeniedException, InvalidDataException, NotFoundException
 from howler.common.loader import datastore
 from howler.common.logging import get_logger
 from howler.common.swagger import generate_swagger_docs
@@ -19,11 +30,23 @@ from howler.helper.search import (
     list_all_fields,
 )
 from howler.security import api_login
+from howler.services import async_search_service
 
 SUB_API = "search"
 search_api = make_subapi_blueprint(SUB_API, api_version=1)
 search_api._doc = "Perform search queries"
 
+MAX_BATCH_SIZE = 50
+
+# Accepted parameters for each type of search in a batch, as a tuple of single and multi valued fields
+BATCH_FIELDS: dict[str, tuple[list[str], list[str]]] = {
+    "search": (["query", "offset", "rows", "sort", "fl", "profile", "timeout", "track_total_hits"], ["filters"]),
+    "count": (["query"], ["filters"]),
+    "facet": (["query", "mincount", "rows", "prefix", "contains", "ignore_case", "sort"], ["filters"]),
+    "histogram": (["query", "mincount", "start", "end", "gap"], ["filters"]),
+    "stats": (["query"], ["filters"]),
+}
+
 logger = get_logger(__file__)
 
 
@@ -56,6 +79,23 @@ def generate_params(request, fields, multi_fields, params=None):
     return params, req_data
 
 
+def _get_histogram_defaults(field: str, field_info: dict[str, Any]) -> dict[str, Union[str, int]]:
+    """Get the default start, end and gap of an histogram based on the type of the field"""
+    if field_info["type"] == "integer":
+        return {"start": 0, "end": 2000, "gap": 100}
+    elif field_info["type"] == "date":
+        storage = datastore()
+        return {
+            "start": f"{storage.ds.now}-1{storage.ds.day}",
+            "end": f"{storage.ds.now}",
+            "gap": f"+1{storage.ds.hour}",
+        }
+    else:
+        raise InvalidDataException(
+            f"Field '{field}' is of type '{field_info['type']}'. Only 'integer' or 'date' are acceptable."
+        )
+
+
 @generate_swagger_docs()
 @search_api.route("/<index>", methods=["GET", "POST"])
 @api_login(required_priv=["R"])
@@ -75,6 +115,7 @@ def search(index, **kwargs):
     rows                =>   Number of results per page
     sort                =>   How to sort the results (not available in deep paging)
     fl                  =>   List of fields to return
+    profile             =>   Projection profile selecting the fields to return when fl is not set (e.g. list, detail)
     timeout             =>   Maximum execution time (ms)
     use_archive         =>   Allow access to the datastore achive (Default: False)
     track_total_hits    =>   Track the total number of query matches, instead of stopping at 10000 (Default: False)
@@ -86,6 +127,7 @@ def search(index, **kwargs):
      "rows": 100,          # Max number of results
      "sort": "field asc",  # How to sort the results
      "fl": "id,score",     # List of fields to return
+     "profile": "list",    # Projection profile selecting the fields to return
      "timeout": 1000,      # Maximum execution time (ms)
      "filters": ['fq']}    # List of additional filter queries limit the data
 
@@ -109,6 +151,7 @@ def search(index, **kwargs):
         "rows",
         "sort",
         "fl",
+        "profile",
         "timeout",
         "deep_paging_id",
         "track_total_hits",
@@ -142,6 +185,99 @@ def search(index, **kwargs):
         return bad_request(err=f"SearchException: {e}")
 
 
+@generate_swagger_docs()
+@search_api.route("/<index>/export", methods=["GET", "POST"])
+@api_login(required_priv=["R"])
+def export(index, **kwargs):
+    """Export every document in the specified index matching a given query as newline delimited JSON.
+
+    Documents are streamed straight from the datastore page per page, so there is no limit on the size of the export.
+    After each page, a line containing only a cursor is written (i.e. {"_cursor": "..."}). If the export is
+    interrupted, pass the last cursor received to resume right after it. The last line of a complete export is
+    {"_cursor": null}.
+
+    Variables:
+    index  =>   Index to export from (hit, user,...)
+
+    Arguments:
+    query   =>   Query to search for
+
+    Optional Arguments:
+    filters             =>   List of additional filter queries limit the data
+    fl                  =>   Comma-separated list of fields to return
+    profile             =>   Projection profile selecting the fields to return when fl is not set (e.g. export)
+    buffer_size         =>   Number of documents fetched from the datastore per page (Default: 1000)
+    cursor              =>   Cursor from which to resume an interrupted export
+    use_archive         =>   Allow access to the datastore achive (Default: False)
+    gzip                =>   Compress the output using gzip (Default: negotiated using Accept-Encoding)
+
+    Data Block:
+    # Note that the data block is for POST requests only!
+    {"query": "query",     # Query to search for
+     "fl": "id,score",     # List of fields to return
+     "profile": "export",  # Projection profile selecting the fields to return
+     "buffer_size": 1000,  # Number of documents fetched per page
+     "cursor": "eyJ...",   # Cursor from which to resume
+     "filters": ['fq']}    # List of additional filter queries limit the data
+
+    Result Example:
+    {"howler": {"id": "..."}, ...}
+    {"howler": {"id": "..."}, ...}
+    {"_cursor": "eyJ..."}
+    ...
+    {"_cursor": null}
+    """
+    user = kwargs["user"]
+    collection = get_collection(index, user)
+
+    if collection is None:
+        return bad_request(err=f"Not a valid index to search in: {index}")
+
+    fields = ["fl", "profile", "cursor"]
+    multi_fields = ["filters"]
+    boolean_fields = ["use_archive", "gzip"]
+
+    params, req_data = generate_params(request, fields, multi_fields)
+
+    params.update(
+        {
+            k: str(req_data.get(k, "false")).lower() in ["true", ""]
+            for k in boolean_fields
+            if req_data.get(k, None) is not None
+        }
+    )
+    compress = params.pop("gzip", None)
+
+    try:
+        params["item_buffer_size"] = int(req_data.get("buffer_size", 1000))
+    except ValueError:
+        return bad_request(err="Invalid buffer size.")
+
+    if has_access_control(index):
+        params.update({"access_control": user["access_control"]})
+
+    params["as_obj"] = False
+
+    query = req_data.get("query", None)
+    if not query:
+        return bad_request(err="There was no search query.")
+
+    pages = collection().stream_search_pages(query, **params)
+
+    try:
+        # Fetch the first page before the response starts so invalid queries and cursors can still be reported
+        first_page = next(pages)
+    except (SearchException, BadRequestError) as e:
+        return bad_request(err=f"SearchException: {e}")
+
+    def generate():
+        for items, cursor in chain([first_page], pages):
+            items.append({"_cursor": cursor})
+            yield items
+
+    return stream_ndjson_response(generate(), compress=compress)
+
+
 @generate_swagger_docs()
 @search_api.route("/<index>/eql", methods=["GET", "POST"])
 @api_login(required_priv=["R"])
@@ -252,6 +388,7 @@ def sigma_search(index, **kwargs):
         "rows",
         "sort",
         "fl",
+        "profile",
         "timeout",
         "deep_paging_id",
         "track_total_hits",
@@ -295,6 +432,166 @@ def sigma_search(index, **kwargs):
         return bad_request(err=f"SearchException: {e}")
 
 
+@generate_swagger_docs()
+@search_api.route("/async/<index>", methods=["POST"])
+@api_login(required_priv=["R"])
+def submit_async_search(index, **kwargs):
+    """Submit a long-running lucene, EQL or sigma search to be run asynchronously on the specified index.
+
+    The request waits a short time for the search to complete. If it does not, the results found so far are returned,
+    along with an id to poll for the rest of the results. Searches expire if they are not polled for a while.
+
+    Variables:
+    index  =>   Index to search in (hit, user,...)
+
+    Arguments:
+    None
+
+    Data Block:
+    {"type": "lucene",                      # Type of search, one of lucene, eql or sigma
+     "query": "query",                      # Lucene query, EQL query or sigma rule to search for
+     "offset": 0,                           # Offset in the results (lucene and sigma only)
+     "rows": 100,                           # Max number of results
+     "sort": "field asc",                   # How to sort the results (lucene and sigma only)
+     "fl": "id,score",                      # List of fields to return
+     "filters": ['fq'],                     # List of additional filter queries limit the data
+     "use_archive": false,                  # Allow access to the datastore achive (lucene and sigma only)
+     "track_total_hits": false,             # Track the total number of query matches (lucene and sigma only)
+     "wait_for_completion_timeout": 1000}   # Maximum time to wait for the search to complete (ms)
+
+    Result Example:
+    {"id": "4fbC8...",          # ID of the search, to poll for results
+     "index": "hit",            # Index searched in
+     "type": "lucene",          # Type of search
+     "is_running": true,        # Is the search still running
+     "is_partial": true,        # Are the results partial
+     "expiry": 1700000000.0,    # When the search expires, unless polled again
+     "result": {...}}           # The results found so far, in the format of the matching synchronous search
+    """
+    user = kwargs["user"]
+
+    try:
+        data = request.json
+    except BadRequest:
+        return bad_request(err="Invalid JSON data block.")
+
+    if not isinstance(data, dict):
+        return bad_request(err="Invalid JSON data block.")
+
+    search_type = data.get("type", "lucene")
+    if not isinstance(search_type, str) or not search_type:
+        return bad_request(err="Invalid search type.")
+
+    query = data.get("query", None)
+    if not isinstance(query, str) or not query:
+        return bad_request(err="There was no search query.")
+
+    params = {
+        k: v for k, v in data.items() if k not in ["type", "query", "wait_for_completion_timeout"] and v is not None
+    }
+    if "filters" in params and not isinstance(params["filters"], list):
+        params["filters"] = [params["filters"]]
+
+    if search_type != "eql":
+        default_sort = get_default_sort(index, user)
+        if default_sort is None:
+            return bad_request(err=f"Not a valid index to search in: {index}")
+
+        params["sort"] = (params.get("sort", None) or default_sort).split(",")
+
+    try:
+        result = async_search_service.submit_search(
+            index,
+            search_type,
+            query,
+            user,
+            wait_for_completion_timeout=data.get("wait_for_completion_timeout", None),
+            **params,
+        )
+    except InvalidDataException as e:
+        return bad_request(err=e.message)
+    except (SearchException, BadRequestError) as e:
+        logger.error("SearchException: %s", str(e), exc_info=True)
+        return bad_request(err=f"SearchException: {e}")
+
+    return accepted(result) if result["is_running"] else ok(result)
+
+
+@generate_swagger_docs()
+@search_api.route("/async/<index>/<search_id>", methods=["GET"])
+@api_login(required_priv=["R"])
+def get_async_search(index, search_id, **kwargs):
+    """Get the status and results of an asynchronous search. Polling a search postpones its expiry.
+
+    Variables:
+    index       =>   Index the search was submitted on
+    search_id   =>   ID of the search returned on submission
+
+    Arguments:
+    None
+
+    Optional Arguments:
+    wait_for_completion_timeout     =>   Maximum time to wait for the search to complete (ms)
+
+    Result Example:
+    {"id": "4fbC8...",          # ID of the search
+     "index": "hit",            # Index searched in
+     "type": "lucene",          # Type of search
+     "is_running": false,       # Is the search still running
+     "is_partial": false,       # Are the results partial
+     "expiry": 1700000000.0,    # When the search expires, unless polled again
+     "result": {...}}           # The results, in the format of the matching synchronous search
+    """
+    user = kwargs["user"]
+
+    try:
+        wait_for_completion_timeout = request.args.get("wait_for_completion_timeout", None, type=int)
+        result = async_search_service.get_search(
+            search_id, user, wait_for_completion_timeout=wait_for_completion_timeout
+        )
+    except NotFoundException as e:
+        return not_found(err=e.message)
+    except AccessDeniedException as e:
+        return forbidden(err=e.message)
+    except (SearchException, BadRequestError) as e:
+        logger.error("SearchException: %s", str(e), exc_info=True)
+        return bad_request(err=f"SearchException: {e}")
+
+    if result["index"] != index:
+        return not_found(err=f"Asynchronous search {search_id} does not exist, or it has expired.")
+
+    return accepted(result) if result["is_running"] else ok(result)
+
+
+@generate_swagger_docs()
+@search_api.route("/async/<index>/<search_id>", methods=["DELETE"])
+@api_login(required_priv=["R"])
+def delete_async_search(index, search_id, **kwargs):
+    """Cancel an asynchronous search if it is still running, and delete its results.
+
+    Variables:
+    index       =>   Index the search was submitted on
+    search_id   =>   ID of the search returned on submission
+
+    Arguments:
+    None
+
+    Result Example:
+    {"success": true}
+    """
+    user = kwargs["user"]
+
+    try:
+        async_search_service.delete_search(search_id, user)
+    except NotFoundException as e:
+        return not_found(err=e.message)
+    except (SearchException, BadRequestError) as e:
+        logger.error("SearchException: %s", str(e), exc_info=True)
+        return bad_request(err=f"SearchException: {e}")
+
+    return no_content()
+
+
 @generate_swagger_docs()
 @search_api.route("/grouped/<index>/<group_field>", methods=["GET", "POST"])
 @api_login(required_priv=["R"])
@@ -312,8 +609,12 @@ def group_search(index, group_field, **kwargs):
     filters      =>   List of additional filter queries limit the data
     offset       =>   Offset in the results
     rows         =>   Max number of results
-    sort         =>   How to sort the results
+    sort         =>   How to sort the results (asc or desc on the group values when paging with after)
     fl           =>   List of fields to return
+    after        =>   Cursor of the next page of groups, or * for the first page, to page through every group
+    prefix       =>   Only return the groups with a value starting with this prefix (paging with after only)
+    contains     =>   Only return the groups with a value containing this value (paging with after only)
+    ignore_case  =>   Ignore the case of the values when applying prefix and contains (Default: False)
 
     Data Block:
     # Note that the data block is for POST requests only!
@@ -324,7 +625,11 @@ def group_search(index, group_field, **kwargs):
      "rows": 100,
      "sort": "field asc",
      "fl": "id,score",
-     "filters": ['fq']}
+     "filters": ['fq'],
+     "after": "*",
+     "prefix": "abc",
+     "contains": "def",
+     "ignore_case": false}
 
 
     Result Example:
@@ -333,7 +638,7 @@ def group_search(index, group_field, **kwargs):
      "offset": 0,        # Offset in the result list
      "rows": 100,        # Number of results returned
      "items": [],        # List of results
-     "sequences": [],    # List of matching sequences
+     "next_after": "e",  # Cursor of the next page of groups, when paging with after
     }
     """
     user = kwargs["user"]
@@ -342,16 +647,22 @@ def group_search(index, group_field, **kwargs):
     if collection is None or default_sort is None:
         return bad_request(err=f"Not a valid index to search in: {index}")
 
-    fields = ["group_sort", "limit", "query", "offset", "rows", "sort", "fl"]
+    fields = ["group_sort", "limit", "query", "offset", "rows", "sort", "fl", "after", "prefix", "contains"]
     multi_fields = ["filters"]
 
-    params = generate_params(request, fields, multi_fields)[0]
+    params, req_data = generate_params(request, fields, multi_fields)
+
+    if req_data.get("ignore_case", None) is not None:
+        params["ignore_case"] = str(req_data["ignore_case"]).lower() in ["true", ""]
 
     if has_access_control(index):
         params.update({"access_control": user["access_control"]})
 
     params["as_obj"] = False
-    params.setdefault("sort", default_sort)
+
+    # When paging through every group, groups are sorted on their value
+    if "after" not in params:
+        params.setdefault("sort", default_sort)
 
     if not group_field:
         return bad_request(err="The field to group on was not specified.")
@@ -474,15 +785,25 @@ def facet(index, field, **kwargs):
     Optional Arguments:
     query       =>   Query to search for
     mincount    =>   Minimum item count for the fieldvalue to be returned
-    rows        => The max number of fieldvalues to return
+    rows        =>   The max number of fieldvalues to return
     filters     =>   Additional query to limit to output
+    prefix      =>   Only return the fieldvalues starting with this prefix
+    contains    =>   Only return the fieldvalues containing this value
+    ignore_case =>   Ignore the case of the fieldvalues when applying prefix and contains (Default: False)
+    sort        =>   Sort the fieldvalues by value (asc or desc) instead of by count
+    after       =>   Cursor of the next page of fieldvalues, or * for the first page, to page through every fieldvalue
 
     Data Block:
     # Note that the data block is for POST requests only!
     {"query": "id:*",
      "mincount": "10",
      "rows": "10",
-     "filters": ['fq']}
+     "filters": ['fq'],
+     "prefix": "abc",
+     "contains": "def",
+     "ignore_case": false,
+     "sort": "asc",
+     "after": "*"}
 
     Result Example:
     {                 # Facetting results
@@ -490,6 +811,10 @@ def facet(index, field, **kwargs):
      ...
      "value_N": 19,
     }
+
+    # When paging with after
+    {"items": {"value_0": 2, ...},      # Facetting results of this page
+     "next_after": "eyJ..."}            # Cursor of the next page, null after the last page
     """
     user = kwargs["user"]
     collection = get_collection(index, user)
@@ -500,10 +825,13 @@ def facet(index, field, **kwargs):
     if field_info is None:
         return bad_request(err=f"Field '{field}' is not a valid field in index: {index}")
 
-    fields = ["query", "mincount", "rows"]
+    fields = ["query", "mincount", "rows", "prefix", "contains", "sort", "after"]
     multi_fields = ["filters"]
 
-    params = generate_params(request, fields, multi_fields)[0]
+    params, req_data = generate_params(request, fields, multi_fields)
+
+    if req_data.get("ignore_case", None) is not None:
+        params["ignore_case"] = str(req_data["ignore_case"]).lower() in ["true", ""]
 
     if has_access_control(index):
         params.update({"access_control": user["access_control"]})
@@ -560,21 +888,13 @@ def histogram(index, field, **kwargs):
 
     # Get fields default values
     field_info = collection().fields().get(field, None)
-    params: dict[str, Union[str, int]] = {}
     if field_info is None:
         return bad_request(err=f"Field '{field}' is not a valid field in index: {index}")
-    elif field_info["type"] == "integer":
-        params = {"start": 0, "end": 2000, "gap": 100}
-    elif field_info["type"] == "date":
-        storage = datastore()
-        params = {
-            "start": f"{storage.ds.now}-1{storage.ds.day}",
-            "end": f"{storage.ds.now}",
-            "gap": f"+1{storage.ds.hour}",
-        }
-    else:
-        err_msg = f"Field '{field}' is of type '{field_info['type']}'. Only 'integer' or 'date' are acceptable."
-        return bad_request(err=err_msg)
+
+    try:
+        params = _get_histogram_defaults(field, field_info)
+    except InvalidDataException as e:
+        return bad_request(err=e.message)
 
     # Load API variables
     params = generate_params(request, fields, multi_fields, params)[0]
@@ -643,3 +963,149 @@ def stats(index, int_field, **kwargs):
     except (SearchException, BadRequestError) as e:
         logger.error("SearchException: %s", str(e), exc_info=True)
         return bad_request(err=f"SearchException: {e}")
+
+
+def _prepare_batch_entry(  # noqa: C901
+    entry: Any, user: dict[str, Any], index_fields: dict[str, dict[str, Any]]
+) -> tuple[dict[str, Any], dict[str, Any], Callable[[dict[str, Any]], Any]]:
+    """Validate a single entry of a batch search and prepare it for the multi search request"""
+    if not isinstance(entry, dict):
+        raise InvalidDataException("Each search in the batch must be an object.")
+
+    search_type = entry.get("type", None)
+    if search_type not in BATCH_FIELDS:
+        raise InvalidDataException(f"Invalid search type: {search_type}. Must be one of {', '.join(BATCH_FIELDS)}.")
+
+    index = entry.get("index", None)
+    if not isinstance(index, str) or not index:
+        raise InvalidDataException(f"Not a valid index to search in: {index}")
+
+    collection = get_collection(index, user)
+    default_sort = get_default_sort(index, user)
+    if collection is None or default_sort is None:
+        raise InvalidDataException(f"Not a valid index to search in: {index}")
+
+    fields, multi_fields = BATCH_FIELDS[search_type]
+    params: dict[str, Any] = {k: entry[k] for k in [*fields, *multi_fields] if k in entry}
+
+    if entry.get("use_archive", None) is not None:
+        params["use_archive"] = str(entry["use_archive"]).lower() in ["true", ""]
+
+    for key in ["offset", "rows", "mincount", "timeout"]:
+        if params.get(key, None) is not None:
+            try:
+                params[key] = int(params[key])
+            except (TypeError, ValueError) as e:
+                raise InvalidDataException(f"{key} must be an integer.", cause=e)
+
+    if params.get("sort", None) is not None and not isinstance(params["sort"], str):
+        raise InvalidDataException("sort must be a string.")
+
+    if search_type in ["search", "count"] and not params.get("query", None):
+        raise InvalidDataException("There was no search query.")
+
+    if search_type in ["facet", "histogram", "stats"]:
+        field = entry.get("field", None)
+        if not isinstance(field, str) or not field:
+            raise InvalidDataException(f"Field '{field}' is not a valid field in index: {index}")
+
+        # Only fetch the field mapping once per index, no matter how many searches target it
+        if index not in index_fields:
+            index_fields[index] = collection().fields()
+
+        field_info = index_fields[index].get(field, None)
+        if field_info is None:
+            raise InvalidDataException(f"Field '{field}' is not a valid field in index: {index}")
+
+        if search_type == "histogram":
+            params = {**_get_histogram_defaults(field, field_info), **params}
+        elif search_type == "stats" and field_info["type"] not in ["integer", "float"]:
+            raise InvalidDataException(f"Field '{field}' is not a numeric field.")
+
+        params["field"] = field
+
+    if search_type == "search":
+        params["as_obj"] = False
+        params["sort"] = (params.get("sort", None) or default_sort).split(",")
+
+    if has_access_control(index):
+        params["access_control"] = user["access_control"]
+
+    try:
+        return collection().prepare_msearch(search_type, **params)
+    except (TypeError, ValueError, ArithmeticError) as e:
+        # e.g. histogram ranges that are not numbers or date math, or a gap of zero
+        raise InvalidDataException(f"Invalid {search_type} arguments: {e}", cause=e)
+
+
+@generate_swagger_docs()
+@search_api.route("/batch", methods=["POST"])
+@api_login(required_priv=["R"])
+def batch(**kwargs):
+    """Run multiple searches, counts, facets, histograms and stats in a single request to the datastore.
+
+    Each search is validated and executed independently, an invalid or failing search does not prevent the others
+    from returning their results.
+
+    Variables:
+    None
+
+    Arguments:
+    None
+
+    Data Block:
+    [
+        {
+            "type": "search",               # One of search, count, facet, histogram or stats
+            "index": "hit",                 # Index to search in (hit, user,...)
+            "field": "howler.status",       # Field to analyse (facet, histogram and stats only)
+            "query": "howler.id:*",         # Query to search for
+            "filters": ["fq"],              # List of additional filter queries limit the data
+            "use_archive": false,           # Allow access to the datastore achive (Default: False)
+            ...                             # Any other argument supported by the matching endpoint
+        },
+        ...
+    ]
+
+    Result Example:
+    [
+        {
+            "result": {...},    # The result of the search, in the format of the matching endpoint
+            "error": null       # The reason the search failed, if it did
+        },
+        ...
+    ]
+    """
+    user = kwargs["user"]
+
+    try:
+        searches = request.json
+    except BadRequest:
+        return bad_request(err="Invalid JSON data block.")
+
+    if not isinstance(searches, list) or len(searches) == 0:
+        return bad_request(err="You must provide a list of searches to run.")
+
+    if len(searches) > MAX_BATCH_SIZE:
+        return bad_request(err=f"A batch is limited to {MAX_BATCH_SIZE} searches, {len(searches)} were provided.")
+
+    responses: list[dict[str, Any]] = [{"result": None, "error": None} for _ in searches]
+    index_fields: dict[str, dict[str, Any]] = {}
+
+    prepared = []
+    for i, entry in enumerate(searches):
+        try:
+            prepared.append((i, _prepare_batch_entry(entry, user, index_fields)))
+        except (InvalidDataException, SearchException) as e:
+            responses[i]["error"] = e.message
+
+    try:
+        results = datastore().multi_search([search for _, search in prepared])
+    except (SearchException, BadRequestError) as e:
+        logger.error("SearchException: %s", str(e), exc_info=True)
+        return bad_request(err=f"SearchException: {e}")
+
+    for (i, _), (result, error) in zip(prepared, results):
+        responses[i] = {"result": result, "error": error}
+
+    return ok(responses)
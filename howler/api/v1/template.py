@@ -10,6 +10,7 @@ from howler.api import (
     not_found,
     ok,
 )
+from howler.api.v1.utils.etag import ok_if_collection_modified
 from howler.common.exceptions import HowlerException
 from howler.common.loader import datastore
 from howler.common.logging import get_logger
@@ -18,7 +19,7 @@ from howler.datastore.operations import OdmHelper
 from howler.odm.models.template import Template
 from howler.odm.models.user import User
 from howler.security import api_login
-from howler.utils.str_utils import sanitize_lucene_query
+from howler.services import template_service
 
 SUB_API = "template"
 template_api = make_subapi_blueprint(SUB_API, api_version=1)
@@ -35,6 +36,9 @@ template_helper = OdmHelper(Template)
 def get_templates(**kwargs):
     """Get a list of templates the user can use to render hits
 
+    The response has an ETag header. Pass it back in an If-None-Match header to get a 304 response instead of the
+    list, as long as no template changed.
+
     Variables:
     None
 
@@ -47,13 +51,8 @@ def get_templates(**kwargs):
     ]
     """
     try:
-        return ok(
-            datastore().template.search(
-                f"type:global OR owner:{kwargs['user']['uname']}",
-                as_obj=False,
-                rows=10000,
-            )["items"]
-        )
+        uname = kwargs["user"]["uname"]
+        return ok_if_collection_modified("template", lambda: template_service.get_templates(uname), scope=uname)
     except ValueError as e:
         return bad_request(err=str(e))
 
@@ -90,8 +89,6 @@ def create_template(**kwargs):
     if "keys" not in template_data:
         return bad_request(err="You must specify a list of keys when creating a template!")
 
-    storage = datastore()
-
     try:
         template = Template(template_data)
 
@@ -100,20 +97,10 @@ def create_template(**kwargs):
         else:
             template.owner = None
 
-        query_str = f"analytic:{sanitize_lucene_query(template.analytic)} AND type:{template.type}"
-
-        if template.type == "personal":
-            query_str += f" AND owner:{template.owner}"
-
-        if template.detection:
-            query_str += f" AND detection:{template.detection}"
-        else:
-            query_str += " AND -_exists_:detection"
-
-        if storage.template.search(query_str)["total"] > 0:
+        if template_service.get_template(template.analytic, template.detection, template.type, template.owner):
             return conflict(err="A template covering this case already exists.")
 
-        storage.template.save(template.template_id, template)
+        template_service.save_template(template)
         return created(template.as_primitives())
     except HowlerException as e:
         return bad_request(err=str(e))
@@ -152,7 +139,7 @@ def delete_template(id: str, user: User, **kwargs):
     if existing_template.type == "global" and "admin" not in user.type:
         return forbidden(err="You cannot delete a global template unless you are an administrator.")
 
-    result = storage.template.delete(id)
+    result = template_service.delete_template(id)
     if result:
         return no_content()
     else:
@@ -198,7 +185,7 @@ def update_template_fields(id: str, user: User, **kwargs):
 
     existing_template.keys = new_fields
 
-    storage.template.save(existing_template.template_id, existing_template)
+    template_service.save_template(existing_template)
 
     try:
         return ok(storage.template.get_if_exists(existing_template.template_id, as_obj=False))
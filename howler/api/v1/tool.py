@@ -7,12 +7,13 @@ from howler.common.exceptions import HowlerException
 from howler.common.loader import datastore
 from howler.common.logging import get_logger
 from howler.common.swagger import generate_swagger_docs
+from howler.datastore.collection import terms_filter
 from howler.datastore.operations import OdmHelper
 from howler.odm.base import _Field
 from howler.odm.models.hit import Hit
 from howler.odm.models.user import User
 from howler.security import api_login
-from howler.services import action_service, analytic_service, hit_service
+from howler.services import action_service, analytic_service, dedup_service, hit_service
 from howler.utils.dict_utils import flatten
 from howler.utils.isotime import now_as_iso
 from howler.utils.str_utils import get_parent_key
@@ -59,6 +60,7 @@ def create_one_or_many_hits(tool_name: str, user: User, **kwargs):  # noqa: C901
             {'id': "id1", 'error': None},
             {'id': "id2", 'error': None},
             {'id': None, 'error': "Error message"},
+            {'id': "id1", 'error': None, 'duplicate': True},   # Duplicate of an existing hit, when deduplication is on
         ]
     }
     """
@@ -162,7 +164,13 @@ def create_one_or_many_hits(tool_name: str, user: User, **kwargs):  # noqa: C901
     if any([obj["error"] for obj in out]):
         return bad_request(out, warnings=warnings, err="No valid hits were provided")
     else:
+        # Bundles need all of their children to be created, so duplicates are only suppressed outside of bundles
+        duplicates = dedup_service.find_duplicates(odms) if bundle_hit is None else {}
+
         for odm in odms:
+            if odm.howler.id in duplicates:
+                continue
+
             if bundle_hit is not None:
                 bundle_hit.howler.hits.append(odm.howler.id)
                 bundle_hit.howler.bundle_size += 1
@@ -179,6 +187,18 @@ def create_one_or_many_hits(tool_name: str, user: User, **kwargs):  # noqa: C901
 
         datastore().hit.commit()
 
-        action_service.bulk_execute_on_query(f"howler.id:({' OR '.join(entry['id'] for entry in out)})", user=user)
+        if duplicates:
+            dedup_service.fold_duplicates(duplicates)
+
+            for entry in out:
+                if entry["id"] in duplicates:
+                    entry["id"] = duplicates[entry["id"]]
+                    entry["duplicate"] = True
+
+        created_ids = [entry["id"] for entry in out if not entry.get("duplicate", False)]
+        if created_ids:
+            action_service.bulk_execute_on_query(
+                "howler.id:*", user=user, filters=[terms_filter("howler.id", created_ids)]
+            )
 
         return created(out, warnings=warnings)
@@ -4,6 +4,7 @@ from typing import Any, Optional
 
 from flask import request
 
+import howler.services.auth_service as auth_service
 import howler.services.user_service as user_service
 from howler.api import (
     bad_request,
@@ -146,7 +147,7 @@ def add_user_account(username, **_):
     avatar = data.pop("avatar", None)
 
     if avatar is not None:
-        storage.user_avatar.save(username, avatar)
+        user_service.save_avatar(username, avatar)
 
     try:
         return ok({"success": storage.user.save(username, User(data))})
@@ -192,7 +193,7 @@ def get_user_account(username: str, server_version: Optional[str] = None, **kwar
     user["username"] = user["uname"]
 
     if "load_avatar" in request.args:
-        user["avatar"] = datastore().user_avatar.get(username)
+        user["avatar"] = user_service.get_avatar(username)
 
     return ok(user), server_version
 
@@ -219,6 +220,7 @@ def remove_user_account(username, **_):
     if user_data:
         user_deleted = storage.user.delete(username)
         avatar_deleted = storage.user_avatar.delete(username)
+        auth_service.invalidate_apikey_cache(username)
 
         if not user_deleted or not avatar_deleted:
             return internal_error(err="Failed to delete user or avatar. Contact your administrator.")
@@ -298,6 +300,7 @@ def set_user_account(username: str, **kwargs):  # noqa: C901
         data["classification"] = user_service.get_dynamic_classification(data["classification"], data["email"])
 
         ret_val = user_service.save_user_account(username, data, kwargs["user"])
+        auth_service.invalidate_apikey_cache(username)
         return ok({"success": ret_val})
     except AccessDeniedException as e:
         return forbidden(err=str(e))
@@ -325,8 +328,7 @@ def get_user_avatar(username, **_):
     Result Example:
     "data:image/jpeg;base64,/9j/4AAQSkZJRgABAQEASABIAAD..."
     """
-    storage = datastore()
-    avatar: str = storage.user_avatar.get(username)
+    avatar = user_service.get_avatar(username)
 
     if avatar:
         resp = ok(avatar)
@@ -364,7 +366,7 @@ def set_user_avatar(username, **kwargs):
     storage = datastore()
     if data:
         data: str = data.decode("utf-8")
-        if not isinstance(data, str) or not storage.user_avatar.save(username, data):
+        if not isinstance(data, str) or not user_service.save_avatar(username, data):
             bad_request(
                 err="Data block should be a base64 encoded image that starts with 'data:image/<format>;base64,'"
             )
@@ -1,22 +1,44 @@
 import functools
 import re
+from typing import Any, Callable, Optional
 
 from flask import Response, request
+from prometheus_client import Counter
 
-from howler.api import not_modified
+from howler.api import not_modified, ok
+from howler.common.loader import APP_NAME
+from howler.services.generation_service import ensure_visible, get_etag, get_generation
 
+NOT_MODIFIED_RESPONSES = Counter(
+    f"{APP_NAME.replace('-', '_')}_not_modified_responses_total",
+    "The number of list requests answered with a 304 without querying the datastore, broken down by collection",
+    ["collection"],
+)
+NOT_MODIFIED_BYTES_SAVED = Counter(
+    f"{APP_NAME.replace('-', '_')}_not_modified_bytes_saved_total",
+    "The number of response bytes not sent thanks to 304 responses to list requests, broken down by collection",
+    ["collection"],
+)
 
-def add_etag(getter, check_if_match=False):
-    """Decorator to add etag handling to a flask response"""
+# The etag and size of the last full response sent for each collection and scope, used to estimate the bytes saved
+_response_sizes: dict[tuple[str, Optional[str]], tuple[str, int]] = {}
+
+
+def add_etag(getter, check_if_match=False, cached=False):
+    """Decorator to add etag handling to a flask response.
+
+    With cached set, GET requests ask the getter for a cached copy of the object, so that conditional requests can be
+    answered without reaching the datastore.
+    """
 
     def wrapper(f):
         @functools.wraps(f)
         def generate_etag(*args, **kwargs):
-            obj, version = getter(
-                kwargs.get("id", kwargs.get("username", None)),
-                as_odm=True,
-                version=True,
-            )
+            getter_kwargs = {"as_odm": True, "version": True}
+            if cached and request.method == "GET":
+                getter_kwargs["cached"] = True
+
+            obj, version = getter(kwargs.get("id", kwargs.get("username", None)), **getter_kwargs)
             if (
                 not check_if_match
                 and "If-Match" in request.headers
@@ -44,3 +66,29 @@ def add_etag(getter, check_if_match=False):
         return generate_etag
 
     return wrapper
+
+
+def ok_if_collection_modified(name: str, builder: Callable[[], Any], scope: Optional[str] = None) -> Response:
+    """Respond with the data built from a collection, along with an etag derived from the generation of the collection.
+
+    If the client sent the same etag in If-None-Match, the collection did not change since: respond with a 304 without
+    building the data.
+    """
+    generation = get_generation(name)
+    etag = get_etag(name, scope, generation=generation)
+
+    if request.if_none_match.contains(etag):
+        NOT_MODIFIED_RESPONSES.labels(name).inc()
+
+        last_etag, size = _response_sizes.get((name, scope), (None, 0))
+        if last_etag == etag:
+            NOT_MODIFIED_BYTES_SAVED.labels(name).inc(size)
+
+        response = not_modified()
+    else:
+        ensure_visible(name, generation)
+        response = ok(builder())
+        _response_sizes[(name, scope)] = (etag, len(response.get_data()))
+
+    response.set_etag(etag)
+    return response
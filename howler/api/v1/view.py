@@ -9,6 +9,7 @@ from howler.api import (
     not_found,
     ok,
 )
+from howler.api.v1.utils.etag import ok_if_collection_modified
 from howler.common.exceptions import HowlerException
 from howler.common.loader import datastore
 from howler.common.logging import get_logger
@@ -31,6 +32,9 @@ logger = get_logger(__file__)
 def get_views(user: User, **kwargs):
     """Get a list of views the user can use to filter hits
 
+    The response has an ETag header. Pass it back in an If-None-Match header to get a 304 response instead of the
+    list, as long as no view changed.
+
     Variables:
     None
 
@@ -43,12 +47,14 @@ def get_views(user: User, **kwargs):
     ]
     """
     try:
-        return ok(
-            datastore().view.search(
+        return ok_if_collection_modified(
+            "view",
+            lambda: datastore().view.search(
                 f"type:global OR owner:({user['uname']} OR none)",
                 as_obj=False,
                 rows=1000,
-            )["items"]
+            )["items"],
+            scope=user["uname"],
         )
     except ValueError as e:
         return bad_request(err=str(e))
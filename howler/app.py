@@ -10,6 +10,7 @@ from flask.logging import default_handler
 from prometheus_client import make_wsgi_app
 from werkzeug.middleware.dispatcher import DispatcherMiddleware
 
+from howler.api import end_request_tracking, start_request_tracking
 from howler.api.base import api
 from howler.api.socket import socket_api
 from howler.api.v1 import apiv1
@@ -39,6 +40,7 @@ from howler.config import (
 from howler.cronjobs import setup_jobs
 from howler.error import errors
 from howler.healthz import healthz
+from howler.helper.compression import compress_response
 
 logger = get_logger(__file__)
 
@@ -55,6 +57,11 @@ app = Flask(
 app.url_map.strict_slashes = False
 app.config["JSON_SORT_KEYS"] = False
 
+app.before_request(start_request_tracking)
+app.after_request(end_request_tracking)
+# After request hooks run in reverse order, so compression is tracked as part of the request
+app.after_request(compress_response)
+
 app.wsgi_app = DispatcherMiddleware(app.wsgi_app, {"/metrics": make_wsgi_app()})  # type: ignore[method-assign]
 
 swagger_template = {
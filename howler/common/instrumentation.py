@@ -0,0 +1,104 @@
+"""Request-scoped instrumentation of the components a request spends time in.
+
+While a context is tracked (i.e. while the API handles a request), every call to an instrumented function is counted
+and timed under the name of its component, such as elasticsearch or redis. Calls nested in a call to the same
+component (e.g. models built while building a model) are only counted once.
+"""
+
+import functools
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+
+# The components instrumented throughout howler
+COMPONENTS = ["elasticsearch", "redis", "odm", "serialization", "compression", "events"]
+
+
+class RequestStats(object):
+    "The number of calls made to each instrumented component, and the time spent in them, within a tracked context"
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.calls: dict[str, int] = defaultdict(int)
+        self.durations: dict[str, float] = defaultdict(float)
+        self.active: set[str] = set()
+
+    def record(self, component: str, duration: float):
+        "Record a call to the given component"
+        self.calls[component] += 1
+        self.durations[component] += duration
+
+    @property
+    def elapsed(self) -> float:
+        "The time elapsed since the context started being tracked"
+        return time.perf_counter() - self.start
+
+
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def track_request() -> RequestStats:
+    """Start counting the calls made to instrumented components in the current context (i.e. the current request).
+
+    Returns:
+        RequestStats: The stats object that will be updated by every subsequent call in this context
+    """
+    stats = RequestStats()
+    request_stats.set(stats)
+    return stats
+
+
+def stop_tracking_request() -> Optional[RequestStats]:
+    """Stop counting the calls made to instrumented components in the current context.
+
+    Returns:
+        Optional[RequestStats]: The stats accumulated since track_request was called, if it was
+    """
+    stats = request_stats.get()
+    request_stats.set(None)
+    return stats
+
+
+@contextmanager
+def timed(component: str) -> Iterator[None]:
+    """Count and time the enclosed block as a call to the given component, if the current context is tracked.
+
+    Args:
+        component (str): The name of the component
+    """
+    stats = request_stats.get()
+    if stats is None or component in stats.active:
+        yield
+        return
+
+    stats.active.add(component)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.active.discard(component)
+        stats.record(component, time.perf_counter() - start)
+
+
+def instrumented(component: str) -> Callable:
+    """Count and time every call to the decorated function as a call to the given component.
+
+    Args:
+        component (str): The name of the component
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            # Fast path, as some instrumented functions (e.g. model construction) are very hot
+            if request_stats.get() is None:
+                return func(*args, **kwargs)
+
+            with timed(component):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -17,7 +17,7 @@ APP_NAME = os.environ.get("APP_NAME", "howler")
 APP_PREFIX = os.environ.get("APP_PREFIX", "hwl")
 USER_TYPES = {"admin", "user", "automation_basic", "automation_advanced"}
 
-config_cache = {}
+config_cache: dict[Optional[str], "Config"] = {}
 
 
 def env_substitute(buffer):
@@ -191,3 +191,13 @@ def datastore(config=None, archive_access=True):
         _datastore = HowlerDatastore(ESStore(config=config, archive_access=archive_access))
 
     return _datastore
+
+
+def get_filestore(config=None):
+    """Get a connection to the filestore. Close it once done with it, e.g. by using it as a context manager."""
+    from howler.filestore import FileStore
+
+    if not config:
+        config = get_config()
+
+    return FileStore(*config.filestore.storage)
@@ -1,9 +1,14 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sys
 
-from flask import request
+from flask import has_request_context, request
+from prometheus_client import Counter, Gauge
 
+from howler.common.loader import APP_NAME
 from howler.common.logging.format import (
     HWL_AUDIT_FORMAT,
     HWL_DATE_FORMAT,
@@ -51,6 +56,133 @@ AUDIT_KW_TARGET = [
     "label",
 ]
 
+AUDIT_RECORDS_DROPPED = Counter(
+    f"{APP_NAME.replace('-', '_')}_audit_records_dropped_total",
+    "The number of audit records dropped because too many records were waiting to be written",
+)
+
+AUDIT_QUEUE_DEPTH = Gauge(
+    f"{APP_NAME.replace('-', '_')}_audit_queue_depth",
+    "The number of audit records waiting to be written",
+)
+
+
+class AuditQueueHandler(logging.handlers.QueueHandler):
+    """Hand audit records over to the audit listener, without blocking the request that logged them.
+
+    Records are formatted by the listener rather than when they are logged. If too many records are already waiting
+    to be written, the record is dropped and counted instead.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        "Leave the record as is, so that the listener's handlers format it"
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        "Queue the record, or drop it if the queue is full"
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            AUDIT_RECORDS_DROPPED.inc()
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """Write the records waiting in a queue in batches, on a background thread.
+
+    Stream (and file) handlers receive each batch in a single write and flush, rather than one per record.
+    """
+
+    _sentinel = None
+
+    def __init__(
+        self,
+        record_queue: queue.Queue,
+        *handlers: logging.Handler,
+        batch_size: int = 500,
+        stop_timeout: float = 5.0,
+    ):
+        super().__init__(record_queue, *handlers, respect_handler_level=True)
+        self.record_queue = record_queue
+        self.batch_size = max(batch_size, 1)
+        self.stop_timeout = stop_timeout
+
+    def enqueue_sentinel(self):
+        """Ask the thread to stop once the records already queued are written.
+
+        If the queue stays full for too long, the oldest records are dropped to make room, so that stopping the
+        listener at exit cannot hang.
+        """
+        try:
+            self.record_queue.put(self._sentinel, timeout=self.stop_timeout)
+            return
+        except queue.Full:
+            pass
+
+        while True:
+            try:
+                self.record_queue.get_nowait()
+                self.record_queue.task_done()
+                AUDIT_RECORDS_DROPPED.inc()
+            except queue.Empty:
+                pass
+
+            try:
+                self.record_queue.put_nowait(self._sentinel)
+                return
+            except queue.Full:
+                continue
+
+    def _monitor(self):
+        stopped = False
+        while not stopped:
+            batch = [self.record_queue.get()]
+            while len(batch) < self.batch_size and batch[-1] is not self._sentinel:
+                try:
+                    batch.append(self.record_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            records = [record for record in batch if record is not self._sentinel]
+            stopped = len(records) < len(batch)
+
+            self.handle_batch(records)
+
+            for _ in batch:
+                self.record_queue.task_done()
+
+    def handle_batch(self, records: list[logging.LogRecord]):
+        "Hand a batch of records to each handler"
+        for handler in self.handlers:
+            accepted = [record for record in records if record.levelno >= handler.level and handler.filter(record)]
+            if not accepted:
+                continue
+
+            if isinstance(handler, logging.StreamHandler):
+                self._write(handler, accepted)
+            else:
+                for record in accepted:
+                    handler.handle(record)
+
+    @staticmethod
+    def _write(handler: logging.StreamHandler, records: list[logging.LogRecord]):
+        "Write a batch of records to a stream handler at once"
+        lines = []
+        for record in records:
+            try:
+                lines.append(handler.format(record) + handler.terminator)
+            except Exception:
+                handler.handleError(record)
+
+        handler.acquire()
+        try:
+            handler.stream.write("".join(lines))
+            handler.flush()
+        except Exception:
+            handler.handleError(records[-1])
+        finally:
+            handler.release()
+
+
 AUDIT_LOG = logging.getLogger("howler.api.audit")
 AUDIT_LOG.propagate = False
 
@@ -68,7 +200,6 @@ fh.setFormatter(
         HWL_DATE_FORMAT if DEBUG else HWL_ISO_DATE_FORMAT,
     )
 )
-AUDIT_LOG.addHandler(fh)
 
 ch = logging.StreamHandler(sys.stdout)
 ch.setLevel(logging.INFO)
@@ -78,7 +209,15 @@ ch.setFormatter(
         HWL_DATE_FORMAT if DEBUG else HWL_ISO_DATE_FORMAT,
     )
 )
-AUDIT_LOG.addHandler(ch)
+
+# Requests only queue their audit records, and a background thread writes them to the file and to stdout
+AUDIT_QUEUE: queue.Queue = queue.Queue(maxsize=config.logging.audit_queue_size)
+AUDIT_QUEUE_DEPTH.set_function(AUDIT_QUEUE.qsize)
+AUDIT_LOG.addHandler(AuditQueueHandler(AUDIT_QUEUE))
+
+AUDIT_LISTENER = BatchingQueueListener(AUDIT_QUEUE, fh, ch, batch_size=config.logging.audit_batch_size)
+AUDIT_LISTENER.start()
+atexit.register(AUDIT_LISTENER.stop)
 
 #########################
 # End of prepare logger #
@@ -87,17 +226,20 @@ AUDIT_LOG.addHandler(ch)
 
 def audit(args, kwargs, logged_in_uname, user, func, impersonator=None):
     """Log audit information for a given function executed by a given user."""
-    try:
-        json_blob = request.json
-        if not isinstance(json_blob, dict):
-            json_blob = {}
-    except Exception:
+    if not AUDIT_LOG.isEnabledFor(logging.DEBUG if DEBUG else logging.INFO):
+        return
+
+    in_request = has_request_context()
+
+    # The parsed body is cached by flask, so this doesn't parse it again for the endpoint
+    json_blob = request.get_json(silent=True) if in_request else None
+    if not isinstance(json_blob, dict):
         json_blob = {}
 
     params_list = (
         list(args)
         + ["%s='%s'" % (k, v) for k, v in kwargs.items() if k in AUDIT_KW_TARGET]
-        + ["%s='%s'" % (k, v) for k, v in request.args.items() if k in AUDIT_KW_TARGET]
+        + (["%s='%s'" % (k, v) for k, v in request.args.items() if k in AUDIT_KW_TARGET] if in_request else [])
         + ["%s='%s'" % (k, v) for k, v in json_blob.items() if k in AUDIT_KW_TARGET]
     )
 
@@ -132,7 +274,7 @@ def audit(args, kwargs, logged_in_uname, user, func, impersonator=None):
             extra={
                 "user": audit_user,
                 "function": f"{func.__name__}({', '.join(params_list)})",
-                "method": request.method,
-                "path": request.path,
+                "method": request.method if in_request else None,
+                "path": request.path if in_request else None,
             },
         )
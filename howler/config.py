@@ -3,12 +3,15 @@ import os
 from flask_caching import Cache
 
 from howler.common import loader
+from howler.odm.base import configure_validation_cache
 from howler.odm.models.config import Config
 from howler.remote.datatypes import get_client
 from howler.remote.datatypes.user_quota_tracker import UserQuotaTracker
 
 config: Config = loader.get_config()
 
+configure_validation_cache(config.system.validation_cache_size)
+
 #################################################################
 # Configuration
 
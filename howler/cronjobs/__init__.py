@@ -1,19 +1,126 @@
+import atexit
+import functools
+import hashlib
 import importlib
 import os
+import time
+from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Any, Callable, Optional
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from pytz import timezone
 
 from howler.common.logging import get_logger
+from howler.config import config, redis
+from howler.remote.datatypes.claims import ExpiringClaims
+from howler.remote.datatypes.lock import ExpiringLock
+from howler.remote.datatypes.membership import Membership
+from howler.utils.uid import get_random_id
 
 logger = get_logger(__file__)
 
 scheduler = BackgroundScheduler(timezone=timezone(os.getenv("SCHEDULER_TZ", "America/Toronto")))
 
+# Every process running a scheduler is a member of the cluster, identified by a random id. Live members share the
+# coordinated jobs between them, and one of them is elected leader for the jobs that must only ever run in one place.
+INSTANCE_ID = get_random_id()
+MEMBERS = Membership("howler-scheduler-members", timeout=config.system.scheduler.member_timeout, host=redis)
+LEADER = ExpiringLock("howler-scheduler-leader", config.system.scheduler.member_timeout, uuid=INSTANCE_ID, host=redis)
+TICKS = ExpiringClaims("howler-scheduler-ticks", ttl=60 * 60, host=redis)
+
+
+def heartbeat():
+    "Let the other scheduler instances know this one is alive, and take or keep leadership if possible"
+    MEMBERS.heartbeat(INSTANCE_ID)
+    LEADER.try_acquire()
+
+
+def leave():
+    "Leave the cluster immediately, so that the other instances take over our jobs without waiting for a timeout"
+    MEMBERS.leave(INSTANCE_ID)
+    LEADER.release()
+
+
+def get_owner(job_id: str) -> Optional[str]:
+    """Get the live scheduler instance responsible for running a job.
+
+    Jobs are assigned using rendezvous hashing, so that when an instance joins or leaves the cluster only the jobs it
+    owns, or will own, move.
+
+    Args:
+        job_id (str): The id of the job
+
+    Returns:
+        Optional[str]: The id of the instance owning the job, or None if no instance is alive
+    """
+    members = MEMBERS.members()
+    if not members:
+        return None
+
+    return max(members, key=lambda member: hashlib.sha256(f"{member}:{job_id}".encode()).digest())
+
+
+def _run_tick(job_id: str, tick: int, func: Callable, *args: Any, **kwargs: Any):
+    "Run a tick of a job, unless another instance already did"
+    if (claim := TICKS.claim(f"{job_id}-{tick}", INSTANCE_ID)) is not None:
+        logger.debug("Tick %s of %s was already run by %s", tick, job_id, claim[0])
+        return
+
+    func(*args, **kwargs)
+
+
+def coordinated(job_id: str, leader_only: bool = False):
+    """Make a job run exactly once per tick across every scheduler instance of the cluster.
+
+    Every instance schedules the job, but only the instance owning it (or the leader, if leader_only is set) runs it
+    right away. The other instances check back after the configured failover delay, and run the tick themselves if
+    the owner died or missed it. Each tick is claimed in redis before running, so it can never run twice.
+
+    Args:
+        job_id (str): The id of the job
+        leader_only (bool, optional): Whether only the leader should run the job. Defaults to False, in which case the
+            job is assigned to an instance by hashing its id.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            # Cron triggers fire on the minute, so every instance agrees on the tick as long as it fires within that
+            # minute, however late. Rounding instead would split instances firing on either side of the 30s mark.
+            tick = int(time.time() // 60)
+
+            owner = LEADER.holder() if leader_only else get_owner(job_id)
+            if owner is None or owner == INSTANCE_ID:
+                _run_tick(job_id, tick, func, *args, **kwargs)
+            else:
+                scheduler.add_job(
+                    id=f"{job_id}_failover",
+                    func=_run_tick,
+                    args=[job_id, tick, func, *args],
+                    kwargs=kwargs,
+                    trigger="date",
+                    run_date=datetime.now() + timedelta(seconds=config.system.scheduler.failover_delay),
+                    replace_existing=True,
+                )
+
+        return run
+
+    return decorator
+
 
 def setup_jobs():
     "Dynamically import and initialize all cronjobs in this folder"
+    heartbeat()
+    scheduler.add_job(
+        id="scheduler_heartbeat",
+        func=heartbeat,
+        trigger="interval",
+        seconds=config.system.scheduler.heartbeat_interval,
+        replace_existing=True,
+    )
+    atexit.register(leave)
+
     module_path = Path(__file__).parent
     modules_to_import = [_file for _file in os.listdir(module_path) if _file.endswith(".py") and _file != "__init__.py"]
 
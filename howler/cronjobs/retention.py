@@ -8,6 +8,7 @@ from pytz import timezone
 
 from howler.common.logging import get_logger
 from howler.config import DEBUG, config
+from howler.cronjobs import coordinated
 
 logger = get_logger(__file__)
 
@@ -51,7 +52,8 @@ def setup_job(sched: BaseScheduler):
 
     sched.add_job(
         id="retention",
-        func=execute,
+        # Only the elected leader runs the retention job
+        func=coordinated("retention", leader_only=True)(execute),
         trigger=CronTrigger.from_crontab(
             config.system.retention.crontab, timezone=timezone(os.getenv("SCHEDULER_TZ", "America/Toronto"))
         ),
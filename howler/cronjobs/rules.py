@@ -1,33 +1,91 @@
 import hashlib
 import json
 import os
-import random
 import re
 import sys
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 from typing import Any, Optional
 
 from apscheduler.schedulers.base import BaseScheduler
 from apscheduler.triggers.cron import CronTrigger
+from prometheus_client import Counter, Histogram
 from pytz import timezone
 from sigma.backends.elasticsearch import LuceneBackend
 from sigma.rule import SigmaRule
 from yaml.scanner import ScannerError
 
 from howler.common.exceptions import HowlerValueError
-from howler.common.loader import datastore
+from howler.common.loader import APP_NAME, datastore
 from howler.common.logging import get_logger
-from howler.config import DEBUG, HWL_ENABLE_RULES
-from howler.datastore.collection import ESCollection
+from howler.config import DEBUG, HWL_ENABLE_RULES, config, redis_persistent
+from howler.cronjobs import coordinated
+from howler.datastore.collection import ESCollection, terms_filter
 from howler.datastore.operations import OdmHelper, OdmUpdateOperation
 from howler.odm.models.analytic import Analytic
 from howler.odm.models.hit import Hit
 from howler.odm.models.howler_data import HitOperationType
+from howler.remote.datatypes.hash import Hash
+from howler.services import hit_service
 
 logger = get_logger(__file__)
 hit_helper = OdmHelper(Hit)
 
+RULE_EXECUTION_TIME = Histogram(
+    f"{APP_NAME.replace('-', '_')}_rule_execution_seconds",
+    "The time taken to execute an analytic rule",
+    ["analytic", "mode"],
+)
+RULE_SCANNED_HITS = Counter(
+    f"{APP_NAME.replace('-', '_')}_rule_scanned_hits_total",
+    "The number of hits in the time window evaluated by an analytic rule",
+    ["analytic"],
+)
+RULE_MATCHED_HITS = Counter(
+    f"{APP_NAME.replace('-', '_')}_rule_matched_hits_total",
+    "The number of hits matched by an analytic rule",
+    ["analytic"],
+)
+
+# Per-analytic high-water mark on event.ingested, up to which the rule has already been evaluated. event.created is set
+# by clients and can be far in the past by the time a hit is ingested, while event.ingested is always set by howler.
+WATERMARKS: Hash[dict[str, str]] = Hash("howler-rule-watermarks", host=redis_persistent)
+
 __scheduler_instance: Optional[BaseScheduler] = None
+# The version of each registered rule, used to detect rules that were modified through another instance
+__registered_rules: dict[str, str] = {}
+# The version of each rule stopped after an exception, which is not scheduled again until the rule is modified
+__stopped_rules: dict[str, str] = {}
+
+
+def _rule_hash(rule: Analytic) -> str:
+    "Hash the rule definition, so that a watermark is only reused as long as the rule it was computed for is unchanged"
+    return hashlib.sha256(f"{rule.rule_type}:{rule.rule}".encode()).hexdigest()
+
+
+def _rule_version(rule: Analytic) -> str:
+    "Get the version of a rule's cronjob, which changes whenever the rule or its crontab is modified"
+    return f"{_rule_hash(rule)}:{_get_crontab(rule)}"
+
+
+def get_watermark(rule: Analytic) -> Optional[str]:
+    "Get the event.ingested timestamp up to which the given rule has already been evaluated, if any"
+    watermark = WATERMARKS.get(rule.analytic_id)
+    if not watermark or watermark.get("rule") != _rule_hash(rule):
+        return None
+
+    # Watermarks recorded on event.created are not reused, the rule is evaluated on all hits instead
+    return watermark.get("ingested", None)
+
+
+def set_watermark(rule: Analytic, ingested: str):
+    "Record that the given rule has been evaluated on all hits ingested up to the given timestamp"
+    WATERMARKS.set(rule.analytic_id, {"rule": _rule_hash(rule), "ingested": ingested})
+
+
+def reset_watermark(analytic_id: str):
+    "Forget the watermark of the given analytic, so that its rule is evaluated on all hits on its next run"
+    WATERMARKS.pop(analytic_id)
 
 
 def create_correlated_bundle(rule: Analytic, query: str, correlated_hits: list[Hit]):
@@ -57,6 +115,7 @@ def create_correlated_bundle(rule: Analytic, query: str, correlated_hits: list[H
             "howler.hash": hashed,
             "howler.is_bundle": True,
             "howler.hits": child_ids,
+            "howler.bundle_size": len(child_ids),
             "howler.data": [
                 json.dumps(
                     {
@@ -79,7 +138,7 @@ def create_correlated_bundle(rule: Analytic, query: str, correlated_hits: list[H
 
     if len(child_ids) > 0:
         datastore().hit.update_by_query(
-            f"howler.id:({' OR '.join(child_ids)})",
+            "howler.id:*",
             [
                 hit_helper.list_add(
                     "howler.bundles",
@@ -100,6 +159,7 @@ def create_correlated_bundle(rule: Analytic, query: str, correlated_hits: list[H
                     },
                 ),
             ],
+            filters=[terms_filter("howler.id", child_ids)],
         )
 
     return correlated_bundle
@@ -108,21 +168,39 @@ def create_correlated_bundle(rule: Analytic, query: str, correlated_hits: list[H
 def create_executor(rule: Analytic):  # noqa: C901
     "Create a cronjob for a given analytic"
 
-    def execute():  # noqa: C901
-        "Execute the rule"
+    def execute(full: bool = False):  # noqa: C901
+        """Execute the rule
+
+        Lucene and sigma rules are only evaluated on the hits ingested since the last successful run, unless full is
+        set or no watermark exists for the current version of the rule.
+        """
+        start = time.time()
+        watermark = None if full else get_watermark(rule)
+
         try:
             if not rule.rule or not rule.rule_type:
                 logger.error("Invalid rule %s! Skipping", rule.analytic_id)
                 return
 
             logger.info(
-                "Executing rule %s (%s)",
+                "Executing rule %s (%s) on hits ingested %s",
                 rule.name,
                 rule.analytic_id,
+                f"after {watermark}" if watermark else "at any time",
             )
 
             correlated_hits: Optional[list[Hit]] = None
 
+            # The upper bound is fixed before running any query, so that hits ingested while the rule executes are
+            # picked up on the next run. It lags behind the current time, since hits are not searchable as soon as
+            # they are ingested.
+            lag = timedelta(seconds=config.system.scheduler.rule_window_lag)
+            window_end = (datetime.utcnow() - lag).isoformat(timespec="milliseconds") + "Z"
+            if watermark and window_end < watermark:
+                # The lag was increased since the last run, the watermark is not moved back
+                window_end = watermark
+            window_filters = [f'event.ingested:{{"{watermark}" TO "{window_end}"]'] if watermark else []
+
             if rule.rule_type in ["lucene", "sigma"]:
                 if rule.rule_type == "lucene":
                     query = re.sub(r"\n+", " ", re.sub(r"#.+", "", rule.rule)).strip()
@@ -140,7 +218,14 @@ def create_executor(rule: Analytic):  # noqa: C901
 
                     query = " AND ".join([f"({q})" for q in lucene_queries])
 
-                num_hits = datastore().hit.search(query, rows=1)["total"]
+                RULE_SCANNED_HITS.labels(rule.name).inc(
+                    datastore().hit.search("howler.id:*", rows=0, filters=window_filters, track_total_hits=True)[
+                        "total"
+                    ]
+                )
+
+                num_hits = datastore().hit.search(query, rows=1, filters=window_filters)["total"]
+                RULE_MATCHED_HITS.labels(rule.name).inc(num_hits)
                 if num_hits > 0:
                     bundle = create_correlated_bundle(rule, query, [])
                     datastore().hit.update_by_query(
@@ -165,17 +250,12 @@ def create_executor(rule: Analytic):  # noqa: C901
                                 },
                             ),
                         ],
+                        filters=window_filters,
                     )
 
                     datastore().hit.commit()
 
-                    child_hits: list[Hit] = datastore().hit.search(
-                        f"howler.bundles:{bundle.howler.id}", rows=1000, fl="howler.id"
-                    )["items"]
-                    datastore().hit.update_by_query(
-                        f"howler.id:{bundle.howler.id}",
-                        [hit_helper.list_add("howler.hits", hit.howler.id, if_missing=True) for hit in child_hits],
-                    )
+                    hit_service.sync_bundle_members(bundle.howler.id, filters=window_filters)
 
             elif rule.rule_type == "eql":
                 query = rule.rule
@@ -194,11 +274,17 @@ def create_executor(rule: Analytic):  # noqa: C901
 
             if correlated_hits and len(correlated_hits) > 0:
                 create_correlated_bundle(rule, query, correlated_hits)
+
+            if rule.rule_type in ["lucene", "sigma"]:
+                set_watermark(rule, window_end)
+
+            RULE_EXECUTION_TIME.labels(rule.name, "incremental" if watermark else "full").observe(time.time() - start)
         except Exception as e:
             logger.debug(e, exc_info=True)
             if __scheduler_instance:
                 __scheduler_instance.remove_job(f"rule_{rule.analytic_id}")
-            # TODO: Allow restarting of rules
+            # The rule is restarted once it is modified, or explicitly registered again
+            __stopped_rules[rule.analytic_id] = _rule_version(rule)
             logger.critical(
                 f"Rule {rule.name} ({rule.analytic_id}) has been stopped, due to an exception: {type(e)}",
                 exc_info=True,
@@ -207,8 +293,21 @@ def create_executor(rule: Analytic):  # noqa: C901
     return execute
 
 
-def register_rules(new_rule: Optional[Analytic] = None, test_override: bool = False):
-    "Register all of the created analytic rules as cronjobs"
+def _get_crontab(rule: Analytic) -> str:
+    "Get the crontab of a rule, defaulting to a minute of every hour that is the same on every scheduler instance"
+    if rule.rule_crontab:
+        return rule.rule_crontab
+
+    return f"{int(hashlib.sha256(rule.analytic_id.encode()).hexdigest(), 16) % 60} * * * *"
+
+
+def register_rules(new_rule: Optional[Analytic] = None, test_override: bool = False):  # noqa: C901
+    """Register all of the created analytic rules as cronjobs
+
+    When called without a rule, the registered cronjobs are synchronized with the rules in the datastore: new and
+    modified rules are (re)registered, and the cronjobs of deleted rules are removed. Every scheduler instance runs
+    this periodically, so that rules created or modified through another instance are eventually scheduled here too.
+    """
     global __scheduler_instance
     if not __scheduler_instance:  # pragma: no cover
         logger.error("Scheduler instance does not exist!")
@@ -226,19 +325,40 @@ def register_rules(new_rule: Optional[Analytic] = None, test_override: bool = Fa
             __scheduler_instance.remove_job(f"rule_{new_rule.analytic_id}")
         else:
             logger.info(f"Registering new rule: {new_rule.analytic_id} on interval {new_rule.rule_crontab}")
+        __stopped_rules.pop(new_rule.analytic_id, None)
         rules = [new_rule]
     else:
         logger.debug("Registering rules")
-        rules: list[Analytic] = datastore().analytic.search("_exists_:rule")["items"]
+        rules: list[Analytic] = list(datastore().analytic.stream_search("_exists_:rule"))
+
+        for analytic_id in set(__registered_rules.keys()) - {rule.analytic_id for rule in rules}:
+            logger.info(f"Removing deleted rule: {analytic_id}")
+            __registered_rules.pop(analytic_id, None)
+            __stopped_rules.pop(analytic_id, None)
+            if __scheduler_instance.get_job(f"rule_{analytic_id}"):
+                __scheduler_instance.remove_job(f"rule_{analytic_id}")
 
     total_initialized = 0
     for rule in rules:
         job_id = f"rule_{rule.analytic_id}"
-        interval = rule.rule_crontab or f"{random.randint(0, 59)} * * * *"  # noqa: S311
+        interval = _get_crontab(rule)
+        version = _rule_version(rule)
+
+        if rule.analytic_id in __stopped_rules:
+            if __stopped_rules[rule.analytic_id] == version:
+                logger.debug(f"Rule {job_id} was stopped, skipping until it is modified")
+                continue
+
+            logger.info(f"Restarting modified rule: {rule.analytic_id} on interval {interval}")
+            __stopped_rules.pop(rule.analytic_id)
 
         if __scheduler_instance.get_job(job_id):
-            logger.debug(f"Rule {job_id} already running!")
-            return
+            if __registered_rules.get(rule.analytic_id, None) == version:
+                logger.debug(f"Rule {job_id} already running!")
+                continue
+
+            logger.info(f"Updating modified rule: {rule.analytic_id} on interval {interval}")
+            __scheduler_instance.remove_job(job_id)
 
         logger.debug(f"Initializing rule cronjob with:\tJob ID: {job_id}\tRule Name: {rule.name}\tCrontab: {interval}")
 
@@ -248,9 +368,11 @@ def register_rules(new_rule: Optional[Analytic] = None, test_override: bool = Fa
             _kwargs = {}
 
         total_initialized += 1
+        __registered_rules[rule.analytic_id] = version
         __scheduler_instance.add_job(
             id=job_id,
-            func=create_executor(rule),
+            # Each tick of the rule runs on a single scheduler instance, see howler.cronjobs.coordinated
+            func=coordinated(job_id)(create_executor(rule)),
             trigger=CronTrigger.from_crontab(interval, timezone=timezone(os.getenv("SCHEDULER_TZ", "America/Toronto"))),
             **_kwargs,
         )
@@ -271,4 +393,12 @@ def setup_job(sched: BaseScheduler):
 
     register_rules()
 
+    sched.add_job(
+        id="sync_rules",
+        func=register_rules,
+        trigger="interval",
+        seconds=config.system.scheduler.rule_sync_interval,
+        replace_existing=True,
+    )
+
     logger.debug("Initialization complete")
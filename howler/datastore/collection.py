@@ -1,5 +1,10 @@
 from __future__ import annotations
 
+import base64
+import functools
+import hashlib
+import hmac
+import inspect
 import json
 import logging
 import re
@@ -10,7 +15,7 @@ from copy import deepcopy
 from datetime import datetime
 from os import environ
 from random import random
-from typing import Any, Dict, Generic, Optional, TypeVar, Union
+from typing import Any, Callable, Dict, Generic, Optional, TypeVar, Union
 
 import elasticsearch
 import elasticsearch.helpers
@@ -18,7 +23,9 @@ from datemath import dm
 from datemath.helpers import DateMathException
 
 from howler import odm
+from howler.common import loader
 from howler.common.exceptions import HowlerRuntimeError, HowlerValueError, NonRecoverableError
+from howler.common.instrumentation import instrumented
 from howler.common.loader import APP_NAME
 from howler.datastore.bulk import ElasticBulkPlan
 from howler.datastore.constants import BACK_MAPPING, TYPE_MAPPING
@@ -51,6 +58,7 @@ from howler.odm.base import (
     ValidatedKeyword,
     _Field,
 )
+from howler.utils import json_utils
 from howler.utils.dict_utils import prune, recursive_update
 
 if typing.TYPE_CHECKING:
@@ -61,6 +69,7 @@ TRANSPORT_TIMEOUT = int(environ.get("AL_DATASTORE_TRANSPORT_TIMEOUT", "10"))
 
 log = logging.getLogger("howler.api.datastore")
 ModelType = TypeVar("ModelType", bound=Model)
+T = TypeVar("T")
 write_block_settings = {"settings": {"index.blocks.write": True}}
 write_unblock_settings = {"settings": {"index.blocks.write": None}}
 
@@ -104,6 +113,84 @@ def sort_str(sort_dicts):
     return ",".join(sort_list)
 
 
+def ids_filter(ids) -> dict[str, Any]:
+    """Build a filter matching the documents with the given ids.
+
+    Unlike a lucene `id:(a OR b OR ...)` query, the ids are not parsed by elasticsearch and do not count towards the
+    maximum number of clauses of a query, so it scales to large sets of ids.
+    """
+    return {"ids": {"values": list(ids)}}
+
+
+def terms_filter(field: str, values) -> dict[str, Any]:
+    """Build a filter matching the documents where the given field has any of the given values.
+
+    Like ids_filter, this scales to large sets of values, unlike a lucene `field:(a OR b OR ...)` query.
+    """
+    return {"terms": {field: list(values)}}
+
+
+def prefix_filter(field: str, prefix: str, ignore_case: bool = False) -> dict[str, Any]:
+    "Build a filter matching the documents where the given field has a value starting with the given prefix."
+    return {"prefix": {field: {"value": prefix, "case_insensitive": ignore_case}}}
+
+
+def contains_filter(field: str, value: str, ignore_case: bool = False) -> dict[str, Any]:
+    "Build a filter matching the documents where the given field has a value containing the given value."
+    escaped = re.sub(r"([\\*?])", r"\\\1", value)
+    return {"wildcard": {field: {"value": f"*{escaped}*", "case_insensitive": ignore_case}}}
+
+
+def value_regex(prefix: Optional[str] = None, contains: Optional[str] = None, ignore_case: bool = False) -> str:
+    """Build a lucene regular expression matching the values starting with prefix and containing contains, to filter
+    the buckets of a terms aggregation.
+    """
+
+    def escape(value: str) -> str:
+        escaped = re.sub(r'([.?+*|{}\[\]()"\\#@&<>~])', r"\\\1", value)
+        if ignore_case:
+            escaped = "".join(f"[{c.lower()}{c.upper()}]" if c.lower() != c.upper() else c for c in escaped)
+        return escaped
+
+    parts = []
+    if prefix:
+        parts.append(f"({escape(prefix)}.*)")
+    if contains:
+        parts.append(f"(.*{escape(contains)}.*)")
+
+    return "&".join(parts)
+
+
+def value_matches(value: Any, prefix: Optional[str] = None, contains: Optional[str] = None, ignore_case=False) -> bool:
+    "Check whether a value starts with prefix and contains contains, the same way as the filters and regex above"
+    value = str(value)
+    if ignore_case:
+        value = value.lower()
+        prefix = prefix.lower() if prefix else prefix
+        contains = contains.lower() if contains else contains
+
+    return (not prefix or value.startswith(prefix)) and (not contains or contains in value)
+
+
+def parse_filter(query_filter) -> dict[str, Any]:
+    """Convert a filter into an elasticsearch query clause.
+
+    Filters are either lucene queries, or structured filters built with ids_filter, terms_filter, prefix_filter or
+    contains_filter.
+    """
+    if isinstance(query_filter, str):
+        return {"query_string": {"query": query_filter}}
+
+    if (
+        isinstance(query_filter, dict)
+        and len(query_filter) == 1
+        and next(iter(query_filter)) in ["ids", "terms", "prefix", "wildcard"]
+    ):
+        return query_filter
+
+    raise SearchException(f"Unsupported filter: {query_filter}")
+
+
 def parse_sort(sort, ret_list=True):
     """This function tries to do two things at once:
     - convert AL sort syntax to elastic,
@@ -139,6 +226,30 @@ def parse_sort(sort, ret_list=True):
     raise SearchException("Unknown sort parameter " + sort)
 
 
+def _matches_any(field: str, prefixes: list[str]) -> bool:
+    return any(field == prefix or field.startswith(f"{prefix}.") for prefix in prefixes)
+
+
+def notifies_change(func: Callable[..., T]) -> Callable[..., T]:
+    """Let the change listeners registered on the datastore know every time the decorated method writes to a collection
+
+    Methods writing to a single document take its key as their first argument, which is passed on to the listeners.
+    Other methods can write to any document of the collection.
+    """
+    keyed = list(inspect.signature(func).parameters.keys())[1:2] == ["key"]
+
+    @functools.wraps(func)
+    def wrapper(self: "ESCollection", *args, **kwargs) -> T:
+        result = func(self, *args, **kwargs)
+        if keyed:
+            self.datastore.notify_change(self, [args[0] if args else kwargs["key"]])
+        else:
+            self.datastore.notify_change(self)
+        return result
+
+    return wrapper
+
+
 class ESCollection(Generic[ModelType]):
     DEFAULT_OFFSET = 0
     DEFAULT_ROW_SIZE = 25
@@ -160,11 +271,13 @@ class ESCollection(Generic[ModelType]):
     UPDATE_MIN = "MIN"
     UPDATE_APPEND = "APPEND"
     UPDATE_APPEND_IF_MISSING = "APPEND_IF_MISSING"
+    UPDATE_MERGE = "MERGE"
     UPDATE_REMOVE = "REMOVE"
     UPDATE_DELETE = "DELETE"
     UPDATE_OPERATIONS = [
         UPDATE_APPEND,
         UPDATE_APPEND_IF_MISSING,
+        UPDATE_MERGE,
         UPDATE_DEC,
         UPDATE_INC,
         UPDATE_MAX,
@@ -179,6 +292,9 @@ class ESCollection(Generic[ModelType]):
         "facet_active": False,
         "facet_mincount": 1,
         "facet_fields": [],
+        "facet_size": None,
+        "facet_include": None,
+        "facet_order": None,
         "stats_active": False,
         "stats_fields": [],
         "field_script": None,
@@ -187,6 +303,12 @@ class ESCollection(Generic[ModelType]):
         "group_field": None,
         "group_sort": None,
         "group_limit": 1,
+        "composite_active": False,
+        "composite_field": None,
+        "composite_order": "asc",
+        "composite_after": None,
+        "composite_limit": 0,
+        "composite_sort": None,
         "histogram_active": False,
         "histogram_field": None,
         "histogram_type": None,
@@ -221,6 +343,8 @@ class ESCollection(Generic[ModelType]):
         self.index_name = f"{self.name}_hot"
         self.model_class = model_class
         self.validate = validate
+        self.trusted_reads = datastore.trusted_reads
+        self.projections = datastore.projections.get(name, {})
         self.max_attempts = max_attempts
 
         if not ESCollection.IGNORE_ENSURE_COLLECTION:
@@ -322,6 +446,7 @@ class ESCollection(Generic[ModelType]):
                         "memory leak in you Elastic cluster..."
                     )
 
+    @instrumented("elasticsearch")
     def with_retries(self, func, *args, raise_conflicts=False, **kwargs):
         """This function performs the passed function with the given args and kwargs and reconnect if it fails
 
@@ -512,6 +637,7 @@ class ESCollection(Generic[ModelType]):
             else:
                 updated += res["updated"]
 
+    @notifies_change
     def archive(self, query, max_docs=None, sort=None):
         """This function should archive to document that are matching to query to an time splitted index
 
@@ -560,7 +686,9 @@ class ESCollection(Generic[ModelType]):
         if not isinstance(operations, ElasticBulkPlan):
             return TypeError("Operations must be of type ElasticBulkPlan")
 
-        return self.with_retries(self.datastore.client.bulk, body=operations.get_plan_data())
+        result = self.with_retries(self.datastore.client.bulk, body=operations.get_plan_data())
+        self.datastore.notify_change(self, list(operations.keys))
+        return result
 
     def get_bulk_plan(self):
         """Creates a BulkPlan tailored for the current datastore
@@ -957,9 +1085,9 @@ class ESCollection(Generic[ModelType]):
             else:
                 data_output.pop("id", None)
                 if as_dictionary:
-                    out[data_id] = self.normalize(data_output, as_obj=as_obj)
+                    out[data_id] = self.normalize(data_output, as_obj=as_obj, trusted=self.trusted_reads)
                 else:
-                    out.append(self.normalize(data_output, as_obj=as_obj))  # type: ignore
+                    out.append(self.normalize(data_output, as_obj=as_obj, trusted=self.trusted_reads))  # type: ignore
 
         out: Union[dict[str, Any], list[Any]]
         if as_dictionary:
@@ -993,15 +1121,16 @@ class ESCollection(Generic[ModelType]):
 
         return out
 
-    def normalize(self, data, as_obj=True) -> Union[ModelType, dict[str, Any], None]:
+    def normalize(self, data, as_obj=True, trusted=False) -> Union[ModelType, dict[str, Any], None]:
         """Normalize the data using the model class
 
         :param as_obj: Return an object instead of a dictionary
         :param data: data to normalize
+        :param trusted: The data was read from the datastore, and only needs to be validated as it is accessed
         :return: instance of the model class
         """
         if as_obj and data is not None and self.model_class and not isinstance(data, self.model_class):
-            return self.model_class(data)
+            return self.model_class(data, trusted=trusted)
 
         if isinstance(data, dict):
             data = {k: v for k, v in data.items() if k not in BANNED_FIELDS}
@@ -1109,8 +1238,8 @@ class ESCollection(Generic[ModelType]):
         data = self._get(key, self.RETRY_NORMAL, archive_access=archive_access, version=version)
         if version:
             data, version = data
-            return self.normalize(data, as_obj=as_obj), version
-        return self.normalize(data, as_obj=as_obj)
+            return self.normalize(data, as_obj=as_obj, trusted=self.trusted_reads), version
+        return self.normalize(data, as_obj=as_obj, trusted=self.trusted_reads)
 
     def get_if_exists(self, key, as_obj=True, archive_access=None, version=False):
         """Get a document from the datastore but do not retry if not found.
@@ -1127,8 +1256,8 @@ class ESCollection(Generic[ModelType]):
         data = self._get(key, self.RETRY_NONE, archive_access=archive_access, version=version)
         if version:
             data, version = data
-            return self.normalize(data, as_obj=as_obj), version
-        return self.normalize(data, as_obj=as_obj)
+            return self.normalize(data, as_obj=as_obj, trusted=self.trusted_reads), version
+        return self.normalize(data, as_obj=as_obj, trusted=self.trusted_reads)
 
     def require(
         self, key, as_obj=True, archive_access=None, version=False
@@ -1149,9 +1278,10 @@ class ESCollection(Generic[ModelType]):
         data = self._get(key, self.RETRY_INFINITY, archive_access=archive_access, version=version)
         if version:
             data, version = data
-            return self.normalize(data, as_obj=as_obj), version
-        return self.normalize(data, as_obj=as_obj)
+            return self.normalize(data, as_obj=as_obj, trusted=self.trusted_reads), version
+        return self.normalize(data, as_obj=as_obj, trusted=self.trusted_reads)
 
+    @notifies_change
     def save(self, key, data, version=None):
         """Save to document to the datastore using the key as its document id.
 
@@ -1190,7 +1320,7 @@ class ESCollection(Generic[ModelType]):
                 self.datastore.client.index,
                 index=self.name,
                 id=key,
-                document=json.dumps(saved_data),
+                document=json_utils.dumpb(saved_data),
                 op_type=operation,
                 if_seq_no=seq_no,
                 if_primary_term=primary_term,
@@ -1199,11 +1329,12 @@ class ESCollection(Generic[ModelType]):
         except elasticsearch.BadRequestError as e:
             raise NonRecoverableError(
                 f"When saving document {key} to elasticsearch, an exception occurred:\n{repr(e)}\n\n"
-                f"Data: {json.dumps(saved_data)}"
+                f"Data: {json_utils.dumps(saved_data)}"
             ) from e
 
         return True
 
+    @notifies_change
     def delete(self, key):
         """This function should delete the underlying document referenced by the key.
         It should return true if the document was in fact properly deleted.
@@ -1228,18 +1359,32 @@ class ESCollection(Generic[ModelType]):
 
         return deleted
 
-    def delete_by_query(self, query, workers=20, sort=None, max_docs=None):
+    @notifies_change
+    def delete_by_query(self, query, workers=20, sort=None, max_docs=None, filters=None):
         """This function should delete the underlying documents referenced by the query.
         It should return true if the documents were in fact properly deleted.
 
         :param query: Query of the documents to download
         :param workers: Number of workers used for deletion if basic currency delete is used
+        :param filters: Filter queries to reduce the data
         :return: True is delete successful
         """
+        if filters is None:
+            filters = []
+        elif isinstance(filters, (str, dict)):
+            filters = [filters]
+
         index = self.name
         if self.archive_access:
             index = f"{index},{self.name}-*"
-        query_body = {"query": {"bool": {"must": {"query_string": {"query": query}}}}}
+        query_body = {
+            "query": {
+                "bool": {
+                    "must": {"query_string": {"query": query}},
+                    "filter": [parse_filter(ff) for ff in filters],
+                }
+            }
+        }
         info = self._delete_async(index, query_body, sort=sort_str(parse_sort(sort)), max_docs=max_docs)
         return info.get("deleted", 0) != 0
 
@@ -1264,6 +1409,17 @@ class ESCollection(Generic[ModelType]):
                 )
                 op_sources.append(script)
                 op_params[f"value{val_id}"] = value
+            elif op == self.UPDATE_MERGE:
+                # The values are passed as a single parameter and deduplicated with a set, so the size of the script
+                # does not depend on the number of values to merge
+                script = (
+                    f"if (ctx._source.{doc_key} == null) {{ctx._source.{doc_key} = new ArrayList()}}\n"
+                    f"Set merged{val_id} = new HashSet(ctx._source.{doc_key});\n"
+                    f"for (def item : params.value{val_id}) "
+                    f"{{if (merged{val_id}.add(item)) {{ctx._source.{doc_key}.add(item)}}}}"
+                )
+                op_sources.append(script)
+                op_params[f"value{val_id}"] = value
             elif op == self.UPDATE_REMOVE:
                 script = (
                     f"if (ctx._source.{doc_key}.indexOf(params.value{val_id}) != -1) "
@@ -1357,6 +1513,12 @@ class ESCollection(Generic[ModelType]):
                     except (ValueError, TypeError, AttributeError):
                         raise DataStoreException(f"Invalid value for field {doc_key}: {value}")
 
+                elif op == self.UPDATE_MERGE:
+                    try:
+                        value = [field.check(item) for item in value]
+                    except (ValueError, TypeError, AttributeError):
+                        raise DataStoreException(f"Invalid value for field {doc_key}: {value}")
+
                 elif op in [self.UPDATE_SET, self.UPDATE_DEC, self.UPDATE_INC]:
                     try:
                         value = field.check(value)
@@ -1374,13 +1536,14 @@ class ESCollection(Generic[ModelType]):
 
         return ret_ops
 
+    @notifies_change
     def update(self, key, operations, version=None):
         """This function performs an atomic update on some fields from the
         underlying documents referenced by the id using a list of operations.
 
         Operations supported by the update function are the following:
         INTEGER ONLY: Increase and decreased value
-        LISTS ONLY: Append and remove items
+        LISTS ONLY: Append, merge and remove items
         ALL TYPES: Set value
 
         :param key: ID of the document to modify
@@ -1427,13 +1590,14 @@ class ESCollection(Generic[ModelType]):
 
         return False
 
+    @notifies_change
     def update_by_query(self, query, operations, filters=None, access_control=None, max_docs=None):
         """This function performs an atomic update on some fields from the
         underlying documents matching the query and the filters using a list of operations.
 
         Operations supported by the update function are the following:
         INTEGER ONLY: Increase and decreased value
-        LISTS ONLY: Append and remove items
+        LISTS ONLY: Append, merge and remove items
         ALL TYPES: Set value
 
         :param access_control:
@@ -1445,6 +1609,10 @@ class ESCollection(Generic[ModelType]):
         operations = self._validate_operations(operations)
         if filters is None:
             filters = []
+        elif isinstance(filters, (str, dict)):
+            filters = [filters]
+        else:
+            filters = list(filters)
 
         if access_control:
             filters.append(access_control)
@@ -1460,7 +1628,7 @@ class ESCollection(Generic[ModelType]):
             "query": {
                 "bool": {
                     "must": {"query_string": {"query": query}},
-                    "filter": [{"query_string": {"query": ff}} for ff in filters],
+                    "filter": [parse_filter(ff) for ff in filters],
                 }
             },
         }
@@ -1496,7 +1664,9 @@ class ESCollection(Generic[ModelType]):
                     extra_fields["_index"] = result["_index"]
                 if "*" in fields:
                     fields = None
-                return self.model_class(source_data, mask=fields, docid=item_id, extra_fields=extra_fields)
+                return self.model_class(
+                    source_data, mask=fields, docid=item_id, extra_fields=extra_fields, trusted=self.trusted_reads
+                )
             else:
                 source_data = recursive_update(source_data, extra_fields, allow_recursion=False)
                 if "id" in fields:
@@ -1515,7 +1685,7 @@ class ESCollection(Generic[ModelType]):
 
         return prune(source_data, fields, self.stored_fields, mapping_class=Mapping)
 
-    def _search(self, args=None, deep_paging_id=None, use_archive=False, track_total_hits=None):
+    def _build_search_query(self, args=None, deep_paging_id=None, use_archive=False, track_total_hits=None):
         index = self.name
         if self.archive_access and use_archive:
             index = f"{index},{self.name}-*"
@@ -1545,7 +1715,7 @@ class ESCollection(Generic[ModelType]):
             "query": {
                 "bool": {
                     "must": {"query_string": {"query": parsed_values["query"]}},
-                    "filter": [{"query_string": {"query": ff}} for ff in parsed_values["filters"]],
+                    "filter": [parse_filter(ff) for ff in parsed_values["filters"]],
                 }
             },
             "from_": parsed_values["start"],
@@ -1600,8 +1770,15 @@ class ESCollection(Generic[ModelType]):
                     facet_body = {
                         "field": field,
                         "min_doc_count": parsed_values["facet_mincount"],
-                        "size": parsed_values["rows"],
+                        "size": parsed_values["facet_size"] or parsed_values["rows"],
                     }
+
+                if parsed_values["facet_include"]:
+                    facet_body["include"] = parsed_values["facet_include"]
+
+                if parsed_values["facet_order"]:
+                    facet_body["order"] = parsed_values["facet_order"]
+
                 query_body["aggregations"][field] = {"terms": facet_body}
 
         # Add a facet aggregation
@@ -1628,6 +1805,68 @@ class ESCollection(Generic[ModelType]):
                 },
             }
 
+        # Add a composite aggregation, to page through every value of a field whatever its cardinality
+        if parsed_values["composite_active"]:
+            field = parsed_values["composite_field"]
+            composite_body: dict[str, Any] = {
+                "size": parsed_values["rows"],
+                "sources": [{field: {"terms": {"field": field, "order": parsed_values["composite_order"]}}}],
+            }
+            if parsed_values["composite_after"]:
+                composite_body["after"] = parsed_values["composite_after"]
+
+            composite_aggregation: dict[str, Any] = {"composite": composite_body}
+            if parsed_values["composite_limit"]:
+                composite_aggregation["aggregations"] = {
+                    "group": {
+                        "top_hits": {
+                            "_source": parsed_values["field_list"] or list(self.stored_fields.keys()),
+                            "size": parsed_values["composite_limit"],
+                            "sort": parse_sort(parsed_values["composite_sort"]) or [{field: "asc"}],
+                        }
+                    }
+                }
+
+            # Only the buckets are needed, the matching documents are fetched per bucket if at all
+            query_body["size"] = 0
+            query_body.setdefault("aggregations", {})
+            query_body["aggregations"]["composite"] = composite_aggregation
+
+        return index, params, query_body
+
+    def get_projection(self, profile: str) -> list[str]:
+        """Get the fields to fetch when searching with the given projection profile
+
+        :param profile: name of the projection profile, as configured in datastore.projections
+        :return: the list of fields to fetch
+        """
+        if profile not in self.projections:
+            raise SearchException(f"Unknown projection profile for {self.name}: {profile}")
+
+        projection = self.projections[profile]
+        if projection.include and self.model_class:
+            candidates = self.model_class.flat_fields().keys()
+        else:
+            candidates = self.stored_fields.keys()
+
+        fields = [
+            field
+            for field in candidates
+            if (not projection.include or _matches_any(field, projection.include))
+            and not _matches_any(field, projection.exclude)
+        ]
+        fields.append("id")
+
+        return fields
+
+    def _search(self, args=None, deep_paging_id=None, use_archive=False, track_total_hits=None):
+        index, params, query_body = self._build_search_query(
+            args,
+            deep_paging_id=deep_paging_id,
+            use_archive=use_archive,
+            track_total_hits=track_total_hits,
+        )
+
         try:
             if deep_paging_id is not None and not deep_paging_id == "*":
                 # Get the next page
@@ -1663,7 +1902,7 @@ class ESCollection(Generic[ModelType]):
         except Exception as error:
             raise SearchException("collection: %s, query: %s, error: %s" % (self.name, query_body, str(error)))
 
-    def search(
+    def _prepare_search(
         self,
         query,
         offset=0,
@@ -1673,45 +1912,16 @@ class ESCollection(Generic[ModelType]):
         timeout=None,
         filters=None,
         access_control=None,
-        deep_paging_id=None,
         as_obj=True,
-        use_archive=False,
-        track_total_hits=None,
         script_fields=[],
+        profile=None,
     ):
-        """This function should perform a search through the datastore and return a
-        search result object that consist on the following::
-
-            {
-                "offset": 0,      # Offset in the search index
-                "rows": 25,       # Number of document returned per page
-                "total": 123456,  # Total number of documents matching the query
-                "items": [        # List of dictionary where each keys are one of
-                    {             #   the field list parameter specified
-                        fl[0]: value,
-                        ...
-                        fl[x]: value
-                    }, ...]
-            }
-
-        :param script_fields: List of name/script tuple of fields to be evaluated at runtime
-        :param track_total_hits: Return to total matching document count
-        :param use_archive: Query also the archive
-        :param deep_paging_id: ID of the next page during deep paging searches
-        :param as_obj: Return objects instead of dictionaries
-        :param query: lucene query to search for
-        :param offset: offset at which you want the results to start at (paging)
-        :param rows: number of items that the search function should return
-        :param sort: field to sort the data with
-        :param fl: list of fields to return from the search
-        :param timeout: maximum time of execution
-        :param filters: additional queries to run on the original query to reduce the scope
-        :param access_control: access control parameters to limiti the scope of the query
-        :return: a search result object
-        """
         if offset is None:
             offset = self.DEFAULT_OFFSET
 
+        if profile and not fl:
+            fl = ",".join(self.get_projection(profile))
+
         if rows is None:
             rows = self.DEFAULT_ROW_SIZE
 
@@ -1720,8 +1930,10 @@ class ESCollection(Generic[ModelType]):
 
         if filters is None:
             filters = []
-        elif isinstance(filters, str):
+        elif isinstance(filters, (str, dict)):
             filters = [filters]
+        else:
+            filters = list(filters)
 
         if access_control:
             filters.append(access_control)
@@ -1749,6 +1961,78 @@ class ESCollection(Generic[ModelType]):
         if script_fields:
             args.append(("script_fields", script_fields))
 
+        def format_result(result):
+            return {
+                "offset": int(offset),
+                "rows": int(rows),
+                "total": int(result["hits"]["total"]["value"]),
+                "items": [self._format_output(doc, field_list, as_obj=as_obj) for doc in result["hits"]["hits"]],
+            }
+
+        return args, format_result
+
+    def search(
+        self,
+        query,
+        offset=0,
+        rows=None,
+        sort=None,
+        fl=None,
+        timeout=None,
+        filters=None,
+        access_control=None,
+        deep_paging_id=None,
+        as_obj=True,
+        use_archive=False,
+        track_total_hits=None,
+        script_fields=[],
+        profile=None,
+    ):
+        """This function should perform a search through the datastore and return a
+        search result object that consist on the following::
+
+            {
+                "offset": 0,      # Offset in the search index
+                "rows": 25,       # Number of document returned per page
+                "total": 123456,  # Total number of documents matching the query
+                "items": [        # List of dictionary where each keys are one of
+                    {             #   the field list parameter specified
+                        fl[0]: value,
+                        ...
+                        fl[x]: value
+                    }, ...]
+            }
+
+        :param script_fields: List of name/script tuple of fields to be evaluated at runtime
+        :param track_total_hits: Return to total matching document count
+        :param use_archive: Query also the archive
+        :param deep_paging_id: ID of the next page during deep paging searches
+        :param as_obj: Return objects instead of dictionaries
+        :param query: lucene query to search for
+        :param offset: offset at which you want the results to start at (paging)
+        :param rows: number of items that the search function should return
+        :param sort: field to sort the data with
+        :param fl: list of fields to return from the search
+        :param timeout: maximum time of execution
+        :param filters: additional queries to run on the original query to reduce the scope
+        :param access_control: access control parameters to limiti the scope of the query
+        :param profile: projection profile selecting the fields to return, when fl is not specified
+        :return: a search result object
+        """
+        args, format_result = self._prepare_search(
+            query,
+            offset=offset,
+            rows=rows,
+            sort=sort,
+            fl=fl,
+            timeout=timeout,
+            filters=filters,
+            access_control=access_control,
+            as_obj=as_obj,
+            script_fields=script_fields,
+            profile=profile,
+        )
+
         result = self._search(
             args,
             deep_paging_id=deep_paging_id,
@@ -1756,12 +2040,7 @@ class ESCollection(Generic[ModelType]):
             track_total_hits=track_total_hits,
         )
 
-        ret_data: dict[str, Any] = {
-            "offset": int(offset),
-            "rows": int(rows),
-            "total": int(result["hits"]["total"]["value"]),
-            "items": [self._format_output(doc, field_list, as_obj=as_obj) for doc in result["hits"]["hits"]],
-        }
+        ret_data = format_result(result)
 
         new_deep_paging_id = result.get("_scroll_id", None)
 
@@ -1796,6 +2075,7 @@ class ESCollection(Generic[ModelType]):
         item_buffer_size=200,
         as_obj=True,
         use_archive=False,
+        profile=None,
     ):
         """This function should perform a search through the datastore and stream
         all related results as a dictionary of key value pair where each keys
@@ -1815,6 +2095,7 @@ class ESCollection(Generic[ModelType]):
         :param filters: additional queries to run on the original query to reduce the scope
         :param access_control: access control parameters to run the query with
         :param buffer_size: number of items to buffer with each search call
+        :param profile: projection profile selecting the fields to return, when fl is not specified
         :return: a generator of dictionary of field list results
         """
         if item_buffer_size > 2000 or item_buffer_size < 50:
@@ -1826,12 +2107,17 @@ class ESCollection(Generic[ModelType]):
 
         if filters is None:
             filters = []
-        elif isinstance(filters, str):
+        elif isinstance(filters, (str, dict)):
             filters = [filters]
+        else:
+            filters = list(filters)
 
         if access_control:
             filters.append(access_control)
 
+        if profile and not fl:
+            fl = ",".join(self.get_projection(profile))
+
         if fl:
             fl = fl.split(",")
 
@@ -1843,7 +2129,7 @@ class ESCollection(Generic[ModelType]):
                         "default_field": self.DEFAULT_SEARCH_FIELD,
                     }
                 },
-                "filter": [{"query_string": {"query": ff}} for ff in filters],
+                "filter": [parse_filter(ff) for ff in filters],
             }
         }
         sort = parse_sort(self.datastore.DEFAULT_SORT)
@@ -1859,24 +2145,156 @@ class ESCollection(Generic[ModelType]):
             # Unpack the results, ensure the id is always set
             yield self._format_output(value, fl, as_obj=as_obj)
 
-    def raw_eql_search(
+    @staticmethod
+    def _sign_cursor(index, query_expression, source, pit_id, search_after) -> str:
+        """Compute the signature binding a stream_search_pages cursor to the search it was issued for
+
+        :param index: index the search runs against
+        :param query_expression: query sent to elasticsearch, including the filters and access control
+        :param source: fields returned by the search
+        :param pit_id: point in time the search resumes from
+        :param search_after: sort values of the last item returned
+        :return: the hex digest of the signature
+        """
+        payload = json.dumps([index, query_expression, source, pit_id, search_after], sort_keys=True)
+        key = loader.get_config().ui.secret_key.encode()
+        return hmac.new(key, payload.encode(), hashlib.sha256).hexdigest()
+
+    def stream_search_pages(
+        self,
+        query,
+        fl=None,
+        filters=None,
+        access_control=None,
+        item_buffer_size=1000,
+        as_obj=True,
+        use_archive=False,
+        cursor=None,
+        profile=None,
+    ):
+        """This function performs a search through the datastore using a point in time and streams the results
+        one page at a time. Along with each page, a cursor is returned that can be passed back to this function
+        to resume streaming right after that page, as long as the point in time has not expired.
+
+        >>> # noinspection PyUnresolvedReferences
+        >>> for items, cursor in collection.stream_search_pages("id:*"):
+        >>>     ...
+
+        :param use_archive: Query also the archive
+        :param as_obj: Return objects instead of dictionaries
+        :param query: lucene query to search for
+        :param fl: list of fields to return from the search
+        :param filters: additional queries to run on the original query to reduce the scope
+        :param access_control: access control parameters to run the query with
+        :param item_buffer_size: number of items to return with each page
+        :param cursor: cursor returned alongside a previous page, to resume from
+        :param profile: projection profile selecting the fields to return, when fl is not specified
+        :return: a generator of tuples of a list of results and the cursor to resume after them
+        """
+        if item_buffer_size > 10000 or item_buffer_size < 50:
+            raise SearchException("Variable item_buffer_size must be between 50 and 10000.")
+
+        index = self.name
+        if self.archive_access and use_archive:
+            index = f"{index},{self.name}-*"
+
+        if filters is None:
+            filters = []
+        elif isinstance(filters, (str, dict)):
+            filters = [filters]
+        else:
+            filters = list(filters)
+
+        if access_control:
+            filters.append(access_control)
+
+        if profile and not fl:
+            fl = ",".join(self.get_projection(profile))
+
+        if fl:
+            fl = fl.split(",")
+
+        query_expression = {
+            "bool": {
+                "must": {
+                    "query_string": {
+                        "query": query,
+                        "default_field": self.DEFAULT_SEARCH_FIELD,
+                    }
+                },
+                "filter": [parse_filter(ff) for ff in filters],
+            }
+        }
+        source = fl or list(self.stored_fields.keys())
+
+        if cursor:
+            try:
+                pit_id, search_after, signature = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            except (ValueError, TypeError):
+                raise SearchException("Invalid cursor provided.")
+
+            # The cursor comes from the client, make sure it was issued for this exact search before resuming it
+            expected = self._sign_cursor(index, query_expression, source, pit_id, search_after)
+            if not isinstance(signature, str) or not hmac.compare_digest(signature, expected):
+                raise SearchException("Invalid cursor provided.")
+        else:
+            pit_id = self.with_retries(
+                self.datastore.client.open_point_in_time, index=index, keep_alive=self.SCROLL_TIMEOUT
+            )["id"]
+            search_after = None
+
+        while True:
+            try:
+                result = self.with_retries(
+                    self.datastore.client.search,
+                    query=query_expression,
+                    pit={"id": pit_id, "keep_alive": self.SCROLL_TIMEOUT},
+                    sort=[{"_shard_doc": "asc"}],
+                    search_after=search_after,
+                    size=item_buffer_size,
+                    _source=source,
+                )
+            except elasticsearch.NotFoundError:
+                raise SearchException("The cursor has expired, the search must be started over.")
+
+            hits = result["hits"]["hits"]
+            pit_id = result.get("pit_id", pit_id)
+
+            if len(hits) < item_buffer_size:
+                self.with_retries(self.datastore.client.close_point_in_time, id=pit_id, ignore=(404,))
+
+                yield [self._format_output(doc, fl, as_obj=as_obj) for doc in hits], None
+                return
+
+            search_after = hits[-1]["sort"]
+            signature = self._sign_cursor(index, query_expression, source, pit_id, search_after)
+            next_cursor = base64.urlsafe_b64encode(json.dumps([pit_id, search_after, signature]).encode()).decode()
+
+            yield [self._format_output(doc, fl, as_obj=as_obj) for doc in hits], next_cursor
+
+    def _prepare_eql_search(
         self,
         eql_query: str,
         fl: Optional[str] = None,
-        filters: Optional[Union[list[str], str]] = None,
+        filters: Optional[Union[list[Union[str, dict[str, Any]]], str, dict[str, Any]]] = None,
         rows: Optional[int] = None,
-        timeout: Optional[int] = None,
+        access_control: Optional[str] = None,
         as_obj=True,
     ):
         if filters is None:
             filters = []
-        elif isinstance(filters, str):
+        elif isinstance(filters, (str, dict)):
             filters = [filters]
+        else:
+            filters = list(filters)
+
+        if access_control:
+            filters.append(access_control)
 
         parsed_filters = {
             "bool": {
                 "must": {"query_string": {"query": "*:*"}},
-                "filter": [{"query_string": {"query": ff}} for ff in filters],
+                "filter": [parse_filter(ff) for ff in filters],
             }
         }
 
@@ -1886,32 +2304,55 @@ class ESCollection(Generic[ModelType]):
         if rows is None:
             rows = 5
 
-        fields = [{"field": f} for f in fl.split(",")]
+        field_list = fl.split(",")
 
-        try:
-            result = self.with_retries(
-                self.datastore.eql.search,
-                index=self.name,
-                timestamp_field="timestamp",
-                query=eql_query,
-                fields=fields,
-                filter=parsed_filters,
-                size=rows,
-                wait_for_completion_timeout=(f"{timeout}ms" if timeout is not None else None),
-            )
+        body = {
+            "index": self.name,
+            "timestamp_field": "timestamp",
+            "query": eql_query,
+            "fields": [{"field": f} for f in field_list],
+            "filter": parsed_filters,
+            "size": rows,
+        }
 
-            ret_data: dict[str, Any] = {
+        def format_result(result):
+            return {
                 "rows": int(rows),
                 "total": int(result["hits"]["total"]["value"]),
                 "items": [
-                    self._format_output(doc, fl.split(","), as_obj=as_obj) for doc in result["hits"].get("events", [])
+                    self._format_output(doc, field_list, as_obj=as_obj) for doc in result["hits"].get("events", [])
                 ],
                 "sequences": [
-                    [self._format_output(doc, fl.split(","), as_obj=as_obj) for doc in sequence.get("events", [])]
+                    [self._format_output(doc, field_list, as_obj=as_obj) for doc in sequence.get("events", [])]
                     for sequence in result["hits"].get("sequences", [])
                 ],
             }
 
+        return body, format_result
+
+    def raw_eql_search(
+        self,
+        eql_query: str,
+        fl: Optional[str] = None,
+        filters: Optional[Union[list[Union[str, dict[str, Any]]], str, dict[str, Any]]] = None,
+        rows: Optional[int] = None,
+        timeout: Optional[int] = None,
+        access_control: Optional[str] = None,
+        as_obj=True,
+    ):
+        body, format_result = self._prepare_eql_search(
+            eql_query, fl=fl, filters=filters, rows=rows, access_control=access_control, as_obj=as_obj
+        )
+
+        try:
+            result = self.with_retries(
+                self.datastore.eql.search,
+                **body,
+                wait_for_completion_timeout=(f"{timeout}ms" if timeout is not None else None),
+            )
+
+            ret_data: dict[str, Any] = format_result(result)
+
             return ret_data
 
         except (elasticsearch.TransportError, elasticsearch.RequestError) as e:
@@ -1924,6 +2365,153 @@ class ESCollection(Generic[ModelType]):
         except Exception as error:
             raise SearchException(f"collection: {self.name}, error: {str(error)}")
 
+    def _format_async_result(self, result, format_result, eql=False):
+        response = result if eql else result.get("response", {})
+
+        return {
+            "id": result.get("id", None),
+            "is_running": bool(result.get("is_running", False)),
+            "is_partial": bool(result.get("is_partial", False)),
+            # Running EQL searches do not return any events until they complete
+            "result": format_result(response) if "hits" in response else None,
+        }
+
+    def _async_search_error(self, error: Exception) -> SearchException:
+        if isinstance(error, (elasticsearch.TransportError, elasticsearch.RequestError)):
+            try:
+                return SearchException(error.info["error"]["root_cause"][0]["reason"])  # type: ignore
+            except (AttributeError, TypeError, ValueError, KeyError, IndexError):
+                pass
+
+        return SearchException(f"collection: {self.name}, error: {str(error)}")
+
+    def submit_async_search(
+        self,
+        query: str,
+        eql=False,
+        wait_for_completion_timeout: Optional[int] = None,
+        keep_alive: Optional[int] = None,
+        use_archive=False,
+        track_total_hits=None,
+        **kwargs,
+    ) -> dict[str, Any]:
+        """Submit a search to be run asynchronously by the datastore, returning its results if it completes within
+        the given time, and the id needed to retrieve them later on otherwise::
+
+            {
+                "id": "FmRld...",     # ID of the search in the datastore
+                "is_running": True,   # Is the search still running
+                "is_partial": True,   # Are the results partial (running search, or failed shards)
+                "result": {...}       # The results found so far, in the format of search or raw_eql_search
+            }
+
+        The search is kept in the datastore after it completes, until it expires or is deleted, so that its results
+        can be retrieved more than once.
+
+        :param query: lucene query to search for, or EQL query if eql is set
+        :param eql: Run an EQL search instead of a lucene search
+        :param wait_for_completion_timeout: time to wait for the search to complete before returning (ms)
+        :param keep_alive: time the search and its results are kept in the datastore (s)
+        :param use_archive: Query also the archive (lucene only)
+        :param track_total_hits: Return to total matching document count (lucene only)
+        :param kwargs: arguments of search (lucene) or raw_eql_search (EQL), except for deep paging and timeout
+        :return: the status of the search, and its results so far
+        """
+        async_params = {
+            "wait_for_completion_timeout": (
+                f"{wait_for_completion_timeout}ms" if wait_for_completion_timeout is not None else None
+            ),
+            "keep_alive": f"{keep_alive}s" if keep_alive is not None else None,
+            "keep_on_completion": True,
+        }
+
+        try:
+            if eql:
+                body, format_result = self._prepare_eql_search(query, **kwargs)
+                result = self.with_retries(self.datastore.eql.search, **body, **async_params)
+            else:
+                args, format_result = self._prepare_search(query, **kwargs)
+                index, params, query_body = self._build_search_query(
+                    args, use_archive=use_archive, track_total_hits=track_total_hits
+                )
+                result = self.with_retries(
+                    self.datastore.client.async_search.submit,
+                    index=index,
+                    params=params,
+                    **query_body,
+                    **async_params,
+                )
+        except (SearchException, HowlerValueError):
+            raise
+        except Exception as error:
+            raise self._async_search_error(error)
+
+        return self._format_async_result(result, format_result, eql=eql)
+
+    def get_async_search(
+        self,
+        async_id: str,
+        eql=False,
+        wait_for_completion_timeout: Optional[int] = None,
+        keep_alive: Optional[int] = None,
+        offset=0,
+        rows=None,
+        fl=None,
+        as_obj=True,
+    ) -> Optional[dict[str, Any]]:
+        """Retrieve the status and results of a search submitted with submit_async_search.
+
+        :param async_id: ID of the search in the datastore
+        :param eql: Whether the search is an EQL search
+        :param wait_for_completion_timeout: time to wait for the search to complete before returning (ms)
+        :param keep_alive: extend the time the search and its results are kept in the datastore to this (s)
+        :param offset: offset the search was submitted with
+        :param rows: number of rows the search was submitted with
+        :param fl: list of fields the search was submitted with
+        :param as_obj: Return objects instead of dictionaries
+        :return: the status of the search, and its results so far, or None if it expired or was deleted
+        """
+        if eql:
+            _, format_result = self._prepare_eql_search("", fl=fl, rows=rows, as_obj=as_obj)
+            get_search = self.datastore.eql.get
+        else:
+            _, format_result = self._prepare_search("", offset=offset, rows=rows, fl=fl, as_obj=as_obj)
+            get_search = self.datastore.client.async_search.get
+
+        try:
+            result = self.with_retries(
+                get_search,
+                id=async_id,
+                wait_for_completion_timeout=(
+                    f"{wait_for_completion_timeout}ms" if wait_for_completion_timeout is not None else None
+                ),
+                keep_alive=f"{keep_alive}s" if keep_alive is not None else None,
+            )
+        except elasticsearch.NotFoundError:
+            return None
+        except Exception as error:
+            raise self._async_search_error(error)
+
+        return self._format_async_result(result, format_result, eql=eql)
+
+    def delete_async_search(self, async_id: str, eql=False) -> bool:
+        """Cancel a search submitted with submit_async_search if it is still running, and delete its results.
+
+        :param async_id: ID of the search in the datastore
+        :param eql: Whether the search is an EQL search
+        :return: True if the search was deleted, False if it had already expired
+        """
+        delete_search = self.datastore.eql.delete if eql else self.datastore.client.async_search.delete
+
+        try:
+            self.with_retries(delete_search, id=async_id)
+        except elasticsearch.NotFoundError:
+            return False
+        except Exception as error:
+            raise self._async_search_error(error)
+
+        return True
+
     def keys(self, access_control=None):
         """This function streams the keys of all the documents of this collection.
 
@@ -1989,6 +2577,7 @@ class ESCollection(Generic[ModelType]):
         query,
         access_control=None,
         use_archive=False,
+        filters=None,
     ):
         """This function should perform a count operation through the datastore and return a
         search result object that consists of the following:
@@ -2000,13 +2589,36 @@ class ESCollection(Generic[ModelType]):
         :param use_archive: Query also the archive
         :param query: lucene query to search for
         :param access_control: access control parameters to limiti the scope of the query
+        :param filters: additional queries to run on the original query to reduce the scope
         :return: a count result object
         """
         index = self.name
         if self.archive_access and use_archive:
             index = f"{index},{self.name}-*"
 
-        result = self.with_retries(self.datastore.client.count, index=index, q=query)
+        if filters is None:
+            filters = []
+        elif isinstance(filters, (str, dict)):
+            filters = [filters]
+        else:
+            filters = list(filters)
+
+        if access_control:
+            filters.append(access_control)
+
+        if filters:
+            result = self.with_retries(
+                self.datastore.client.count,
+                index=index,
+                query={
+                    "bool": {
+                        "must": {"query_string": {"query": query, "default_field": self.DEFAULT_SEARCH_FIELD}},
+                        "filter": [parse_filter(ff) for ff in filters],
+                    }
+                },
+            )
+        else:
+            result = self.with_retries(self.datastore.client.count, index=index, q=query)
 
         ret_data: dict[str, Any] = {
             "count": result["count"],
@@ -2025,6 +2637,30 @@ class ESCollection(Generic[ModelType]):
         filters=None,
         access_control=None,
         use_archive=False,
+    ):
+        args, format_result = self._prepare_histogram(
+            field,
+            start,
+            end,
+            gap,
+            query=query,
+            mincount=mincount,
+            filters=filters,
+            access_control=access_control,
+        )
+
+        return format_result(self._search(args, use_archive=use_archive))
+
+    def _prepare_histogram(
+        self,
+        field,
+        start,
+        end,
+        gap,
+        query="id:*",
+        mincount=None,
+        filters=None,
+        access_control=None,
     ):
         type_modifier = self._validate_steps_count(start, end, gap)
         start = type_modifier(start)
@@ -2036,8 +2672,10 @@ class ESCollection(Generic[ModelType]):
 
         if filters is None:
             filters = []
-        elif isinstance(filters, str):
+        elif isinstance(filters, (str, dict)):
             filters = [filters]
+        else:
+            filters = list(filters)
         filters.append("{field}:[{min} TO {max}]".format(field=field, min=start, max=end))
 
         args = [
@@ -2063,13 +2701,14 @@ class ESCollection(Generic[ModelType]):
         if filters:
             args.append(("filters", filters))
 
-        result = self._search(args, use_archive=use_archive)
+        def format_result(result):
+            # Convert the histogram into a dictionary
+            return {
+                type_modifier(row.get("key_as_string", row["key"])): row["doc_count"]
+                for row in result["aggregations"]["histogram"]["buckets"]
+            }
 
-        # Convert the histogram into a dictionary
-        return {
-            type_modifier(row.get("key_as_string", row["key"])): row["doc_count"]
-            for row in result["aggregations"]["histogram"]["buckets"]
-        }
+        return args, format_result
 
     def facet(
         self,
@@ -2085,6 +2724,80 @@ class ESCollection(Generic[ModelType]):
         access_control=None,
         use_archive=False,
         field_script=None,
+        after=None,
+    ):
+        """Count the number of documents matching the query for each value of a field.
+
+        By default, only the rows most frequent values are returned, as a dictionary of value to count. When after is
+        set, every value is paged through instead, in the order of the values, rows values at a time::
+
+            {
+                "items": {value: count, ...},  # The values of this page and their count
+                "next_after": "eyJ..."         # Cursor to pass back as after for the next page, None after the last
+            }
+
+        :param field: field to count the values of
+        :param query: lucene query the documents must match
+        :param prefix: only count the values starting with this prefix
+        :param contains: only count the values containing this value
+        :param ignore_case: ignore the case of the values when applying prefix and contains
+        :param sort: asc or desc to order the values by value, instead of by count
+        :param rows: number of values to return
+        :param mincount: minimum number of documents a value must be found in to be returned
+        :param filters: additional queries to run on the original query to reduce the scope
+        :param access_control: access control parameters to limit the scope of the query
+        :param use_archive: Query also the archive
+        :param field_script: script computing the values to count instead of the field (not supported with after)
+        :param after: cursor of the next page of values, or * for the first page
+        :return: the count of each value
+        """
+        if after is not None:
+            if field_script:
+                raise SearchException("Paging through the values of a field script is not supported.")
+
+            args, format_result = self._prepare_composite(
+                field,
+                query=query,
+                after=after,
+                prefix=prefix,
+                contains=contains,
+                ignore_case=ignore_case,
+                sort=sort,
+                rows=rows,
+                mincount=mincount,
+                filters=filters,
+                access_control=access_control,
+            )
+        else:
+            args, format_result = self._prepare_facet(
+                field,
+                query=query,
+                prefix=prefix,
+                contains=contains,
+                ignore_case=ignore_case,
+                sort=sort,
+                rows=rows,
+                mincount=mincount,
+                filters=filters,
+                access_control=access_control,
+                field_script=field_script,
+            )
+
+        return format_result(self._search(args, use_archive=use_archive))
+
+    def _prepare_facet(
+        self,
+        field,
+        query=None,
+        prefix=None,
+        contains=None,
+        ignore_case=False,
+        sort=None,
+        rows=10,
+        mincount=None,
+        filters=None,
+        access_control=None,
+        field_script=None,
     ):
         if not query:
             query = "id:*"
@@ -2094,18 +2807,29 @@ class ESCollection(Generic[ModelType]):
 
         if filters is None:
             filters = []
-        elif isinstance(filters, str):
+        elif isinstance(filters, (str, dict)):
             filters = [filters]
+        else:
+            filters = list(filters)
 
+        # The documents are not needed, only the aggregation
         args = [
             ("query", query),
             ("facet_active", True),
             ("facet_fields", [field]),
             ("facet_mincount", mincount),
-            ("rows", rows),
+            ("facet_size", rows),
+            ("rows", 0),
         ]
 
-        # TODO: prefix, contains, ignore_case, sort
+        if prefix or contains:
+            args.append(("facet_include", value_regex(prefix, contains, ignore_case)))
+
+        if sort:
+            if sort not in ["asc", "desc"]:
+                raise SearchException(f"Invalid facet sort: {sort}. Must be one of asc or desc.")
+
+            args.append(("facet_order", {"_key": sort}))
 
         if access_control:
             filters.append(access_control)
@@ -2116,12 +2840,131 @@ class ESCollection(Generic[ModelType]):
         if field_script:
             args.append(("field_script", field_script))
 
-        result = self._search(args, use_archive=use_archive)
+        def format_result(result):
+            # Convert the histogram into a dictionary
+            return {
+                row.get("key_as_string", row["key"]): row["doc_count"]
+                for row in result["aggregations"][field]["buckets"]
+            }
 
-        # Convert the histogram into a dictionary
-        return {
-            row.get("key_as_string", row["key"]): row["doc_count"] for row in result["aggregations"][field]["buckets"]
-        }
+        return args, format_result
+
+    def _prepare_composite(
+        self,
+        field,
+        query=None,
+        after="*",
+        prefix=None,
+        contains=None,
+        ignore_case=False,
+        sort=None,
+        rows=10,
+        mincount=None,
+        filters=None,
+        access_control=None,
+        limit=0,
+        group_sort=None,
+        fl=None,
+        as_obj=True,
+    ):
+        if not query:
+            query = "id:*"
+
+        # Paging parameters may come straight from query arguments
+        rows = int(rows)
+        limit = int(limit)
+        mincount = int(mincount or 1)
+
+        if sort is None:
+            sort = "asc"
+        elif sort not in ["asc", "desc"]:
+            raise SearchException(f"Invalid sort: {sort}. Must be one of asc or desc.")
+
+        if filters is None:
+            filters = []
+        elif isinstance(filters, (str, dict)):
+            filters = [filters]
+        else:
+            filters = list(filters)
+
+        after_key = None
+        if after and after != "*":
+            try:
+                after_key = json.loads(base64.urlsafe_b64decode(after.encode()))
+            except ValueError:
+                raise SearchException("Invalid cursor provided.")
+
+            if not isinstance(after_key, dict) or list(after_key.keys()) != [field]:
+                raise SearchException("Invalid cursor provided.")
+
+        # Composite aggregations cannot filter their buckets, so the documents without a matching value are excluded by
+        # the query instead. Documents with multiple values can still bring non-matching ones, removed from the results.
+        if prefix:
+            filters.append(prefix_filter(field, prefix, ignore_case))
+        if contains:
+            filters.append(contains_filter(field, contains, ignore_case))
+
+        if access_control:
+            filters.append(access_control)
+
+        args = [
+            ("query", query),
+            ("composite_active", True),
+            ("composite_field", field),
+            ("composite_order", sort),
+            ("composite_after", after_key),
+            ("composite_limit", limit),
+            ("composite_sort", group_sort),
+            ("rows", rows),
+        ]
+
+        if fl:
+            field_list = fl.split(",")
+            args.append(("field_list", field_list))
+        else:
+            field_list = None
+
+        if filters:
+            args.append(("filters", filters))
+
+        def format_result(result):
+            aggregation = result["aggregations"]["composite"]
+            buckets = [
+                bucket
+                for bucket in aggregation["buckets"]
+                if bucket["doc_count"] >= mincount
+                and value_matches(bucket["key"][field], prefix, contains, ignore_case)
+            ]
+
+            # A page with less buckets than requested is the last one, no need for another request to find out
+            next_after = None
+            if "after_key" in aggregation and len(aggregation["buckets"]) >= rows:
+                next_after = base64.urlsafe_b64encode(json.dumps(aggregation["after_key"]).encode()).decode()
+
+            if not limit:
+                return {
+                    "items": {bucket["key"][field]: bucket["doc_count"] for bucket in buckets},
+                    "next_after": next_after,
+                }
+
+            return {
+                "rows": rows,
+                "total": int(result["hits"]["total"]["value"]),
+                "items": [
+                    {
+                        "value": bucket["key"][field],
+                        "total": bucket["doc_count"],
+                        "items": [
+                            self._format_output(row, field_list, as_obj=as_obj)
+                            for row in bucket["group"]["hits"]["hits"]
+                        ],
+                    }
+                    for bucket in buckets
+                ],
+                "next_after": next_after,
+            }
+
+        return args, format_result
 
     def stats(
         self,
@@ -2131,11 +2974,31 @@ class ESCollection(Generic[ModelType]):
         access_control=None,
         use_archive=False,
         field_script=None,
+    ):
+        args, format_result = self._prepare_stats(
+            field,
+            query=query,
+            filters=filters,
+            access_control=access_control,
+            field_script=field_script,
+        )
+
+        return format_result(self._search(args, use_archive=use_archive))
+
+    def _prepare_stats(
+        self,
+        field,
+        query="id:*",
+        filters=None,
+        access_control=None,
+        field_script=None,
     ):
         if filters is None:
             filters = []
-        elif isinstance(filters, str):
+        elif isinstance(filters, (str, dict)):
             filters = [filters]
+        else:
+            filters = list(filters)
 
         args = [
             ("query", query),
@@ -2153,8 +3016,74 @@ class ESCollection(Generic[ModelType]):
         if field_script:
             args.append(("field_script", field_script))
 
-        result = self._search(args, use_archive=use_archive)
-        return result["aggregations"][f"{field}_stats"]
+        def format_result(result):
+            return result["aggregations"][f"{field}_stats"]
+
+        return args, format_result
+
+    def _prepare_count(self, query, filters=None, access_control=None):
+        if filters is None:
+            filters = []
+        elif isinstance(filters, (str, dict)):
+            filters = [filters]
+        else:
+            filters = list(filters)
+
+        if access_control:
+            filters.append(access_control)
+
+        args = [
+            ("query", query),
+            ("rows", 0),
+            ("df", self.DEFAULT_SEARCH_FIELD),
+        ]
+
+        if filters:
+            args.append(("filters", filters))
+
+        def format_result(result):
+            return {"count": int(result["hits"]["total"]["value"])}
+
+        return args, format_result
+
+    def prepare_msearch(self, operation, use_archive=False, **kwargs):
+        """This function builds the header and body needed to run one of the search operations of this collection
+        as part of a multi search request, as well as the function converting the raw response into the same
+        output as the equivalent collection function.
+
+        Supported operations are: search, count, facet, histogram and stats. The keyword arguments are the same
+        as the ones of the matching function, except that deep paging is not supported.
+
+        :param operation: search operation to prepare
+        :param use_archive: Query also the archive
+        :param kwargs: arguments of the search operation
+        :return: a tuple of the msearch header, the msearch body and the result formatting function
+        """
+        track_total_hits = None
+        if operation == "search":
+            track_total_hits = kwargs.pop("track_total_hits", None)
+            args, format_result = self._prepare_search(**kwargs)
+        elif operation == "count":
+            track_total_hits = True
+            args, format_result = self._prepare_count(**kwargs)
+        elif operation == "facet":
+            args, format_result = self._prepare_facet(**kwargs)
+        elif operation == "histogram":
+            args, format_result = self._prepare_histogram(**kwargs)
+        elif operation == "stats":
+            args, format_result = self._prepare_stats(**kwargs)
+        else:
+            raise SearchException(f"Operation '{operation}' cannot be part of a multi search")
+
+        index, params, query_body = self._build_search_query(
+            args, use_archive=use_archive, track_total_hits=track_total_hits
+        )
+
+        # The msearch body is sent as is, it does not go through the client's argument renaming
+        query_body["from"] = query_body.pop("from_")
+        query_body.update(params)
+
+        return {"index": index}, query_body, format_result
 
     def grouped_search(
         self,
@@ -2171,20 +3100,72 @@ class ESCollection(Generic[ModelType]):
         as_obj=True,
         use_archive=False,
         track_total_hits=False,
+        after=None,
+        prefix=None,
+        contains=None,
+        ignore_case=False,
     ):
+        """Search for the documents matching a query, grouped on the values of a field.
+
+        By default, groups are paged through with offset and rows, which does not scale to fields with many distinct
+        values. When after is set, every group is paged through instead, in the order of the values, using a cursor:
+        the results then have a next_after cursor to pass back as after for the next page, None after the last page.
+        Sort is then the order of the values (asc or desc), and prefix, contains and ignore_case filter them.
+
+        :param group_field: field to group the documents on
+        :param query: lucene query to search for
+        :param offset: offset at which the groups start (not supported with after)
+        :param sort: field to sort the groups with, or asc or desc with after
+        :param group_sort: field to sort the documents of each group with
+        :param fl: list of fields to return
+        :param limit: number of documents to return for each group
+        :param rows: number of groups to return
+        :param filters: additional queries to run on the original query to reduce the scope
+        :param access_control: access control parameters to limit the scope of the query
+        :param as_obj: Return objects instead of dictionaries
+        :param use_archive: Query also the archive
+        :param track_total_hits: Return to total matching document count
+        :param after: cursor of the next page of groups, or * for the first page
+        :param prefix: only return the groups with a value starting with this prefix (after only)
+        :param contains: only return the groups with a value containing this value (after only)
+        :param ignore_case: ignore the case of the values when applying prefix and contains
+        :return: the groups, with their total number of documents and their first documents
+        """
         if rows is None:
             rows = self.DEFAULT_ROW_SIZE
 
-        if sort is None:
-            sort = self.DEFAULT_SORT
-
         if group_sort is None:
             group_sort = self.DEFAULT_SORT
 
+        if after is not None:
+            args, format_result = self._prepare_composite(
+                group_field,
+                query=query,
+                after=after,
+                prefix=prefix,
+                contains=contains,
+                ignore_case=ignore_case,
+                sort=sort,
+                rows=rows,
+                filters=filters,
+                access_control=access_control,
+                limit=max(int(limit), 1),
+                group_sort=group_sort,
+                fl=fl,
+                as_obj=as_obj,
+            )
+
+            return format_result(self._search(args, use_archive=use_archive, track_total_hits=track_total_hits))
+
+        if sort is None:
+            sort = self.DEFAULT_SORT
+
         if filters is None:
             filters = []
-        elif isinstance(filters, str):
+        elif isinstance(filters, (str, dict)):
             filters = [filters]
+        else:
+            filters = list(filters)
 
         args = [
             ("query", query),
@@ -2590,6 +3571,7 @@ class ESCollection(Generic[ModelType]):
                 body=current_template,
             )
 
+    @notifies_change
     def wipe(self):
         """This function should completely delete the collection
 
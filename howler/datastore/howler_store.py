@@ -5,6 +5,7 @@ import elasticsearch
 
 from howler.common.exceptions import HowlerAttributeError
 from howler.datastore.collection import ESCollection, log
+from howler.datastore.exceptions import SearchException
 from howler.odm.models.action import Action
 from howler.odm.models.analytic import Analytic
 from howler.odm.models.hit import Hit
@@ -26,6 +27,12 @@ class HowlerDatastore(object):
         self.ds.register("view", View)
         self.ds.register("user_avatar")
 
+        from howler.services.generation_service import track_generations
+        from howler.services.hit_cache_service import track_hit_cache
+
+        track_generations(self.ds)
+        track_hit_cache(self.ds)
+
     def __enter__(self):
         return self
 
@@ -82,15 +89,12 @@ class HowlerDatastore(object):
         else:
             raise HowlerAttributeError(f"Collection {collection_name} does not exist.")
 
-    @elasticapm.capture_span(span_type="datastore")
-    def multi_index_bulk(self, bulk_plans):
+    def _with_retries(self, func, *args, **kwargs):
         max_retry_backoff = 10
         retries = 0
         while True:
             try:
-                plan = "\n".join([p.get_plan_data() for p in bulk_plans])
-                ret_val = self.ds.client.bulk(body=plan)
-                return ret_val
+                return func(*args, **kwargs)
             except (
                 elasticsearch.exceptions.ConnectionError,
                 elasticsearch.exceptions.ConnectionTimeout,
@@ -122,3 +126,48 @@ class HowlerDatastore(object):
 
                 else:
                     raise
+
+    @elasticapm.capture_span(span_type="datastore")
+    def multi_index_bulk(self, bulk_plans):
+        plan = "\n".join([p.get_plan_data() for p in bulk_plans])
+        return self._with_retries(self.ds.client.bulk, body=plan)
+
+    @elasticapm.capture_span(span_type="datastore")
+    def multi_search(self, searches):
+        """Run a list of prepared search operations (see ESCollection.prepare_msearch) in a single round trip.
+
+        Returns one (result, error) tuple per search, in the same order as the input. A failing search does not
+        fail the others, its error message is returned instead of a result.
+        """
+        if not searches:
+            return []
+
+        body = []
+        for header, query_body, _ in searches:
+            body.append(header)
+            body.append(query_body)
+
+        try:
+            responses = self._with_retries(self.ds.client.msearch, searches=body)["responses"]
+        except elasticsearch.ApiError as e:
+            try:
+                err_msg = e.info["error"]["root_cause"][0]["reason"]  # type: ignore
+            except (ValueError, KeyError, IndexError, TypeError):
+                err_msg = str(e)
+
+            raise SearchException(err_msg)
+
+        results = []
+        for (_, _, format_result), response in zip(searches, responses):
+            if "error" in response:
+                error = response["error"]
+                try:
+                    err_msg = error["root_cause"][0]["reason"]
+                except (KeyError, IndexError, TypeError):
+                    err_msg = error.get("reason", str(error)) if isinstance(error, dict) else str(error)
+
+                results.append((None, err_msg))
+            else:
+                results.append((format_result(response), None))
+
+        return results
@@ -32,6 +32,26 @@ class OdmHelper:
             silent,
         )
 
+    def list_merge(
+        self,
+        key: str,
+        values: list[Any],
+        explanation: Optional[str] = None,
+        silent: bool = False,
+    ):
+        if self.valid_fields and not any(
+            field for field in self.valid_fields if field.startswith(key) and self.fields[field].multivalued
+        ):
+            raise HowlerValueError(f"Key {key} not found in {self.model_name}")
+
+        return OdmUpdateOperation(
+            ESCollection.UPDATE_MERGE,
+            key,
+            values,
+            explanation,
+            silent,
+        )
+
     def list_remove(
         self,
         key: str,
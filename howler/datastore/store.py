@@ -12,14 +12,18 @@ import elasticsearch.client
 import elasticsearch.helpers
 
 from howler.common import loader
-from howler.datastore.collection import ESCollection
+from howler.datastore.collection import ESCollection, log
 from howler.datastore.exceptions import DataStoreException
+from howler.datastore.support.serializer import SERIALIZERS
 
 if typing.TYPE_CHECKING:
     from howler.odm.models.config import Config
 
 TRANSPORT_TIMEOUT = int(environ.get("AL_DATASTORE_TRANSPORT_TIMEOUT", "10"))
 
+# Called after a write with the collection written to, and the keys of the documents written if they are known
+ChangeListener = typing.Callable[[ESCollection, typing.Optional[list[str]]], None]
+
 
 class ESStore(object):
     """Elasticsearch multi-index implementation of the ResultStore interface."""
@@ -76,8 +80,11 @@ class ESStore(object):
         self._closed = False
         self._collections: dict[str, ESCollection] = {}
         self._models: dict[str, typing.Any] = {}
+        self._change_listeners: dict[str, list[ChangeListener]] = {}
         self.ilm_config = ilm_config
         self.validate = True
+        self.trusted_reads = config.datastore.trusted_reads
+        self.projections = config.datastore.projections
 
         tracer = logging.getLogger("elasticsearch")
         tracer.setLevel(logging.CRITICAL)
@@ -87,6 +94,7 @@ class ESStore(object):
             api_key=self._apikey,
             max_retries=0,
             request_timeout=TRANSPORT_TIMEOUT,
+            serializers=SERIALIZERS,
         )
         self.eql = elasticsearch.client.EqlClient(self.client)
         self.archive_access = archive_access
@@ -164,6 +172,7 @@ class ESStore(object):
             api_key=self._apikey,
             max_retries=0,
             request_timeout=TRANSPORT_TIMEOUT,
+            serializers=SERIALIZERS,
         )
         self.eql = elasticsearch.client.EqlClient(self.client)
 
@@ -202,6 +211,28 @@ class ESStore(object):
 
         self._models[name] = model_class
 
+    def add_change_listener(self, name: str, listener: ChangeListener):
+        """Call the given listener every time documents of the given collection are written through this datastore
+
+        :param name: Name of the collection to listen to
+        :param listener: Function called after every write with the collection and the keys of the documents written,
+            or None if any document may have been written
+        """
+        self._change_listeners.setdefault(f"{loader.APP_NAME}-{name}", []).append(listener)
+
+    def notify_change(self, collection: ESCollection, keys: typing.Optional[list[str]] = None):
+        """Call the listeners of the given collection, after documents were written to it
+
+        :param collection: The collection that was written to
+        :param keys: The keys of the documents written, or None if any document may have been written
+        """
+        for listener in self._change_listeners.get(collection.name, []):
+            try:
+                listener(collection, keys)
+            except Exception:
+                # The write itself succeeded, listeners failing should not make it look like it didn't
+                log.exception("Change listener failed for collection %s", collection.name)
+
     def to_pydatemath(self, value):
         replace_list = [
             (self.now, self.DATEMATH_MAP["NOW"]),
@@ -0,0 +1,32 @@
+from typing import Any
+
+from elasticsearch.serializer import JsonSerializer, NdjsonSerializer
+
+from howler.utils import json_utils
+
+
+class HowlerJsonSerializer(JsonSerializer):
+    "Encode requests to and decode responses from elasticsearch with howler's JSON codec"
+
+    def json_dumps(self, data: Any) -> bytes:
+        return json_utils.dumpb(data, default=self.default)
+
+    def json_loads(self, data: bytes) -> Any:
+        return json_utils.loads(data)
+
+
+class HowlerNdjsonSerializer(NdjsonSerializer):
+    "Encode the lines of bulk requests to elasticsearch with howler's JSON codec"
+
+    def json_dumps(self, data: Any) -> bytes:
+        return json_utils.dumpb(data, default=self.default)
+
+    def json_loads(self, data: bytes) -> Any:
+        return json_utils.loads(data)
+
+
+# The compatibility mode mimetypes elasticsearch responds with use the same serializers
+SERIALIZERS = {
+    HowlerJsonSerializer.mimetype: HowlerJsonSerializer(),
+    HowlerNdjsonSerializer.mimetype: HowlerNdjsonSerializer(),
+}
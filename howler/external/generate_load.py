@@ -0,0 +1,627 @@
+"""Generate production-sized load against howler, to test its scaling limits locally.
+
+Two commands are available:
+
+    populate: Write millions of realistic hits, bundles, comments and logs directly to elasticsearch, using several
+        processes and bulk requests.
+    replay: Replay a recorded mix of API calls against a running instance, and report their latency.
+
+Run with --help for the options of each command.
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import random
+import statistics
+import sys
+import time
+from base64 import b64encode
+from collections import defaultdict
+from copy import deepcopy
+from datetime import datetime, timedelta
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Iterator, Optional, TypedDict
+
+import requests
+
+from howler.common import loader
+from howler.common.exceptions import HowlerRuntimeError, HowlerValueError
+from howler.datastore.bulk import ElasticBulkPlan
+from howler.datastore.collection import ESCollection
+from howler.odm.helper import generate_useful_hit
+from howler.odm.models.analytic import Analytic
+from howler.odm.models.hit import Hit
+from howler.odm.models.howler_data import Assessment, AssessmentEscalationMap, HitStatus
+from howler.odm.models.user import User
+from howler.odm.randomizer import get_random_host, get_random_ip, get_random_phrase, get_random_word
+from howler.security.utils import get_password_hash
+from howler.utils.uid import get_random_id
+
+# Elasticsearch rejects bulk items with this status when its write queues are full
+REJECTED_STATUS = 429
+
+MIN_BATCH_SIZE = 50
+INITIAL_BACKOFF = 0.5
+MAX_BACKOFF = 30.0
+
+# How the generated hits are spread across statuses
+STATUS_WEIGHTS = {
+    HitStatus.OPEN: 0.6,
+    HitStatus.IN_PROGRESS: 0.15,
+    HitStatus.ON_HOLD: 0.05,
+    HitStatus.RESOLVED: 0.2,
+}
+
+
+class LoadProfile(TypedDict):
+    "The volume and shape of the data to generate"
+
+    hits: int
+    analytics: int
+    detections: int
+    users: int
+    observables: int
+    bundle_ratio: float
+    max_bundle_size: int
+    comments: float
+    logs: float
+    days: int
+    templates: int
+    seed: int
+
+
+class Vocabulary(TypedDict):
+    "The values the generated data is drawn from, which control the cardinality of the corresponding fields"
+
+    analytics: list[tuple[str, list[str]]]
+    users: list[str]
+    ips: list[str]
+    hosts: list[str]
+
+
+def _unique(generate: Any, count: int) -> list[str]:
+    "Generate the given number of unique values"
+    values: set[str] = set()
+    while len(values) < count:
+        values.add(generate(len(values)))
+
+    return sorted(values)
+
+
+def _random_name(_index: int) -> str:
+    "Generate a name following the best practices for analytic and detection names"
+    return " ".join(get_random_word().capitalize() for _ in range(random.randint(1, 3)))
+
+
+def build_vocabulary(profile: LoadProfile) -> Vocabulary:
+    """Build the values the generated data is drawn from.
+
+    The vocabulary only depends on the profile (including its seed), so that every process draws from the same values.
+
+    Args:
+        profile (LoadProfile): The profile of the data to generate
+
+    Returns:
+        Vocabulary: The analytics and their detections, users, IPs and hosts to use
+    """
+    random.seed(profile["seed"])
+
+    detections = _unique(_random_name, profile["detections"])
+
+    return {
+        "analytics": [
+            (name, random.sample(detections, k=random.randint(1, min(len(detections), 5))))
+            for name in _unique(_random_name, profile["analytics"])
+        ],
+        "users": _unique(lambda index: f"{get_random_word().lower()}{index}", profile["users"]),
+        "ips": _unique(lambda _: get_random_ip(), profile["observables"]),
+        "hosts": _unique(lambda index: f"host{index}.{get_random_host()}", profile["observables"]),
+    }
+
+
+def build_templates(vocabulary: Vocabulary, count: int) -> list[dict[str, Any]]:
+    """Generate the hits that every generated hit is a variation of.
+
+    Generating a complete hit is too slow to do millions of times, so a set of them is generated once, and the fields
+    that matter for scale (ids, timestamps, analytics, users, observables, status, comments and logs) are redrawn for
+    every hit.
+
+    Args:
+        vocabulary (Vocabulary): The values to draw from
+        count (int): The number of templates to generate
+
+    Returns:
+        list[dict[str, Any]]: The templates, as they are stored in elasticsearch
+    """
+    lookups = loader.get_lookups()
+
+    return [
+        generate_useful_hit(lookups, vocabulary["users"], prune_hit=True).as_primitives(hidden_fields=True)
+        for _ in range(count)
+    ]
+
+
+def _timestamp(start: datetime, max_seconds: float) -> tuple[datetime, str]:
+    "Draw a timestamp after the given start"
+    timestamp = start + timedelta(seconds=random.random() * max_seconds)
+    return timestamp, timestamp.isoformat() + "Z"
+
+
+def _count(mean: float) -> int:
+    "Draw a number of entries with the given mean"
+    return round(random.expovariate(1 / mean)) if mean > 0 else 0
+
+
+def _add_activity(hit: dict[str, Any], created: datetime, vocabulary: Vocabulary, profile: LoadProfile):
+    "Draw the status, assignment, comments and logs of a hit"
+    howler = hit["howler"]
+    status = random.choices(list(STATUS_WEIGHTS.keys()), weights=list(STATUS_WEIGHTS.values()))[0]
+    howler["status"] = str(status)
+    howler["assignment"] = random.choice(vocabulary["users"]) if status != HitStatus.OPEN else "unassigned"
+
+    if status == HitStatus.RESOLVED:
+        assessment = random.choice(Assessment.list())
+        howler["assessment"] = assessment
+        howler["escalation"] = AssessmentEscalationMap[assessment].value
+    else:
+        howler.pop("assessment", None)
+
+    # Activity happens within a day of the hit being created
+    howler["comment"] = []
+    for _ in range(_count(profile["comments"])):
+        _, timestamp = _timestamp(created, 86400)
+        howler["comment"].append(
+            {
+                "id": get_random_id(),
+                "timestamp": timestamp,
+                "modified": timestamp,
+                "value": get_random_phrase(),
+                "user": random.choice(vocabulary["users"]),
+                "reactions": {},
+            }
+        )
+
+    howler["log"] = []
+    for _ in range(_count(profile["logs"])):
+        _, timestamp = _timestamp(created, 86400)
+        howler["log"].append(
+            {
+                "timestamp": timestamp,
+                "key": "howler.assignment",
+                "explanation": f"Assigned to {howler['assignment']}",
+                "new_value": howler["assignment"],
+                "previous_value": "unassigned",
+                "type": "set",
+                "user": random.choice(vocabulary["users"]),
+            }
+        )
+
+
+def generate_hit(template: dict[str, Any], vocabulary: Vocabulary, profile: LoadProfile) -> dict[str, Any]:
+    """Generate a hit as a variation of the given template.
+
+    Args:
+        template (dict[str, Any]): The template to vary
+        vocabulary (Vocabulary): The values to draw from
+        profile (LoadProfile): The profile of the data to generate
+
+    Returns:
+        dict[str, Any]: The hit, as it is stored in elasticsearch
+    """
+    hit = deepcopy(template)
+    hit_id = get_random_id()
+    analytic, detections = random.choice(vocabulary["analytics"])
+
+    created, timestamp = _timestamp(datetime.now() - timedelta(days=profile["days"]), profile["days"] * 86400)
+    hit["timestamp"] = timestamp
+    hit["event"]["created"] = timestamp
+    hit["event"]["id"] = hit_id
+
+    howler = hit["howler"]
+    howler["id"] = hit_id
+    howler["analytic"] = analytic
+    howler["detection"] = random.choice(detections)
+    howler["hash"] = sha256(hit_id.encode()).hexdigest()
+    howler["bundles"] = []
+    howler["hits"] = []
+    howler["is_bundle"] = False
+    howler["bundle_size"] = 0
+
+    ips = random.sample(vocabulary["ips"], k=min(len(vocabulary["ips"]), 2))
+    hosts = random.sample(vocabulary["hosts"], k=min(len(vocabulary["hosts"]), 2))
+    howler["outline"]["threat"] = ips[0]
+    howler["outline"]["target"] = hosts[0]
+    hit["related"]["ip"] = ips
+    hit["related"]["hosts"] = hosts
+    hit["related"]["user"] = random.sample(vocabulary["users"], k=min(len(vocabulary["users"]), 2))
+    for key in ["source", "destination"]:
+        if key in hit and "ip" in hit[key]:
+            hit[key]["ip"] = random.choice(vocabulary["ips"])
+
+    _add_activity(hit, created, vocabulary, profile)
+
+    return hit
+
+
+def generate_hits(
+    count: int, templates: list[dict[str, Any]], vocabulary: Vocabulary, profile: LoadProfile
+) -> Iterator[dict[str, Any]]:
+    """Generate the given number of hits, a share of which are bundles of the hits generated after them.
+
+    Args:
+        count (int): The number of hits (including bundles) to generate
+        templates (list[dict[str, Any]]): The templates to vary
+        vocabulary (Vocabulary): The values to draw from
+        profile (LoadProfile): The profile of the data to generate
+
+    Yields:
+        dict[str, Any]: The hits, as they are stored in elasticsearch
+    """
+    generated = 0
+    while generated < count:
+        hit = generate_hit(random.choice(templates), vocabulary, profile)
+        generated += 1
+
+        if random.random() >= profile["bundle_ratio"] or generated >= count:
+            yield hit
+            continue
+
+        children = [
+            generate_hit(random.choice(templates), vocabulary, profile)
+            for _ in range(min(random.randint(2, max(profile["max_bundle_size"], 2)), count - generated))
+        ]
+        generated += len(children)
+
+        hit["howler"]["is_bundle"] = True
+        hit["howler"]["hits"] = [child["howler"]["id"] for child in children]
+        hit["howler"]["bundle_size"] = len(children)
+        yield hit
+
+        for child in children:
+            child["howler"]["bundles"] = [hit["howler"]["id"]]
+            yield child
+
+
+class BulkWriter(object):
+    """Write documents to a collection in bulk, backing off when elasticsearch pushes back.
+
+    Every process writes one batch at a time, so the number of requests in flight is bounded by the number of
+    processes. When elasticsearch rejects documents because its write queues are full, the batch size is halved and
+    the rejected documents are retried after an exponential backoff. The batch size grows back as batches succeed.
+    """
+
+    def __init__(self, collection: ESCollection, batch_size: int, max_retries: int = 10):
+        self.collection = collection
+        self.max_batch_size = batch_size
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.pending: list[dict[str, Any]] = []
+        self.written = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def add(self, doc_id: str, doc: dict[str, Any]):
+        "Queue a document to be written, and write a batch if enough documents are queued"
+        self.pending.append({"id": doc_id, "doc": doc})
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        "Write every queued document"
+        retries = 0
+        backoff = INITIAL_BACKOFF
+        while self.pending:
+            batch, self.pending = self.pending[: self.batch_size], self.pending[self.batch_size :]
+            rejected = self._write(batch)
+
+            if not rejected:
+                retries = 0
+                backoff = INITIAL_BACKOFF
+                self.batch_size = min(self.max_batch_size, self.batch_size + max(self.max_batch_size // 10, 1))
+                continue
+
+            retries += 1
+            if retries > self.max_retries:
+                raise HowlerRuntimeError(f"Elasticsearch rejected {len(rejected)} documents {retries} times in a row")
+
+            self.rejected += len(rejected)
+            self.batch_size = max(MIN_BATCH_SIZE, self.batch_size // 2)
+            self.pending = rejected + self.pending
+            time.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF)
+
+    def _write(self, batch: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        "Write a batch of documents, and return the ones elasticsearch rejected"
+        # The documents are generated as they are stored, so they are written as is rather than validated again
+        plan = ElasticBulkPlan(self.collection.index_list)
+        for entry in batch:
+            plan.add_insert_operation(entry["id"], entry["doc"])
+
+        result = self.collection.bulk(plan)
+
+        rejected = []
+        for entry, item in zip(batch, result["items"]):
+            status = item["create"]
+            if status.get("status") == REJECTED_STATUS:
+                rejected.append(entry)
+            elif "error" in status:
+                self.failed += 1
+            else:
+                self.written += 1
+
+        return rejected
+
+
+_worker: dict[str, Any] = {}
+
+
+def _init_populate_worker(profile: LoadProfile, batch_size: int):
+    "Connect to the datastore and build the vocabulary and templates, once per process"
+    vocabulary = build_vocabulary(profile)
+
+    _worker["profile"] = profile
+    _worker["vocabulary"] = vocabulary
+    _worker["templates"] = build_templates(vocabulary, profile["templates"])
+    _worker["datastore"] = loader.datastore(archive_access=False)
+    _worker["batch_size"] = batch_size
+
+    # Check once that the templates are still valid hits, since generated hits are not validated
+    Hit(_worker["templates"][0])
+
+
+def _populate_task(task: tuple[int, int]) -> dict[str, int]:
+    "Generate and write a share of the hits"
+    index, count = task
+    profile: LoadProfile = _worker["profile"]
+
+    # Seeding each task (rather than each process) makes the generated data independent of the number of processes
+    random.seed(f"{profile['seed']}-{index}")
+
+    writer = BulkWriter(_worker["datastore"].hit, _worker["batch_size"])
+    for hit in generate_hits(count, _worker["templates"], _worker["vocabulary"], profile):
+        writer.add(hit["howler"]["id"], hit)
+    writer.flush()
+
+    return {"written": writer.written, "failed": writer.failed, "rejected": writer.rejected}
+
+
+def create_users(ds: Any, vocabulary: Vocabulary, batch_size: int):
+    "Create a user for every user in the vocabulary"
+    # Nobody logs in as these users, so they share a single (slow to compute) password hash
+    password = get_password_hash(get_random_id())
+
+    writer = BulkWriter(ds.user, batch_size)
+    for uname in vocabulary["users"]:
+        user = User(
+            {"uname": uname, "name": uname.capitalize(), "email": f"{uname}@howler.cyber.gc.ca", "password": password}
+        )
+        writer.add(uname, user.as_primitives(hidden_fields=True))
+    writer.flush()
+    ds.user.commit()
+
+
+def create_analytics(ds: Any, vocabulary: Vocabulary, batch_size: int):
+    "Create an analytic for every analytic in the vocabulary"
+    writer = BulkWriter(ds.analytic, batch_size)
+    for name, detections in vocabulary["analytics"]:
+        owner = random.choice(vocabulary["users"])
+        analytic = Analytic(
+            {
+                "name": name,
+                "owner": owner,
+                "contributors": [owner],
+                "detections": sorted(detections),
+                "description": get_random_phrase(),
+            }
+        )
+        writer.add(analytic.analytic_id, analytic.as_primitives(hidden_fields=True))
+    writer.flush()
+    ds.analytic.commit()
+
+
+def populate(profile: LoadProfile, processes: int, batch_size: int, task_size: int):
+    """Populate the datastore with the users, analytics and hits described by the profile.
+
+    Args:
+        profile (LoadProfile): The profile of the data to generate
+        processes (int): The number of processes generating and writing hits
+        batch_size (int): The maximum number of documents per bulk request
+        task_size (int): The number of hits each task generates. Progress is reported as tasks complete.
+    """
+    ds = loader.datastore(archive_access=False)
+    vocabulary = build_vocabulary(profile)
+
+    print(f"Creating {len(vocabulary['users'])} users and {len(vocabulary['analytics'])} analytics")
+    create_users(ds, vocabulary, batch_size)
+    create_analytics(ds, vocabulary, batch_size)
+
+    tasks = [
+        (index, min(task_size, profile["hits"] - index * task_size))
+        for index in range(math.ceil(profile["hits"] / task_size))
+    ]
+
+    print(f"Creating {profile['hits']} hits with {processes} processes")
+    start = time.perf_counter()
+    totals: dict[str, int] = defaultdict(int)
+
+    # Processes are spawned rather than forked, so that they don't share the parent's elasticsearch connections
+    with multiprocessing.get_context("spawn").Pool(
+        processes, initializer=_init_populate_worker, initargs=(profile, batch_size)
+    ) as pool:
+        for result in pool.imap_unordered(_populate_task, tasks):
+            for key, value in result.items():
+                totals[key] += value
+
+            elapsed = time.perf_counter() - start
+            print(
+                f"\t{totals['written']}/{profile['hits']} hits written "
+                f"({totals['written'] / elapsed:.0f}/s, {totals['failed']} failed, {totals['rejected']} rejected)"
+            )
+
+    ds.hit.commit()
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+
+
+class RecordedCall(TypedDict):
+    "An API call, as recorded for replay"
+
+    method: str
+    path: str
+    params: Optional[dict[str, Any]]
+    json: Optional[Any]
+    weight: Optional[float]
+
+
+def load_calls(path: Path) -> list[RecordedCall]:
+    """Load a recorded mix of API calls, from either a JSON list or newline delimited JSON.
+
+    Args:
+        path (Path): The file the calls were recorded to
+
+    Returns:
+        list[RecordedCall]: The recorded calls
+    """
+    text = path.read_text()
+    if text.lstrip().startswith("["):
+        calls = json.loads(text)
+    else:
+        calls = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    for call in calls:
+        if "method" not in call or "path" not in call:
+            raise HowlerValueError(f"Recorded calls need a method and a path: {call}")
+
+    return calls
+
+
+def _replay_task(task: tuple[int, str, str, list[RecordedCall], int]) -> list[tuple[str, int, float]]:
+    "Replay a number of calls drawn from the recorded mix"
+    index, host, auth, calls, count = task
+    random.seed(index)
+
+    session = requests.Session()
+    session.headers.update({"Authorization": f"Basic {b64encode(auth.encode()).decode()}"})
+
+    weights = [call.get("weight") or 1 for call in calls]
+    results = []
+    for call in random.choices(calls, weights=weights, k=count):
+        start = time.perf_counter()
+        try:
+            status = session.request(
+                call["method"],
+                f"{host}{call['path']}",
+                params=call.get("params"),
+                json=call.get("json"),
+                verify=False,
+                timeout=60,
+            ).status_code
+        except requests.RequestException:
+            status = 0
+
+        results.append((f"{call['method']} {call['path']}", status, time.perf_counter() - start))
+
+    return results
+
+
+def _percentile(values: list[float], percentile: int) -> float:
+    "Compute a percentile of the given values"
+    return statistics.quantiles(values, n=100)[percentile - 1] if len(values) > 1 else values[0]
+
+
+def replay(host: str, auth: str, calls: list[RecordedCall], processes: int, count: int):
+    """Replay a recorded mix of API calls against a running instance, and report their latency.
+
+    Args:
+        host (str): The URL of the instance
+        auth (str): The credentials to authenticate with, as uname:apikey_name:apikey
+        calls (list[RecordedCall]): The recorded calls, drawn from according to their weight
+        processes (int): The number of processes making calls concurrently
+        count (int): The total number of calls to make
+    """
+    tasks = [(index, host, auth, calls, count // processes + (index < count % processes)) for index in range(processes)]
+
+    start = time.perf_counter()
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    with multiprocessing.get_context("spawn").Pool(processes) as pool:
+        for results in pool.imap_unordered(_replay_task, tasks):
+            for key, status, latency in results:
+                latencies[key].append(latency)
+                if not 200 <= status < 400:
+                    errors[key] += 1
+
+    elapsed = time.perf_counter() - start
+    print(f"{count} calls in {elapsed:.1f}s ({count / elapsed:.1f}/s)")
+    print(f"{'call':<60} {'count':>8} {'errors':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for key, values in sorted(latencies.items()):
+        print(
+            f"{key[:60]:<60} {len(values):>8} {errors[key]:>8} "
+            + " ".join(f"{_percentile(values, percentile) * 1000:>6.0f}ms" for percentile in [50, 95, 99])
+        )
+
+
+def _parser() -> argparse.ArgumentParser:
+    "Build the command line parser"
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    populate_parser = commands.add_parser("populate", help="Write generated data directly to elasticsearch")
+    populate_parser.add_argument("--hits", type=int, default=1_000_000, help="The number of hits, including bundles")
+    populate_parser.add_argument("--analytics", type=int, default=100, help="The number of distinct analytics")
+    populate_parser.add_argument("--detections", type=int, default=500, help="The number of distinct detections")
+    populate_parser.add_argument("--users", type=int, default=200, help="The number of distinct users")
+    populate_parser.add_argument("--observables", type=int, default=10_000, help="The number of distinct IPs/hosts")
+    populate_parser.add_argument("--bundle-ratio", type=float, default=0.01, help="The share of hits that are bundles")
+    populate_parser.add_argument("--max-bundle-size", type=int, default=50, help="The maximum hits per bundle")
+    populate_parser.add_argument("--comments", type=float, default=0.5, help="The mean number of comments per hit")
+    populate_parser.add_argument("--logs", type=float, default=2, help="The mean number of logs per hit")
+    populate_parser.add_argument("--days", type=int, default=30, help="The number of days hits are spread over")
+    populate_parser.add_argument("--templates", type=int, default=200, help="The number of hits to vary")
+    populate_parser.add_argument("--seed", type=int, default=0, help="The seed of the generated data")
+    populate_parser.add_argument("--processes", type=int, default=multiprocessing.cpu_count())
+    populate_parser.add_argument("--batch-size", type=int, default=1000, help="The maximum documents per bulk request")
+    populate_parser.add_argument("--task-size", type=int, default=10_000, help="The hits generated per task")
+
+    replay_parser = commands.add_parser("replay", help="Replay a recorded mix of API calls")
+    replay_parser.add_argument(
+        "calls",
+        type=Path,
+        help="A JSON list or newline delimited JSON of calls, with a method, path and optional params, json and weight",
+    )
+    replay_parser.add_argument("--host", default="http://localhost:5000")
+    replay_parser.add_argument("--auth", default="admin:devkey:admin", help="uname:apikey_name:apikey")
+    replay_parser.add_argument("--count", type=int, default=1000, help="The total number of calls to make")
+    replay_parser.add_argument("--processes", type=int, default=multiprocessing.cpu_count())
+
+    return parser
+
+
+def main():
+    "Main run function"
+    args = _parser().parse_args(sys.argv[1:])
+
+    if args.command == "populate":
+        profile: LoadProfile = {
+            "hits": args.hits,
+            "analytics": args.analytics,
+            "detections": args.detections,
+            "users": args.users,
+            "observables": args.observables,
+            "bundle_ratio": args.bundle_ratio,
+            "max_bundle_size": args.max_bundle_size,
+            "comments": args.comments,
+            "logs": args.logs,
+            "days": args.days,
+            "templates": args.templates,
+            "seed": args.seed,
+        }
+        populate(profile, args.processes, args.batch_size, args.task_size)
+    else:
+        replay(args.host, args.auth, load_calls(args.calls), args.processes, args.count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+import tempfile
+from typing import IO, Iterable, Iterator, Optional, Union
+from urllib.parse import parse_qs, unquote, urlparse
+
+from howler.common.exceptions import HowlerException, HowlerValueError
+from howler.common.logging import get_logger
+from howler.filestore.transport.base import CHUNK_SIZE, Transport, TransportException, copy_stream
+
+logger = get_logger(__file__)
+
+LOCATIONS = ["all", "near", "far"]
+
+
+class FileStoreException(HowlerException):
+    """Exception thrown when a file cannot be found in, or written to, the filestore"""
+
+
+# The options each type of storage accepts in the query string of its URL
+OPTIONS = {"file": set(), "s3": {"aws_region", "s3_bucket", "use_ssl", "verify"}}
+
+
+def _parse_bool(value: Optional[str], default: bool) -> bool:
+    if value is None:
+        return default
+
+    return value.lower() == "true"
+
+
+def create_transport(url: str) -> Transport:
+    """Create the transport storing files at the given URL. The type of storage is selected by the scheme of the URL.
+
+    Args:
+        url (str): The URL of the storage, i.e. file:///path/to/folder or s3://key:secret@host/path?s3_bucket=bucket
+
+    Raises:
+        FileStoreException: The scheme of the URL, or one of its options, is not supported
+
+    Returns:
+        Transport: The transport
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in OPTIONS:
+        raise FileStoreException(f"Unsupported filestore scheme: {parsed.scheme}")
+
+    options = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+    unsupported = set(options.keys()) - OPTIONS[parsed.scheme]
+    if unsupported:
+        raise FileStoreException(f"Unsupported {parsed.scheme} filestore options: {', '.join(sorted(unsupported))}")
+
+    if parsed.scheme == "s3":
+        from howler.filestore.transport.s3 import TransportS3
+
+        return TransportS3(
+            base=unquote(parsed.path),
+            host=parsed.hostname,
+            port=parsed.port,
+            accesskey=unquote(parsed.username) if parsed.username else None,
+            secretkey=unquote(parsed.password) if parsed.password else None,
+            aws_region=options.get("aws_region", None),
+            s3_bucket=options.get("s3_bucket", "howler-storage"),
+            use_ssl=_parse_bool(options.get("use_ssl", None), True),
+            verify=_parse_bool(options.get("verify", None), True),
+        )
+
+    from howler.filestore.transport.local import TransportLocal
+
+    return TransportLocal(base=unquote(parsed.path))
+
+
+class FileStore(object):
+    """Store files in one or more locations, from the nearest (i.e. fastest) to the farthest (i.e. long term storage).
+
+    Every operation can target the first location (near), the last location (far) or every location (all). Reads try
+    each targeted location in order, while writes and deletions apply to every targeted location.
+    """
+
+    def __init__(self, *transport_urls: str):
+        if not transport_urls:
+            raise FileStoreException("At least one storage location is required")
+
+        self.transports = [create_transport(url) for url in transport_urls]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __str__(self):
+        return ", ".join(str(transport) for transport in self.transports)
+
+    def _select(self, location: str) -> list[Transport]:
+        if location == "all":
+            return self.transports
+
+        if location == "near":
+            return self.transports[:1]
+
+        if location == "far":
+            return self.transports[-1:]
+
+        raise HowlerValueError(f"Invalid location {location}, must be one of {', '.join(LOCATIONS)}")
+
+    def close(self):
+        "Terminate the connection to every location"
+        for transport in self.transports:
+            try:
+                transport.close()
+            except Exception:
+                logger.exception("Failed to close %s", transport)
+
+    def delete(self, path: str, location: str = "all"):
+        "Delete the file at the given path from the selected locations"
+        for transport in self._select(location):
+            transport.delete(path)
+
+    def exists(self, path: str, location: str = "all") -> bool:
+        "Check if the file at the given path exists in any of the selected locations"
+        return any(transport.exists(path) for transport in self._select(location))
+
+    def read(self, path: str, location: str = "all") -> Iterator[bytes]:
+        """Stream the content of a file, chunk by chunk, from the first selected location that has it
+
+        Args:
+            path (str): The path of the file
+            location (str, optional): The locations to read the file from. Defaults to "all".
+
+        Raises:
+            FileStoreException: None of the selected locations have the file
+
+        Returns:
+            Iterator[bytes]: The content of the file
+        """
+        for transport in self._select(location):
+            chunks = transport.read(path)
+            try:
+                # Transports only notice the file is missing once the stream is started
+                first = next(chunks, b"")
+            except TransportException:
+                continue
+
+            return self._chain(first, chunks)
+
+        raise FileStoreException(f"{path} does not exist in {self}")
+
+    @staticmethod
+    def _chain(first: bytes, chunks: Iterator[bytes]) -> Iterator[bytes]:
+        if first:
+            yield first
+
+        yield from chunks
+
+    def get(self, path: str, location: str = "all") -> Optional[bytes]:
+        "Get the content of the file at the given path from the first selected location that has it, if any does"
+        try:
+            return b"".join(self.read(path, location))
+        except FileStoreException:
+            return None
+
+    def write(self, path: str, stream: IO[bytes], location: str = "all"):
+        """Write the content of a binary stream to a file in the selected locations, without holding it in memory
+
+        Args:
+            path (str): The path of the file
+            stream (IO[bytes]): The stream to read the content of the file from
+            location (str, optional): The locations to write the file to. Defaults to "all".
+        """
+        transports = self._select(location)
+        if len(transports) == 1:
+            transports[0].write(path, stream)
+            return
+
+        # The stream can only be read once, so it is buffered (on disk if it is large) to write it to every location
+        with tempfile.SpooledTemporaryFile(max_size=CHUNK_SIZE) as buffer:
+            copy_stream(stream, buffer)
+            for transport in transports:
+                buffer.seek(0)
+                transport.write(path, buffer)
+
+    def put(self, path: str, content: Union[str, bytes], location: str = "all"):
+        "Put the content at the given path in the selected locations"
+        for transport in self._select(location):
+            transport.put(path, content)
+
+    def download(self, path: str, dest_path: str, location: str = "all"):
+        "Download the file at the given path to a local file, from the first selected location that has it"
+        for transport in self._select(location):
+            if transport.exists(path):
+                transport.download(path, dest_path)
+                return
+
+        raise FileStoreException(f"{path} does not exist in {self}")
+
+    def upload(self, src_path: str, dest_path: str, location: str = "all"):
+        "Upload a local file to the given path in the selected locations"
+        for transport in self._select(location):
+            transport.upload(src_path, dest_path)
+
+    def upload_batch(
+        self, local_remote_tuples: Iterable[tuple[str, str]], location: str = "all"
+    ) -> list[tuple[str, str, str]]:
+        """Upload multiple local files to the selected locations
+
+        Args:
+            local_remote_tuples (Iterable[tuple[str, str]]): The local path and destination path of each file
+            location (str, optional): The locations to upload the files to. Defaults to "all".
+
+        Returns:
+            list[tuple[str, str, str]]: The local path, destination path and error of each file that failed to upload
+        """
+        local_remote_tuples = list(local_remote_tuples)
+
+        failed_tuples = []
+        for transport in self._select(location):
+            failed_tuples.extend(transport.upload_batch(local_remote_tuples))
+
+        return failed_tuples
+
+    def promote(self, path: str) -> bool:
+        """Copy a file to the nearest location, if it is only stored in farther ones
+
+        Args:
+            path (str): The path of the file
+
+        Returns:
+            bool: Whether the file is now stored in the nearest location
+        """
+        near = self.transports[0]
+        if near.exists(path):
+            return True
+
+        for transport in self.transports[1:]:
+            if transport.exists(path):
+                transport.copy(path, near)
+                return True
+
+        return False
+
+    def demote(self, path: str) -> bool:
+        """Move a file to the farthest location (e.g. long term storage), removing it from nearer ones
+
+        Args:
+            path (str): The path of the file
+
+        Returns:
+            bool: Whether the file is now stored in the farthest location
+        """
+        far = self.transports[-1]
+        if not far.exists(path):
+            source = next((transport for transport in self.transports[:-1] if transport.exists(path)), None)
+            if source is None:
+                return False
+
+            source.copy(path, far)
+
+        for transport in self.transports[:-1]:
+            transport.delete(path)
+
+        return True
@@ -0,0 +1,124 @@
+import io
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from typing import IO, Iterable, Iterator, Union
+
+from howler.common.exceptions import HowlerException
+
+# The size of the chunks files are read and written in when streamed
+CHUNK_SIZE = 1024 * 1024
+
+
+class TransportException(HowlerException):
+    """Exception thrown when a transport fails to perform a file operation"""
+
+
+class Transport(ABC):
+    """Base class of the storage backends of the filestore.
+
+    Paths are relative to the base location of the transport, and always use forward slashes.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        "Release the resources held by the transport"
+
+    @abstractmethod
+    def delete(self, path: str):
+        "Delete the file at the given path, if it exists"
+        raise NotImplementedError()
+
+    @abstractmethod
+    def exists(self, path: str) -> bool:
+        "Check if there is a file at the given path"
+        raise NotImplementedError()
+
+    @abstractmethod
+    def read(self, path: str) -> Iterator[bytes]:
+        """Stream the content of a file, chunk by chunk
+
+        Args:
+            path (str): The path of the file
+
+        Raises:
+            TransportException: The file does not exist
+
+        Yields:
+            bytes: The content of the file, in chunks of at most CHUNK_SIZE bytes
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    def write(self, path: str, stream: IO[bytes]):
+        """Write the content of a binary stream to a file, without holding it in memory
+
+        Args:
+            path (str): The path of the file
+            stream (IO[bytes]): The stream to read the content of the file from
+        """
+        raise NotImplementedError()
+
+    def get(self, path: str) -> bytes:
+        "Get the content of the file at the given path"
+        return b"".join(self.read(path))
+
+    def put(self, path: str, content: Union[str, bytes]):
+        "Put the given content in the file at the given path"
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+
+        self.write(path, io.BytesIO(content))
+
+    def download(self, src_path: str, dest_path: str):
+        "Download the file at the given path to a local file"
+        dest_dir = os.path.dirname(dest_path)
+        if dest_dir:
+            os.makedirs(dest_dir, exist_ok=True)
+
+        with open(dest_path, "wb") as dest:
+            for chunk in self.read(src_path):
+                dest.write(chunk)
+
+    def upload(self, src_path: str, dest_path: str):
+        "Upload a local file to the given path"
+        with open(src_path, "rb") as src:
+            self.write(dest_path, src)
+
+    def upload_batch(self, local_remote_tuples: Iterable[tuple[str, str]]) -> list[tuple[str, str, str]]:
+        """Upload multiple local files
+
+        Args:
+            local_remote_tuples (Iterable[tuple[str, str]]): The local path and destination path of each file
+
+        Returns:
+            list[tuple[str, str, str]]: The local path, destination path and error of each file that failed to upload
+        """
+        failed_tuples = []
+        for src_path, dest_path in local_remote_tuples:
+            try:
+                self.upload(src_path, dest_path)
+            except Exception as e:
+                failed_tuples.append((src_path, dest_path, str(e)))
+
+        return failed_tuples
+
+    def copy(self, path: str, other: "Transport"):
+        "Stream the file at the given path to the same path on another transport"
+        with tempfile.SpooledTemporaryFile(max_size=CHUNK_SIZE) as buffer:
+            for chunk in self.read(path):
+                buffer.write(chunk)
+
+            buffer.seek(0)
+            other.write(path, buffer)
+
+
+def copy_stream(src: IO[bytes], dest: IO[bytes]):
+    "Copy a binary stream to another, chunk by chunk"
+    shutil.copyfileobj(src, dest, CHUNK_SIZE)
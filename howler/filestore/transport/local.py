@@ -0,0 +1,65 @@
+import os
+import tempfile
+from typing import IO, Iterator, Optional
+
+from howler.common.logging import get_logger
+from howler.filestore.transport.base import CHUNK_SIZE, Transport, TransportException, copy_stream
+
+logger = get_logger(__file__)
+
+
+class TransportLocal(Transport):
+    "Store files in a folder of the local filesystem (or of a mounted volume)"
+
+    def __init__(self, base: Optional[str] = None):
+        self.base = os.path.abspath(base or "/")
+        os.makedirs(self.base, exist_ok=True)
+
+    def __str__(self):
+        return f"file://{self.base}"
+
+    def normalize(self, path: str) -> str:
+        "Get the absolute path of a file, making sure it is inside the base folder"
+        normalized = os.path.normpath(os.path.join(self.base, path.lstrip("/")))
+        if normalized != self.base and not normalized.startswith(self.base.rstrip("/") + "/"):
+            raise TransportException(f"{path} is outside of {self.base}")
+
+        return normalized
+
+    def delete(self, path: str):
+        "Delete the file at the given path, if it exists"
+        try:
+            os.unlink(self.normalize(path))
+        except FileNotFoundError:
+            pass
+
+    def exists(self, path: str) -> bool:
+        "Check if there is a file at the given path"
+        return os.path.isfile(self.normalize(path))
+
+    def read(self, path: str) -> Iterator[bytes]:
+        "Stream the content of a file, chunk by chunk"
+        try:
+            file = open(self.normalize(path), "rb")
+        except FileNotFoundError as e:
+            raise TransportException(f"{path} does not exist in {self}", cause=e) from e
+
+        with file:
+            while chunk := file.read(CHUNK_SIZE):
+                yield chunk
+
+    def write(self, path: str, stream: IO[bytes]):
+        "Write the content of a binary stream to a file"
+        final_path = self.normalize(path)
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+
+        # Write to a temporary file first, so that readers never see a partially written file
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(final_path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as temp:
+                copy_stream(stream, temp)
+
+            os.replace(temp_path, final_path)
+        except Exception:
+            os.unlink(temp_path)
+            raise
@@ -0,0 +1,106 @@
+from typing import IO, Any, Iterator, Optional
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from howler.common.logging import get_logger
+from howler.filestore.transport.base import CHUNK_SIZE, Transport, TransportException
+
+logger = get_logger(__file__)
+
+# The error codes S3 (and S3 compatible storage) respond with when an object or bucket does not exist
+NOT_FOUND_CODES = {"404", "NoSuchKey", "NoSuchBucket", "NotFound"}
+
+
+class TransportS3(Transport):
+    "Store files in a bucket of Amazon S3, or of any S3 compatible storage (e.g. Minio)"
+
+    DEFAULT_HOST = "s3.amazonaws.com"
+
+    def __init__(
+        self,
+        base: Optional[str] = None,
+        accesskey: Optional[str] = None,
+        secretkey: Optional[str] = None,
+        aws_region: Optional[str] = None,
+        s3_bucket: str = "howler-storage",
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        use_ssl: bool = True,
+        verify: bool = True,
+        client: Optional[Any] = None,
+    ):
+        self.base = (base or "").strip("/")
+        self.bucket = s3_bucket
+        self.host = host or self.DEFAULT_HOST
+
+        if client is None:
+            scheme = "https" if use_ssl else "http"
+            client = boto3.client(
+                "s3",
+                aws_access_key_id=accesskey,
+                aws_secret_access_key=secretkey,
+                region_name=aws_region,
+                endpoint_url=f"{scheme}://{self.host}:{port}" if port else f"{scheme}://{self.host}",
+                verify=verify,
+                config=Config(retries={"max_attempts": 3, "mode": "standard"}),
+            )
+
+        self.client = client
+
+        try:
+            self.client.head_bucket(Bucket=self.bucket)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in NOT_FOUND_CODES:
+                raise TransportException(f"Could not access bucket {self.bucket}", cause=e) from e
+
+            logger.info("Creating bucket %s", self.bucket)
+            self.client.create_bucket(Bucket=self.bucket)
+
+    def __str__(self):
+        return f"s3://{self.host}/{self.bucket}/{self.base}".rstrip("/")
+
+    def close(self):
+        "Release the connections to the S3 endpoint"
+        self.client.close()
+
+    def normalize(self, path: str) -> str:
+        "Get the key of the object storing the file at the given path"
+        path = path.strip("/")
+        return f"{self.base}/{path}" if self.base else path
+
+    def delete(self, path: str):
+        "Delete the file at the given path, if it exists"
+        self.client.delete_object(Bucket=self.bucket, Key=self.normalize(path))
+
+    def exists(self, path: str) -> bool:
+        "Check if there is a file at the given path"
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.normalize(path))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in NOT_FOUND_CODES:
+                return False
+
+            raise
+
+        return True
+
+    def read(self, path: str) -> Iterator[bytes]:
+        "Stream the content of a file, chunk by chunk"
+        try:
+            body = self.client.get_object(Bucket=self.bucket, Key=self.normalize(path))["Body"]
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in NOT_FOUND_CODES:
+                raise TransportException(f"{path} does not exist in {self}", cause=e) from e
+
+            raise
+
+        try:
+            yield from body.iter_chunks(CHUNK_SIZE)
+        finally:
+            body.close()
+
+    def write(self, path: str, stream: IO[bytes]):
+        "Write the content of a binary stream to a file, in multiple parts if it is large"
+        self.client.upload_fileobj(stream, self.bucket, self.normalize(path))
@@ -0,0 +1,130 @@
+import zlib
+from typing import Optional
+
+from flask import Response, request
+from prometheus_client import Counter
+
+from howler.common.instrumentation import timed
+from howler.common.loader import APP_NAME
+from howler.config import config
+
+# The content codings responses can be compressed with, and the matching zlib window bits
+ENCODINGS = {"gzip": 31, "deflate": 15}
+
+# Compressing anything else (images, archives, etc.) is a waste of CPU, as it is usually compressed already
+COMPRESSIBLE_MIMETYPES = [
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+]
+
+COMPRESSED_RESPONSES = Counter(
+    f"{APP_NAME.replace('-', '_')}_http_compressed_responses_total",
+    "The number of compressed HTTP responses, broken down by path and content coding",
+    ["path", "encoding"],
+)
+COMPRESSION_INPUT_BYTES = Counter(
+    f"{APP_NAME.replace('-', '_')}_http_compression_input_bytes_total",
+    "The size of HTTP responses before compression, broken down by path",
+    ["path"],
+)
+COMPRESSION_OUTPUT_BYTES = Counter(
+    f"{APP_NAME.replace('-', '_')}_http_compression_output_bytes_total",
+    "The size of HTTP responses after compression, broken down by path",
+    ["path"],
+)
+
+
+def negotiate_encoding() -> Optional[str]:
+    """Pick the content coding to compress the response to the current request with, based on its Accept-Encoding
+
+    Returns:
+        Optional[str]: The content coding, or None if the response should not be compressed
+    """
+    if not config.ui.compression.enabled:
+        return None
+
+    return request.accept_encodings.best_match(list(ENCODINGS.keys()))
+
+
+def _is_compressible(mimetype: Optional[str]) -> bool:
+    return mimetype is not None and (mimetype.startswith("text/") or mimetype in COMPRESSIBLE_MIMETYPES)
+
+
+class StreamCompressor(object):
+    """Compress a streamed response chunk by chunk.
+
+    Every chunk is flushed as soon as it is compressed, so that the client can process it without waiting for the next.
+    """
+
+    def __init__(self, encoding: str, path: str, level: Optional[int] = None):
+        self.encoding = encoding
+        self.path = path
+        self.compressor = zlib.compressobj(
+            level if level is not None else config.ui.compression.stream_level, zlib.DEFLATED, ENCODINGS[encoding]
+        )
+
+        COMPRESSED_RESPONSES.labels(path, encoding).inc()
+
+    def _record(self, size: int, compressed_size: int):
+        COMPRESSION_INPUT_BYTES.labels(self.path).inc(size)
+        COMPRESSION_OUTPUT_BYTES.labels(self.path).inc(compressed_size)
+
+    def compress(self, data: bytes) -> bytes:
+        "Compress a chunk of the response"
+        compressed = self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        self._record(len(data), len(compressed))
+        return compressed
+
+    def flush(self) -> bytes:
+        "Finish the compressed stream"
+        compressed = self.compressor.flush()
+        self._record(0, len(compressed))
+        return compressed
+
+
+def compress_response(response: Response) -> Response:
+    """Compress a response if the client accepts it and it is large enough to be worth it.
+
+    Streamed responses are left as is: they are compressed as they are generated instead (see StreamCompressor).
+    """
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or not _is_compressible(response.mimetype)
+        or response.status_code in (204, 206, 304)
+        or response.status_code < 200
+    ):
+        return response
+
+    # The response depends on the Accept-Encoding header, whether it ends up compressed or not
+    response.vary.add("Accept-Encoding")
+
+    size = response.content_length or 0
+    if size < config.ui.compression.min_size:
+        return response
+
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+
+    with timed("compression"):
+        compressor = zlib.compressobj(config.ui.compression.level, zlib.DEFLATED, ENCODINGS[encoding])
+        compressed = compressor.compress(response.get_data()) + compressor.flush()
+
+    # Incompressible data can grow slightly once compressed
+    if len(compressed) >= size:
+        return response
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+
+    path = str(request.url_rule)
+    COMPRESSED_RESPONSES.labels(path, encoding).inc()
+    COMPRESSION_INPUT_BYTES.labels(path).inc(size)
+    COMPRESSION_OUTPUT_BYTES.labels(path).inc(len(compressed))
+
+    return response
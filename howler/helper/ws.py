@@ -1,6 +1,7 @@
 # Taken from https://pypi.org/project/simple-websocket/
 
 import selectors
+import zlib
 from time import time
 
 from wsproto import ConnectionType, WSConnection
@@ -15,7 +16,7 @@ from wsproto.events import (
     TextMessage,
 )
 from wsproto.extensions import PerMessageDeflate
-from wsproto.frame_protocol import CloseReason
+from wsproto.frame_protocol import CloseReason, Opcode
 from wsproto.utilities import LocalProtocolError
 
 
@@ -36,6 +37,39 @@ class ConnectionClosed(RuntimeError):
         super().__init__(f'Connection closed: {reason} {message or ""}')
 
 
+class Deflate(PerMessageDeflate):
+    """Per-message deflate, with a tunable compression level and window size.
+
+    Messages smaller than the threshold are sent uncompressed, as compression is decided message by message. The
+    window can be made smaller than the negotiated one, which the other end can always decompress, to reduce the memory
+    kept for each connection.
+    """
+
+    def __init__(self, level=zlib.Z_DEFAULT_COMPRESSION, threshold=0, window_bits=15):
+        super().__init__()
+        self.level = level
+        self.threshold = threshold
+        self.window_bits = window_bits
+        self._uncompressed = False
+
+    def frame_outbound(self, proto, opcode, rsv, data, fin):
+        if not self._compressible_opcode(opcode):
+            return (rsv, data)
+
+        if opcode is not Opcode.CONTINUATION:
+            self._uncompressed = fin and len(data) < self.threshold
+
+        if self._uncompressed:
+            return (rsv, data)
+
+        if self._compressor is None:
+            bits = min(self.client_max_window_bits if proto.client else self.server_max_window_bits, self.window_bits)
+            # zlib recommends scaling the internal compression state along with the window
+            self._compressor = zlib.compressobj(self.level, zlib.DEFLATED, -bits, max(1, min(9, bits - 7)))
+
+        return super().frame_outbound(proto, opcode, rsv, data, fin)
+
+
 class Base:
     def __init__(
         self,
@@ -47,6 +81,9 @@ class Base:
         thread_class=None,
         event_class=None,
         selector_class=None,
+        compression_level=zlib.Z_DEFAULT_COMPRESSION,
+        compression_threshold=0,
+        compression_window_bits=15,
     ):
         #: The name of the subprotocol chosen for the WebSocket connection.
         self.subprotocol = None
@@ -55,6 +92,9 @@ class Base:
         self.receive_bytes = receive_bytes
         self.ping_interval = ping_interval
         self.max_message_size = max_message_size
+        self.compression_level = compression_level
+        self.compression_threshold = compression_threshold
+        self.compression_window_bits = compression_window_bits
         self.pong_received = True
         self.input_buffer = []
         self.incoming_message = None
@@ -196,7 +236,13 @@ class Base:
                     out_data += self.ws.send(
                         AcceptConnection(
                             subprotocol=self.subprotocol,
-                            extensions=[PerMessageDeflate()],
+                            extensions=[
+                                Deflate(
+                                    level=self.compression_level,
+                                    threshold=self.compression_threshold,
+                                    window_bits=self.compression_window_bits,
+                                )
+                            ],
                         )
                     )
                 elif isinstance(event, CloseConnection):
@@ -298,6 +344,11 @@ class Server(Base):
                            selectors. The default is the
                            ``selectors.DefaultSelector`` class from the Python
                            standard library.
+    :param compression_level: The zlib compression level of outgoing messages.
+    :param compression_threshold: The size in bytes under which outgoing
+                                  messages are sent uncompressed.
+    :param compression_window_bits: The maximum base two logarithm of the
+                                    compression window of outgoing messages.
     """
 
     def __init__(
@@ -310,6 +361,9 @@ class Server(Base):
         thread_class=None,
         event_class=None,
         selector_class=None,
+        compression_level=zlib.Z_DEFAULT_COMPRESSION,
+        compression_threshold=0,
+        compression_window_bits=15,
     ):
         self.environ = environ
         self.subprotocols = subprotocols or []
@@ -348,6 +402,9 @@ class Server(Base):
             thread_class=thread_class,
             event_class=event_class,
             selector_class=selector_class,
+            compression_level=compression_level,
+            compression_threshold=compression_threshold,
+            compression_window_bits=compression_window_bits,
         )
 
     def handshake(self):
@@ -12,6 +12,7 @@ independent data models in python. This gives us:
 from __future__ import annotations
 
 import copy
+import functools
 import json
 import re
 import typing
@@ -26,6 +27,7 @@ from venv import logger
 import arrow
 import validators
 from dateutil.tz import tzutc
+from prometheus_client import Gauge
 
 from howler.common import loader
 from howler.common.exceptions import (
@@ -34,6 +36,7 @@ from howler.common.exceptions import (
     HowlerTypeError,
     HowlerValueError,
 )
+from howler.common.instrumentation import instrumented
 from howler.common.net import is_valid_domain, is_valid_ip
 from howler.utils.dict_utils import flatten, recursive_update
 from howler.utils.isotime import now_as_iso
@@ -87,6 +90,10 @@ FULL_URI = f"^((?:(?:[A-Za-z]*:)?//)?(?:\\S+(?::\\S*)?@)?({IP_REGEX}|{DOMAIN_REG
 PLATFORM_REGEX = r"^(Windows|Linux|MacOS|Android|iOS)$"
 PROCESSOR_REGEX = r"^x(64|86)$"
 
+IP_ONLY_VALIDATOR = re.compile(IP_ONLY_REGEX)
+EMAIL_VALIDATOR = re.compile(EMAIL_REGEX)
+FULL_URI_VALIDATOR = re.compile(FULL_URI)
+
 
 def flat_to_nested(data: dict[str, _Any]) -> dict[str, _Any]:
     sub_data: dict[str, _Any] = {}
@@ -108,6 +115,110 @@ def flat_to_nested(data: dict[str, _Any]) -> dict[str, _Any]:
     return sub_data
 
 
+# Validation results of the field types checking values against the validators library, regexes or the TLD list are
+# memoized in a bounded LRU cache per field type, as the same domains, IPs and emails are seen over and over again.
+# Validators return the normalized value, or the message and cause of the validation error to raise.
+VALIDATION_CACHE_SIZE = 10000
+VALIDATION_CACHE = Gauge(
+    f"{loader.APP_NAME.replace('-', '_')}_odm_validation_cache",
+    "The number of hits, misses and entries of the memoized ODM field validators",
+    ["field", "stat"],
+)
+
+_validators: dict[str, typing.Callable] = {}
+_validation_caches: dict[str, typing.Callable] = {}
+
+
+def memoized_validator(field_type: str) -> typing.Callable:
+    "Memoize a validator in the LRU cache of the given field type"
+
+    def decorator(func: typing.Callable) -> typing.Callable:
+        _validators[field_type] = func
+        _validation_caches[field_type] = functools.lru_cache(maxsize=VALIDATION_CACHE_SIZE)(func)
+
+        for stat in ["hits", "misses", "currsize"]:
+            VALIDATION_CACHE.labels(field_type, stat).set_function(
+                lambda stat=stat: getattr(_validation_caches[field_type].cache_info(), stat)
+            )
+
+        @functools.wraps(func)
+        def validate(*args):
+            try:
+                return _validation_caches[field_type](*args)
+            except TypeError:
+                # Unhashable values can't be memoized
+                return func(*args)
+
+        return validate
+
+    return decorator
+
+
+def configure_validation_cache(size: int):
+    """Resize the LRU caches of the memoized field validators, clearing them.
+
+    Args:
+        size (int): The number of results to keep per field type. 0 disables memoization.
+    """
+    global VALIDATION_CACHE_SIZE
+
+    VALIDATION_CACHE_SIZE = size
+    for field_type, func in _validators.items():
+        _validation_caches[field_type] = functools.lru_cache(maxsize=size)(func)
+
+
+def validation_cache_info() -> dict[str, _Any]:
+    "Get the statistics of the LRU cache of each memoized field validator"
+    return {field_type: cache.cache_info() for field_type, cache in _validation_caches.items()}
+
+
+@memoized_validator("ip")
+def _validate_ip(value: str) -> tuple[str | None, str | None]:
+    if not IP_ONLY_VALIDATOR.match(value):
+        return None, f"'{value}' not match the validator: {IP_ONLY_REGEX}"
+
+    return value, None
+
+
+@memoized_validator("domain")
+def _validate_domain(value: str, strict: bool) -> tuple[str | None, Exception | None]:
+    domain_result = validators.domain(value)
+    # We'll only fail if strict mode is enabled - otherwise, we'll check hostname validation as well
+    if isinstance(domain_result, Exception) and strict:
+        return None, domain_result
+
+    hostname_result = validators.hostname(value)
+    if isinstance(hostname_result, Exception):
+        return None, hostname_result
+
+    return value.lower(), None
+
+
+@memoized_validator("email")
+def _validate_email(value: str) -> tuple[str | None, str | None, Exception | None]:
+    validation_result = validators.email(value)
+    if isinstance(validation_result, Exception):
+        return None, f"'{value}' did not pass validation.", validation_result
+
+    match = EMAIL_VALIDATOR.match(value)
+    if not is_valid_domain(match.group(1)):
+        return None, f"'{match.group(1)}' in email '{value}' is not a valid Domain.", None
+
+    return value.lower(), None, None
+
+
+@memoized_validator("uri")
+def _validate_uri(value: str) -> tuple[str | None, str | None]:
+    match = FULL_URI_VALIDATOR.match(value)
+    if not match:
+        return None, f"'{value}' not match the validator: {FULL_URI}"
+
+    if not is_valid_domain(match.group(2)) and not is_valid_ip(match.group(2)):
+        return None, f"'{match.group(2)}' in URI '{value}' is not a valid Domain or IP."
+
+    return match.group(0).replace(match.group(1), match.group(1).lower()), None
+
+
 class KeyMaskException(HowlerKeyError):
     pass
 
@@ -415,11 +526,9 @@ class IP(Keyword):
         if not value:
             return None
 
-        if not self.validation_regex.match(value):
-            raise HowlerValueError(
-                f"[{'.'.join(context) or self.name}]: '{value}' not match the "
-                f"validator: {self.validation_regex.pattern}"
-            )
+        value, error = _validate_ip(value)
+        if error:
+            raise HowlerValueError(f"[{'.'.join(context) or self.name}]: {error}")
 
         return value
 
@@ -433,20 +542,11 @@ class Domain(Keyword):
         if not value:
             return None
 
-        domain_result = validators.domain(value)
-        # We'll only raise the exception if strict mode is enabled - otherwise, we'll check hostname validation as well
-        if isinstance(domain_result, Exception) and self.strict:
-            raise HowlerValueError(
-                f"[{'.'.join(context) or self.name}] '{value}' did not pass validation."
-            ) from domain_result
-
-        hostname_result = validators.hostname(value)
-        if isinstance(hostname_result, Exception):
-            raise HowlerValueError(
-                f"[{'.'.join(context) or self.name}] '{value}' did not pass validation."
-            ) from hostname_result
+        result, error = _validate_domain(value, self.strict)
+        if error is not None:
+            raise HowlerValueError(f"[{'.'.join(context) or self.name}] '{value}' did not pass validation.") from error
 
-        return value.lower()
+        return result
 
 
 class Email(Keyword):
@@ -458,19 +558,11 @@ class Email(Keyword):
         if not value:
             return None
 
-        validation_result = validators.email(value)
-        if isinstance(validation_result, Exception):
-            raise HowlerValueError(
-                f"[{'.'.join(context) or self.name}] '{value}' did not pass validation."
-            ) from validation_result
-
-        match = self.validation_regex.match(value)
-        if not is_valid_domain(match.group(1)):
-            raise HowlerValueError(
-                f"[{'.'.join(context) or self.name}] '{match.group(1)}' in email '{value}'" " is not a valid Domain."
-            )
+        result, error, cause = _validate_email(value)
+        if error:
+            raise HowlerValueError(f"[{'.'.join(context) or self.name}] {error}") from cause
 
-        return value.lower()
+        return result
 
 
 class URI(Keyword):
@@ -482,20 +574,11 @@ class URI(Keyword):
         if not value:
             return None
 
-        match = self.validation_regex.match(value)
-        if not match:
-            raise HowlerValueError(
-                f"[{'.'.join(context) or self.name}] '{value}' not match the "
-                f"validator: {self.validation_regex.pattern}"
-            )
-
-        if not is_valid_domain(match.group(2)) and not is_valid_ip(match.group(2)):
-            raise HowlerValueError(
-                f"[{'.'.join(context) or self.name}] '{match.group(2)}' in URI '{value}'"
-                " is not a valid Domain or IP."
-            )
+        result, error = _validate_uri(value)
+        if error:
+            raise HowlerValueError(f"[{'.'.join(context) or self.name}] {error}")
 
-        return match.group(0).replace(match.group(1), match.group(1).lower())
+        return result
 
 
 class URIPath(ValidatedKeyword):
@@ -983,6 +1066,7 @@ class Compound(_Field):
         ignore_extra_values=False,
         extra_fields={},
         context=[],
+        trusted=False,
         **kwargs,
     ):
         if self.optional and value is None:
@@ -997,6 +1081,7 @@ class Compound(_Field):
             ignore_extra_values=ignore_extra_values,
             extra_fields=extra_fields,
             context=context,
+            trusted=trusted,
         )
 
     def fields(self):
@@ -1035,6 +1120,201 @@ class Optional(_Field):
         self.child_type.apply_defaults(self.index, self.store)
 
 
+def _check_field(
+    name: str, field_type: _Field, data: dict, context: list[str], mask_map: dict, extra_fields: dict, **params
+):
+    "Validate the value of a field of a model, from the data the model is built with"
+    if name in mask_map and mask_map[name]:
+        params["mask"] = mask_map[name]
+    if name in extra_fields and extra_fields[name]:
+        params["extra_fields"] = extra_fields[name]
+
+    try:
+        value = data[name]
+    except KeyError:
+        if field_type.default_set:
+            value = copy.copy(field_type.default)
+        elif not field_type.optional:
+            raise HowlerValueError(f"[{'.'.join([*context, name])}]: value is missing from the object!")
+        else:
+            value = None
+
+    return field_type.check(value, context=[*context, name], **params)
+
+
+def _copy_primitive(value: _Any) -> _Any:
+    "Copy data decoded from JSON, much faster than copy.deepcopy can"
+    if isinstance(value, dict):
+        return {key: _copy_primitive(child) for key, child in value.items()}
+
+    if isinstance(value, list):
+        return [_copy_primitive(child) for child in value]
+
+    return value
+
+
+# Returned by _conform_primitive when the value has to be validated (and serialized back) to get its primitive form
+_VALIDATE = object()
+
+
+# The kinds of fields _conform_primitive handles differently
+_LEAF, _COMPOUND, _LIST, _MAPPING = range(4)
+
+_CONFORM_PLANS: dict[type, tuple[dict[str, tuple[int, _Field]], list[str]]] = {}
+
+
+def _conform_kind(field_type: _Field) -> tuple[int, _Field]:
+    while isinstance(field_type, Optional):
+        field_type = field_type.child_type
+
+    if isinstance(field_type, Compound):
+        return _COMPOUND, field_type
+
+    if isinstance(field_type, List):
+        return _LIST, field_type
+
+    if isinstance(field_type, Mapping):
+        return _MAPPING, field_type
+
+    return _LEAF, field_type
+
+
+def _conform_plan(model: type["Model"]) -> tuple[dict[str, tuple[int, _Field]], list[str]]:
+    "The fields of a model, and the fields validation would fill in (or complain about) when they are missing"
+    try:
+        return _CONFORM_PLANS[model]
+    except KeyError:
+        pass
+
+    fields = model.fields()
+    filled_in = [
+        name
+        for name, field_type in fields.items()
+        if (field_type.default_set and field_type.default is not None)
+        or (not field_type.default_set and not field_type.optional and not isinstance(field_type, Optional))
+    ]
+
+    plan = ({name: _conform_kind(field_type) for name, field_type in fields.items()}, filled_in)
+    _CONFORM_PLANS[model] = plan
+    return plan
+
+
+def _conform_primitive(kind: int, field_type: _Field, value: _Any) -> _Any:
+    """Copy the trusted data of a field to the primitive form its validated value would have, without validating it.
+
+    Fields removed from the model since the data was written are left out. Anything that validating would change, such
+    as the default of a field added since, is not handled here: _VALIDATE is returned instead.
+    """
+    # Null values are never written to the datastore, so how they serialize is left to validation
+    if value is None:
+        return _VALIDATE
+
+    if kind == _LEAF:
+        return _copy_primitive(value)
+
+    if kind == _COMPOUND:
+        if not isinstance(value, dict):
+            return _VALIDATE
+
+        sub_fields, filled_in = _conform_plan(field_type.child_type)
+        for name in filled_in:
+            if name not in value:
+                return _VALIDATE
+
+        out = {}
+        for name, sub_value in value.items():
+            sub_field = sub_fields.get(name, None)
+            if sub_field is None:
+                continue
+
+            sub_value = _conform_primitive(sub_field[0], sub_field[1], sub_value)
+            if sub_value is _VALIDATE:
+                return _VALIDATE
+
+            out[name] = sub_value
+
+        return out
+
+    child_kind, child_type = _conform_kind(field_type.child_type)
+    if kind == _LIST:
+        if not isinstance(value, list):
+            return _VALIDATE
+
+        children = enumerate(value)
+        out_children: _Any = [None] * len(value)
+    else:
+        if not isinstance(value, dict):
+            return _VALIDATE
+
+        children = value.items()
+        out_children = {}
+
+    for key, child in children:
+        child = _conform_primitive(child_kind, child_type, child)
+        if child is _VALIDATE:
+            return _VALIDATE
+
+        out_children[key] = child
+
+    return out_children
+
+
+class _LazyValues(dict):
+    """The values of a model built from trusted data, such as documents read back from the datastore.
+
+    Each field is only validated the first time it is read, and fields that are never read are serialized back as is.
+    """
+
+    __slots__ = ("fields", "data", "context", "mask_map", "extra_fields", "params")
+
+    def __init__(
+        self,
+        fields: dict[str, _Field],
+        data: dict,
+        context: list[str],
+        mask_map: dict,
+        extra_fields: dict,
+        ignore_extra_values: bool,
+    ):
+        super().__init__()
+        self.fields = {name.rstrip("_"): (name, field_type) for name, field_type in fields.items()}
+        self.data = data
+        self.context = context
+        self.mask_map = mask_map
+        self.extra_fields = extra_fields
+        self.params = {"ignore_extra_values": ignore_extra_values, "trusted": True}
+
+    def __missing__(self, key: str):
+        if key not in self.fields:
+            raise KeyError(key)
+
+        name, field_type = self.fields[key]
+        value = _check_field(name, field_type, self.data, self.context, self.mask_map, self.extra_fields, **self.params)
+        self[key] = value
+
+        return value
+
+    def keys_in_order(self) -> list[str]:
+        "The keys of every value, validated or not, in the order an eagerly validated model would have them"
+        return [*self.fields.keys(), *(key for key in self.keys() if key not in self.fields)]
+
+    def primitive(self, key: str) -> _Any:
+        """A copy of the raw value of a field that was not validated yet, in the form validating it would give.
+
+        Returns _VALIDATE if it has to be validated first, e.g. if it lacks the default of a field added since.
+        """
+        name, field_type = self.fields[key]
+        if self.mask_map.get(name) or self.extra_fields.get(name) or name not in self.data:
+            return _VALIDATE
+
+        return _conform_primitive(*_conform_kind(field_type), self.data[name])
+
+    def validate(self):
+        "Validate every field that was not read yet"
+        for key in self.fields.keys():
+            self[key]
+
+
 class Model:
     @classmethod
     def fields(cls, skip_mappings=False) -> _Mapping[str, _Field]:
@@ -1233,6 +1513,7 @@ class Model:
     # Descriptions of the model should be class-accessible only for markdown()
     __description = None
 
+    @instrumented("odm")
     def __init__(
         self,
         data: dict = None,
@@ -1241,7 +1522,22 @@ class Model:
         ignore_extra_values=True,
         extra_fields={},
         context=[],
+        trusted=False,
     ):
+        """Build a model object, validating the given data.
+
+        Args:
+            data (dict, optional): The data of the object. Defaults to None.
+            mask (list, optional): The only fields to keep. Defaults to None.
+            docid (optional): The id of the datastore document the data comes from. Defaults to None.
+            ignore_extra_values (bool, optional): Whether to ignore fields the model does not have instead of raising.
+                Defaults to True.
+            extra_fields (dict, optional): Additional values to include in the object. Defaults to {}.
+            context (list, optional): The path to the object, for error messages. Defaults to [].
+            trusted (bool, optional): Whether the data was validated already (e.g. it was read from the datastore).
+                Trusted data is validated one field at a time, as fields are read, and fields that are never read are
+                serialized back as is. Call validate() to validate every field at once. Defaults to False.
+        """
         if len(context) == 0:
             context = [self.__class__.__name__.lower()]
 
@@ -1285,41 +1581,49 @@ class Model:
                 f"[{'.'.join(context)}]: object was created with invalid parameters: " f"{', '.join(self.unused_keys)}"
             )
 
-        # Pass each value through it's respective validator, and store it
-        for name, field_type in fields.items():
-            params = {"ignore_extra_values": ignore_extra_values}
-            if name in mask_map and mask_map[name]:
-                params["mask"] = mask_map[name]
-            if name in extra_fields and extra_fields[name]:
-                params["extra_fields"] = extra_fields[name]
-
-            try:
-                value = data[name]
-            except KeyError:
-                if field_type.default_set:
-                    value = copy.copy(field_type.default)
-                elif not field_type.optional:
-                    raise HowlerValueError(f"[{'.'.join([*context, name])}]: value is missing from the object!")
-                else:
-                    value = None
-
-            self._odm_py_obj[name.rstrip("_")] = field_type.check(value, context=[*context, name], **params)
-
-            value = None
+        if trusted:
+            # Values are validated when they are first read instead
+            self._odm_py_obj = _LazyValues(fields, data, context, mask_map, extra_fields, ignore_extra_values)
+        else:
+            # Pass each value through it's respective validator, and store it
+            for name, field_type in fields.items():
+                self._odm_py_obj[name.rstrip("_")] = _check_field(
+                    name, field_type, data, context, mask_map, extra_fields, ignore_extra_values=ignore_extra_values
+                )
 
         for key in extra_keys:
-            self._odm_py_obj[key.rstrip("_")] = Any().check(extra_fields[key], context=[*context, name])
+            self._odm_py_obj[key.rstrip("_")] = Any().check(extra_fields[key], context=[*context, key])
 
         # Since the layout of model objects should be fixed, don't allow any further
         # attribute assignment
         self.__frozen = True
 
+    @instrumented("serialization")
     def as_primitives(self, hidden_fields=False, strip_null=True) -> dict[str, typing.Any]:
         """Convert the object back into primitives that can be json serialized."""
         out = {}
 
+        values = self._odm_py_obj
+        if isinstance(values, _LazyValues):
+            # Objects are serialized with their hidden fields to be written back to the datastore, which must never be
+            # given fields that were not validated, at any depth
+            if hidden_fields:
+                self.validate()
+
+            keys = values.keys_in_order()
+        else:
+            keys = list(values.keys())
+
         fields = self.fields()
-        for key, value in self._odm_py_obj.items():
+        for key in keys:
+            if key not in values:
+                # Fields of trusted data that were never read are serialized back as is
+                raw_value = values.primitive(key)
+                if raw_value is not _VALIDATE:
+                    out[key] = raw_value
+                    continue
+
+            value = values[key]
             field_type = fields.get(key, Any)
             if value is not None or (value is None and field_type.default_set):
                 if strip_null and value is None:
@@ -1344,6 +1648,22 @@ class Model:
                     out[key] = value
         return out
 
+    def validate(self):
+        """Validate every field of the object that was not validated yet, including the fields of its sub-objects.
+
+        Only objects built from trusted data can have fields that were not validated yet.
+        """
+        if isinstance(self._odm_py_obj, _LazyValues):
+            self._odm_py_obj.validate()
+
+        for value in self._odm_py_obj.values():
+            if isinstance(value, Model):
+                value.validate()
+            elif isinstance(value, (TypedList, TypedMapping)):
+                for child in value.values() if isinstance(value, TypedMapping) else value:
+                    if isinstance(child, Model):
+                        child.validate()
+
     def json(self):
         return json.dumps(self.as_primitives())
 
@@ -1357,6 +1677,10 @@ class Model:
         elif not isinstance(other, self.__class__):
             return False
 
+        for obj in (self, other):
+            if isinstance(obj._odm_py_obj, _LazyValues):
+                obj._odm_py_obj.validate()
+
         if len(self._odm_py_obj) != len(other._odm_py_obj):
             return False
 
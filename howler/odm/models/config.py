@@ -96,11 +96,65 @@ class Host(odm.Model):
         return result
 
 
+@odm.model(index=False, store=False, description="A named set of fields to fetch from an index when searching it")
+class Projection(odm.Model):
+    include: list[str] = odm.List(
+        odm.Keyword(),
+        default=[],
+        description="Fields (or parents of fields) to fetch. Every stored field is fetched if empty.",
+    )
+    exclude: list[str] = odm.List(
+        odm.Keyword(),
+        default=[],
+        description="Fields (or parents of fields) not to fetch, usually because they are too large for list views",
+    )
+
+
+# Hit list views never render the log, comments or raw data of hits, which can be larger than the rest of the hit.
+# Clients fetch them on demand, along with the rest of the hit, when it is opened.
+DEFAULT_PROJECTIONS = {
+    "hit": {
+        "list": {"include": [], "exclude": ["howler.log", "howler.comment", "howler.data"]},
+        "detail": {"include": [], "exclude": []},
+        "export": {"include": [], "exclude": []},
+    }
+}
+
+
+@odm.model(index=False, store=False, description="In-memory cache of recently read hits")
+class HitCache(odm.Model):
+    enabled = odm.Boolean(default=False, description="Serve repeated reads of a hit from memory")
+    max_size = odm.Integer(default=2000, description="Maximum number of hits kept in memory by each instance")
+    ttl = odm.Integer(
+        default=60,
+        description="Maximum number of seconds a hit is kept in memory, bounding how stale a hit written by another "
+        "application, or updated by query through another instance, can be",
+    )
+
+
+DEFAULT_HIT_CACHE = {"enabled": False, "max_size": 2000, "ttl": 60}
+
+
 @odm.model(index=False, store=False, description="Datastore Configuration")
 class Datastore(odm.Model):
     hosts: list[Host] = odm.List(odm.Compound(Host), description="List of hosts used for the datastore")
     ilm = odm.Compound(ILM, default=DEFAULT_ILM, description="Index Lifecycle Management Policy")
     type = odm.Enum({"elasticsearch"}, description="Type of application used for the datastore")
+    trusted_reads = odm.Boolean(
+        default=False,
+        description=(
+            "Validate the fields of documents read from the datastore as they are accessed instead of upfront. Values "
+            "are then returned as stored, without normalizing dates or rejecting invalid enum values."
+        ),
+    )
+    projections: dict[str, dict[str, Projection]] = odm.Mapping(
+        odm.Mapping(odm.Compound(Projection)),
+        default=DEFAULT_PROJECTIONS,
+        description="Projection profiles of each index, selectable with the profile parameter when searching it",
+    )
+    hit_cache: HitCache = odm.Compound(
+        HitCache, default=DEFAULT_HIT_CACHE, description="In-memory cache of recently read hits"
+    )
 
 
 DEFAULT_DATASTORE = {
@@ -115,9 +169,45 @@ DEFAULT_DATASTORE = {
     ],
     "ilm": DEFAULT_ILM,
     "type": "elasticsearch",
+    "trusted_reads": False,
+    "projections": DEFAULT_PROJECTIONS,
+    "hit_cache": DEFAULT_HIT_CACHE,
 }
 
 
+@odm.model(index=False, store=False, description="Offloading of bulky documents to the filestore")
+class Offload(odm.Model):
+    hit_data = odm.Boolean(
+        default=False,
+        description="Store large howler.data entries of new hits in the filestore, referenced from the hit by hash",
+    )
+    avatars = odm.Boolean(
+        default=False,
+        description="Store user avatars in the filestore, referenced from the user_avatar index by hash",
+    )
+    min_size = odm.Integer(
+        default=16384,
+        description="Minimum length, in characters, of a howler.data entry for it to be stored in the filestore",
+    )
+
+
+DEFAULT_OFFLOAD = {"hit_data": False, "avatars": False, "min_size": 16384}
+
+
+@odm.model(index=False, store=False, description="Filestore Configuration")
+class Filestore(odm.Model):
+    storage: list[str] = odm.List(
+        odm.Keyword(),
+        description="URLs of the locations files are stored in, from the nearest (fastest) to the farthest (long term)",
+    )
+    offload: Offload = odm.Compound(
+        Offload, default=DEFAULT_OFFLOAD, description="Offloading of bulky documents to the filestore"
+    )
+
+
+DEFAULT_FILESTORE = {"storage": ["file:///var/lib/howler/filestore"], "offload": DEFAULT_OFFLOAD}
+
+
 @odm.model(
     index=False,
     store=False,
@@ -136,6 +226,16 @@ class Logging(odm.Model):
     syslog_port: int = odm.Integer(description="If `log_to_syslog: true`, provide port of the syslog server?")
     export_interval: int = odm.Integer(description="How often, in seconds, should counters log their values?")
     log_as_json: bool = odm.Boolean(description="Log in JSON format?")
+    audit_queue_size: int = odm.Integer(
+        default=10000,
+        description=(
+            "How many audit records can wait to be written before new records are dropped. Audit records are written "
+            "in the background, so that writing them doesn't slow down requests."
+        ),
+    )
+    audit_batch_size: int = odm.Integer(
+        default=500, description="The maximum number of audit records written to the audit logs at once"
+    )
 
 
 DEFAULT_LOGGING = {
@@ -148,6 +248,8 @@ DEFAULT_LOGGING = {
     "syslog_host": "localhost",
     "syslog_port": 514,
     "export_interval": 5,
+    "audit_queue_size": 10000,
+    "audit_batch_size": 500,
 }
 
 
@@ -315,6 +417,10 @@ class Auth(odm.Model):
         description="Unit of maximum duration for API keys",
         optional=True,
     )
+    apikey_cache_ttl: int = odm.Integer(
+        default=60,
+        description="How long, in seconds, a successful API key verification is cached for. 0 disables the cache.",
+    )
     internal: Internal = odm.Compound(
         Internal,
         default=DEFAULT_INTERNAL,
@@ -326,6 +432,7 @@ class Auth(odm.Model):
 DEFAULT_AUTH = {
     "allow_apikeys": True,
     "allow_extended_apikeys": True,
+    "apikey_cache_ttl": 60,
     "internal": DEFAULT_INTERNAL,
     "oauth": DEFAULT_OAUTH,
 }
@@ -390,15 +497,176 @@ DEFAULT_RETENTION = {
 }
 
 
+@odm.model(index=False, store=False, description="Hit Deduplication Configuration")
+class Deduplication(odm.Model):
+    enabled: bool = odm.Boolean(
+        default=False,
+        description=(
+            "Whether to suppress duplicate hits at ingestion. If enabled, hits sharing the howler.hash of a hit "
+            "created within the window are not created, the duplicates count of the original hit is incremented "
+            "instead."
+        ),
+    )
+    window: int = odm.Integer(
+        default=3600,
+        description="The number of seconds after the creation of a hit during which duplicates are suppressed",
+    )
+    local_cache_size: int = odm.Integer(
+        default=10000,
+        description="The number of hashes each API instance remembers locally to avoid querying redis",
+    )
+
+
+DEFAULT_DEDUPLICATION = {
+    "enabled": False,
+    "window": 3600,
+    "local_cache_size": 10000,
+}
+
+
+@odm.model(index=False, store=False, description="Cronjob Scheduling Configuration")
+class Scheduler(odm.Model):
+    heartbeat_interval: int = odm.Integer(
+        default=10,
+        description="The number of seconds between the heartbeats each scheduler instance sends to redis",
+    )
+    member_timeout: int = odm.Integer(
+        default=30,
+        description=(
+            "The number of seconds without a heartbeat after which a scheduler instance is considered dead. Its "
+            "rules are then redistributed to the remaining instances, and it loses leadership."
+        ),
+    )
+    failover_delay: int = odm.Integer(
+        default=15,
+        description=(
+            "The number of seconds instances that do not own a job wait for its owner to run a tick, before running "
+            "it themselves"
+        ),
+    )
+    rule_sync_interval: int = odm.Integer(
+        default=60,
+        description="The number of seconds between each synchronization of the registered rules with the datastore",
+    )
+    rule_window_lag: int = odm.Integer(
+        default=60,
+        description=(
+            "The number of seconds rules lag behind the current time. Hits ingested more recently are only evaluated "
+            "on the next run, so that hits that are not yet searchable are not skipped. This should be at least the "
+            "refresh interval of the hit index."
+        ),
+    )
+
+
+DEFAULT_SCHEDULER = {
+    "heartbeat_interval": 10,
+    "member_timeout": 30,
+    "failover_delay": 15,
+    "rule_sync_interval": 60,
+    "rule_window_lag": 60,
+}
+
+
+@odm.model(index=False, store=False, description="Asynchronous Search Configuration")
+class AsyncSearch(odm.Model):
+    wait_for_completion_timeout: int = odm.Integer(
+        default=1000,
+        description=(
+            "The number of milliseconds a request submitting or polling an asynchronous search waits for it to "
+            "complete, before returning the results found so far"
+        ),
+    )
+    keep_alive: int = odm.Integer(
+        default=3600,
+        description="The number of seconds an asynchronous search and its results are kept after it was last polled",
+    )
+    max_per_user: int = odm.Integer(
+        default=10,
+        description="The maximum number of asynchronous searches each user can have at once",
+    )
+
+
+DEFAULT_ASYNC_SEARCH = {
+    "wait_for_completion_timeout": 1000,
+    "keep_alive": 3600,
+    "max_per_user": 10,
+}
+
+
 @odm.model(index=False, store=False, description="System Configuration")
 class System(odm.Model):
     type: str = odm.Enum(values=["production", "staging", "development"], description="Type of system")
     retention: Retention = odm.Compound(Retention, default=DEFAULT_RETENTION, description="Retention Configuration")
+    deduplication: Deduplication = odm.Compound(
+        Deduplication, default=DEFAULT_DEDUPLICATION, description="Hit Deduplication Configuration"
+    )
+    scheduler: Scheduler = odm.Compound(
+        Scheduler, default=DEFAULT_SCHEDULER, description="Cronjob Scheduling Configuration"
+    )
+    async_search: AsyncSearch = odm.Compound(
+        AsyncSearch, default=DEFAULT_ASYNC_SEARCH, description="Asynchronous Search Configuration"
+    )
+    validation_cache_size: int = odm.Integer(
+        default=10000,
+        description=(
+            "The number of validated domains, IPs, emails and URIs each process remembers per field type, to avoid "
+            "validating the same values over and over. 0 disables memoization."
+        ),
+    )
 
 
 DEFAULT_SYSTEM = {"type": "development"}
 
 
+@odm.model(index=False, store=False, description="Response Compression Configuration")
+class Compression(odm.Model):
+    enabled: bool = odm.Boolean(
+        default=False,
+        description=(
+            "Compress responses for clients that accept it (see the Accept-Encoding header). The ETag of a compressed "
+            "response is left as is, so only enable this when no cache in front of howler relies on strong ETags."
+        ),
+    )
+    min_size: int = odm.Integer(
+        default=1024,
+        description="The size in bytes under which responses are sent as is, as compressing them isn't worth the CPU",
+    )
+    level: int = odm.Integer(
+        default=5,
+        description="The compression level (1-9) of regular responses. Higher levels save little on JSON for much CPU.",
+    )
+    stream_level: int = odm.Integer(
+        default=1,
+        description="The compression level (1-9) of streamed responses (e.g. exports), compressed chunk by chunk",
+    )
+    websocket_level: int = odm.Integer(
+        default=1,
+        description="The compression level (1-9) of websocket messages",
+    )
+    websocket_min_size: int = odm.Integer(
+        default=256,
+        description="The size in bytes under which websocket messages are sent uncompressed",
+    )
+    websocket_window_bits: int = odm.Integer(
+        default=12,
+        description=(
+            "The base two logarithm (9-15) of the compression window kept for each websocket connection. Smaller "
+            "windows use less memory per connection, at the cost of compression ratio."
+        ),
+    )
+
+
+DEFAULT_COMPRESSION = {
+    "enabled": False,
+    "min_size": 1024,
+    "level": 5,
+    "stream_level": 1,
+    "websocket_level": 1,
+    "websocket_min_size": 256,
+    "websocket_window_bits": 12,
+}
+
+
 @odm.model(index=False, store=False, description="UI Configuration")
 class UI(odm.Model):
     audit: bool = odm.Boolean(description="Should API calls be audited and saved to a separate log file?")
@@ -410,6 +678,9 @@ class UI(odm.Model):
         values=["info", "warning", "success", "error"],
         description="Banner message level",
     )
+    compression: Compression = odm.Compound(
+        Compression, default=DEFAULT_COMPRESSION, description="Response Compression Configuration"
+    )
     debug: bool = odm.Boolean(description="Enable debugging?")
     static_folder: Optional[str] = odm.Keyword(
         optional=True, description="The directory where static assets are stored."
@@ -418,6 +689,13 @@ class UI(odm.Model):
     email: Optional[str] = odm.Optional(odm.Email(), description="Assemblyline admins email address")
     enforce_quota: bool = odm.Boolean(description="Enforce the user's quotas?")
     secret_key: str = odm.Keyword(description="Flask secret key to store cookies, etc.")
+    server_timing: bool = odm.Boolean(
+        default=False,
+        description=(
+            "Return a Server-Timing header breaking down the time spent handling each request between elasticsearch, "
+            "redis, the ODM, serialization and events"
+        ),
+    )
     validate_session_ip: bool = odm.Boolean(
         description="Validate if the session IP matches the IP the session was created from"
     )
@@ -434,11 +712,13 @@ DEFAULT_UI = {
     "audit": True,
     "banner": None,
     "banner_level": "info",
+    "compression": DEFAULT_COMPRESSION,
     "debug": False,
     "discover_url": None,
     "email": None,
     "enforce_quota": True,
     "secret_key": os.environ.get("FLASK_SECRET_KEY", "This is the default flask secret key... you should change this!"),
+    "server_timing": False,
     "validate_session_ip": True,
     "validate_session_useragent": True,
     "static_folder": os.path.dirname(__file__) + "/../../../static",
@@ -464,6 +744,7 @@ class Config(odm.Model):
     auth: Auth = odm.Compound(Auth, default=DEFAULT_AUTH, description="Authentication module configuration")
     core: Core = odm.Compound(Core, default=DEFAULT_CORE, description="Core component configuration")
     datastore: Datastore = odm.Compound(Datastore, default=DEFAULT_DATASTORE, description="Datastore configuration")
+    filestore: Filestore = odm.Compound(Filestore, default=DEFAULT_FILESTORE, description="Filestore configuration")
     logging: Logging = odm.Compound(Logging, default=DEFAULT_LOGGING, description="Logging configuration")
     system: System = odm.Compound(System, default=DEFAULT_SYSTEM, description="System configuration")
     ui: UI = odm.Compound(UI, default=DEFAULT_UI, description="UI configuration parameters")
@@ -473,6 +754,7 @@ DEFAULT_CONFIG = {
     "auth": DEFAULT_AUTH,
     "core": DEFAULT_CORE,
     "datastore": DEFAULT_DATASTORE,
+    "filestore": DEFAULT_FILESTORE,
     "logging": DEFAULT_LOGGING,
     "system": DEFAULT_SYSTEM,
     "ui": DEFAULT_UI,
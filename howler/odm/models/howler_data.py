@@ -231,6 +231,10 @@ class HowlerData(odm.Model):
         default=0,
     )
     is_bundle: bool = odm.Boolean(description="Is this hit a bundle or a normal hit?", default=False)
+    duplicates: int = odm.Integer(
+        description="Number of duplicates of this hit that were suppressed at ingestion",
+        default=0,
+    )
     related: list[str] = odm.List(
         odm.Keyword(
             description="Related hits grouped by the enrichment that correlated them. Populated by enrichments."
@@ -457,13 +457,16 @@ def wipe_views(ds):
     ds.view.wipe()
 
 
+def generate_hits(users: list[str], hit_count: int = 200, prune_hit: bool = False) -> list[Hit]:
+    """Generate some random hits, without saving them"""
+    lookups = loader.get_lookups()
+    return [generate_useful_hit(lookups, users, prune_hit=prune_hit) for _ in range(hit_count)]
+
+
 def create_hits(ds: HowlerDatastore, hit_count: int = 200):
     """Create some random hits"""
-    lookups = loader.get_lookups()
     users = ds.user.search("*:*")["items"]
-    for hit_idx in range(hit_count):
-        hit = generate_useful_hit(lookups, [user["uname"] for user in users], prune_hit=False)
-
+    for hit_idx, hit in enumerate(generate_hits([user["uname"] for user in users], hit_count)):
         if hit_idx + 1 == hit_count:
             hit.howler.analytic = "SecretAnalytic"
             hit.howler.detection = None
@@ -9,6 +9,7 @@ import redis
 from packaging.version import parse
 
 from howler.common import loader
+from howler.common.instrumentation import instrumented
 from howler.utils.uid import get_random_id
 
 # Add a version warning if redis python client is < 2.10.0. Older versions
@@ -45,6 +46,7 @@ def reply_queue_name(prefix=None, suffix=None):
     return "-".join(components)
 
 
+@instrumented("redis")
 def retry_call(func, *args, **kw):
     maximum = 2
     exponent = -7
@@ -0,0 +1,88 @@
+import json
+
+from howler.remote.datatypes import get_client, retry_call
+
+_claim_script = """
+local ttl = tonumber(ARGV[#ARGV])
+local results = {}
+
+for i, key in ipairs(KEYS) do
+    local existing = redis.call('get', key)
+    if existing then
+        results[i] = {existing, redis.call('ttl', key)}
+    else
+        redis.call('set', key, ARGV[i], 'EX', ttl)
+        results[i] = false
+    end
+end
+
+return results
+"""
+
+_release_claimed_script = """
+for i, key in ipairs(KEYS) do
+    if redis.call('get', key) == ARGV[i] then
+        redis.call('del', key)
+    end
+end
+"""
+
+
+class ExpiringClaims(object):
+    """A set of keys, each one holding the value of whoever claimed it first, that expire individually"""
+
+    def __init__(self, name, ttl=3600, host=None, port=None):
+        self.c = get_client(host, port, False)
+        self.name = name
+        self.ttl = ttl
+        self._claim = self.c.register_script(_claim_script)
+        self._release_claimed = self.c.register_script(_release_claimed_script)
+
+    def _key(self, key):
+        return f"{self.name}-{key}"
+
+    def claim(self, key, value):
+        """Claim a key for the given value, unless it is already claimed.
+
+        Returns:
+            None if the key was claimed, otherwise a tuple of the value it is claimed by and its remaining ttl
+        """
+        return self.multi_claim({key: value})[key]
+
+    def multi_claim(self, claims):
+        """Claim multiple keys at once, see `claim`."""
+        if not claims:
+            return {}
+
+        keys = list(claims.keys())
+        results = retry_call(
+            self._claim,
+            keys=[self._key(key) for key in keys],
+            args=[json.dumps(claims[key]) for key in keys] + [self.ttl],
+        )
+
+        return {key: (json.loads(result[0]), int(result[1])) if result else None for key, result in zip(keys, results)}
+
+    def get(self, key):
+        value = retry_call(self.c.get, self._key(key))
+        if value is None:
+            return value
+        return json.loads(value)
+
+    def release(self, *keys):
+        if keys:
+            retry_call(self.c.delete, *[self._key(key) for key in keys])
+
+    def release_claimed(self, claims):
+        """Release multiple keys, but only those that are still claimed by the given value.
+
+        Args:
+            claims: A mapping of each key to release to the value it must be claimed by
+        """
+        if claims:
+            keys = list(claims.keys())
+            retry_call(
+                self._release_claimed,
+                keys=[self._key(key) for key in keys],
+                args=[json.dumps(claims[key]) for key in keys],
+            )
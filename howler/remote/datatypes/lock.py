@@ -40,3 +40,60 @@ class Lock(object):
 
     def __exit__(self, unused1, unused2, unused3):
         retry_call(self._release, args=[self.lock_holder, self.lock_release, self.uuid])
+
+
+expiring_lock_acquire_script = """
+local lock_holder = KEYS[1]
+local uuid = ARGV[1]
+local timeout = ARGV[2]
+local current = redis.call('get', lock_holder)
+if current == uuid then
+    redis.call('expire', lock_holder, timeout)
+    return true
+elseif not current then
+    redis.call('set', lock_holder, uuid, 'EX', timeout)
+    return true
+end
+return false
+"""
+
+expiring_lock_release_script = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    redis.call('del', KEYS[1])
+    return true
+end
+return false
+"""
+
+
+class ExpiringLock(object):
+    """A non-blocking lock that is held until it is released or not renewed for timeout seconds.
+
+    Useful to elect a single leader among many processes: each process periodically calls try_acquire, and whoever
+    holds the lock keeps it for as long as it keeps renewing it.
+    """
+
+    def __init__(self, name, timeout, uuid=None, host=None, port=None):
+        self.uuid = uuid or get_random_id()
+        self.c = get_client(host, port, False)
+        self.lock_holder = f"lock-{name}-holder"
+        self.timeout = timeout
+        self._acquire = self.c.register_script(expiring_lock_acquire_script)
+        self._release = self.c.register_script(expiring_lock_release_script)
+
+    def try_acquire(self):
+        """Acquire the lock if it is free, or renew it if it is already held by us.
+
+        Returns:
+            True if we hold the lock, False otherwise
+        """
+        return retry_call(self._acquire, keys=[self.lock_holder], args=[self.uuid, self.timeout]) == 1
+
+    def holder(self):
+        "Get the uuid of whoever currently holds the lock, if anyone"
+        holder = retry_call(self.c.get, self.lock_holder)
+        return holder.decode("utf-8") if holder is not None else None
+
+    def release(self):
+        "Release the lock, if we hold it"
+        return retry_call(self._release, keys=[self.lock_holder], args=[self.uuid]) == 1
@@ -0,0 +1,43 @@
+from howler.remote.datatypes import get_client, retry_call
+
+_heartbeat_script = """
+local now = tonumber(redis.call('time')[1])
+local timeout = tonumber(ARGV[2])
+
+redis.call('zadd', KEYS[1], now, ARGV[1])
+redis.call('zremrangebyscore', KEYS[1], '-inf', now - timeout)
+redis.call('expire', KEYS[1], timeout * 2)
+"""
+
+_members_script = """
+local now = tonumber(redis.call('time')[1])
+return redis.call('zrangebyscore', KEYS[1], '(' .. (now - tonumber(ARGV[1])), '+inf')
+"""
+
+
+class Membership(object):
+    """The set of live members of a group, where each member is alive for as long as it keeps sending heartbeats.
+
+    Heartbeats are timestamped using the redis server clock, so members with skewed clocks agree on who is alive.
+    """
+
+    def __init__(self, name, timeout=30, host=None, port=None):
+        self.c = get_client(host, port, False)
+        self.name = name
+        self.timeout = timeout
+        self._heartbeat = self.c.register_script(_heartbeat_script)
+        self._members = self.c.register_script(_members_script)
+
+    def heartbeat(self, member: str):
+        "Mark the member as alive for the next timeout seconds, and forget the members that stopped sending heartbeats"
+        retry_call(self._heartbeat, keys=[self.name], args=[member, self.timeout])
+
+    def members(self) -> list[str]:
+        "Get the sorted list of members that sent a heartbeat within the last timeout seconds"
+        return sorted(
+            member.decode("utf-8") for member in retry_call(self._members, keys=[self.name], args=[self.timeout])
+        )
+
+    def leave(self, member: str):
+        "Remove the member from the group immediately"
+        retry_call(self.c.zrem, self.name, member)
@@ -1,5 +1,4 @@
 import functools
-import json
 import uuid
 from typing import Optional
 
@@ -10,14 +9,16 @@ import howler.services.auth_service as auth_service
 from howler.api import forbidden, ok, unauthorized
 from howler.common.exceptions import AuthenticationException
 from howler.common.logging import get_logger
+from howler.config import config
 from howler.helper.ws import ConnectionClosed, Server
+from howler.utils import json_utils
 
 logger = get_logger(__file__)
 
 
 def ws_response(type, data={}, error=False, status=200, message=""):
     "Create a formatted websocket response"
-    return json.dumps({"error": error, "status": status, "message": message, "type": type, **data})
+    return json_utils.dumps({"error": error, "status": status, "message": message, "type": type, **data})
 
 
 def websocket_auth(required_type: Optional[list[str]] = None, required_priv: Optional[list[str]] = None):
@@ -40,7 +41,13 @@ def websocket_auth(required_type: Optional[list[str]] = None, required_priv: Opt
         def auth(*args, **kwargs):
             try:
                 ws_id = str(uuid.uuid4())
-                ws = Server(request.environ, ping_interval=5)
+                ws = Server(
+                    request.environ,
+                    ping_interval=5,
+                    compression_level=config.ui.compression.websocket_level,
+                    compression_threshold=config.ui.compression.websocket_min_size,
+                    compression_window_bits=config.ui.compression.websocket_window_bits,
+                )
 
                 auth_header = ws.receive()
 
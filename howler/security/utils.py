@@ -5,6 +5,7 @@ from typing import List, Optional
 from urllib.parse import urlparse
 
 import elasticapm
+from gevent import get_hub, monkey
 from passlib.hash import bcrypt
 
 from howler.config import config
@@ -48,9 +49,7 @@ def get_password_hash(password: Optional[str]) -> Optional[str]:
     return bcrypt.hash(password)
 
 
-@elasticapm.capture_span(span_type="authentication")
-def verify_password(password: str, pw_hash: str):
-    """Use bcrypt to verify a user's password against the hash"""
+def _verify_bcrypt(password: str, pw_hash: str) -> bool:
     try:
         return bcrypt.verify(password, pw_hash)
     except ValueError:
@@ -59,6 +58,19 @@ def verify_password(password: str, pw_hash: str):
         return False
 
 
+@elasticapm.capture_span(span_type="authentication")
+def verify_password(password: str, pw_hash: str):
+    """Use bcrypt to verify a user's password against the hash
+
+    bcrypt is CPU bound, so when running under gevent the verification is moved to the hub's native thread pool
+    instead of blocking every other greenlet of the worker until it completes.
+    """
+    if monkey.is_module_patched("threading"):
+        return get_hub().threadpool.apply(_verify_bcrypt, (password, pw_hash))
+
+    return _verify_bcrypt(password, pw_hash)
+
+
 def get_password_requirement_message(
     lower: bool = True,
     upper: bool = True,
@@ -1,5 +1,5 @@
 import json
-from typing import Optional
+from typing import Any, Optional, Union
 
 from howler import actions
 from howler.common.exceptions import HowlerValueError
@@ -13,8 +13,13 @@ from howler.utils.str_utils import sanitize_lucene_query
 logger = get_logger(__file__)
 
 
-def bulk_execute_on_query(query: str, trigger: str = "create", user: Optional[User] = None):
-    """Execute the operations specified in registered actions on the given query"""
+def bulk_execute_on_query(
+    query: str,
+    trigger: str = "create",
+    user: Optional[User] = None,
+    filters: Optional[list[Union[str, dict[str, Any]]]] = None,
+):
+    """Execute the operations specified in registered actions on the given query, narrowed down by the given filters"""
     storage = datastore()
 
     if trigger not in VALID_TRIGGERS:
@@ -51,6 +56,7 @@ def bulk_execute_on_query(query: str, trigger: str = "create", user: Optional[Us
                 operation_id=operation.operation_id,
                 query=intersected_query,
                 user=user,
+                filters=filters,
                 **parsed_data,
             )
 
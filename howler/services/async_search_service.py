@@ -0,0 +1,237 @@
+import time
+from typing import Any, Optional
+
+from prometheus_client import Counter
+from sigma.backends.elasticsearch import LuceneBackend
+from sigma.rule import SigmaRule
+from yaml.scanner import ScannerError
+
+from howler.common.exceptions import AccessDeniedException, InvalidDataException, NotFoundException
+from howler.common.loader import APP_NAME
+from howler.common.logging import get_logger
+from howler.config import config, redis
+from howler.helper.search import get_collection, has_access_control
+from howler.remote.datatypes.hash import ExpiringHash
+from howler.utils.uid import get_random_id
+
+logger = get_logger(__file__)
+
+SEARCH_TYPES = ["lucene", "eql", "sigma"]
+
+# Arguments accepted by each type of search, on top of the query itself
+SEARCH_ARGUMENTS: dict[str, list[str]] = {
+    "lucene": ["offset", "rows", "sort", "fl", "filters", "use_archive", "track_total_hits"],
+    "eql": ["rows", "fl", "filters"],
+    "sigma": ["offset", "rows", "sort", "fl", "filters", "use_archive", "track_total_hits"],
+}
+
+ASYNC_SEARCHES = Counter(
+    f"{APP_NAME.replace('-', '_')}_async_searches_total",
+    "The number of asynchronous searches submitted, broken down by type",
+    ["type"],
+)
+
+
+def _get_handles(user: dict[str, Any]) -> ExpiringHash:
+    "Get the handles of the asynchronous searches of the given user, indexed by the id returned to the user"
+    return ExpiringHash(f"howler-async-search-{user['uname']}", ttl=config.system.async_search.keep_alive, host=redis)
+
+
+def _wait_time(wait_for_completion_timeout: Optional[int]) -> int:
+    "Get the time to wait for a search to complete, which users can reduce but not extend past the configured one"
+    if wait_for_completion_timeout is None:
+        return config.system.async_search.wait_for_completion_timeout
+
+    return max(0, min(int(wait_for_completion_timeout), config.system.async_search.wait_for_completion_timeout))
+
+
+def _format_response(search_id: str, handle: dict[str, Any], status: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "id": search_id,
+        "index": handle["index"],
+        "type": handle["type"],
+        "is_running": status["is_running"],
+        "is_partial": status["is_partial"],
+        "expiry": handle["expiry"],
+        "result": status["result"],
+    }
+
+
+def _prune_expired(handles: ExpiringHash):
+    "Remove the handles of the searches that expired in the datastore, so that they don't count towards the limit"
+    now = time.time()
+    for search_id, handle in handles.items().items():
+        if handle["expiry"] < now:
+            handles.pop(search_id)
+
+
+def submit_search(
+    index: str,
+    search_type: str,
+    query: str,
+    user: dict[str, Any],
+    wait_for_completion_timeout: Optional[int] = None,
+    **kwargs,
+) -> dict[str, Any]:
+    """Submit a lucene, EQL or sigma search to be run asynchronously on the given index.
+
+    Args:
+        index (str): The index to search in
+        search_type (str): The type of search, one of lucene, eql or sigma
+        query (str): The lucene query, EQL query or sigma rule to search for
+        user (dict[str, Any]): The user submitting the search
+        wait_for_completion_timeout (Optional[int], optional): The number of milliseconds to wait for the search to
+            complete. Defaults to, and cannot exceed, the configured time.
+
+    Raises:
+        InvalidDataException: The search is invalid, or the user already has too many searches
+
+    Returns:
+        dict[str, Any]: The id of the search, its status and the results found so far
+    """
+    collection = get_collection(index, user)
+    if collection is None:
+        raise InvalidDataException(f"Not a valid index to search in: {index}")
+
+    if search_type not in SEARCH_TYPES:
+        raise InvalidDataException(f"Invalid search type: {search_type}. Must be one of {', '.join(SEARCH_TYPES)}.")
+
+    if not query:
+        raise InvalidDataException("There was no search query.")
+
+    handles = _get_handles(user)
+    _prune_expired(handles)
+    if handles.length() >= config.system.async_search.max_per_user:
+        raise InvalidDataException(
+            f"You cannot have more than {config.system.async_search.max_per_user} asynchronous searches at once. "
+            "Delete some of your searches, or wait for them to expire."
+        )
+
+    params = {key: value for key, value in kwargs.items() if key in SEARCH_ARGUMENTS[search_type]}
+    params["as_obj"] = False
+
+    access_control = user["access_control"] if has_access_control(index) else None
+    if access_control:
+        params["access_control"] = access_control
+
+    es_collection = collection()
+
+    if search_type == "sigma":
+        try:
+            rule = SigmaRule.from_yaml(query)
+        except ScannerError as e:
+            raise InvalidDataException(f"Error when parsing yaml: {e.problem} {e.problem_mark}")
+
+        lucene_queries = LuceneBackend(index_names=[es_collection.index_name]).convert_rule(rule)
+        params["filters"] = [*params.get("filters", []), *lucene_queries]
+        query = "*:*"
+
+    keep_alive = config.system.async_search.keep_alive
+    status = es_collection.submit_async_search(
+        query,
+        eql=search_type == "eql",
+        wait_for_completion_timeout=_wait_time(wait_for_completion_timeout),
+        keep_alive=keep_alive,
+        **params,
+    )
+    ASYNC_SEARCHES.labels(search_type).inc()
+
+    # The id of the search in the datastore is never returned to users, as anyone knowing it could read the results
+    search_id = get_random_id()
+    handle = {
+        "async_id": status["id"],
+        "index": index,
+        "type": search_type,
+        "access_control": access_control,
+        "offset": params.get("offset", None),
+        "rows": params.get("rows", None),
+        "fl": params.get("fl", None),
+        "expiry": time.time() + keep_alive,
+    }
+    handles.set(search_id, handle)
+
+    return _format_response(search_id, handle, status)
+
+
+def _get_handle(search_id: str, user: dict[str, Any]) -> tuple[ExpiringHash, dict[str, Any]]:
+    handles = _get_handles(user)
+    handle: Optional[dict[str, Any]] = handles.get(search_id)
+    if not handle:
+        raise NotFoundException(f"Asynchronous search {search_id} does not exist, or it has expired.")
+
+    return handles, handle
+
+
+def get_search(
+    search_id: str, user: dict[str, Any], wait_for_completion_timeout: Optional[int] = None
+) -> dict[str, Any]:
+    """Get the status and results of an asynchronous search submitted by the given user, extending its expiry.
+
+    Access to the search is checked on every poll: if the user lost access to the index, or if their access control
+    changed since the search was submitted, the search is deleted.
+
+    Args:
+        search_id (str): The id of the search returned on submission
+        user (dict[str, Any]): The user retrieving the search
+        wait_for_completion_timeout (Optional[int], optional): The number of milliseconds to wait for the search to
+            complete. Defaults to, and cannot exceed, the configured time.
+
+    Raises:
+        NotFoundException: The search does not exist, or has expired
+        AccessDeniedException: The user is no longer allowed to see the results of the search
+
+    Returns:
+        dict[str, Any]: The id of the search, its status and the results found so far
+    """
+    handles, handle = _get_handle(search_id, user)
+    eql = handle["type"] == "eql"
+
+    collection = get_collection(handle["index"], user)
+    if collection is None or (
+        has_access_control(handle["index"]) and handle["access_control"] != user["access_control"]
+    ):
+        logger.warning("Access to asynchronous search %s revoked for %s, deleting it", search_id, user["uname"])
+        handles.pop(search_id)
+        if collection is not None:
+            collection().delete_async_search(handle["async_id"], eql=eql)
+
+        raise AccessDeniedException("You are no longer allowed to access the results of this search.")
+
+    keep_alive = config.system.async_search.keep_alive
+    status = collection().get_async_search(
+        handle["async_id"],
+        eql=eql,
+        wait_for_completion_timeout=_wait_time(wait_for_completion_timeout),
+        keep_alive=keep_alive,
+        offset=handle["offset"],
+        rows=handle["rows"],
+        fl=handle["fl"],
+        as_obj=False,
+    )
+
+    if status is None:
+        handles.pop(search_id)
+        raise NotFoundException(f"Asynchronous search {search_id} does not exist, or it has expired.")
+
+    handle["expiry"] = time.time() + keep_alive
+    handles.set(search_id, handle)
+
+    return _format_response(search_id, handle, status)
+
+
+def delete_search(search_id: str, user: dict[str, Any]):
+    """Cancel an asynchronous search submitted by the given user if it is still running, and delete its results.
+
+    Args:
+        search_id (str): The id of the search returned on submission
+        user (dict[str, Any]): The user deleting the search
+
+    Raises:
+        NotFoundException: The search does not exist, or has expired
+    """
+    handles, handle = _get_handle(search_id, user)
+    handles.pop(search_id)
+
+    collection = get_collection(handle["index"], user)
+    if collection is not None:
+        collection().delete_async_search(handle["async_id"], eql=handle["type"] == "eql")
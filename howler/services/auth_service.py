@@ -1,6 +1,11 @@
 import base64
 import hashlib
+import hmac
+import json
+import os
+import time
 from datetime import datetime
+from threading import Lock
 from typing import Optional, Union
 
 import elasticapm
@@ -18,6 +23,7 @@ from howler.common.loader import datastore
 from howler.common.logging import get_logger
 from howler.config import config, redis
 from howler.odm.models.user import User
+from howler.remote.datatypes import retry_call
 from howler.remote.datatypes.queues.named import NamedQueue
 from howler.remote.datatypes.set import ExpiringSet
 from howler.security.utils import generate_random_secret, verify_password
@@ -30,6 +36,13 @@ nonpersistent_config: dict[str, Union[str, int]] = {
     "ttl": config.auth.internal.failure_ttl,
 }
 
+# Successful api key verifications, keyed by (username, key name). Each entry holds an HMAC of the secret that was
+# verified, the stored bcrypt hash it was verified against and the time at which the entry expires. The HMAC key
+# never leaves this process, so the cache can't be used to recover or brute force secrets.
+APIKEY_CACHE_SECRET = os.urandom(32)
+apikey_cache: dict[tuple[str, str], tuple[bytes, str, float]] = {}
+apikey_cache_lock = Lock()
+
 
 def _get_token_store(user: str) -> ExpiringSet:
     """Get an expiring redis set in which to add a token
@@ -74,10 +87,20 @@ def create_token(user: str, priv: list[str]) -> str:
     """
     token = hashlib.sha256(str(generate_random_secret()).encode("utf-8", errors="replace")).hexdigest()
 
-    _get_token_store(user).add(token)
+    token_store = _get_token_store(user)
     priv_store = _get_priv_store(user, token)
-    priv_store.pop_all()
-    priv_store.add(",".join(priv))
+
+    def _store_token():
+        pipe = redis.pipeline(transaction=False)
+        pipe.sadd(token_store.name, json.dumps(token))
+        pipe.expire(token_store.name, token_store.ttl)
+        pipe.delete(priv_store.name)
+        pipe.sadd(priv_store.name, json.dumps(",".join(priv)))
+        pipe.expire(priv_store.name, priv_store.ttl)
+        return pipe.execute()
+
+    # Store the token and its privileges in a single round trip
+    retry_call(_store_token)
 
     return token
 
@@ -92,15 +115,105 @@ def check_token(user: str, token: str) -> Optional[list[str]]:
     Returns:
         Optional[list[str]]: The list of privileges associated with the token
     """
-    if _get_token_store(user).exist(token):
-        members = _get_priv_store(user, token).members()
-        if len(members) > 0:
-            priv_str = members[0]
-            return priv_str.split(",")
+    token_store = _get_token_store(user)
+    priv_store = _get_priv_store(user, token)
+
+    def _fetch_token():
+        pipe = redis.pipeline(transaction=False)
+        pipe.sismember(token_store.name, json.dumps(token))
+        pipe.smembers(priv_store.name)
+        pipe.expire(priv_store.name, priv_store.ttl)
+        return pipe.execute()
+
+    # Check the token and fetch its privileges in a single round trip
+    exists, members, _ = retry_call(_fetch_token)
+
+    if exists and len(members) > 0:
+        priv_str = json.loads(next(iter(members)))
+        return priv_str.split(",")
 
     return None
 
 
+def _hmac_apikey_secret(secret: str) -> bytes:
+    return hmac.new(APIKEY_CACHE_SECRET, secret.encode("utf-8", errors="replace"), hashlib.sha256).digest()
+
+
+def _check_apikey_cache(username: str, name: str, secret: str, pw_hash: str) -> bool:
+    """Check if the given api key secret was recently verified against the given stored hash
+
+    Args:
+        username (str): The user the api key belongs to
+        name (str): The name of the api key
+        secret (str): The secret provided by the client
+        pw_hash (str): The bcrypt hash currently stored for the api key
+
+    Returns:
+        bool: Whether the secret is known to match the hash
+    """
+    with apikey_cache_lock:
+        entry = apikey_cache.get((username, name), None)
+
+    if entry is None:
+        return False
+
+    secret_hmac, cached_hash, expiry = entry
+    if expiry < time.time() or cached_hash != pw_hash:
+        invalidate_apikey_cache(username, name)
+        return False
+
+    return hmac.compare_digest(secret_hmac, _hmac_apikey_secret(secret))
+
+
+def _cache_apikey(username: str, name: str, secret: str, pw_hash: str):
+    "Remember that the given api key secret was successfully verified against the given stored hash"
+    if config.auth.apikey_cache_ttl <= 0:
+        return
+
+    with apikey_cache_lock:
+        apikey_cache[(username, name)] = (
+            _hmac_apikey_secret(secret),
+            pw_hash,
+            time.time() + config.auth.apikey_cache_ttl,
+        )
+
+
+def _verify_apikey(username: str, name: str, secret: str, pw_hash: str) -> bool:
+    """Verify an api key secret against its stored hash
+
+    The expensive bcrypt verification is skipped if this exact secret was recently verified against the same hash.
+
+    Args:
+        username (str): The user the api key belongs to
+        name (str): The name of the api key
+        secret (str): The secret provided by the client
+        pw_hash (str): The bcrypt hash currently stored for the api key
+
+    Returns:
+        bool: Whether the secret matches the hash
+    """
+    if _check_apikey_cache(username, name, secret, pw_hash):
+        return True
+
+    if verify_password(secret, pw_hash):
+        _cache_apikey(username, name, secret, pw_hash)
+        return True
+
+    return False
+
+
+def invalidate_apikey_cache(username: str, name: Optional[str] = None):
+    """Discard the cached verifications of a user's api keys
+
+    Args:
+        username (str): The user whose api keys changed
+        name (Optional[str], optional): The name of the api key that changed. Defaults to all of the user's keys.
+    """
+    with apikey_cache_lock:
+        for key in [key for key in apikey_cache.keys() if key[0] == username and (name is None or key[1] == name)]:
+            apikey_cache.pop(key, None)
+
+
 def validate_token(username: str, token: str) -> Optional[list[str]]:
     """This function identifies the user via the internal token functionality
 
@@ -217,7 +330,7 @@ def validate_apikey(
                     )
 
                 # If the key can be used for whichever purpose, actually validate the secret data
-                if verify_password(apikey_password, key.password):
+                if _verify_apikey(username, name, apikey_password, key.password):
                     return user_data, key.acl
             except ValueError:
                 pass
@@ -0,0 +1,167 @@
+import time
+from collections import Counter as CollectionCounter
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+from prometheus_client import Counter
+
+from howler.common.loader import APP_NAME, datastore
+from howler.common.logging import get_logger
+from howler.config import config, redis
+from howler.datastore.collection import ESCollection, terms_filter
+from howler.datastore.operations import OdmUpdateOperation
+from howler.odm.models.hit import Hit
+from howler.remote.datatypes.claims import ExpiringClaims
+
+logger = get_logger(__file__)
+
+CHECKED_HITS = Counter(
+    f"{APP_NAME.replace('-', '_')}_dedup_checked_hits_total",
+    "The number of hits checked for duplicates at ingestion",
+)
+SUPPRESSED_HITS = Counter(
+    f"{APP_NAME.replace('-', '_')}_dedup_suppressed_hits_total",
+    "The number of duplicate hits suppressed at ingestion, broken down by where the duplicate was detected",
+    ["analytic", "source"],
+)
+
+HASH_CLAIMS = ExpiringClaims("howler-hit-hash", ttl=config.system.deduplication.window, host=redis)
+
+local_cache: OrderedDict[str, tuple[str, float]] = OrderedDict()
+local_cache_lock = Lock()
+
+
+def _get_local(hit_hash: str) -> Optional[str]:
+    "Get the id of the original hit with the given hash from the local cache, if it is still within the window"
+    with local_cache_lock:
+        entry = local_cache.get(hit_hash, None)
+        if entry is None:
+            return None
+
+        original_id, expiry = entry
+        if expiry < time.time():
+            del local_cache[hit_hash]
+            return None
+
+        local_cache.move_to_end(hit_hash)
+        return original_id
+
+
+def _set_local(hit_hash: str, original_id: str, ttl: int):
+    "Remember the id of the original hit with the given hash for ttl seconds, evicting the least recently used hashes"
+    with local_cache_lock:
+        local_cache[hit_hash] = (original_id, time.time() + ttl)
+        local_cache.move_to_end(hit_hash)
+
+        while len(local_cache) > config.system.deduplication.local_cache_size:
+            local_cache.popitem(last=False)
+
+
+def find_duplicates(hits: list[Hit]) -> dict[str, str]:
+    """Find the hits that are duplicates of a hit created within the deduplication window, based on howler.hash.
+
+    The hashes of the hits that are not duplicates are claimed, so that any hit with the same hash created later on
+    is considered a duplicate of them.
+
+    Args:
+        hits (list[Hit]): The hits about to be created
+
+    Returns:
+        dict[str, str]: A mapping of the id of each duplicate hit to the id of the original hit. Hits that are not
+            in the mapping should be created.
+    """
+    if not config.system.deduplication.enabled or not hits:
+        return {}
+
+    duplicates: dict[str, str] = {}
+    analytics: dict[str, str] = {}
+    claims: dict[str, str] = {}
+
+    for hit in hits:
+        CHECKED_HITS.inc()
+
+        hit_hash = hit.howler.hash
+        analytics[hit.howler.id] = hit.howler.analytic
+
+        if original_id := _get_local(hit_hash):
+            duplicates[hit.howler.id] = original_id
+            SUPPRESSED_HITS.labels(hit.howler.analytic, "local").inc()
+        elif original_id := claims.get(hit_hash, None):
+            duplicates[hit.howler.id] = original_id
+            SUPPRESSED_HITS.labels(hit.howler.analytic, "batch").inc()
+        else:
+            claims[hit_hash] = hit.howler.id
+
+    for hit_hash, result in HASH_CLAIMS.multi_claim(claims).items():
+        hit_id = claims[hit_hash]
+        if result is None:
+            _set_local(hit_hash, hit_id, config.system.deduplication.window)
+        else:
+            original_id, ttl = result
+            _set_local(hit_hash, original_id, ttl)
+            duplicates[hit_id] = original_id
+            SUPPRESSED_HITS.labels(analytics[hit_id], "remote").inc()
+
+    # Duplicates within the batch must point to the original hit, even if their first occurence was a duplicate too
+    for hit_id, original_id in duplicates.items():
+        duplicates[hit_id] = duplicates.get(original_id, original_id)
+
+    return duplicates
+
+
+def release(hits: list[Hit]):
+    """Release the hashes claimed for hits that could not be created, so that they are not considered duplicates.
+
+    Args:
+        hits (list[Hit]): The hits that could not be created
+    """
+    if not config.system.deduplication.enabled or not hits:
+        return
+
+    with local_cache_lock:
+        for hit in hits:
+            local_cache.pop(hit.howler.hash, None)
+
+    HASH_CLAIMS.release(*[hit.howler.hash for hit in hits])
+
+
+def release_deleted(hit_ids: list[str]):
+    """Release the hashes claimed by hits that are about to be deleted, so that new hits aren't suppressed for them.
+
+    Args:
+        hit_ids (list[str]): The ids of the hits being deleted
+    """
+    if not config.system.deduplication.enabled or not hit_ids:
+        return
+
+    claims: dict[str, str] = {
+        hit.howler.hash: hit.howler.id
+        for hit in datastore().hit.stream_search(
+            "howler.id:*", fl="howler.id,howler.hash", filters=[terms_filter("howler.id", hit_ids)]
+        )
+    }
+
+    # Another hit may have claimed the same hash since, its claim must be left as is
+    with local_cache_lock:
+        for hit_hash, hit_id in claims.items():
+            entry = local_cache.get(hit_hash, None)
+            if entry is not None and entry[0] == hit_id:
+                del local_cache[hit_hash]
+
+    HASH_CLAIMS.release_claimed(claims)
+
+
+def fold_duplicates(duplicates: dict[str, str]):
+    """Increment the duplicates count of the original hits by the number of suppressed duplicates.
+
+    Args:
+        duplicates (dict[str, str]): The mapping of duplicate hit ids to original hit ids returned by find_duplicates
+    """
+    storage = datastore()
+
+    for original_id, count in CollectionCounter(duplicates.values()).items():
+        if not storage.hit.update(
+            original_id, [OdmUpdateOperation(ESCollection.UPDATE_INC, "howler.duplicates", count)]
+        ):
+            logger.warning("Could not fold %s duplicates into hit %s", count, original_id)
@@ -4,16 +4,22 @@ from typing import Any, Callable
 import requests
 from requests.auth import HTTPBasicAuth
 
+from howler.common.instrumentation import instrumented
 from howler.common.logging import get_logger
 from howler.config import DEBUG, HWL_USE_WEBSOCKET_API, config
+from howler.utils import json_utils
 
 logger = get_logger(__file__)
 
 handlers: dict[str, list[Callable]] = {}
 
+# Unlike handlers, which are only called where events are received, listeners are called where events are emitted
+listeners: dict[str, list[Callable]] = {}
+
 HWL_INTERPOD_COMMS_SECRET = os.getenv("HWL_INTERPOD_COMMS_SECRET", "secret")
 
 
+@instrumented("events")
 def emit(event: str, data: Any):
     """Emit a new instance of the specified event, with additional data related to that event
 
@@ -23,6 +29,12 @@ def emit(event: str, data: Any):
     """
     logger.debug("Recieved emit request for event type %s", event)
 
+    for listener in listeners.get(event, []):
+        try:
+            listener(data)
+        except Exception:
+            logger.exception("Listener failed for event type %s", event)
+
     if not DEBUG and not HWL_USE_WEBSOCKET_API:
         res = None
         if config.ui.websocket_url:
@@ -34,7 +46,8 @@ def emit(event: str, data: Any):
             try:
                 res = requests.post(
                     f"{config.ui.websocket_url}/{event}",
-                    json=data,
+                    data=json_utils.dumpb(data),
+                    headers={"Content-Type": "application/json"},
                     auth=HTTPBasicAuth("user", HWL_INTERPOD_COMMS_SECRET),
                     timeout=5,
                 )
@@ -75,6 +88,18 @@ def on(event: str, handler: Callable):
     logger.debug(f"event:{event} - added listener")
 
 
+def listen(event: str, listener: Callable):
+    """Add a new listener to the specified event, called every time this process emits an instance of the event
+
+    Args:
+        event (str): The id of the event to listen for
+        listener (Callable): The function that will be called with the data of every instance of this event emitted
+    """
+    listeners.setdefault(event, []).append(listener)
+
+    logger.debug(f"event:{event} - added emit listener")
+
+
 def off(event: str, handler: Callable):
     """Remove an existing listener from the specified event
 
@@ -0,0 +1,108 @@
+import re
+import threading
+from hashlib import sha256
+from typing import Any, Optional
+
+from prometheus_client import Counter
+
+from howler.common.loader import APP_NAME, get_filestore
+from howler.common.logging import get_logger
+from howler.filestore import FileStore
+from howler.utils import json_utils
+
+logger = get_logger(__file__)
+
+OFFLOADED_BYTES = Counter(
+    f"{APP_NAME.replace('-', '_')}_filestore_offloaded_bytes_total",
+    "The size of the documents stored in the filestore instead of the datastore, broken down by kind",
+    ["kind"],
+)
+
+# Offloaded content is replaced by a JSON object referencing it, so that clients expecting JSON can still parse it
+REFERENCE_KEY = "$filestore"
+REFERENCE_PREFIX = f'{{"{REFERENCE_KEY}":'
+
+SHA256_REGEX = re.compile(r"[0-9a-f]{64}")
+
+_lock = threading.Lock()
+_filestore: Optional[FileStore] = None
+
+
+def filestore() -> FileStore:
+    "Get the filestore shared by the whole application"
+    global _filestore
+
+    with _lock:
+        if _filestore is None:
+            _filestore = get_filestore()
+
+    return _filestore
+
+
+def _path(kind: str, content_hash: str) -> str:
+    # Nest files in folders, so that no folder ends up with millions of files
+    return f"{kind}/{content_hash[:2]}/{content_hash[2:4]}/{content_hash}"
+
+
+def is_reference(value: Any) -> bool:
+    """Check if the given value looks like a reference to content stored in the filestore.
+
+    Clients must never be allowed to write such values, or they could reference content they don't have access to.
+    """
+    return isinstance(value, str) and value.startswith(REFERENCE_PREFIX)
+
+
+def _parse_reference(value: str) -> Optional[str]:
+    try:
+        reference = json_utils.loads(value)
+    except ValueError:
+        return None
+
+    if not isinstance(reference, dict) or not isinstance(reference.get(REFERENCE_KEY, None), str):
+        return None
+
+    content_hash = reference[REFERENCE_KEY]
+    return content_hash if SHA256_REGEX.fullmatch(content_hash) else None
+
+
+def offload(kind: str, content: str) -> str:
+    """Store content in the filestore by hash, unless it is already stored.
+
+    Args:
+        kind (str): The kind of content (e.g. hit-data), used to group it in the filestore
+        content (str): The content to store
+
+    Returns:
+        str: The reference to store in the datastore instead of the content
+    """
+    encoded = content.encode("utf-8")
+    content_hash = sha256(encoded).hexdigest()
+
+    path = _path(kind, content_hash)
+    if not filestore().exists(path):
+        filestore().put(path, encoded)
+        OFFLOADED_BYTES.labels(kind).inc(len(encoded))
+
+    return json_utils.dumps({REFERENCE_KEY: content_hash, "size": len(encoded)})
+
+
+def resolve(kind: str, value: str) -> str:
+    """Get the content a reference points to. Values that aren't references are returned as is.
+
+    Args:
+        kind (str): The kind of content (e.g. hit-data) the reference points to
+        value (str): The reference
+
+    Returns:
+        str: The content, or the value itself if it is not a valid reference or the content is missing
+    """
+    content_hash = _parse_reference(value) if is_reference(value) else None
+    if content_hash is None:
+        return value
+
+    content = filestore().get(_path(kind, content_hash))
+    if content is None:
+        logger.error("%s %s is missing from the filestore", kind, content_hash)
+        return value
+
+    return content.decode("utf-8")
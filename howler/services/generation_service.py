@@ -0,0 +1,149 @@
+import functools
+import hashlib
+import time
+from threading import Lock
+from typing import TYPE_CHECKING, Callable, Generic, Optional, TypeVar
+
+from howler.common.loader import datastore
+from howler.common.logging import get_logger
+from howler.config import redis_persistent
+from howler.remote.datatypes import retry_call
+
+if TYPE_CHECKING:
+    from howler.datastore.collection import ESCollection
+    from howler.datastore.store import ESStore
+
+logger = get_logger(__file__)
+
+T = TypeVar("T")
+
+# Collections whose generation is bumped on every write made through the datastore
+TRACKED_COLLECTIONS = ["action", "analytic", "overview", "template", "view"]
+
+# Changes made to a collection without going through the datastore (e.g. by another application) are picked up after
+# this many seconds at most
+MAX_AGE = 300
+
+# The latest generation of each collection this instance has made visible to searches
+_visible: dict[str, int] = {}
+_visible_lock = Lock()
+
+
+# Generations are kept in the persistent redis, as resetting them would make etags handed out earlier valid again
+def _key(name: str) -> str:
+    return f"howler-generation-{name}"
+
+
+def get_generation(name: str) -> int:
+    """Get the current generation of a collection. The generation changes every time the collection is modified.
+
+    Args:
+        name (str): The name of the collection
+
+    Returns:
+        int: The current generation of the collection
+    """
+    return int(retry_call(redis_persistent.get, _key(name)) or 0)
+
+
+def bump_generation(name: str) -> int:
+    """Mark a collection as modified, invalidating everything cached based on a previous generation of it.
+
+    Args:
+        name (str): The name of the collection
+
+    Returns:
+        int: The new generation of the collection
+    """
+    return int(retry_call(redis_persistent.incr, _key(name)))
+
+
+def ensure_visible(name: str, generation: int):
+    """Make sure the writes up to the given generation of a collection are visible to searches, before building on it.
+
+    Writes only bump the generation, the collection is refreshed at most once per generation by each instance instead.
+
+    Args:
+        name (str): The name of the collection
+        generation (int): The generation the data is about to be built for
+    """
+    with _visible_lock:
+        if _visible.get(name, -1) >= generation:
+            return
+
+        collection: "ESCollection" = getattr(datastore(), name)
+        collection.with_retries(collection.datastore.client.indices.refresh, index=collection.index_name)
+        _visible[name] = generation
+
+
+def _on_change(name: str, collection: "ESCollection", keys: Optional[list[str]]):
+    bump_generation(name)
+
+
+def track_generations(store: "ESStore"):
+    """Bump the generation of the tracked collections every time they are written to through the given datastore
+
+    Args:
+        store (ESStore): The datastore to track the writes of
+    """
+    for name in TRACKED_COLLECTIONS:
+        store.add_change_listener(name, functools.partial(_on_change, name))
+
+
+def get_etag(name: str, scope: Optional[str] = None, generation: Optional[int] = None) -> str:
+    """Get an etag for data built from the current content of a collection, which changes with its generation.
+
+    Args:
+        name (str): The name of the collection
+        scope (Optional[str], optional): What else the data depends on, such as the user it was built for.
+            Defaults to None.
+        generation (Optional[int], optional): The generation of the collection the data is built for. Defaults to
+            None, in which case the current generation is used.
+
+    Returns:
+        str: The etag
+    """
+    if generation is None:
+        generation = get_generation(name)
+
+    return hashlib.sha256(f"{name}:{generation}:{scope or ''}".encode()).hexdigest()
+
+
+class GenerationCache(Generic[T]):
+    """A value built from the content of a collection, kept in memory until the generation of the collection changes.
+
+    Only the generation is fetched from redis on each access, the value itself is rebuilt when it is outdated.
+    """
+
+    def __init__(self, name: str, builder: Callable[[], T], max_age: int = MAX_AGE):
+        self.name = name
+        self.builder = builder
+        self.max_age = max_age
+
+        self.lock = Lock()
+        self.value: Optional[T] = None
+        self.generation: Optional[int] = None
+        self.built_at = 0.0
+
+    def get(self) -> T:
+        """Get the value, rebuilding it if the collection changed since it was built
+
+        Returns:
+            T: The value built from the current content of the collection
+        """
+        generation = get_generation(self.name)
+
+        with self.lock:
+            if self.value is None or self.generation != generation or time.time() - self.built_at > self.max_age:
+                logger.debug("Rebuilding %s cache for generation %s", self.name, generation)
+                ensure_visible(self.name, generation)
+                self.value = self.builder()
+                self.generation = generation
+                self.built_at = time.time()
+
+            return self.value
+
+    def clear(self):
+        "Drop the cached value, so that it is rebuilt on the next access"
+        with self.lock:
+            self.value = None
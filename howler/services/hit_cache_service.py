@@ -0,0 +1,217 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from prometheus_client import Counter, Gauge
+
+from howler.common.loader import APP_NAME, datastore
+from howler.common.logging import get_logger
+from howler.config import config
+from howler.datastore.collection import CREATE_TOKEN
+from howler.remote.datatypes.events import EventSender, EventWatcher
+from howler.utils import json_utils
+from howler.utils.uid import get_random_id
+
+if TYPE_CHECKING:
+    from howler.datastore.collection import ESCollection
+    from howler.datastore.store import ESStore
+
+logger = get_logger(__file__)
+
+HIT_CACHE_REQUESTS = Counter(
+    f"{APP_NAME.replace('-', '_')}_hit_cache_requests_total",
+    "The number of hits read through the hit cache, broken down by whether they were served from memory",
+    ["result"],
+)
+HIT_CACHE_INVALIDATIONS = Counter(
+    f"{APP_NAME.replace('-', '_')}_hit_cache_invalidations_total",
+    "The number of hit cache invalidations, broken down by what triggered them",
+    ["source"],
+)
+HIT_CACHE_SIZE = Gauge(f"{APP_NAME.replace('-', '_')}_hit_cache_size", "The number of hits in the hit cache")
+
+# Invalidations are published to every instance, which ignore the ones they published themselves
+CHANNEL = "howler-hit-cache"
+INSTANCE_ID = get_random_id()
+
+Fetcher = Callable[[str], tuple[Optional[dict[str, Any]], Optional[str]]]
+
+
+class HitCache(object):
+    """A bounded cache of the most recently read hits, along with their version (i.e. their seq_no and primary_term).
+
+    Hits are kept encoded, so that every read gets its own copy to modify.
+    """
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self.lock = threading.Lock()
+        self.entries: OrderedDict[str, tuple[bytes, str, float]] = OrderedDict()
+
+        # Incremented on every invalidation, so that a hit read before an invalidation isn't cached after it
+        self.epoch = 0
+
+    def get(self, id: str, fetch: Fetcher) -> tuple[Optional[dict[str, Any]], Optional[str]]:
+        """Get a hit and its version from the cache, or fetch and cache it if it isn't cached
+
+        Args:
+            id (str): The id of the hit
+            fetch (Fetcher): Function fetching the hit and its version from the datastore
+
+        Returns:
+            tuple[Optional[dict[str, Any]], Optional[str]]: The hit and its version
+        """
+        with self.lock:
+            entry = self.entries.get(id, None)
+            if entry is not None and entry[2] > time.monotonic():
+                self.entries.move_to_end(id)
+                HIT_CACHE_REQUESTS.labels("hit").inc()
+                return json_utils.loads(entry[0]), entry[1]
+
+            epoch = self.epoch
+
+        HIT_CACHE_REQUESTS.labels("miss").inc()
+        data, version = fetch(id)
+
+        # Missing and archived hits have no version to check cached copies against
+        if data is None or version is None or version == CREATE_TOKEN:
+            return data, version
+
+        encoded = json_utils.dumpb(data)
+        with self.lock:
+            if self.epoch == epoch:
+                self.entries[id] = (encoded, version, time.monotonic() + self.ttl)
+                self.entries.move_to_end(id)
+                while len(self.entries) > self.max_size:
+                    self.entries.popitem(last=False)
+
+            HIT_CACHE_SIZE.set(len(self.entries))
+
+        return data, version
+
+    def invalidate(self, ids: Optional[list[str]] = None):
+        """Remove hits from the cache
+
+        Args:
+            ids (Optional[list[str]], optional): The ids of the hits to remove. Defaults to None, removing every hit.
+        """
+        with self.lock:
+            self.epoch += 1
+
+            if ids is None:
+                self.entries.clear()
+            else:
+                for id in ids:
+                    self.entries.pop(id, None)
+
+            HIT_CACHE_SIZE.set(len(self.entries))
+
+
+_lock = threading.Lock()
+_cache: Optional[HitCache] = None
+_sender: Optional[EventSender[dict[str, Any]]] = None
+_watcher: Optional[EventWatcher[dict[str, Any]]] = None
+
+
+def _redis_params() -> dict[str, Any]:
+    return {
+        "host": config.core.redis.nonpersistent.host,
+        "port": config.core.redis.nonpersistent.port,
+        "private": False,
+    }
+
+
+def _on_remote_invalidation(message: dict[str, Any]):
+    if message.get("instance", None) == INSTANCE_ID or _cache is None:
+        return
+
+    HIT_CACHE_INVALIDATIONS.labels("remote").inc()
+    _cache.invalidate(message.get("ids", None))
+
+
+def _get_cache() -> Optional[HitCache]:
+    global _cache, _watcher
+
+    if not config.datastore.hit_cache.enabled:
+        return None
+
+    with _lock:
+        if _cache is None:
+            # Listen to the invalidations published by other instances before anything is cached
+            _watcher = EventWatcher(**_redis_params(), deserializer=json_utils.loads)
+            _watcher.register(f"{CHANNEL}.*", _on_remote_invalidation)
+            _watcher.start()
+
+            _cache = HitCache(config.datastore.hit_cache.max_size, config.datastore.hit_cache.ttl)
+
+    return _cache
+
+
+def invalidate(ids: Optional[list[str]] = None, source: str = "write", publish: bool = True):
+    """Remove hits from the cache of every instance
+
+    Args:
+        ids (Optional[list[str]], optional): The ids of the hits to remove. Defaults to None, removing every hit.
+        source (str, optional): What triggered the invalidation, for metrics. Defaults to "write".
+        publish (bool, optional): Whether to let the other instances know, or only invalidate the hits of this
+            instance. Defaults to True.
+    """
+    global _sender
+
+    if not config.datastore.hit_cache.enabled or ids == []:
+        return
+
+    HIT_CACHE_INVALIDATIONS.labels(source).inc()
+    if _cache is not None:
+        _cache.invalidate(ids)
+
+    if not publish:
+        return
+
+    # Instances that never read hits (e.g. workers) must still let the others know about the hits they write
+    with _lock:
+        if _sender is None:
+            _sender = EventSender(CHANNEL, **_redis_params(), serializer=json_utils.dumps)
+
+    _sender.send("invalidate", {"instance": INSTANCE_ID, "ids": ids})
+
+
+def get_hit(id: str) -> tuple[Optional[dict[str, Any]], Optional[str]]:
+    """Get a hit and its version, from memory if it was read recently and hasn't changed since.
+
+    Args:
+        id (str): The id of the hit
+
+    Returns:
+        tuple[Optional[dict[str, Any]], Optional[str]]: The hit and its version
+    """
+
+    def fetch(id: str) -> tuple[Optional[dict[str, Any]], Optional[str]]:
+        return datastore().hit.get_if_exists(key=id, as_obj=False, version=True)
+
+    cache = _get_cache()
+    if cache is None:
+        return fetch(id)
+
+    return cache.get(id, fetch)
+
+
+def _on_change(collection: "ESCollection", keys: Optional[list[str]]):
+    if keys is None:
+        # Writes by query (e.g. rules, bulk actions) can touch any hit. Publishing them would flush the cache of every
+        # instance each time, so the other instances only see them once their copies expire.
+        invalidate(source="query", publish=False)
+    else:
+        invalidate(keys, source="write")
+
+
+def track_hit_cache(store: "ESStore"):
+    """Invalidate cached hits every time they are written through the given datastore
+
+    Args:
+        store (ESStore): The datastore to track the writes of
+    """
+    store.add_change_listener("hit", _on_change)
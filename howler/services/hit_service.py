@@ -1,14 +1,14 @@
-import json
 import re
 import typing
 from hashlib import sha256
-from typing import Any, Literal, Optional, Union, cast
+from typing import Any, Literal, Optional, Sequence, Union, cast
 
 from prometheus_client import Counter
 
 import howler.services.event_service as event_service
 from howler.actions.promote import Escalation
 from howler.common.exceptions import (
+    HowlerException,
     HowlerTypeError,
     HowlerValueError,
     NotFoundException,
@@ -16,7 +16,8 @@ from howler.common.exceptions import (
 )
 from howler.common.loader import APP_NAME, datastore
 from howler.common.logging import get_logger
-from howler.datastore.collection import ESCollection
+from howler.config import config
+from howler.datastore.collection import ESCollection, terms_filter
 from howler.datastore.operations import OdmHelper, OdmUpdateOperation
 from howler.datastore.types import HitSearchResult
 from howler.helper.hit import (
@@ -40,8 +41,10 @@ from howler.odm.models.howler_data import (
     Log,
 )
 from howler.odm.models.user import User
-from howler.services import action_service
+from howler.services import action_service, analytic_service, dedup_service, filestore_service, hit_cache_service
+from howler.utils import json_utils
 from howler.utils.dict_utils import flatten
+from howler.utils.str_utils import sanitize_lucene_query
 from howler.utils.uid import get_random_id
 
 log = get_logger(__file__)
@@ -284,9 +287,7 @@ def convert_hit(data: dict[str, Any], unique: bool, ignore_extra_values: bool =
             "raw_data": data.get("howler.data", {}),
         }
 
-        data["howler.hash"] = sha256(
-            json.dumps(hash_contents, sort_keys=True, ensure_ascii=True).encode("utf-8")
-        ).hexdigest()
+        data["howler.hash"] = sha256(json_utils.canonical_dumpb(hash_contents)).hexdigest()
 
     data["howler.id"] = get_random_id()
 
@@ -299,8 +300,9 @@ def convert_hit(data: dict[str, Any], unique: bool, ignore_extra_values: bool =
             if isinstance(entry, str):
                 parsed_data.append(entry)
             else:
-                parsed_data.append(json.dumps(entry))
+                parsed_data.append(json_utils.stored_dumps(entry))
 
+        check_data(parsed_data)
         data["howler.data"] = parsed_data
 
     if "bundle_size" not in data and "howler.hits" in data:
@@ -343,6 +345,8 @@ def convert_hit(data: dict[str, Any], unique: bool, ignore_extra_values: bool =
         odm.event.id = odm.howler.id
         if not odm.event.created:
             odm.event.created = "NOW"
+        # Rules only evaluate each hit once, based on when it was ingested, so clients cannot set it
+        odm.event.ingested = "NOW"
     else:
         odm.event = Event({"created": "NOW", "id": odm.howler.id})
 
@@ -361,9 +365,70 @@ def get_hit(
     id: str,
     as_odm: bool = False,
     version: bool = False,
+    cached: bool = False,
 ):
-    """Return hit object as either an ODM or Dict"""
-    return datastore().hit.get_if_exists(key=id, as_obj=as_odm, version=version)
+    """Return hit object as either an ODM or Dict. Cached hits are served from memory if they didn't change since."""
+    if not cached:
+        return datastore().hit.get_if_exists(key=id, as_obj=as_odm, version=version)
+
+    data, _version = hit_cache_service.get_hit(id)
+    if as_odm and data is not None:
+        data = Hit(data, trusted=True)
+
+    return (data, _version) if version else data
+
+
+def check_data(data: Any):
+    """Make sure howler.data entries written by clients don't pass for references to content stored in the filestore
+
+    Args:
+        data (Any): The howler.data entries, or a single entry
+
+    Raises:
+        HowlerValueError: One of the entries starts like a reference
+    """
+    if any(filestore_service.is_reference(entry) for entry in (data if isinstance(data, list) else [data])):
+        raise HowlerValueError(
+            f"howler.data entries cannot start with {filestore_service.REFERENCE_PREFIX}, which is reserved for "
+            "entries stored in the filestore."
+        )
+
+
+def offload_data(hit: Hit):
+    """Store the large howler.data entries of a hit in the filestore if enabled, and reference them from the hit
+
+    Args:
+        hit (Hit): The hit to offload the data of
+    """
+    offload = config.filestore.offload
+    if not offload.hit_data or not hit.howler.data:
+        return
+
+    data = []
+    for entry in hit.howler.data:
+        if len(entry) >= offload.min_size and not filestore_service.is_reference(entry):
+            entry = filestore_service.offload("hit-data", entry)
+
+        data.append(entry)
+
+    hit.howler.data = data
+
+
+def resolve_data(hit: Optional[dict[str, Any]]) -> Optional[dict[str, Any]]:
+    """Replace the references to howler.data entries stored in the filestore with the entries themselves
+
+    Args:
+        hit (Optional[dict[str, Any]]): The hit to resolve the data of
+
+    Returns:
+        Optional[dict[str, Any]]: The hit
+    """
+    # Hits offloaded before offloading was disabled are still resolved
+    data = (hit or {}).get("howler", {}).get("data", None)
+    if data and any(filestore_service.is_reference(entry) for entry in data):
+        hit["howler"]["data"] = [filestore_service.resolve("hit-data", entry) for entry in data]  # type: ignore[index]
+
+    return hit
 
 
 CREATED_HITS = Counter(
@@ -386,10 +451,144 @@ def create_hit(
     if user:
         hit.howler.log = [Log({"timestamp": "NOW", "explanation": "Created hit", "user": user})]
 
+    offload_data(hit)
+
     CREATED_HITS.labels(hit.howler.analytic).inc()
     return datastore().hit.save(id, hit)
 
 
+def _flush_hits(pending: list[tuple[int, Hit, list[str]]], user: User) -> list[dict[str, Any]]:  # noqa: C901
+    """Write a chunk of validated hits to the datastore in a single bulk request"""
+    storage = datastore()
+
+    duplicates = dedup_service.find_duplicates([odm for _, odm, _ in pending])
+
+    statuses: list[dict[str, Any]] = []
+    to_create: list[tuple[int, Hit, list[str]]] = []
+    for line, odm, warnings in pending:
+        if odm.howler.id in duplicates:
+            statuses.append({"line": line, "duplicate_of": duplicates[odm.howler.id]})
+        else:
+            to_create.append((line, odm, warnings))
+
+    created: list[Hit] = []
+    failed: list[Hit] = []
+    # The events sent out for the created hits carry their data, not the references to the offloaded entries
+    hit_data: dict[str, list[str]] = {}
+    if to_create:
+        plan = storage.hit.get_bulk_plan()
+        for _, odm, _ in to_create:
+            hit_data[odm.howler.id] = list(odm.howler.data or [])
+            offload_data(odm)
+            plan.add_insert_operation(odm.howler.id, odm)
+
+        try:
+            result = storage.hit.bulk(plan)
+        except Exception as e:
+            # The response has already started streaming, so the lines of this chunk are reported as failed instead
+            log.exception("Bulk creation of %s hits failed", len(to_create))
+            result = {"items": [{"create": {"error": {"reason": f"Could not create hit: {e}"}}} for _ in to_create]}
+        else:
+            storage.hit.commit()
+
+        for (line, odm, warnings), item in zip(to_create, result["items"]):
+            error = item["create"].get("error", None)
+            if error:
+                failed.append(odm)
+                statuses.append({"line": line, "error": error.get("reason", str(error))})
+                continue
+
+            CREATED_HITS.labels(odm.howler.analytic).inc()
+            created.append(odm)
+
+            data = odm.as_primitives()
+            data["howler"]["data"] = hit_data[odm.howler.id]
+            version = f"{item['create']['_seq_no']}---{item['create']['_primary_term']}"
+            event_service.emit("hits", {"hit": data, "version": version})
+
+            status: dict[str, Any] = {"line": line, "id": odm.howler.id}
+            if warnings:
+                status["warnings"] = warnings
+            statuses.append(status)
+
+    dedup_service.release(failed)
+    if duplicates:
+        dedup_service.fold_duplicates(duplicates)
+
+    # Analytics only need to be updated once per analytic/detection pair, not once per hit
+    analytics: dict[tuple[str, Optional[str]], Hit] = {}
+    for odm in created:
+        analytics.setdefault((odm.howler.analytic, odm.howler.detection), odm)
+
+    for odm in analytics.values():
+        analytic_service.save_from_hit(odm, user)
+
+    if created:
+        action_service.bulk_execute_on_query(
+            "howler.id:*", user=user, filters=[terms_filter("howler.id", [odm.howler.id for odm in created])]
+        )
+
+    return statuses
+
+
+def create_hits_from_stream(
+    lines: typing.Iterable[Union[str, bytes]],
+    user: User,
+    ignore_extra_values: bool = False,
+    chunk_size: int = 500,
+) -> typing.Iterator[list[dict[str, Any]]]:
+    """Create hits from a stream of newline delimited JSON, without holding more than one chunk in memory.
+
+    Args:
+        lines (Iterable[Union[str, bytes]]): The lines of NDJSON to create the hits from, one hit per line
+        user (User): The user creating the hits
+        ignore_extra_values (bool, optional): Whether to throw an exception for any invalid extra values, or simply
+            emit a warning. Defaults to False.
+        chunk_size (int, optional): The number of hits to write to the datastore at once. Defaults to 500.
+
+    Yields:
+        list[dict[str, Any]]: The status of each line of the processed chunk, either the id of the created hit, the
+            id of the hit it is a duplicate of or the reason it could not be created
+    """
+    pending: list[tuple[int, Hit, list[str]]] = []
+    statuses: list[dict[str, Any]] = []
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+
+        try:
+            data = json_utils.loads(line)
+        except ValueError as e:
+            statuses.append({"line": line_number, "error": f"Invalid JSON: {e}"})
+            continue
+
+        if not isinstance(data, dict):
+            statuses.append({"line": line_number, "error": "Invalid JSON: each line must be a JSON object"})
+            continue
+
+        try:
+            odm, warnings = convert_hit(data, unique=False, ignore_extra_values=ignore_extra_values)
+            odm.howler.log = [Log({"timestamp": "NOW", "explanation": "Created hit", "user": user["uname"]})]
+            pending.append((line_number, odm, warnings))
+        except HowlerException as e:
+            statuses.append({"line": line_number, "error": str(e)})
+
+        if len(pending) >= chunk_size:
+            statuses.extend(_flush_hits(pending, user))
+            pending = []
+
+        if len(statuses) >= chunk_size:
+            yield sorted(statuses, key=lambda status: status["line"])
+            statuses = []
+
+    if pending:
+        statuses.extend(_flush_hits(pending, user))
+
+    if statuses:
+        yield sorted(statuses, key=lambda status: status["line"])
+
+
 def update_hit(
     hit_id: str,
     operations: list[OdmUpdateOperation],
@@ -403,14 +602,21 @@ def update_hit(
             "Status of a Hit cannot be modified like other properties. Please use a transition to do so."
         )
 
+    for operation in operations:
+        if operation.key == "howler.data":
+            check_data(operation.value)
+
     return _update_hit(hit_id, operations, user, version=version)
 
 
 @typing.no_type_check
 def save_hit(hit: Hit, version: Optional[str] = None) -> tuple[Hit, str]:
     "Save a hit to the datastore"
+    offload_data(hit)
+
     datastore().hit.save(hit.howler.id, hit, version=version)
     data, _version = datastore().hit.get(hit.howler.id, as_obj=False, version=True)
+    resolve_data(data)
     event_service.emit("hits", {"hit": data, "version": _version})
 
     return data, version
@@ -450,6 +656,7 @@ def _update_hit(
             if operation.operation in (
                 ESCollection.UPDATE_APPEND,
                 ESCollection.UPDATE_APPEND_IF_MISSING,
+                ESCollection.UPDATE_MERGE,
             ):
                 operation_type = HitOperationType.APPENDED
             else:
@@ -512,6 +719,42 @@ def get_all_children(hit: Hit):
     return child_hits
 
 
+def sync_bundle_members(bundle_id: str, filters: Optional[Sequence[Union[str, dict[str, Any]]]] = None) -> int:
+    """Add the hits tagged with a bundle to its list of children, and update its size accordingly.
+
+    The ids of the children are streamed from the datastore, and merged into the bundle in a single update whose script
+    does not grow with the number of children, so that bundles of any size can be synchronized.
+
+    Args:
+        bundle_id (str): The ID of the bundle to synchronize
+        filters (Sequence[str | dict[str, Any]], optional): Filters restricting the children to merge, for example to
+            the hits tagged since the last synchronization. Defaults to None, in which case every child is merged.
+
+    Returns:
+        int: The number of children in the bundle
+    """
+    storage = datastore().hit
+    query = f"howler.bundles:{sanitize_lucene_query(bundle_id)}"
+
+    child_ids = [
+        hit.howler.id for hit in storage.stream_search(query, fl="howler.id", filters=filters, item_buffer_size=1000)
+    ]
+    bundle_size = storage.count(query)["count"]
+
+    storage.update(
+        bundle_id,
+        [
+            odm_helper.list_merge("howler.hits", child_ids),
+            odm_helper.update("howler.bundle_size", bundle_size),
+        ],
+    )
+
+    data, _version = storage.get(bundle_id, as_obj=False, version=True)
+    event_service.emit("hits", {"hit": data, "version": _version})
+
+    return bundle_size
+
+
 def transition_hit(
     id: str,
     transition: HitStatusTransition,
@@ -574,9 +817,10 @@ def transition_hit(
 
         datastore().hit.commit()
         action_service.bulk_execute_on_query(
-            f"howler.id:({' OR '.join(h['howler']['id'] for h in ([hit] + child_hits))})",
+            "howler.id:*",
             trigger=trigger,
             user=user,
+            filters=[terms_filter("howler.id", [h["howler"]["id"] for h in ([hit] + child_hits)])],
         )
 
         for _hit in [hit] + child_hits:
@@ -598,6 +842,8 @@ def delete_hits(hit_ids: list[str]) -> bool:
     """
     ds = datastore()
 
+    dedup_service.release_deleted(hit_ids)
+
     operations = []
     result = True
 
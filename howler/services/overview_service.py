@@ -0,0 +1,89 @@
+from typing import Any, Optional, TypedDict
+
+from howler.common.loader import datastore
+from howler.common.logging import get_logger
+from howler.odm.models.overview import Overview
+from howler.services.generation_service import GenerationCache
+
+logger = get_logger(__file__)
+
+
+class OverviewIndex(TypedDict):
+    "Every overview, indexed by the (analytic, detection) pair it applies to"
+
+    items: list[dict[str, Any]]
+    by_key: dict[tuple[str, Optional[str]], dict[str, Any]]
+
+
+def _build_index() -> OverviewIndex:
+    items = sorted(
+        datastore().overview.stream_search("overview_id:*", as_obj=False),
+        key=lambda overview: overview["overview_id"],
+    )
+
+    return {
+        "items": items,
+        "by_key": {(overview["analytic"], overview.get("detection", None)): overview for overview in items},
+    }
+
+
+OVERVIEW_INDEX: GenerationCache[OverviewIndex] = GenerationCache("overview", _build_index)
+
+
+def get_overviews() -> list[dict[str, Any]]:
+    """Get every overview
+
+    Returns:
+        list[dict[str, Any]]: The overviews
+    """
+    return OVERVIEW_INDEX.get()["items"]
+
+
+def get_overview(analytic: str, detection: Optional[str]) -> Optional[dict[str, Any]]:
+    """Get the overview covering exactly the given analytic and detection
+
+    Args:
+        analytic (str): The analytic the overview applies to
+        detection (Optional[str]): The detection the overview applies to, or None for the analytic-wide overview
+
+    Returns:
+        Optional[dict[str, Any]]: The overview, if there is one
+    """
+    return OVERVIEW_INDEX.get()["by_key"].get((analytic, detection), None)
+
+
+def resolve_overview(analytic: str, detection: Optional[str]) -> Optional[dict[str, Any]]:
+    """Get the overview to use to render a hit with the given analytic and detection.
+
+    The overview of the detection is used if there is one, otherwise the overview of the analytic.
+
+    Args:
+        analytic (str): The analytic of the hit
+        detection (Optional[str]): The detection of the hit
+
+    Returns:
+        Optional[dict[str, Any]]: The overview to use, if there is one
+    """
+    by_key = OVERVIEW_INDEX.get()["by_key"]
+    return by_key.get((analytic, detection), None) or by_key.get((analytic, None), None)
+
+
+def save_overview(overview: Overview):
+    """Save an overview. Writing to the datastore invalidates the overviews cached by every API instance.
+
+    Args:
+        overview (Overview): The overview to save
+    """
+    datastore().overview.save(overview.overview_id, overview)
+
+
+def delete_overview(overview_id: str) -> bool:
+    """Delete an overview. Writing to the datastore invalidates the overviews cached by every API instance.
+
+    Args:
+        overview_id (str): The id of the overview to delete
+
+    Returns:
+        bool: Whether the overview was deleted
+    """
+    return datastore().overview.delete(overview_id)
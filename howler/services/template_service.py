@@ -0,0 +1,113 @@
+from typing import Any, Optional, TypedDict
+
+from howler.common.loader import datastore
+from howler.common.logging import get_logger
+from howler.odm.models.template import Template
+from howler.services.generation_service import GenerationCache
+
+logger = get_logger(__file__)
+
+
+class TemplateIndex(TypedDict):
+    "Every template, indexed by the (analytic, detection) pair it applies to"
+
+    items: list[dict[str, Any]]
+    by_key: dict[tuple[str, Optional[str]], list[dict[str, Any]]]
+
+
+def _build_index() -> TemplateIndex:
+    items = sorted(
+        datastore().template.stream_search("template_id:*", as_obj=False),
+        key=lambda template: template["template_id"],
+    )
+
+    by_key: dict[tuple[str, Optional[str]], list[dict[str, Any]]] = {}
+    for template in items:
+        by_key.setdefault((template["analytic"], template.get("detection", None)), []).append(template)
+
+    return {"items": items, "by_key": by_key}
+
+
+TEMPLATE_INDEX: GenerationCache[TemplateIndex] = GenerationCache("template", _build_index)
+
+
+def _can_use(template: dict[str, Any], uname: str) -> bool:
+    return template["type"] == "global" or template.get("owner", None) == uname
+
+
+def get_templates(uname: str) -> list[dict[str, Any]]:
+    """Get every template the given user can use
+
+    Args:
+        uname (str): The username of the user
+
+    Returns:
+        list[dict[str, Any]]: The templates
+    """
+    return [template for template in TEMPLATE_INDEX.get()["items"] if _can_use(template, uname)]
+
+
+def get_template(
+    analytic: str, detection: Optional[str], template_type: str, owner: Optional[str] = None
+) -> Optional[dict[str, Any]]:
+    """Get the template of the given type covering exactly the given analytic and detection
+
+    Args:
+        analytic (str): The analytic the template applies to
+        detection (Optional[str]): The detection the template applies to, or None for the analytic-wide template
+        template_type (str): The type of the template, personal or global
+        owner (Optional[str], optional): The owner of the template, for personal templates. Defaults to None.
+
+    Returns:
+        Optional[dict[str, Any]]: The template, if there is one
+    """
+    for template in TEMPLATE_INDEX.get()["by_key"].get((analytic, detection), []):
+        if template["type"] == template_type and (template_type == "global" or template.get("owner", None) == owner):
+            return template
+
+    return None
+
+
+def resolve_template(analytic: str, detection: Optional[str], uname: str) -> Optional[dict[str, Any]]:
+    """Get the template the given user should use to render a hit with the given analytic and detection.
+
+    Templates of the detection are preferred over templates of the analytic, and personal templates over global ones.
+
+    Args:
+        analytic (str): The analytic of the hit
+        detection (Optional[str]): The detection of the hit
+        uname (str): The username of the user rendering the hit
+
+    Returns:
+        Optional[dict[str, Any]]: The template to use, if there is one
+    """
+    by_key = TEMPLATE_INDEX.get()["by_key"]
+
+    keys = [(analytic, detection), (analytic, None)] if detection else [(analytic, None)]
+    for key in keys:
+        candidates = [template for template in by_key.get(key, []) if _can_use(template, uname)]
+        if candidates:
+            return next((template for template in candidates if template["type"] == "personal"), candidates[0])
+
+    return None
+
+
+def save_template(template: Template):
+    """Save a template. Writing to the datastore invalidates the templates cached by every API instance.
+
+    Args:
+        template (Template): The template to save
+    """
+    datastore().template.save(template.template_id, template)
+
+
+def delete_template(template_id: str) -> bool:
+    """Delete a template. Writing to the datastore invalidates the templates cached by every API instance.
+
+    Args:
+        template_id (str): The id of the template to delete
+
+    Returns:
+        bool: Whether the template was deleted
+    """
+    return datastore().template.delete(template_id)
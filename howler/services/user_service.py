@@ -14,6 +14,7 @@ from howler.config import CLASSIFICATION, config
 from howler.helper.oauth import fetch_avatar, parse_profile
 from howler.odm.models.user import User
 from howler.odm.models.view import View
+from howler.services import filestore_service
 from howler.utils.str_utils import safe_str
 
 ACCOUNT_USER_MODIFIABLE = ["name", "email", "avatar", "password", "dashboard"]
@@ -63,7 +64,7 @@ def convert_user(user: User) -> dict[str, Any]:
         for key, value in datastore().user.get_if_exists(user["uname"]).apikeys.items()
     ]
 
-    user_data["avatar"] = datastore().user_avatar.get_if_exists(user["uname"])
+    user_data["avatar"] = get_avatar(user["uname"])
     user_data["username"] = user_data.pop("uname")
     user_data["is_admin"] = "admin" in user_data["type"]
     user_data["roles"] = list(set(user_data.pop("type")))
@@ -200,7 +201,7 @@ def parse_user_data(  # noqa: C901
                     )
 
                     if avatar:
-                        storage.user_avatar.save(username, avatar)
+                        save_avatar(username, avatar)
 
                 view_query = f"owner:{current_user['uname']} AND title:view.assigned_to_me AND type:readonly"
                 if len(storage.view.search(view_query)["items"]) == 0:
@@ -311,11 +312,43 @@ def save_user_account(username: str, data: dict[str, Any], user: dict[str, Any])
     if avatar == "DELETE":
         storage.user_avatar.delete(username)
     elif avatar is not None:
-        storage.user_avatar.save(username, avatar)
+        save_avatar(username, avatar)
 
     return storage.user.save(username, data)
 
 
+def get_avatar(username: str) -> Optional[str]:
+    """Get the avatar of a user, from the filestore if it was stored there
+
+    Args:
+        username (str): The username of the user
+
+    Returns:
+        Optional[str]: The avatar, as a base64 encoded data URL
+    """
+    avatar = datastore().user_avatar.get_if_exists(username)
+    if not avatar:
+        return None
+
+    return filestore_service.resolve("avatar", avatar)
+
+
+def save_avatar(username: str, avatar: str) -> bool:
+    """Save the avatar of a user. Avatars are stored in the filestore instead of the datastore if enabled.
+
+    Args:
+        username (str): The username of the user
+        avatar (str): The avatar, as a base64 encoded data URL
+
+    Returns:
+        bool: If the save operation was successful
+    """
+    if config.filestore.offload.avatars:
+        avatar = filestore_service.offload("avatar", avatar)
+
+    return datastore().user_avatar.save(username, avatar)
+
+
 def get_dynamic_classification(current_c12n: str, email: str) -> str:
     """Get the classification of the user
 
@@ -0,0 +1,132 @@
+"""The JSON codec used throughout howler.
+
+orjson is used by default, as it is several times faster than the standard library on the large documents howler
+handles. Set HWL_JSON_BACKEND to json to force the standard library, which is also used if orjson cannot be imported
+(e.g. on a platform it has no wheels for). Values orjson cannot encode (e.g. integers over 64 bits, or dictionaries with
+non-string keys) are encoded by the standard library instead.
+
+Both backends produce the same compact output, and encode NaN and infinite floats as null, since they are not valid
+JSON. JSON that is stored as a string inside documents (e.g. howler.data entries) is encoded with stored_dumps instead,
+so that it keeps the format it has always been stored in.
+"""
+
+import json
+import math
+import os
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+BACKEND = "orjson" if orjson is not None and os.environ.get("HWL_JSON_BACKEND", "orjson") == "orjson" else "json"
+
+
+def _finite(obj: Any) -> Any:
+    "Replace NaN and infinite floats with None, the way orjson encodes them"
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+
+    return obj
+
+
+def dumpb(obj: Any, sort_keys: bool = False, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Encode an object to compact, UTF-8 encoded JSON
+
+    Args:
+        obj (Any): The object to encode
+        sort_keys (bool, optional): Whether to sort the keys of dictionaries. Defaults to False.
+        default (Optional[Callable[[Any], Any]], optional): Function converting objects that cannot be encoded
+            otherwise to objects that can. Defaults to None.
+
+    Returns:
+        bytes: The encoded object
+    """
+    if BACKEND == "orjson":
+        try:
+            return orjson.dumps(
+                obj,
+                default=default,
+                option=(orjson.OPT_SORT_KEYS if sort_keys else 0) | orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except orjson.JSONEncodeError:
+            pass
+
+    kwargs: dict[str, Any] = {"sort_keys": sort_keys, "default": default, "ensure_ascii": False}
+    try:
+        encoded = json.dumps(obj, allow_nan=False, separators=(",", ":"), **kwargs)
+    except ValueError:
+        # NaN and infinite floats are encoded as null, like orjson does
+        encoded = json.dumps(_finite(obj), separators=(",", ":"), **kwargs)
+
+    return encoded.encode("utf-8", "surrogatepass")
+
+
+def dumps(obj: Any, sort_keys: bool = False, default: Optional[Callable[[Any], Any]] = None) -> str:
+    """Encode an object to compact JSON
+
+    Args:
+        obj (Any): The object to encode
+        sort_keys (bool, optional): Whether to sort the keys of dictionaries. Defaults to False.
+        default (Optional[Callable[[Any], Any]], optional): Function converting objects that cannot be encoded
+            otherwise to objects that can. Defaults to None.
+
+    Returns:
+        str: The encoded object
+    """
+    return dumpb(obj, sort_keys=sort_keys, default=default).decode("utf-8", "surrogatepass")
+
+
+def loads(data: Union[str, bytes, bytearray, memoryview]) -> Any:
+    """Decode a JSON document
+
+    Args:
+        data (Union[str, bytes, bytearray, memoryview]): The document to decode
+
+    Raises:
+        ValueError: The document is not valid JSON
+
+    Returns:
+        Any: The decoded object
+    """
+    if BACKEND == "orjson":
+        return orjson.loads(data)
+
+    return json.loads(data)
+
+
+def stored_dumps(obj: Any) -> str:
+    """Encode an object to JSON that is stored as a string inside a document, e.g. a howler.data entry.
+
+    Stored strings are returned to clients as is, so they are always produced by the standard library with its default
+    formatting, the same as the strings stored before orjson was introduced.
+
+    Args:
+        obj (Any): The object to encode
+
+    Returns:
+        str: The encoded object
+    """
+    return json.dumps(obj)
+
+
+def canonical_dumpb(obj: Any) -> bytes:
+    """Encode an object to the canonical JSON howler computes hashes (e.g. howler.hash) from.
+
+    The output must never change, or hashes computed before the change would no longer match. It is always produced
+    by the standard library, with sorted keys, ASCII escapes and the default separators.
+
+    Args:
+        obj (Any): The object to encode
+
+    Returns:
+        bytes: The encoded object
+    """
+    return json.dumps(obj, sort_keys=True, ensure_ascii=True).encode("utf-8")
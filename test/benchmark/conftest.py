@@ -0,0 +1,100 @@
+"""Benchmarks of howler's hot paths.
+
+Each benchmark is timed over a number of rounds, and its fastest round is compared to the baseline stored for it. The
+fastest round is the least affected by other processes competing for the machine, so it is steadier than the mean or
+median. The benchmark fails if it is slower than its baseline by more than the regression threshold. Baselines are
+machine specific, so they are recorded the first time a benchmark runs on a given machine rather than committed.
+
+Benchmarks are slow and sensitive to the load of the machine, so they are only collected when HWL_BENCHMARK is set.
+
+Environment variables:
+    HWL_BENCHMARK: Set to true to run the benchmarks. They are excluded from the test suite otherwise.
+    HWL_BENCHMARK_BASELINES: The file baselines are stored in. Defaults to baselines.json next to this file.
+    HWL_BENCHMARK_THRESHOLD: The tolerated slowdown, as a fraction of the baseline. Defaults to 0.25.
+    HWL_BENCHMARK_UPDATE: Set to true to record the current timings as the new baselines instead of comparing them.
+"""
+
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+
+BASELINES_PATH = Path(os.environ.get("HWL_BENCHMARK_BASELINES", Path(__file__).parent / "baselines.json"))
+REGRESSION_THRESHOLD = float(os.environ.get("HWL_BENCHMARK_THRESHOLD", "0.25"))
+UPDATE_BASELINES = os.environ.get("HWL_BENCHMARK_UPDATE", "false").lower() == "true"
+
+if os.environ.get("HWL_BENCHMARK", "false").lower() != "true":
+    collect_ignore_glob = ["test_*.py"]
+
+
+class Baselines(object):
+    "The fastest timings recorded for each benchmark"
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.timings: dict[str, float] = json.loads(path.read_text()) if path.exists() else {}
+        self.changed = False
+
+    def get(self, name: str) -> float | None:
+        return self.timings.get(name)
+
+    def record(self, name: str, timing: float):
+        self.timings[name] = timing
+        self.changed = True
+
+    def save(self):
+        if self.changed:
+            self.path.write_text(json.dumps(self.timings, indent=2, sort_keys=True))
+
+
+@pytest.fixture(scope="session")
+def baselines():
+    baselines = Baselines(BASELINES_PATH)
+    try:
+        yield baselines
+    finally:
+        baselines.save()
+
+
+@pytest.fixture
+def benchmark(request, baselines: Baselines):
+    """Time a function, and fail if it regressed compared to its baseline.
+
+    The returned function takes the function to time and its arguments, as well as the number of rounds to time it
+    over, and returns the fastest timing.
+    """
+
+    def run(func: Callable, *args: Any, rounds: int = 20, **kwargs: Any) -> float:
+        # Warm up any caches, so that the first round isn't an outlier
+        func(*args, **kwargs)
+
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            func(*args, **kwargs)
+            timings.append(time.perf_counter() - start)
+
+        fastest = min(timings)
+        name = request.node.nodeid.split("::", 1)[-1]
+        baseline = baselines.get(name)
+
+        print(  # noqa: T201
+            f"{name}: fastest {fastest * 1000:.3f}ms, median {statistics.median(timings) * 1000:.3f}ms over {rounds} "
+            "rounds" + (f" (baseline {baseline * 1000:.3f}ms)" if baseline else " (no baseline)")
+        )
+
+        if baseline is None or UPDATE_BASELINES:
+            baselines.record(name, fastest)
+        elif fastest > baseline * (1 + REGRESSION_THRESHOLD):
+            pytest.fail(
+                f"{name} regressed: {fastest * 1000:.3f}ms against a baseline of {baseline * 1000:.3f}ms "
+                f"(threshold {REGRESSION_THRESHOLD:.0%})"
+            )
+
+        return fastest
+
+    return run
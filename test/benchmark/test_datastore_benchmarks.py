@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from howler.datastore.collection import terms_filter
+from howler.datastore.howler_store import HowlerDatastore
+from howler.datastore.operations import OdmHelper
+from howler.odm.models.hit import Hit
+from howler.odm.models.howler_data import HitStatusTransition
+from howler.odm.random_data import generate_hits
+from howler.services import hit_service
+
+HIT_COUNT = 100
+
+odm_helper = OdmHelper(Hit)
+
+
+@pytest.fixture(scope="module")
+def hits(datastore_connection: HowlerDatastore):
+    random.seed(HIT_COUNT)
+    hits = generate_hits(["admin", "user"], HIT_COUNT, prune_hit=True)
+    for hit in hits:
+        hit.howler.status = "open"
+        hit.howler.assignment = "unassigned"
+        hit.howler.bundles = []
+        hit.howler.hits = []
+        hit.howler.is_bundle = False
+        hit_service.create_hit(hit.howler.id, hit, user="admin", overwrite=True)
+    datastore_connection.hit.commit()
+
+    try:
+        yield hits
+    finally:
+        datastore_connection.hit.delete_by_query(
+            "howler.id:*", filters=[terms_filter("howler.id", [hit.howler.id for hit in hits])]
+        )
+        datastore_connection.hit.commit()
+
+
+@pytest.fixture(scope="module")
+def admin(datastore_connection: HowlerDatastore):
+    return datastore_connection.user.get("admin", as_obj=False)
+
+
+def test_create_hits(benchmark, datastore_connection: HowlerDatastore, hits: list[Hit]):
+    def run():
+        for hit in hits:
+            hit_service.create_hit(hit.howler.id, hit, user="admin", overwrite=True)
+        datastore_connection.hit.commit()
+
+    benchmark(run, rounds=5)
+
+
+@pytest.mark.parametrize("as_obj", [True, False])
+def test_search_hits(benchmark, hits: list[Hit], as_obj: bool):
+    benchmark(hit_service.search, "howler.id:*", rows=HIT_COUNT, as_obj=as_obj)
+
+
+def test_update_hits(benchmark, hits: list[Hit]):
+    def run():
+        for hit in hits[:10]:
+            hit_service.update_hit(hit.howler.id, [odm_helper.update("howler.score", random.random() * 1000)], "admin")
+
+    benchmark(run, rounds=5)
+
+
+def test_transition_hits(benchmark, hits: list[Hit], admin: dict):
+    def run():
+        for hit in hits[:10]:
+            hit_service.transition_hit(hit.howler.id, HitStatusTransition.ASSIGN_TO_ME, admin)
+            hit_service.transition_hit(hit.howler.id, HitStatusTransition.RELEASE, admin)
+
+    benchmark(run, rounds=5)
@@ -0,0 +1,260 @@
+import os
+import random
+import tracemalloc
+from copy import deepcopy
+
+import pytest
+
+from howler.common import loader
+from howler.datastore.bulk import ElasticBulkPlan
+from howler.datastore.collection import ESCollection
+from howler.datastore.operations import OdmHelper
+from howler.odm.base import Mapping
+from howler.odm.models.config import DEFAULT_PROJECTIONS, Projection
+from howler.odm.models.hit import Hit
+from howler.odm.random_data import generate_hits
+from howler.services.hit_service import convert_hit
+from howler.utils import json_utils
+from howler.utils.dict_utils import flatten, prune
+
+HIT_COUNT = 20
+
+# flatten (and so convert_hit) is much slower than the other hot paths, so it is only run on a sample of the hits
+SAMPLE_COUNT = 2
+
+
+@pytest.fixture(scope="module")
+def hits() -> list[Hit]:
+    # Seed the generator, so that the hits have the same shape on every run and timings can be compared to baselines
+    random.seed(HIT_COUNT)
+    return generate_hits(["admin", "user", "goose", "huey"], HIT_COUNT, prune_hit=True)
+
+
+@pytest.fixture(scope="module")
+def hit_dicts(hits: list[Hit]) -> list[dict]:
+    return [hit.as_primitives() for hit in hits]
+
+
+@pytest.fixture(scope="module")
+def collection() -> ESCollection:
+    "A hit collection that is never connected to elasticsearch, as formatting output doesn't need it"
+    collection = ESCollection.__new__(ESCollection)
+    collection.model_class = Hit
+    collection.stored_fields = {name: field for name, field in Hit.flat_fields().items() if field.store}
+    collection.trusted_reads = False
+    collection.projections = {name: Projection(projection) for name, projection in DEFAULT_PROJECTIONS["hit"].items()}
+    return collection
+
+
+def test_convert_hit(benchmark, hit_dicts: list[dict]):
+    new_hits = []
+    for data in hit_dicts[:SAMPLE_COUNT]:
+        data = deepcopy(data)
+        data["howler"].pop("bundles", None)
+        data["howler"].pop("hits", None)
+        new_hits.append(data)
+
+    def run():
+        for data in new_hits:
+            convert_hit(data, unique=False, ignore_extra_values=True)
+
+    benchmark(run, rounds=3)
+
+
+def test_hit_init(benchmark, hit_dicts: list[dict]):
+    def run():
+        for data in hit_dicts:
+            Hit(data)
+
+    benchmark(run, rounds=5)
+
+
+def test_hit_as_primitives(benchmark, hits: list[Hit]):
+    def run():
+        for hit in hits:
+            hit.as_primitives()
+
+    benchmark(run, rounds=10)
+
+
+@pytest.mark.parametrize("as_obj", [True, False])
+def test_format_output(benchmark, collection: ESCollection, hit_dicts: list[dict], as_obj: bool):
+    results = [{"_id": data["howler"]["id"], "_index": "hit", "_source": data} for data in hit_dicts]
+
+    def run():
+        # _format_output consumes the source of the result, so each round formats a fresh copy
+        for result in deepcopy(results):
+            collection._format_output(result, as_obj=as_obj)
+
+    benchmark(run, rounds=5)
+
+
+@pytest.fixture(scope="module")
+def search_results(hit_dicts: list[dict]) -> list[dict]:
+    "The results of a 1000 rows hit search, as returned by elasticsearch"
+    return [{"_id": str(index), "_index": "hit", "_source": hit_dicts[index % len(hit_dicts)]} for index in range(1000)]
+
+
+def _search(collection: ESCollection, search_results: list[dict]) -> list[dict]:
+    # What the API does with most searches: build the hits, read a few fields and serialize them back
+    output = []
+    for result in deepcopy(search_results):
+        hit = collection._format_output(result, fields="*")
+        if hit.howler.status != "resolved":
+            output.append(hit.as_primitives())
+
+    return output
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_search_1000_rows(benchmark, monkeypatch, collection: ESCollection, search_results: list[dict], trusted: bool):
+    monkeypatch.setattr(collection, "trusted_reads", trusted)
+
+    benchmark(_search, collection, search_results, rounds=3)
+
+
+def test_search_1000_rows_memory(monkeypatch, collection: ESCollection, search_results: list[dict]):
+    peaks = {}
+    for trusted in [False, True]:
+        monkeypatch.setattr(collection, "trusted_reads", trusted)
+
+        tracemalloc.start()
+        try:
+            hits = [collection._format_output(result, fields="*") for result in deepcopy(search_results)]
+            peaks[trusted] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        del hits
+
+    print(  # noqa: T201
+        f"search_1000_rows: peak {peaks[False] / 2**20:.1f}MiB validated, {peaks[True] / 2**20:.1f}MiB trusted"
+    )
+
+    assert peaks[True] < peaks[False]
+
+
+def test_projection_payload_size(collection: ESCollection, search_results: list[dict]):
+    sizes = {}
+    for profile in ["detail", "list"]:
+        fields = collection.get_projection(profile)
+
+        # Elasticsearch only returns the fields of the projection, which is what pruning the source does
+        items = []
+        for result in deepcopy(search_results):
+            result["_source"] = prune(result["_source"], fields, collection.stored_fields, mapping_class=Mapping)
+            items.append(collection._format_output(result, fields, as_obj=False))
+
+        sizes[profile] = len(json_utils.dumpb(items))
+
+    print(  # noqa: T201
+        f"projection_payload_size: {sizes['detail'] / 2**20:.2f}MiB detail, {sizes['list'] / 2**20:.2f}MiB list "
+        f"({1 - sizes['list'] / sizes['detail']:.0%} smaller)"
+    )
+
+    assert sizes["list"] < sizes["detail"]
+
+
+def test_classification(benchmark):
+    cl_engine = loader.get_classification(
+        yml_config=os.path.join(os.path.dirname(os.path.dirname(__file__)), "classification.yml")
+    )
+    classifications = ["U//REL TO DEPTS", "R//GOD//REL TO G1", "UNRESTRICTED//REL TO DEPARTMENT 2", "RESTRICTED"]
+
+    def run():
+        for _ in range(50):
+            for c12n in classifications:
+                cl_engine.normalize_classification(c12n)
+                for user_c12n in classifications:
+                    cl_engine.is_accessible(user_c12n, c12n)
+
+    benchmark(run)
+
+
+def test_flatten(benchmark, hit_dicts: list[dict]):
+    def run():
+        for data in hit_dicts[:SAMPLE_COUNT]:
+            flatten(data, odm=Hit)
+
+    benchmark(run, rounds=3)
+
+
+def test_prune(benchmark, hit_dicts: list[dict]):
+    fields = {name: field for name, field in Hit.flat_fields().items() if field.store}
+    keys = ["howler.id", "howler.analytic", "howler.detection", "howler.status", "event.created", "destination"]
+
+    def run():
+        for data in hit_dicts:
+            prune(data, keys, fields, mapping_class=Mapping)
+
+    benchmark(run, rounds=10)
+
+
+def test_painless_scripts(benchmark, collection: ESCollection, hits: list[Hit]):
+    helper = OdmHelper(Hit)
+    operations = []
+    for hit in hits:
+        operations.extend(
+            [
+                helper.update("howler.status", hit.howler.status),
+                helper.update("howler.assignment", hit.howler.assignment),
+                helper.list_add("howler.labels.generic", "label", if_missing=True),
+                helper.list_merge("howler.hits", [hit.howler.id]),
+                helper.list_remove("howler.labels.generic", "other"),
+            ]
+        )
+
+    benchmark(collection._create_scripts_from_operations, operations, rounds=50)
+
+
+@pytest.fixture(params=["json", "orjson"])
+def json_backend(request, monkeypatch):
+    if request.param == "orjson" and json_utils.orjson is None:
+        pytest.skip("orjson is not installed")
+
+    monkeypatch.setattr(json_utils, "BACKEND", request.param)
+    return request.param
+
+
+@pytest.fixture(scope="module")
+def search_response(hit_dicts: list[dict]) -> dict:
+    "A large search response, as returned by the API: 250 full hits"
+    items = [deepcopy(hit_dicts[index % len(hit_dicts)]) for index in range(250)]
+    return {
+        "api_response": {"offset": 0, "rows": len(items), "total": len(items), "items": items},
+        "api_error_message": "",
+        "api_warning": [],
+        "api_server_version": "benchmark",
+        "api_status_code": 200,
+    }
+
+
+def test_encode_search_response(benchmark, json_backend: str, search_response: dict):
+    benchmark(json_utils.dumpb, search_response, rounds=10)
+
+
+def test_decode_search_response(benchmark, json_backend: str, search_response: dict):
+    # Elasticsearch responses are decoded from bytes
+    encoded = json_utils.dumpb(
+        {
+            "hits": {
+                "hits": [
+                    {"_id": str(index), "_source": item}
+                    for index, item in enumerate(search_response["api_response"]["items"])
+                ]
+            }
+        }
+    )
+
+    benchmark(json_utils.loads, encoded, rounds=10)
+
+
+def test_bulk_plan(benchmark, json_backend: str, hits: list[Hit]):
+    def run():
+        plan = ElasticBulkPlan(["howler-hit_hot"], model=Hit)
+        for hit in hits:
+            plan.add_upsert_operation(hit.howler.id, hit)
+
+        plan.get_plan_data()
+
+    benchmark(run, rounds=10)
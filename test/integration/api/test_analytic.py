@@ -3,6 +3,7 @@ import json
 import pytest
 from conftest import get_api_data
 
+from howler.cronjobs.rules import get_watermark, set_watermark
 from howler.datastore.howler_store import HowlerDatastore
 from howler.odm.models.analytic import Analytic
 from howler.odm.random_data import create_analytics, wipe_analytics
@@ -28,6 +29,25 @@ def test_get_analytics(datastore: HowlerDatastore, login_session):
     assert len(resp) == len(datastore.analytic.search("analytic_id:*")["items"])
 
 
+def test_get_analytics_not_modified(datastore: HowlerDatastore, login_session):
+    session, host = login_session
+
+    res = get_api_data(session, f"{host}/api/v1/analytic", raw=True)
+    etag = res.headers["ETag"]
+
+    res = get_api_data(session, f"{host}/api/v1/analytic", raw=True, headers={"If-None-Match": etag})
+    assert res.status_code == 304
+
+    analytic = datastore.analytic.search("analytic_id:*", rows=1)["items"][0]
+    analytic.description = "test-etag"
+    datastore.analytic.save(analytic.analytic_id, analytic)
+
+    res = get_api_data(session, f"{host}/api/v1/analytic", raw=True, headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.headers["ETag"] != etag
+    assert any(analytic["description"] == "test-etag" for analytic in res.json()["api_response"])
+
+
 def test_get_analytic(datastore: HowlerDatastore, login_session):
     session, host = login_session
 
@@ -151,6 +171,18 @@ def test_favourite(datastore: HowlerDatastore, login_session):
     assert analytic.analytic_id not in datastore.user.search(f"uname:{uname}")["items"][0]["favourite_analytics"]
 
 
+def test_backfill(datastore: HowlerDatastore, login_session):
+    session, host = login_session
+
+    analytic: Analytic = datastore.analytic.search("_exists_:rule")["items"][0]
+    set_watermark(analytic, "2024-01-01T00:00:00.000Z")
+
+    resp = get_api_data(session, f"{host}/api/v1/analytic/{analytic.analytic_id}/backfill", method="POST")
+
+    assert resp["analytic_id"] == analytic.analytic_id
+    assert get_watermark(analytic) is None
+
+
 def test_delete(datastore: HowlerDatastore, login_session):
     session, host = login_session
 
@@ -472,6 +472,50 @@ def test_create_valid_hits(datastore, login_session):
         assert data[i]["howler"]["outline"] is not None
 
 
+def test_create_hits_stream(datastore: HowlerDatastore, login_session):
+    """Test that /api/v1/hit/ndjson creates valid hits and reports invalid lines"""
+    session, host = login_session
+
+    hit = {
+        "howler": {
+            "analytic": "A test for streaming hits",
+            "score": "0.8",
+            "outline": {
+                "threat": "10.0.0.1",
+                "target": "asdf123",
+                "indicators": ["me.ps1"],
+                "summary": "This is a summary",
+            },
+        },
+    }
+
+    lines = [json.dumps(hit) for _ in range(7)]
+    lines.insert(3, "{not json")
+    lines.insert(5, json.dumps({**hit, "howler": {**hit["howler"], "bundles": ["abc"]}}))
+
+    res = get_api_data(
+        session=session,
+        url=f"{host}/api/v1/hit/ndjson",
+        params={"chunk_size": 3},
+        data="\n".join(lines),
+        method="POST",
+        headers={"content-type": "application/x-ndjson"},
+        raw=True,
+    )
+    assert res.status_code == 200
+
+    statuses = [json.loads(line) for line in res.text.splitlines()]
+    assert sorted(status["line"] for status in statuses) == list(range(1, len(lines) + 1))
+
+    errors = [status for status in statuses if "error" in status]
+    assert sorted(status["line"] for status in errors) == [4, 6]
+
+    datastore.hit.commit()
+    for status in statuses:
+        if "error" not in status:
+            assert datastore.hit.exists(status["id"])
+
+
 def test_create_bad_name_hits(datastore, login_session):
     """Test that /api/v1/hit creates hits using valid data with a bad anayltic name"""
     session, host = login_session
@@ -1186,3 +1230,49 @@ def test_hit_warnings(datastore: HowlerDatastore, login_session):
     )
 
     assert len(result["warnings"]) == 0
+
+
+def test_resolve_hits(datastore: HowlerDatastore, login_session):
+    session, host = login_session
+
+    hits = datastore.hit.search("howler.id:*", rows=3, as_obj=False)["items"]
+    hit = hits[0]
+
+    overview = get_api_data(
+        session,
+        f"{host}/api/v1/overview/",
+        method="POST",
+        data=json.dumps({"analytic": hit["howler"]["analytic"], "content": "# Resolve"}),
+    )
+    template = get_api_data(
+        session,
+        f"{host}/api/v1/template/",
+        method="POST",
+        data=json.dumps({"analytic": hit["howler"]["analytic"], "type": "personal", "keys": ["howler.id"]}),
+    )
+
+    try:
+        resp = get_api_data(
+            session,
+            f"{host}/api/v1/hit/resolve/",
+            method="POST",
+            data=json.dumps([h["howler"]["id"] for h in hits] + ["not_a_hit"]),
+        )
+
+        assert sorted(resp.keys()) == sorted(h["howler"]["id"] for h in hits)
+        assert resp[hit["howler"]["id"]]["template"]["template_id"] == template["template_id"]
+
+        # Overviews of the detection take precedence over the one of the analytic
+        resolved_overview = resp[hit["howler"]["id"]]["overview"]
+        assert resolved_overview["analytic"] == hit["howler"]["analytic"]
+        assert resolved_overview["detection"] in [None, hit["howler"].get("detection", None)]
+        if resolved_overview["detection"] is None:
+            assert resolved_overview["overview_id"] == overview["overview_id"]
+    finally:
+        get_api_data(session, f"{host}/api/v1/overview/{overview['overview_id']}/", method="DELETE")
+        get_api_data(session, f"{host}/api/v1/template/{template['template_id']}/", method="DELETE")
+
+    with pytest.raises(APIError) as err:
+        get_api_data(session, f"{host}/api/v1/hit/resolve/", method="POST", data=json.dumps({"id": "a"}))
+
+    assert "400" in str(err.value)
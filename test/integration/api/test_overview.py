@@ -131,3 +131,26 @@ def test_set_overview(datastore: HowlerDatastore, login_session):
 
     updated_overview = datastore.overview.get(id, as_obj=True)
     assert updated_overview.content == "Potato"
+
+
+def test_get_overviews_not_modified(datastore: HowlerDatastore, login_session):
+    session, host = login_session
+
+    res = get_api_data(session, f"{host}/api/v1/overview/", raw=True)
+    etag = res.headers["ETag"]
+
+    res = get_api_data(session, f"{host}/api/v1/overview/", raw=True, headers={"If-None-Match": etag})
+    assert res.status_code == 304
+
+    # Any change to the overviews changes the etag
+    get_api_data(
+        session,
+        f"{host}/api/v1/overview/",
+        method="POST",
+        data=json.dumps({"analytic": "test-etag", "content": "# Test"}),
+    )
+
+    res = get_api_data(session, f"{host}/api/v1/overview/", raw=True, headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.headers["ETag"] != etag
+    assert any(overview["analytic"] == "test-etag" for overview in res.json()["api_response"])
@@ -1,3 +1,5 @@
+import json
+
 import pytest
 from conftest import APIError, get_api_data
 
@@ -50,6 +52,34 @@ def test_facet_search(datastore, login_session):
             assert isinstance(v, int)
 
 
+def test_facet_search_paging(datastore, login_session):
+    session, host = login_session
+
+    for collection in collections:
+        full = get_api_data(session, f"{host}/api/v1/search/facet/{collection}/name/", params={"rows": 100})
+
+        params = {"rows": 3, "after": "*"}
+        paged = {}
+        while params["after"]:
+            resp = get_api_data(session, f"{host}/api/v1/search/facet/{collection}/name/", params=params)
+            assert len(resp["items"]) <= 3
+            paged.update(resp["items"])
+            params["after"] = resp["next_after"]
+
+        assert paged == full
+        assert list(paged.keys()) == sorted(paged.keys())
+
+        resp = get_api_data(
+            session,
+            f"{host}/api/v1/search/facet/{collection}/name/",
+            params={"after": "*", "prefix": "test_", "ignore_case": True},
+        )
+        assert sorted(resp["items"].keys()) == sorted(k for k in full.keys() if k.lower().startswith("test_"))
+
+        resp = get_api_data(session, f"{host}/api/v1/search/facet/{collection}/name/", params={"contains": "TEST"})
+        assert sorted(resp.keys()) == sorted(k for k in full.keys() if "TEST" in k)
+
+
 # noinspection PyUnusedLocal
 def test_grouped_search(datastore, login_session):
     session, host = login_session
@@ -61,6 +91,24 @@ def test_grouped_search(datastore, login_session):
             assert v["total"] == 1 and "value" in v
 
 
+def test_grouped_search_paging(datastore, login_session):
+    session, host = login_session
+
+    for collection in collections:
+        params = {"rows": 3, "after": "*", "fl": "name"}
+        values = []
+        while params["after"]:
+            resp = get_api_data(session, f"{host}/api/v1/search/grouped/{collection}/name/", params=params)
+            for group in resp["items"]:
+                assert group["total"] == len(group["items"]) == 1
+                assert group["items"][0]["name"] == group["value"]
+            values.extend(group["value"] for group in resp["items"])
+            params["after"] = resp["next_after"]
+
+        assert len(values) >= TEST_SIZE
+        assert values == sorted(values)
+
+
 # noinspection PyUnusedLocal
 def test_histogram_search(datastore, login_session):
     session, host = login_session
@@ -97,6 +145,22 @@ def test_search(datastore, login_session):
         assert TEST_SIZE <= resp["total"] >= len(resp["items"])
 
 
+def test_search_profile(datastore, login_session):
+    session, host = login_session
+
+    resp = get_api_data(session, f"{host}/api/v1/search/hit/", params={"query": "howler.id:*", "profile": "list"})
+    assert len(resp["items"]) > 0
+    for item in resp["items"]:
+        assert "id" in item
+        assert "log" not in item["howler"]
+        assert "comment" not in item["howler"]
+
+    with pytest.raises(APIError) as api_err:
+        get_api_data(session, f"{host}/api/v1/search/hit/", params={"query": "howler.id:*", "profile": "missing"})
+
+    assert "400" in str(api_err)
+
+
 # noinspection PyUnusedLocal
 def test_get_fields(datastore, login_session):
     session, host = login_session
@@ -172,3 +236,164 @@ def test_search_fail(datastore, login_session):
             )
 
         assert "400" in str(api_err)
+
+
+def test_batch_search(datastore, login_session):
+    session, host = login_session
+
+    searches = [
+        {"type": "search", "index": "user", "query": "id:*"},
+        {"type": "count", "index": "user", "query": "id:*"},
+        {"type": "facet", "index": "user", "field": "name"},
+        {"type": "histogram", "index": "user", "field": "api_quota"},
+        {"type": "stats", "index": "user", "field": "api_quota"},
+        {"type": "facet", "index": "user", "field": "not_a_field"},
+        {"type": "count", "index": "hit", "query": "--1123!@#21123!@#9sfg8d76dfvhjkln543"},
+        {"type": "not_a_type", "index": "user"},
+        {"type": "search", "index": "user", "query": "id:*", "sort": ["id asc"]},
+        {"type": "search", "index": "user", "query": "id:*", "rows": "ten"},
+        {"type": "histogram", "index": "user", "field": "api_quota", "start": 0, "end": 10, "gap": 0},
+        {"type": "histogram", "index": "user", "field": "api_quota", "start": [0], "end": 10, "gap": 1},
+        {"type": "count", "query": "id:*"},
+        {"type": "count", "index": "", "query": "id:*"},
+        {"type": "count", "index": ["user"], "query": "id:*"},
+        {"type": "facet", "index": "user"},
+        {"type": "facet", "index": "user", "field": ["name"]},
+    ]
+
+    resp = get_api_data(
+        session,
+        f"{host}/api/v1/search/batch/",
+        data=json.dumps(searches),
+        method="POST",
+    )
+
+    assert len(resp) == len(searches)
+
+    search_result, count_result, facet_result, histogram_result, stats_result = [r["result"] for r in resp[:5]]
+    assert all(r["error"] is None for r in resp[:5])
+    assert search_result["total"] == count_result["count"] >= TEST_SIZE
+    assert len(facet_result) == TEST_SIZE
+    for k, v in histogram_result.items():
+        assert isinstance(int(k), int) and isinstance(v, int)
+    assert sorted(list(stats_result.keys())) == ["avg", "count", "max", "min", "sum"]
+
+    for failed in resp[5:]:
+        assert failed["result"] is None
+        assert failed["error"]
+
+
+def test_batch_search_fail(datastore, login_session):
+    session, host = login_session
+
+    for data in [{"type": "search"}, [], [{"type": "count", "index": "user", "query": "id:*"}] * 51]:
+        with pytest.raises(APIError) as api_err:
+            get_api_data(session, f"{host}/api/v1/search/batch/", data=json.dumps(data), method="POST")
+
+        assert "400" in str(api_err)
+
+
+def test_export(datastore, login_session):
+    session, host = login_session
+
+    for collection in collections:
+        search_resp = get_api_data(session, f"{host}/api/v1/search/{collection}/", params={"query": "id:*"})
+
+        for compress in [False, True]:
+            res = get_api_data(
+                session,
+                f"{host}/api/v1/search/{collection}/export/",
+                params={"query": "id:*", "fl": "id,name", "gzip": compress},
+                raw=True,
+            )
+            assert res.status_code == 200
+
+            lines = [json.loads(line) for line in res.text.splitlines()]
+            assert lines[-1] == {"_cursor": None}
+
+            items = [line for line in lines if "_cursor" not in line]
+            assert len(items) == search_resp["total"]
+            for item in items:
+                assert sorted(item.keys()) == ["id", "name"]
+
+
+def test_export_fail(datastore, login_session):
+    session, host = login_session
+
+    for params in [{}, {"query": "id:*", "cursor": "not_a_cursor"}, {"query": "id:*", "buffer_size": "a"}]:
+        with pytest.raises(APIError) as api_err:
+            get_api_data(session, f"{host}/api/v1/search/user/export/", params=params)
+
+        assert "400" in str(api_err)
+
+
+def test_async_search(datastore, login_session):
+    session, host = login_session
+
+    search_resp = get_api_data(session, f"{host}/api/v1/search/user/", params={"query": "id:*", "fl": "id"})
+
+    resp = get_api_data(
+        session,
+        f"{host}/api/v1/search/async/user/",
+        data=json.dumps({"type": "lucene", "query": "id:*", "fl": "id", "wait_for_completion_timeout": 0}),
+        method="POST",
+    )
+    assert resp["index"] == "user"
+    assert resp["type"] == "lucene"
+
+    while resp["is_running"]:
+        resp = get_api_data(session, f"{host}/api/v1/search/async/user/{resp['id']}/")
+
+    assert resp["result"]["total"] == search_resp["total"]
+    assert resp["result"]["items"] == search_resp["items"]
+
+    # Results can be retrieved until the search is deleted
+    assert get_api_data(session, f"{host}/api/v1/search/async/user/{resp['id']}/")["result"] == resp["result"]
+
+    get_api_data(session, f"{host}/api/v1/search/async/user/{resp['id']}/", method="DELETE")
+
+    with pytest.raises(APIError) as api_err:
+        get_api_data(session, f"{host}/api/v1/search/async/user/{resp['id']}/")
+
+    assert "404" in str(api_err)
+
+
+def test_async_eql_search(datastore, login_session):
+    session, host = login_session
+
+    resp = get_api_data(
+        session,
+        f"{host}/api/v1/search/async/hit/",
+        data=json.dumps({"type": "eql", "query": "any where true", "rows": 5}),
+        method="POST",
+    )
+    assert resp["type"] == "eql"
+
+    while resp["is_running"]:
+        resp = get_api_data(session, f"{host}/api/v1/search/async/hit/{resp['id']}/")
+
+    assert len(resp["result"]["items"]) <= 5
+
+    get_api_data(session, f"{host}/api/v1/search/async/hit/{resp['id']}/", method="DELETE")
+
+
+def test_async_search_fail(datastore, login_session):
+    session, host = login_session
+
+    for data in [
+        {"type": "lucene"},
+        {"type": "lucene", "query": ""},
+        {"type": "lucene", "query": ["id:*"]},
+        {"type": None, "query": "id:*"},
+        {"type": "not_a_type", "query": "id:*"},
+        {"type": "lucene", "query": "--1123!@#21123!@#9sfg8d76dfvhjkln543"},
+    ]:
+        with pytest.raises(APIError) as api_err:
+            get_api_data(session, f"{host}/api/v1/search/async/user/", data=json.dumps(data), method="POST")
+
+        assert "400" in str(api_err)
+
+    with pytest.raises(APIError) as api_err:
+        get_api_data(session, f"{host}/api/v1/search/async/user/not_a_search/")
+
+    assert "404" in str(api_err)
@@ -152,3 +152,26 @@ def test_set_template(datastore: HowlerDatastore, login_session):
 
     updated_template = datastore.template.get(id, as_obj=True)
     assert updated_template.keys == ["event.id"]
+
+
+def test_get_templates_not_modified(datastore: HowlerDatastore, login_session):
+    session, host = login_session
+
+    res = get_api_data(session, f"{host}/api/v1/template/", raw=True)
+    etag = res.headers["ETag"]
+
+    res = get_api_data(session, f"{host}/api/v1/template/", raw=True, headers={"If-None-Match": etag})
+    assert res.status_code == 304
+
+    # Any change to the templates changes the etag
+    get_api_data(
+        session,
+        f"{host}/api/v1/template/",
+        method="POST",
+        data=json.dumps({"analytic": "test-etag", "type": "personal", "keys": ["howler.id"]}),
+    )
+
+    res = get_api_data(session, f"{host}/api/v1/template/", raw=True, headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.headers["ETag"] != etag
+    assert any(template["analytic"] == "test-etag" for template in res.json()["api_response"])
@@ -89,6 +89,25 @@ def test_get_views(datastore, login_session):
     assert all(t["type"] == "global" or t["owner"] in ["admin", "none"] for t in resp)
 
 
+def test_get_views_not_modified(datastore: HowlerDatastore, login_session):
+    session, host = login_session
+
+    res = get_api_data(session, f"{host}/api/v1/view/", raw=True)
+    etag = res.headers["ETag"]
+
+    res = get_api_data(session, f"{host}/api/v1/view/", raw=True, headers={"If-None-Match": etag})
+    assert res.status_code == 304
+
+    # Writes made straight to the datastore change the etag too
+    view = datastore.view.search("view_id:*", rows=1, as_obj=False)["items"][0]
+    datastore.view.update(view["view_id"], [(datastore.view.UPDATE_SET, "title", "test-etag")])
+
+    res = get_api_data(session, f"{host}/api/v1/view/", raw=True, headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.headers["ETag"] != etag
+    assert any(view["title"] == "test-etag" for view in res.json()["api_response"])
+
+
 # noinspection PyUnusedLocal
 def test_remove_view(datastore: HowlerDatastore, login_session):
     session, host = login_session
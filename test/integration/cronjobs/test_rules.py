@@ -1,15 +1,21 @@
 import textwrap
+from datetime import datetime, timedelta
 
+from howler.config import config
 from howler.cronjobs.rules import (
     create_correlated_bundle,
     create_executor,
+    get_watermark,
     register_rules,
+    reset_watermark,
+    set_watermark,
     setup_job,
 )
 from howler.odm.models.analytic import Analytic
 from howler.odm.models.hit import Hit
 from howler.odm.random_data import create_analytics, create_hits
 from howler.odm.randomizer import random_model_obj
+from howler.services import hit_service
 
 
 def test_correlated_bundle(datastore_connection):
@@ -60,6 +66,15 @@ def test_registration(datastore_connection):
     register_rules(test_override=True)
 
     assert scheduler.get_job(f"rule_{rule.analytic_id}")
+    assert scheduler.get_job("sync_rules")
+
+    # Synchronizing the rules removes the cronjobs of deleted rules
+    datastore_connection.analytic.delete(rule.analytic_id)
+    datastore_connection.analytic.commit()
+
+    register_rules(test_override=True)
+
+    assert not scheduler.get_job(f"rule_{rule.analytic_id}")
 
     scheduler.remove_all_jobs()
 
@@ -133,3 +148,111 @@ def test_executor(datastore_connection):
     eql_executor()
     sigma_executor()
     create_executor(not_a_rule)()
+
+
+def test_executor_watermark(datastore_connection):
+    rule: Analytic = random_model_obj(Analytic)
+    rule.rule = "howler.id:*"
+    rule.rule_type = "lucene"
+    rule.rule_crontab = "0 0 * * *"
+
+    reset_watermark(rule.analytic_id)
+    assert get_watermark(rule) is None
+
+    create_executor(rule)()
+
+    watermark = get_watermark(rule)
+    assert watermark
+
+    # Recently created hits are left for the next run, since they may not be searchable yet
+    lag = timedelta(seconds=config.system.scheduler.rule_window_lag)
+    assert watermark <= (datetime.utcnow() - lag).isoformat(timespec="milliseconds") + "Z"
+
+    # Subsequent runs only evaluate the hits created since the previous one, and move the watermark forward
+    create_hits(datastore_connection, hit_count=2)
+    datastore_connection.hit.commit()
+
+    create_executor(rule)()
+    assert get_watermark(rule) > watermark
+
+    # Changing the rule invalidates the watermark
+    rule.rule = "howler.id:* AND howler.score:>=0"
+    assert get_watermark(rule) is None
+
+    set_watermark(rule, watermark)
+    create_executor(rule)(full=True)
+    assert get_watermark(rule) > watermark
+
+    reset_watermark(rule.analytic_id)
+
+
+def test_executor_watermark_late_hits(datastore_connection):
+    rule: Analytic = random_model_obj(Analytic)
+    rule.rule = f"howler.analytic:{rule.analytic_id}"
+    rule.rule_type = "lucene"
+    rule.rule_crontab = "0 0 * * *"
+
+    scheduler = config.system.scheduler
+    original_lag = scheduler.rule_window_lag
+    scheduler.rule_window_lag = 0
+    try:
+        reset_watermark(rule.analytic_id)
+        create_executor(rule)()
+        assert get_watermark(rule)
+
+        # A hit created long before the watermark, but only ingested now, is still evaluated on the next run
+        hit, _ = hit_service.convert_hit(
+            {
+                "howler.analytic": rule.analytic_id,
+                "howler.detection": "late",
+                "howler.score": 0,
+                "event.created": "2020-01-01T00:00:00Z",
+            },
+            unique=False,
+        )
+        datastore_connection.hit.save(hit.howler.id, hit)
+        datastore_connection.hit.commit()
+
+        create_executor(rule)()
+
+        assert datastore_connection.hit.get(hit.howler.id).howler.bundles
+    finally:
+        scheduler.rule_window_lag = original_lag
+        reset_watermark(rule.analytic_id)
+
+
+def test_executor_large_bundle(datastore_connection):
+    rule: Analytic = random_model_obj(Analytic)
+    rule.rule = f"howler.analytic:{rule.analytic_id}"
+    rule.rule_type = "lucene"
+    rule.rule_crontab = "0 0 * * *"
+
+    # More children than a single search page or a script with one clause per child could handle
+    plan = datastore_connection.hit.get_bulk_plan()
+    for _ in range(2500):
+        hit: Hit = random_model_obj(Hit)
+        hit.howler.analytic = rule.analytic_id
+        hit.howler.bundles = []
+        hit.howler.is_bundle = False
+        plan.add_insert_operation(hit.howler.id, hit)
+    datastore_connection.hit.bulk(plan)
+    datastore_connection.hit.commit()
+
+    try:
+        create_executor(rule)(full=True)
+        datastore_connection.hit.commit()
+
+        bundle: Hit = datastore_connection.hit.search(f"howler.is_bundle:true AND howler.hits:{hit.howler.id}", rows=1)[
+            "items"
+        ][0]
+
+        assert len(bundle.howler.hits) == 2500
+        assert len(set(bundle.howler.hits)) == 2500
+        assert bundle.howler.bundle_size == 2500
+
+        # Synchronizing again does not duplicate any children
+        assert hit_service.sync_bundle_members(bundle.howler.id) == 2500
+        assert len(datastore_connection.hit.get(bundle.howler.id).howler.hits) == 2500
+    finally:
+        datastore_connection.hit.delete_by_query(f"howler.analytic:{rule.analytic_id}")
+        reset_watermark(rule.analytic_id)
@@ -8,8 +8,8 @@ import pytest
 from datemath import dm
 from retrying import retry
 
-from howler.datastore.collection import ESCollection
-from howler.datastore.exceptions import VersionConflictException
+from howler.datastore.collection import ESCollection, ids_filter, terms_filter
+from howler.datastore.exceptions import SearchException, VersionConflictException
 
 with warnings.catch_warnings():
     warnings.simplefilter("ignore")
@@ -399,6 +399,31 @@ def _test_stats(c: ESCollection):
         assert v > 0
 
 
+def _test_prepare_msearch(c: ESCollection):
+    operations = [
+        ("search", {"query": "id:*", "rows": 5, "as_obj": False}, c.search("id:*", rows=5, as_obj=False)),
+        ("count", {"query": "id:*"}, c.count("id:*")),
+        ("facet", {"field": "classification_s"}, c.facet("classification_s")),
+        ("stats", {"field": "lvl_i"}, c.stats("lvl_i")),
+        (
+            "histogram",
+            {"field": "lvl_i", "start": 0, "end": 1000, "gap": 100},
+            c.histogram("lvl_i", 0, 1000, 100),
+        ),
+    ]
+
+    prepared = [c.prepare_msearch(operation, **kwargs) for operation, kwargs, _ in operations]
+
+    body = []
+    for header, query_body, _ in prepared:
+        body.extend([header, query_body])
+
+    responses = c.datastore.client.msearch(searches=body)["responses"]
+
+    for (_, _, expected), (_, _, format_result), response in zip(operations, prepared, responses):
+        assert format_result(response) == expected
+
+
 TEST_FUNCTIONS = [
     (_test_exists, "exists"),
     (_test_get, "get"),
@@ -418,9 +443,63 @@ TEST_FUNCTIONS = [
     (_test_histogram, "histogram"),
     (_test_facet, "facet"),
     (_test_stats, "stats"),
+    (_test_prepare_msearch, "prepare_msearch"),
 ]
 
 
+def test_structured_filters(es_connection: ESCollection):
+    c = es_connection
+    ids = [f"filtered_{i}" for i in range(10_000)]
+
+    for i in range(5):
+        c.save(ids[i * 1000], {"filtered_b": True, "lvl_i": i})
+    c.commit()
+
+    try:
+        assert c.search("*:*", filters=ids_filter(ids))["total"] == 5
+        assert c.search("*:*", filters=[ids_filter(ids), terms_filter("lvl_i", [0, 1])])["total"] == 2
+        assert c.count("*:*", filters=[ids_filter(ids)])["count"] == 5
+        assert len(list(c.stream_search("*:*", filters=[ids_filter(ids)], fl="lvl_i"))) == 5
+
+        assert c.update_by_query("*:*", [(c.UPDATE_SET, "lvl_i", 100)], filters=[ids_filter(ids[:2000])])
+        c.commit()
+        assert c.count("lvl_i:100", filters=[ids_filter(ids)])["count"] == 2
+
+        c.delete_by_query("*:*", filters=[ids_filter(ids[:2000]), terms_filter("lvl_i", [100])])
+        c.commit()
+        assert c.count("*:*", filters=[ids_filter(ids)])["count"] == 3
+
+        with pytest.raises(SearchException):
+            c.search("*:*", filters=[{"script": {}}])
+    finally:
+        c.delete_by_query("filtered_b:true")
+        c.commit()
+
+
+def test_structured_filters_benchmark(es_connection: ESCollection):
+    "Compare the latency of large id set queries, as a lucene OR query and as a structured filter"
+    c = es_connection
+    # Lucene queries are limited to 1024 clauses by default, so the comparison can't go any higher
+    ids = [f"benchmark_{i}" for i in range(1_000)]
+
+    start = time.perf_counter()
+    for _ in range(10):
+        c.search(f"id:({' OR '.join(ids)})", rows=0)
+    lucene = (time.perf_counter() - start) / 10
+
+    start = time.perf_counter()
+    for _ in range(10):
+        c.search("*:*", rows=0, filters=[ids_filter(ids)])
+    structured = (time.perf_counter() - start) / 10
+
+    print(f"Searching by {len(ids)} ids: {lucene * 1000:.2f}ms lucene, {structured * 1000:.2f}ms structured")  # noqa: T201
+
+    # The structured filter scales well past the clause limit
+    start = time.perf_counter()
+    c.search("*:*", rows=0, filters=[ids_filter(f"benchmark_{i}" for i in range(100_000))])
+    print(f"Searching by 100000 ids: {(time.perf_counter() - start) * 1000:.2f}ms structured")  # noqa: T201
+
+
 # noinspection PyShadowingNames
 @pytest.mark.parametrize("function", [f[0] for f in TEST_FUNCTIONS], ids=[f[1] for f in TEST_FUNCTIONS])
 def test_es(es_connection: ESCollection, function):
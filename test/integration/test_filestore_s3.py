@@ -0,0 +1,50 @@
+import io
+import os
+
+import pytest
+
+from howler.filestore import FileStore, FileStoreException
+from howler.filestore.transport.base import CHUNK_SIZE
+from howler.utils.uid import get_random_id
+
+# The minio instance the tests run against, see azure-pipelines.yml
+S3_URL = os.environ.get(
+    "HWL_TEST_S3_URL",
+    "s3://hwl_storage_key:Ch%40ngeTh%21sPa33w0rd@localhost:9000/test?s3_bucket=howler-test&use_ssl=false",
+)
+
+
+@pytest.fixture(scope="module")
+def filestore(tmp_path_factory):
+    try:
+        fs = FileStore(f"file://{tmp_path_factory.mktemp('near')}", S3_URL)
+    except Exception:
+        pytest.skip("Could not connect to S3 storage")
+
+    with fs:
+        yield fs
+
+
+def test_s3_filestore(filestore):
+    path = f"{get_random_id()}/file.txt"
+
+    filestore.put(path, b"content")
+    assert filestore.exists(path, location="far")
+    assert filestore.get(path, location="far") == b"content"
+
+    content = os.urandom(CHUNK_SIZE * 6)
+    filestore.write(f"{path}.large", io.BytesIO(content), location="far")
+    assert b"".join(filestore.read(f"{path}.large", location="far")) == content
+
+    filestore.delete(path, location="near")
+    assert filestore.get(path) == b"content"
+    assert filestore.promote(path)
+    assert filestore.exists(path, location="near")
+    assert filestore.demote(path)
+    assert not filestore.exists(path, location="near")
+
+    filestore.delete(path)
+    filestore.delete(f"{path}.large")
+    assert not filestore.exists(path)
+    with pytest.raises(FileStoreException):
+        filestore.read(path)
@@ -174,6 +174,37 @@ def test_expiring_sets(redis_connection):
             assert not es.exist(values[2])
 
 
+def test_expiring_claims(redis_connection):
+    if redis_connection:
+        from howler.remote.datatypes.claims import ExpiringClaims
+
+        claims = ExpiringClaims("test-expiring-claims", ttl=1)
+        claims.release("a", "b", "c")
+
+        assert claims.claim("a", "first") is None
+        assert claims.claim("a", "second") == ("first", 1)
+        assert claims.get("a") == "first"
+
+        assert claims.multi_claim({"a": "third", "b": "fourth", "c": "fifth"}) == {
+            "a": ("first", 1),
+            "b": None,
+            "c": None,
+        }
+        assert claims.get("c") == "fifth"
+
+        claims.release("c")
+        assert claims.get("c") is None
+
+        # Claims are only released for the value they are held by
+        claims.release_claimed({"a": "other", "b": "fourth"})
+        assert claims.get("a") == "first"
+        assert claims.get("b") is None
+
+        time.sleep(1.1)
+        assert claims.get("a") is None
+        assert claims.claim("a", "sixth") is None
+
+
 # noinspection PyShadowingNames
 def test_lock(redis_connection):
     if redis_connection:
@@ -200,6 +231,56 @@ def test_lock(redis_connection):
         assert not t2.is_alive()
 
 
+# noinspection PyShadowingNames
+def test_expiring_lock(redis_connection):
+    if redis_connection:
+        from howler.remote.datatypes.lock import ExpiringLock
+
+        first = ExpiringLock("test-expiring-lock", 1, uuid="first")
+        second = ExpiringLock("test-expiring-lock", 1, uuid="second")
+        first.release()
+        second.release()
+
+        assert first.try_acquire()
+        assert not second.try_acquire()
+        assert first.try_acquire()
+        assert second.holder() == "first"
+
+        assert not second.release()
+        assert first.release()
+        assert first.holder() is None
+
+        assert second.try_acquire()
+
+        # The lock is lost if it is not renewed in time
+        time.sleep(1.1)
+        assert second.holder() is None
+        assert first.try_acquire()
+        first.release()
+
+
+# noinspection PyShadowingNames
+def test_membership(redis_connection):
+    if redis_connection:
+        from howler.remote.datatypes.membership import Membership
+
+        members = Membership("test-membership", timeout=2)
+        members.leave("a")
+        members.leave("b")
+
+        members.heartbeat("b")
+        members.heartbeat("a")
+        assert members.members() == ["a", "b"]
+
+        members.leave("a")
+        assert members.members() == ["b"]
+
+        time.sleep(1)
+        members.heartbeat("a")
+        time.sleep(1.1)
+        assert members.members() == ["a"]
+
+
 # noinspection PyShadowingNames,PyUnusedLocal
 def test_priority_queue(redis_connection):
     from howler.remote.datatypes.queues.priority import PriorityQueue, length, select
@@ -0,0 +1,43 @@
+import inspect
+
+import pytest
+from flask import Flask
+from mock import patch
+
+from howler.api.v1.hit import create_hits
+from howler.common.exceptions import HowlerException
+
+HIT = {"howler.analytic": "test", "howler.detection": "test", "howler.score": 0}
+
+
+@pytest.fixture(scope="module")
+def request_context():
+    app = Flask("test_app")
+
+    app.config.update(SECRET_KEY="test test")
+
+    return app
+
+
+@patch("howler.api.v1.hit.analytic_service")
+@patch("howler.api.v1.hit.dedup_service")
+@patch("howler.api.v1.hit.hit_service.create_hit")
+@patch("howler.api.v1.hit.hit_service.does_hit_exist", return_value=False)
+def test_create_hits_releases_claims(_, create_hit, dedup_service, analytic_service, request_context: Flask):
+    dedup_service.find_duplicates.return_value = {}
+
+    def fail_second(hit_id, odm, user):
+        if create_hit.call_count == 2:
+            raise HowlerException("Failed to create hit")
+
+    create_hit.side_effect = fail_second
+
+    hits = [{**HIT, "howler.data": [str(i)]} for i in range(3)]
+    with request_context.test_request_context(json=hits), pytest.raises(HowlerException):
+        inspect.unwrap(create_hits)(user={"uname": "admin"})
+
+    # The first hit was created and keeps its claim, the others can be resent without being considered duplicates
+    (released,) = dedup_service.release.call_args.args
+    created = create_hit.call_args_list[0].args[1]
+    assert len(released) == 2
+    assert created.howler.id not in {odm.howler.id for odm in released}
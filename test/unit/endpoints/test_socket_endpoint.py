@@ -0,0 +1,31 @@
+import base64
+
+import pytest
+from flask import Flask
+from mock import patch
+
+from howler.api.socket import HWL_INTERPOD_COMMS_SECRET, emit
+
+AUTHORIZATION = "Basic " + base64.b64encode(f"user:{HWL_INTERPOD_COMMS_SECRET}".encode()).decode()
+
+
+@pytest.fixture(scope="module")
+def request_context():
+    app = Flask("test_app")
+
+    app.config.update(SECRET_KEY="test test")
+
+    return app
+
+
+@patch("howler.api.socket.event_service")
+def test_emit(event_service, request_context: Flask):
+    with request_context.test_request_context(headers={"Authorization": AUTHORIZATION}, data=b'{"test": "hello"}'):
+        assert emit("broadcast").status_code == 200
+
+    event_service.emit.assert_called_once_with("broadcast", {"test": "hello"})
+
+    with request_context.test_request_context(headers={"Authorization": AUTHORIZATION}, data=b"{not json"):
+        assert emit("broadcast").status_code == 400
+
+    event_service.emit.assert_called_once()
@@ -0,0 +1,124 @@
+import gzip
+import json
+import zlib
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask, Response
+from wsproto.frame_protocol import Opcode, RsvBits
+
+import howler.api as api
+from howler.config import config
+from howler.helper.compression import COMPRESSION_INPUT_BYTES, COMPRESSION_OUTPUT_BYTES, compress_response
+from howler.helper.ws import Deflate
+
+DATA = [{"howler": {"id": str(index), "analytic": "Password Checker", "status": "open"}} for index in range(100)]
+
+
+@pytest.fixture(scope="module")
+def request_context():
+    app = Flask("test_app")
+
+    app.config.update(SECRET_KEY="test test")
+    app.add_url_rule("/api/v1/search/hit/", "search", lambda: None)
+
+    return app
+
+
+@pytest.fixture(autouse=True)
+def compression_enabled():
+    enabled = config.ui.compression.enabled
+    config.ui.compression.enabled = True
+    try:
+        yield
+    finally:
+        config.ui.compression.enabled = enabled
+
+
+def test_disabled(request_context):
+    config.ui.compression.enabled = False
+
+    with request_context.test_request_context("/api/v1/search/hit/", headers={"Accept-Encoding": "gzip"}):
+        result = compress_response(api.ok(DATA))
+        assert "Content-Encoding" not in result.headers
+        assert result.json["api_response"] == DATA
+
+
+def test_negotiated(request_context):
+    with request_context.test_request_context(
+        "/api/v1/search/hit/", headers={"Accept-Encoding": "br, gzip;q=0.8, deflate;q=0.5"}
+    ):
+        result = compress_response(api.ok(DATA))
+        assert result.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in result.vary
+        assert result.content_length == len(result.get_data())
+        assert json.loads(gzip.decompress(result.get_data()))["api_response"] == DATA
+
+    with request_context.test_request_context("/api/v1/search/hit/", headers={"Accept-Encoding": "deflate"}):
+        result = compress_response(api.ok(DATA))
+        assert result.headers["Content-Encoding"] == "deflate"
+        assert json.loads(zlib.decompress(result.get_data()))["api_response"] == DATA
+
+    path = "/api/v1/search/hit/"
+    assert COMPRESSION_OUTPUT_BYTES.labels(path)._value.get() < COMPRESSION_INPUT_BYTES.labels(path)._value.get()
+
+
+@pytest.mark.parametrize("headers", [{}, {"Accept-Encoding": "gzip;q=0"}, {"Accept-Encoding": "br"}])
+def test_not_accepted(request_context, headers):
+    with request_context.test_request_context(headers=headers):
+        result = compress_response(api.ok(DATA))
+        assert "Content-Encoding" not in result.headers
+        assert "Accept-Encoding" in result.vary
+        assert result.json["api_response"] == DATA
+
+
+def test_skipped(request_context):
+    with request_context.test_request_context(headers={"Accept-Encoding": "gzip"}):
+        # Small responses aren't worth compressing
+        assert "Content-Encoding" not in compress_response(api.ok({"success": True})).headers
+
+        # Neither are responses that are usually compressed already
+        result = compress_response(Response(b"\x89PNG" + bytes(4096), mimetype="image/png"))
+        assert "Content-Encoding" not in result.headers
+
+        assert "Content-Encoding" not in compress_response(api.not_modified()).headers
+
+
+def test_stream_negotiated(request_context):
+    chunks = [DATA[:50], DATA[50:]]
+
+    with request_context.test_request_context(headers={"Accept-Encoding": "gzip"}):
+        result = api.stream_ndjson_response(iter(chunks))
+        assert result.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in result.vary
+
+        # Streamed responses are compressed as they are generated, not by the after request hook
+        assert compress_response(result) is result
+
+        lines = gzip.decompress(b"".join(result.response)).splitlines()
+        assert [json.loads(line) for line in lines] == DATA
+
+        result = api.stream_ndjson_response(iter(chunks), compress=False)
+        assert "Content-Encoding" not in result.headers
+
+
+def test_websocket_deflate():
+    extension = Deflate(level=1, threshold=100, window_bits=10)
+    proto = SimpleNamespace(client=False)
+    rsv = RsvBits(False, False, False)
+
+    # Small messages are sent as is
+    assert extension.frame_outbound(proto, Opcode.TEXT, rsv, b"{}", True) == (rsv, b"{}")
+
+    message = json.dumps(DATA).encode()
+    for _ in range(2):
+        compressed_rsv, compressed = extension.frame_outbound(proto, Opcode.TEXT, rsv, message, True)
+        assert compressed_rsv.rsv1
+        assert len(compressed) < len(message)
+
+    # The window is reduced, but a peer using the negotiated window can still decompress every message
+    decompressor = zlib.decompressobj(-15)
+    extension = Deflate(level=1, threshold=100, window_bits=10)
+    for _ in range(2):
+        _, compressed = extension.frame_outbound(proto, Opcode.TEXT, rsv, message, True)
+        assert decompressor.decompress(compressed + b"\x00\x00\xff\xff") == message
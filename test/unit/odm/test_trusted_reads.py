@@ -0,0 +1,110 @@
+import random
+from copy import deepcopy
+
+import pytest
+
+from howler.common.exceptions import HowlerValueError
+from howler.odm.base import KeyMaskException
+from howler.odm.models.hit import Hit
+from howler.odm.random_data import generate_hits
+
+
+@pytest.fixture(scope="module")
+def hit_data() -> dict:
+    random.seed(1)
+    return generate_hits(["admin"], 1, prune_hit=True)[0].as_primitives()
+
+
+def test_trusted_matches_validated(hit_data: dict):
+    hit = Hit(deepcopy(hit_data))
+    trusted_hit = Hit(deepcopy(hit_data), trusted=True)
+
+    assert trusted_hit.as_primitives() == hit.as_primitives()
+    assert list(trusted_hit.as_primitives().keys()) == list(hit.as_primitives().keys())
+    assert trusted_hit.howler.id == hit.howler.id
+    assert trusted_hit["howler.status"] == hit["howler.status"]
+    assert trusted_hit.event.created == hit.event.created
+    assert trusted_hit.get("missing", "default") == "default"
+    assert trusted_hit == hit
+    assert trusted_hit.as_primitives(hidden_fields=True) == hit.as_primitives(hidden_fields=True)
+
+
+def test_validated_on_access(hit_data: dict):
+    data = deepcopy(hit_data)
+    data["howler"]["status"] = "not-a-status"
+
+    with pytest.raises(HowlerValueError):
+        Hit(deepcopy(data))
+
+    # Fields that are never read are never validated
+    trusted_hit = Hit(deepcopy(data), trusted=True)
+    assert trusted_hit.howler.id == data["howler"]["id"]
+    assert trusted_hit.as_primitives()["howler"]["status"] == "not-a-status"
+
+    with pytest.raises(HowlerValueError):
+        trusted_hit.howler.status
+
+    with pytest.raises(HowlerValueError):
+        Hit(deepcopy(data), trusted=True).validate()
+
+    Hit(deepcopy(hit_data), trusted=True).validate()
+
+
+def test_changes(hit_data: dict):
+    trusted_hit = Hit(deepcopy(hit_data), trusted=True)
+    trusted_hit.howler.status = "resolved"
+    trusted_hit.howler.labels.generic.append("new label")
+
+    data = trusted_hit.as_primitives()
+    assert data["howler"]["status"] == "resolved"
+    assert "new label" in data["howler"]["labels"]["generic"]
+
+    with pytest.raises(HowlerValueError):
+        trusted_hit.howler.status = "not-a-status"
+
+    # Changing the serialized data doesn't change the object it was serialized from
+    data["event"]["kind"] = "changed"
+    assert trusted_hit.as_primitives()["event"]["kind"] == hit_data["event"]["kind"]
+
+
+def test_mask(hit_data: dict):
+    trusted_hit = Hit(deepcopy(hit_data), mask=["howler.id", "howler.analytic"], trusted=True)
+
+    assert trusted_hit.howler.id == hit_data["howler"]["id"]
+    assert trusted_hit.as_primitives() == {
+        "howler": {"id": hit_data["howler"]["id"], "analytic": hit_data["howler"]["analytic"]}
+    }
+
+    with pytest.raises(KeyMaskException):
+        trusted_hit.event
+
+    with pytest.raises(KeyMaskException):
+        trusted_hit.howler.status
+
+
+def test_model_changes(hit_data: dict):
+    "Documents written before fields were added to (or removed from) the model are read like validated ones"
+    data = deepcopy(hit_data)
+    del data["howler"]["duplicates"]
+    del data["howler"]["bundle_size"]
+    data["howler"]["removed_field"] = "value"
+
+    hit = Hit(deepcopy(data))
+    trusted_hit = Hit(deepcopy(data), trusted=True)
+
+    primitives = trusted_hit.as_primitives()
+    assert primitives["howler"]["duplicates"] == 0
+    assert primitives["howler"]["bundle_size"] == 0
+    assert "removed_field" not in primitives["howler"]
+    assert primitives == hit.as_primitives()
+
+
+def test_written_back_validated(hit_data: dict):
+    data = deepcopy(hit_data)
+    data["howler"]["score"] = "not-a-score"
+
+    # Objects are fully validated before they are written back to the datastore
+    trusted_hit = Hit(deepcopy(data), trusted=True)
+    assert trusted_hit.as_primitives()["howler"]["score"] == "not-a-score"
+    with pytest.raises(HowlerValueError):
+        trusted_hit.as_primitives(hidden_fields=True)
@@ -0,0 +1,95 @@
+import time
+
+import pytest
+
+from howler.common.exceptions import HowlerValueError
+from howler.odm import base
+from howler.odm.base import Domain, Email, Model, configure_validation_cache, model, validation_cache_info
+from howler.odm.models.hit import Hit
+from howler.odm.randomizer import random_model_obj
+
+
+@pytest.fixture(autouse=True)
+def validation_cache():
+    original_size = base.VALIDATION_CACHE_SIZE
+
+    configure_validation_cache(original_size)
+    try:
+        yield
+    finally:
+        configure_validation_cache(original_size)
+
+
+@model()
+class Observables(Model):
+    domain = Domain()
+    email = Email()
+
+
+def test_validation_cache():
+    Observables({"domain": "Example.com", "email": "User@Example.com"})
+    observables = Observables({"domain": "Example.com", "email": "User@Example.com"})
+
+    assert observables.domain == "example.com"
+    assert observables.email == "user@example.com"
+
+    info = validation_cache_info()
+    assert info["domain"].hits == 1
+    assert info["domain"].misses == 1
+    assert info["email"].hits == 1
+
+    # Invalid values are memoized as well, and still raise with the context of the field
+    for _ in range(2):
+        with pytest.raises(HowlerValueError) as err:
+            Observables({"domain": "example.com", "email": "user@example.notatld"})
+
+        assert str(err.value) == (
+            "[observables.email] 'example.notatld' in email 'user@example.notatld' is not a valid Domain."
+        )
+
+    assert validation_cache_info()["email"].hits == 2
+
+
+def test_validation_cache_size():
+    configure_validation_cache(2)
+
+    for domain in ["a.com", "b.com", "c.com", "a.com"]:
+        Observables({"domain": domain, "email": "user@example.com"})
+
+    info = validation_cache_info()
+    assert info["domain"].currsize == 2
+    assert info["domain"].hits == 0
+
+    configure_validation_cache(0)
+    Observables({"domain": "a.com", "email": "user@example.com"})
+    assert validation_cache_info()["domain"].currsize == 0
+
+
+def test_validation_cache_benchmark():
+    "Compare the time needed to load the same hits repeatedly, as when reading them back from searches"
+    hits = [random_model_obj(Hit).as_primitives() for _ in range(20)]
+    observables = [
+        {"domain": hit["destination"]["domain"], "email": hit["destination"]["user"]["email"]} for hit in hits
+    ]
+
+    def load(model: type[Model], data: list[dict]) -> float:
+        start = time.perf_counter()
+        for _ in range(5):
+            for entry in data:
+                model(entry)
+        return time.perf_counter() - start
+
+    configure_validation_cache(0)
+    uncached_hits, uncached_observables = load(Hit, hits), load(Observables, observables)
+
+    configure_validation_cache(10000)
+    load(Hit, hits)
+    cached_hits, cached_observables = load(Hit, hits), load(Observables, observables)
+
+    print(  # noqa: T201
+        f"Loading {len(hits) * 5} hits: {uncached_hits * 1000:.2f}ms uncached, {cached_hits * 1000:.2f}ms cached\n"
+        f"Loading their observables: {uncached_observables * 1000:.2f}ms uncached, "
+        f"{cached_observables * 1000:.2f}ms cached"
+    )
+
+    assert cached_observables * 2 < uncached_observables
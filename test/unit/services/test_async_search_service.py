@@ -0,0 +1,129 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from howler.common.exceptions import AccessDeniedException, InvalidDataException, NotFoundException
+from howler.services import async_search_service
+
+
+class FakeHandles(dict):
+    "An in-memory stand-in for the redis hash holding the handles of a user's searches"
+
+    def items(self):
+        return dict(super().items())
+
+    def length(self):
+        return len(self)
+
+    def set(self, key, value):
+        self[key] = value
+
+
+@pytest.fixture
+def handles():
+    handles = FakeHandles()
+    with patch("howler.services.async_search_service._get_handles", return_value=handles):
+        yield handles
+
+
+@pytest.fixture
+def collection():
+    collection = MagicMock()
+    collection.submit_async_search.return_value = {
+        "id": "es_id",
+        "is_running": True,
+        "is_partial": True,
+        "result": None,
+    }
+    collection.get_async_search.return_value = {
+        "id": "es_id",
+        "is_running": False,
+        "is_partial": False,
+        "result": {"total": 0, "items": []},
+    }
+
+    with (
+        patch("howler.services.async_search_service.get_collection", return_value=lambda: collection),
+        patch("howler.services.async_search_service.has_access_control", return_value=True),
+    ):
+        yield collection
+
+
+USER = {"uname": "goose", "type": ["user"], "access_control": "howler.id:*"}
+
+
+def test_submit_and_get(handles, collection):
+    submitted = async_search_service.submit_search(
+        "hit", "lucene", "howler.id:*", USER, fl="howler.id", rows=10, timeout=100
+    )
+
+    # The id of the search in the datastore is never returned
+    assert submitted["id"] != "es_id"
+    assert submitted["is_running"]
+    assert handles[submitted["id"]]["async_id"] == "es_id"
+
+    # Arguments that are not supported by asynchronous searches are dropped
+    kwargs = collection.submit_async_search.call_args.kwargs
+    assert "timeout" not in kwargs
+    assert kwargs["access_control"] == USER["access_control"]
+
+    result = async_search_service.get_search(submitted["id"], USER)
+    assert not result["is_running"]
+    assert result["result"] == {"total": 0, "items": []}
+    assert collection.get_async_search.call_args.kwargs["fl"] == "howler.id"
+
+
+def test_wait_time_is_capped(handles, collection):
+    async_search_service.submit_search("hit", "lucene", "howler.id:*", USER, wait_for_completion_timeout=10**9)
+
+    assert (
+        collection.submit_async_search.call_args.kwargs["wait_for_completion_timeout"]
+        == async_search_service.config.system.async_search.wait_for_completion_timeout
+    )
+
+
+def test_access_enforced_on_poll(handles, collection):
+    submitted = async_search_service.submit_search("hit", "lucene", "howler.id:*", USER)
+
+    with pytest.raises(AccessDeniedException):
+        async_search_service.get_search(submitted["id"], {**USER, "access_control": "howler.status:open"})
+
+    # The search is deleted, so that its results can never be retrieved again
+    collection.delete_async_search.assert_called_once_with("es_id", eql=False)
+    assert submitted["id"] not in handles
+    with pytest.raises(NotFoundException):
+        async_search_service.get_search(submitted["id"], USER)
+
+
+def test_expired(handles, collection):
+    submitted = async_search_service.submit_search("hit", "eql", "any where true", USER)
+    collection.get_async_search.return_value = None
+
+    with pytest.raises(NotFoundException):
+        async_search_service.get_search(submitted["id"], USER)
+
+    assert submitted["id"] not in handles
+
+
+def test_limit(handles, collection):
+    max_per_user = async_search_service.config.system.async_search.max_per_user
+    for _ in range(max_per_user):
+        async_search_service.submit_search("hit", "lucene", "howler.id:*", USER)
+
+    with pytest.raises(InvalidDataException):
+        async_search_service.submit_search("hit", "lucene", "howler.id:*", USER)
+
+    # Expired searches do not count towards the limit
+    next(iter(handles.values()))["expiry"] = 0
+    async_search_service.submit_search("hit", "lucene", "howler.id:*", USER)
+
+
+def test_delete(handles, collection):
+    submitted = async_search_service.submit_search("hit", "eql", "any where true", USER)
+    async_search_service.delete_search(submitted["id"], USER)
+
+    collection.delete_async_search.assert_called_once_with("es_id", eql=True)
+    assert not handles
+
+    with pytest.raises(NotFoundException):
+        async_search_service.delete_search(submitted["id"], USER)
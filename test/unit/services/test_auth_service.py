@@ -0,0 +1,149 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import gevent
+import pytest
+from mock import patch
+from passlib.hash import bcrypt
+
+from howler.common.instrumentation import stop_tracking_request, track_request
+from howler.odm.models.user import User
+from howler.odm.randomizer import random_model_obj
+from howler.security.utils import verify_password
+from howler.services import auth_service
+
+SECRET = "super_secret_password"
+
+
+@pytest.fixture(autouse=True)
+def apikey_cache():
+    original_ttl = auth_service.config.auth.apikey_cache_ttl
+
+    auth_service.apikey_cache.clear()
+    auth_service.config.auth.apikey_cache_ttl = 60
+    try:
+        yield auth_service.apikey_cache
+    finally:
+        auth_service.config.auth.apikey_cache_ttl = original_ttl
+        auth_service.apikey_cache.clear()
+
+
+def _user(rounds: int = 4) -> User:
+    user: User = random_model_obj(User)
+    user.apikeys = {
+        "key": {
+            "acl": ["R", "W"],
+            "password": bcrypt.using(rounds=rounds).hash(SECRET),
+            "agents": [],
+            "expiry_date": None,
+        }
+    }
+    return user
+
+
+@patch("howler.services.auth_service.datastore")
+def test_validate_apikey_cache(datastore):
+    user = _user()
+    datastore.return_value.user.get_if_exists.return_value = user
+
+    with patch("howler.services.auth_service.verify_password", wraps=auth_service.verify_password) as verify_password:
+        assert auth_service.validate_apikey(user.uname, f"key:{SECRET}") == (user, ["R", "W"])
+        assert auth_service.validate_apikey(user.uname, f"key:{SECRET}") == (user, ["R", "W"])
+        assert verify_password.call_count == 1
+
+        # A wrong secret is never accepted from the cache
+        assert auth_service.validate_apikey(user.uname, "key:wrong") == (None, None)
+        assert verify_password.call_count == 2
+
+
+@patch("howler.services.auth_service.datastore")
+def test_validate_apikey_cache_invalidation(datastore):
+    user = _user()
+    datastore.return_value.user.get_if_exists.return_value = user
+
+    with patch("howler.services.auth_service.verify_password", wraps=auth_service.verify_password) as verify_password:
+        auth_service.validate_apikey(user.uname, f"key:{SECRET}")
+
+        auth_service.invalidate_apikey_cache(user.uname, "key")
+        assert (user.uname, "key") not in auth_service.apikey_cache
+
+        auth_service.validate_apikey(user.uname, f"key:{SECRET}")
+        assert verify_password.call_count == 2
+
+        # Recreating the key with the same name and a different secret must not reuse the cached verification
+        user.apikeys["key"].password = bcrypt.using(rounds=4).hash("new_secret")
+        assert auth_service.validate_apikey(user.uname, f"key:{SECRET}") == (None, None)
+        assert verify_password.call_count == 3
+
+
+@patch("howler.services.auth_service.datastore")
+def test_validate_apikey_cache_disabled(datastore):
+    user = _user()
+    datastore.return_value.user.get_if_exists.return_value = user
+    auth_service.config.auth.apikey_cache_ttl = 0
+
+    assert auth_service.validate_apikey(user.uname, f"key:{SECRET}") == (user, ["R", "W"])
+    assert len(auth_service.apikey_cache) == 0
+
+
+@patch("howler.services.auth_service.datastore")
+def test_validate_apikey_cache_benchmark(datastore):
+    "Compare the latency of api key validation under concurrent load, with and without cached verifications"
+    user = _user(rounds=10)
+    datastore.return_value.user.get_if_exists.return_value = user
+
+    def validate():
+        start = time.perf_counter()
+        assert auth_service.validate_apikey(user.uname, f"key:{SECRET}")[0] is not None
+        return time.perf_counter() - start
+
+    def run(concurrency: int = 8, requests: int = 32) -> float:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return statistics.median(executor.map(lambda _: validate(), range(requests)))
+
+    auth_service.config.auth.apikey_cache_ttl = 0
+    uncached = run()
+
+    auth_service.config.auth.apikey_cache_ttl = 60
+    validate()
+    cached = run()
+
+    print(f"Median api key validation latency: {uncached * 1000:.2f}ms uncached, {cached * 1000:.2f}ms cached")  # noqa: T201
+
+    assert cached * 10 < uncached
+
+
+def test_verify_password_off_hub():
+    pw_hash = bcrypt.using(rounds=4).hash(SECRET)
+
+    with (
+        patch("howler.security.utils.monkey.is_module_patched", return_value=True),
+        patch("howler.security.utils.get_hub", wraps=gevent.get_hub) as get_hub,
+    ):
+        assert verify_password(SECRET, pw_hash)
+        assert not verify_password("wrong", pw_hash)
+
+    assert get_hub.call_count == 2
+
+
+@patch("howler.services.auth_service.redis")
+def test_token_round_trips(redis):
+    pipeline = redis.pipeline.return_value
+
+    stats = track_request()
+    try:
+        token = auth_service.create_token("user", ["R", "W"])
+        assert stats.calls["redis"] == 1
+        pipeline.sadd.assert_any_call("token_user", f'"{token}"')
+        pipeline.sadd.assert_any_call(f"token_priv_user_{token[:10]}", '"R,W"')
+
+        pipeline.execute.return_value = [True, {b'"R,W"'}, True]
+        assert auth_service.check_token("user", token) == ["R", "W"]
+        assert stats.calls["redis"] == 2
+
+        pipeline.execute.return_value = [False, set(), False]
+        assert auth_service.check_token("user", token) is None
+        assert stats.calls["redis"] == 3
+    finally:
+        assert stop_tracking_request() is stats
@@ -0,0 +1,123 @@
+from unittest.mock import patch
+
+import pytest
+
+from howler.services import dedup_service, hit_service
+
+
+@pytest.fixture(autouse=True)
+def deduplication_config():
+    deduplication = dedup_service.config.system.deduplication
+    original = deduplication.as_primitives()
+
+    dedup_service.local_cache.clear()
+    deduplication.enabled = True
+    try:
+        yield deduplication
+    finally:
+        deduplication.enabled = original["enabled"]
+        deduplication.local_cache_size = original["local_cache_size"]
+        dedup_service.local_cache.clear()
+
+
+def _hit(data: str):
+    hit, _ = hit_service.convert_hit(
+        {"howler.analytic": "test", "howler.detection": "test", "howler.score": 0, "howler.data": [data]}, False
+    )
+    return hit
+
+
+@patch("howler.services.dedup_service.HASH_CLAIMS")
+def test_find_duplicates(hash_claims):
+    remote_original = _hit("remote")
+    hash_claims.multi_claim.side_effect = lambda claims: {
+        key: ("remote_original", 60) if key == remote_original.howler.hash else None for key in claims
+    }
+
+    first, batch_duplicate, remote_duplicate, other_remote_duplicate = (
+        _hit("first"),
+        _hit("first"),
+        _hit("remote"),
+        _hit("remote"),
+    )
+
+    duplicates = dedup_service.find_duplicates([first, batch_duplicate, remote_duplicate, other_remote_duplicate])
+
+    assert duplicates == {
+        batch_duplicate.howler.id: first.howler.id,
+        remote_duplicate.howler.id: "remote_original",
+        other_remote_duplicate.howler.id: "remote_original",
+    }
+
+    # Both hashes are now known locally, redis should not be queried again
+    hash_claims.multi_claim.reset_mock()
+    local_duplicate, other_local_duplicate = _hit("first"), _hit("remote")
+
+    duplicates = dedup_service.find_duplicates([local_duplicate, other_local_duplicate])
+
+    assert duplicates == {
+        local_duplicate.howler.id: first.howler.id,
+        other_local_duplicate.howler.id: "remote_original",
+    }
+    hash_claims.multi_claim.assert_called_once_with({})
+
+
+@patch("howler.services.dedup_service.HASH_CLAIMS")
+def test_find_duplicates_local_cache_size(hash_claims, deduplication_config):
+    hash_claims.multi_claim.side_effect = lambda claims: {key: None for key in claims}
+    deduplication_config.local_cache_size = 2
+
+    hits = [_hit(str(i)) for i in range(3)]
+    assert dedup_service.find_duplicates(hits) == {}
+
+    assert list(dedup_service.local_cache.keys()) == [hit.howler.hash for hit in hits[1:]]
+
+
+@patch("howler.services.dedup_service.HASH_CLAIMS")
+def test_release(hash_claims):
+    hash_claims.multi_claim.side_effect = lambda claims: {key: None for key in claims}
+
+    hit = _hit("released")
+    dedup_service.find_duplicates([hit])
+    dedup_service.release([hit])
+
+    hash_claims.release.assert_called_once_with(hit.howler.hash)
+    assert hit.howler.hash not in dedup_service.local_cache
+
+
+@patch("howler.services.dedup_service.datastore")
+@patch("howler.services.dedup_service.HASH_CLAIMS")
+def test_release_deleted(hash_claims, datastore):
+    hash_claims.multi_claim.side_effect = lambda claims: {key: None for key in claims}
+
+    deleted, other = _hit("deleted"), _hit("other")
+    dedup_service.find_duplicates([deleted, other])
+
+    # The hash of the other hit is now held by a hit that is not deleted
+    dedup_service._set_local(other.howler.hash, "newer", 60)
+
+    datastore.return_value.hit.stream_search.return_value = iter([deleted, other])
+    dedup_service.release_deleted([deleted.howler.id, other.howler.id])
+
+    hash_claims.release_claimed.assert_called_once_with(
+        {deleted.howler.hash: deleted.howler.id, other.howler.hash: other.howler.id}
+    )
+    assert deleted.howler.hash not in dedup_service.local_cache
+    assert dedup_service.local_cache[other.howler.hash][0] == "newer"
+
+
+@patch("howler.services.dedup_service.datastore")
+def test_fold_duplicates(datastore):
+    dedup_service.fold_duplicates({"a": "original", "b": "original", "c": "other"})
+
+    calls = {call.args[0]: call.args[1][0] for call in datastore.return_value.hit.update.call_args_list}
+    assert sorted(calls.keys()) == ["original", "other"]
+    assert calls["original"].key == "howler.duplicates"
+    assert calls["original"].value == 2
+    assert calls["other"].value == 1
+
+
+def test_find_duplicates_disabled(deduplication_config):
+    deduplication_config.enabled = False
+
+    assert dedup_service.find_duplicates([_hit("first"), _hit("first")]) == {}
@@ -0,0 +1,120 @@
+from unittest.mock import patch
+
+import pytest
+
+from howler.common.exceptions import HowlerValueError
+from howler.datastore.collection import ESCollection
+from howler.datastore.operations import OdmUpdateOperation
+from howler.filestore import FileStore
+from howler.services import filestore_service, hit_service, user_service
+
+
+@pytest.fixture(autouse=True)
+def offload_config():
+    offload = hit_service.config.filestore.offload
+    original = offload.as_primitives()
+
+    offload.hit_data = True
+    offload.avatars = True
+    offload.min_size = 10
+    try:
+        yield offload
+    finally:
+        offload.hit_data = original["hit_data"]
+        offload.avatars = original["avatars"]
+        offload.min_size = original["min_size"]
+
+
+@pytest.fixture(autouse=True)
+def filestore(tmp_path):
+    with FileStore(f"file://{tmp_path}") as fs, patch.object(filestore_service, "_filestore", fs):
+        yield fs
+
+
+def _hit(*data: str):
+    hit, _ = hit_service.convert_hit(
+        {"howler.analytic": "test", "howler.detection": "test", "howler.score": 0, "howler.data": list(data)}, False
+    )
+    return hit
+
+
+def test_offload(filestore):
+    reference = filestore_service.offload("hit-data", "a" * 100)
+    assert filestore_service.is_reference(reference)
+    assert filestore_service.offload("hit-data", "a" * 100) == reference
+    assert filestore_service.resolve("hit-data", reference) == "a" * 100
+
+    assert not filestore_service.is_reference("a" * 100)
+    assert filestore_service.resolve("hit-data", "a" * 100) == "a" * 100
+
+    # Values that merely look like references are returned as is
+    for value in ['{"$filestore": 1}', '{"$filestore": x', '{"$filestore": "../../etc/passwd"}', '{"$filestore": []}']:
+        assert filestore_service.resolve("hit-data", value) == value
+
+    # Missing content is left referenced rather than failing the whole read
+    filestore.delete(filestore_service._path("hit-data", filestore_service.json_utils.loads(reference)["$filestore"]))
+    assert filestore_service.resolve("hit-data", reference) == reference
+
+
+def test_offload_hit_data(offload_config):
+    large = '{"raw": "' + "x" * 100 + '"}'
+    hit = _hit("small", large)
+    hash = hit.howler.hash
+
+    hit_service.offload_data(hit)
+    assert hit.howler.data[0] == "small"
+    assert filestore_service.is_reference(hit.howler.data[1])
+    assert len(hit.howler.data[1]) < len(large)
+
+    # The hash used to deduplicate hits is computed from the original data
+    assert hit.howler.hash == hash
+
+    # Offloading twice leaves the references as is
+    data = list(hit.howler.data)
+    hit_service.offload_data(hit)
+    assert hit.howler.data == data
+
+    resolved = hit_service.resolve_data(hit.as_primitives())
+    assert resolved["howler"]["data"] == ["small", large]
+
+    # Hits offloaded before offloading was disabled are still resolved
+    offload_config.hit_data = False
+    hit = _hit(large)
+    hit_service.offload_data(hit)
+    assert hit.howler.data == [large]
+    assert hit_service.resolve_data({"howler": {"data": data}})["howler"]["data"] == ["small", large]
+    assert hit_service.resolve_data(None) is None
+
+
+def test_forged_references():
+    reference = filestore_service.offload("hit-data", "a" * 100)
+
+    # Clients cannot write references to content they may not have access to
+    with pytest.raises(HowlerValueError):
+        _hit("small", reference)
+
+    with pytest.raises(HowlerValueError):
+        hit_service.update_hit("id", [OdmUpdateOperation(ESCollection.UPDATE_APPEND, "howler.data", reference)])
+
+
+@patch("howler.services.user_service.datastore")
+def test_offload_avatar(datastore, offload_config):
+    avatars = {}
+
+    def save(username: str, avatar: str):
+        avatars[username] = avatar
+        return True
+
+    datastore.return_value.user_avatar.save.side_effect = save
+    datastore.return_value.user_avatar.get_if_exists.side_effect = avatars.get
+
+    avatar = "data:image/png;base64," + "A" * 1000
+    assert user_service.save_avatar("user", avatar)
+    assert filestore_service.is_reference(avatars["user"])
+    assert user_service.get_avatar("user") == avatar
+
+    offload_config.avatars = False
+    assert user_service.save_avatar("other", avatar)
+    assert avatars["other"] == avatar
+    assert user_service.get_avatar("other") == avatar
+    assert user_service.get_avatar("missing") is None
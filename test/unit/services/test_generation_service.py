@@ -0,0 +1,95 @@
+from unittest.mock import MagicMock, patch
+
+from howler.datastore.collection import ESCollection
+from howler.datastore.store import ESStore
+from howler.services import generation_service
+from howler.services.generation_service import GenerationCache, ensure_visible, get_etag, track_generations
+
+
+@patch("howler.services.generation_service.ensure_visible")
+@patch("howler.services.generation_service.get_generation")
+def test_generation_cache(get_generation, ensure_visible):
+    builder = MagicMock(side_effect=lambda: object())
+    cache = GenerationCache("test", builder)
+
+    get_generation.return_value = 1
+    first = cache.get()
+    assert cache.get() is first
+    assert builder.call_count == 1
+    ensure_visible.assert_called_once_with("test", 1)
+
+    # Any change to the collection, from any API instance, invalidates the value
+    get_generation.return_value = 2
+    second = cache.get()
+    assert second is not first
+    assert builder.call_count == 2
+
+    # Changes made behind the cache's back are picked up eventually
+    cache.built_at = 0
+    assert cache.get() is not second
+    assert builder.call_count == 3
+
+
+@patch("howler.services.generation_service.bump_generation")
+def test_writes_bump_generation(bump_generation):
+    store = ESStore.__new__(ESStore)
+    store._change_listeners = {}
+    store.client = MagicMock()
+    track_generations(store)
+
+    def collection(name: str) -> ESCollection:
+        collection = ESCollection.__new__(ESCollection)
+        collection.datastore = store
+        collection.name = f"howler-{name}"
+        collection.commit = MagicMock()
+        collection.with_retries = MagicMock(return_value={"result": "deleted"})
+        collection.ilm_config = None
+        return collection
+
+    view = collection("view")
+    view.delete("view_id")
+
+    # Writes only bump the generation, they are made visible to searches when something is built from them
+    view.commit.assert_not_called()
+    bump_generation.assert_called_once_with("view")
+
+    # Writes to collections that are not tracked have no overhead
+    hit = collection("hit")
+    hit.delete("hit_id")
+    assert bump_generation.call_count == 1
+
+    # Failing to bump the generation does not make the write fail
+    bump_generation.side_effect = ConnectionError
+    assert view.delete("view_id")
+
+
+@patch("howler.services.generation_service.get_generation")
+def test_get_etag(get_generation):
+    get_generation.return_value = 1
+    etag = get_etag("view", "goose")
+    assert get_etag("view", "goose") == etag
+    assert get_etag("view", "huey") != etag
+
+    get_generation.return_value = 2
+    assert get_etag("view", "goose") != etag
+
+
+@patch("howler.services.generation_service.datastore")
+def test_ensure_visible(datastore):
+    collection = datastore.return_value.view
+    collection.with_retries.side_effect = lambda func, **kwargs: func(**kwargs)
+    collection.index_name = "howler-view_hot"
+    refresh = collection.datastore.client.indices.refresh
+
+    with patch.dict(generation_service._visible, clear=True):
+        # The collection is refreshed once per generation, no matter how many times it is built for it
+        ensure_visible("view", 1)
+        ensure_visible("view", 1)
+        refresh.assert_called_once_with(index="howler-view_hot")
+
+        # Writes made before an older generation are already visible
+        ensure_visible("view", 0)
+        assert refresh.call_count == 1
+
+        ensure_visible("view", 2)
+        assert refresh.call_count == 2
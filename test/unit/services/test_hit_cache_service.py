@@ -0,0 +1,175 @@
+import random
+import threading
+import time
+from typing import Any, Optional
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from howler.config import config
+from howler.datastore.collection import CREATE_TOKEN, ESCollection
+from howler.datastore.store import ESStore
+from howler.services import event_service, hit_cache_service
+from howler.services.hit_cache_service import HIT_CACHE_REQUESTS, HitCache
+
+
+@pytest.fixture
+def hit_cache_enabled():
+    enabled = config.datastore.hit_cache.enabled
+    config.datastore.hit_cache.enabled = True
+    try:
+        yield
+    finally:
+        config.datastore.hit_cache.enabled = enabled
+
+
+def _requests(result: str) -> float:
+    return HIT_CACHE_REQUESTS.labels(result)._value.get()
+
+
+def test_hit_cache():
+    fetch = MagicMock(return_value=({"howler": {"id": "a", "labels": {"generic": []}}}, "1---1"))
+    cache = HitCache(max_size=2, ttl=60)
+
+    hits, misses = _requests("hit"), _requests("miss")
+
+    data, version = cache.get("a", fetch)
+    assert version == "1---1"
+    data["howler"]["labels"]["generic"].append("changed")
+
+    # Each read gets its own copy of the hit
+    data, version = cache.get("a", fetch)
+    assert data == {"howler": {"id": "a", "labels": {"generic": []}}}
+    assert version == "1---1"
+    assert fetch.call_count == 1
+    assert _requests("hit") - hits == 1
+    assert _requests("miss") - misses == 1
+
+    # The least recently used hits are evicted first
+    cache.get("b", fetch)
+    cache.get("a", fetch)
+    cache.get("c", fetch)
+    assert list(cache.entries.keys()) == ["a", "c"]
+
+    cache.invalidate(["a"])
+    assert list(cache.entries.keys()) == ["c"]
+    cache.invalidate()
+    assert len(cache.entries) == 0
+
+    # Expired hits are fetched again
+    cache = HitCache(max_size=2, ttl=0)
+    cache.get("a", fetch)
+    cache.get("a", fetch)
+    assert fetch.call_count == 5
+
+
+def test_hit_cache_uncached():
+    cache = HitCache(max_size=2, ttl=60)
+
+    # Missing and archived hits have no version to check against
+    for result in [(None, CREATE_TOKEN), ({"howler": {"id": "a"}}, CREATE_TOKEN)]:
+        assert cache.get("a", MagicMock(return_value=result)) == result
+        assert len(cache.entries) == 0
+
+    # Hits changed while they are being fetched are not cached
+    def fetch(id: str):
+        cache.invalidate([id])
+        return {"howler": {"id": id}}, "1---1"
+
+    cache.get("a", fetch)
+    assert len(cache.entries) == 0
+
+
+def test_hit_cache_concurrent_updates():
+    "Once a write is acknowledged, no read started after it can return the previous version of the hit"
+    cache = HitCache(max_size=10, ttl=60)
+
+    lock = threading.Lock()
+    documents: dict[str, tuple[dict[str, Any], int]] = {id: ({"howler": {"id": id}}, 0) for id in ["a", "b", "c"]}
+    acknowledged = {id: 0 for id in documents}
+    errors: list[str] = []
+
+    def fetch(id: str) -> tuple[Optional[dict[str, Any]], Optional[str]]:
+        with lock:
+            data, seq_no = documents[id]
+
+        # Give writers a chance to change the hit while it is on its way back
+        time.sleep(random.random() / 1000)
+        return data, f"{seq_no}---1"
+
+    def writer():
+        for _ in range(200):
+            id = random.choice(list(documents.keys()))
+            with lock:
+                _, seq_no = documents[id]
+                documents[id] = ({"howler": {"id": id, "seq_no": seq_no + 1}}, seq_no + 1)
+
+            cache.invalidate([id])
+            with lock:
+                acknowledged[id] = max(acknowledged[id], seq_no + 1)
+
+    def reader():
+        for _ in range(500):
+            id = random.choice(list(documents.keys()))
+            with lock:
+                minimum = acknowledged[id]
+
+            data, version = cache.get(id, fetch)
+            seq_no = int(version.split("---")[0])
+            if seq_no < minimum:
+                errors.append(f"{id}: read version {seq_no} after version {minimum} was written")
+            if data.get("howler", {}).get("seq_no", 0) != seq_no:
+                errors.append(f"{id}: data does not match version {seq_no}")
+
+    threads = [threading.Thread(target=writer) for _ in range(2)] + [threading.Thread(target=reader) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert _requests("hit") > 0
+
+
+@patch("howler.services.hit_cache_service.EventSender")
+def test_invalidation(event_sender, hit_cache_enabled):
+    store = ESStore.__new__(ESStore)
+    store._change_listeners = {}
+    store.client = MagicMock()
+    hit_cache_service.track_hit_cache(store)
+
+    collection = ESCollection.__new__(ESCollection)
+    collection.datastore = store
+    collection.name = "howler-hit"
+    collection.with_retries = MagicMock(return_value={"result": "deleted"})
+    collection.ilm_config = None
+
+    cache = HitCache(max_size=10, ttl=60)
+    fetch = MagicMock(side_effect=lambda id: ({"howler": {"id": id}}, "1---1"))
+    cache.get("a", fetch)
+    cache.get("b", fetch)
+
+    with patch.object(hit_cache_service, "_cache", cache), patch.object(hit_cache_service, "_sender", None):
+        # Writes invalidate the hits locally, and let the other instances know
+        collection.delete("a")
+        assert list(cache.entries.keys()) == ["b"]
+        event_sender.return_value.send.assert_called_once_with(
+            "invalidate", {"instance": hit_cache_service.INSTANCE_ID, "ids": ["a"]}
+        )
+
+        # Hit events follow writes that were already published, and are not published again
+        event_service.emit("hits", {"hit": {"howler": {"id": "b"}}, "version": "2---1"})
+        assert list(cache.entries.keys()) == ["b"]
+        assert event_sender.return_value.send.call_count == 1
+
+        # Writes by query can touch any hit, but only flush the cache of this instance
+        store.notify_change(collection)
+        assert len(cache.entries) == 0
+        assert event_sender.return_value.send.call_count == 1
+
+        # Invalidations from other instances are applied, but not those this instance published
+        cache.get("a", fetch)
+        hit_cache_service._on_remote_invalidation({"instance": hit_cache_service.INSTANCE_ID, "ids": ["a"]})
+        assert list(cache.entries.keys()) == ["a"]
+        hit_cache_service._on_remote_invalidation({"instance": "other", "ids": None})
+        assert len(cache.entries) == 0
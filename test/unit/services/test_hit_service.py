@@ -1,7 +1,14 @@
+import json
 from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
 
+from howler.datastore.bulk import ElasticBulkPlan
+from howler.datastore.collection import ESCollection
+from howler.datastore.exceptions import DataStoreException
 from howler.helper.workflow import Workflow
 from howler.odm.base import UTC_TZ
+from howler.odm.models.hit import Hit
 from howler.services import hit_service
 
 
@@ -45,6 +52,17 @@ def test_convert_hit_hash():
     assert result_2.howler.hash != result_4.howler.hash
 
 
+def test_convert_hit_data():
+    entry = {"raw": "é ☃", "values": [1, 2.5]}
+    result, _ = hit_service.convert_hit(
+        {"howler.analytic": "test", "howler.detection": "test", "howler.score": 0, "howler.data": ["as is", entry]},
+        False,
+    )
+
+    # Entries sent as objects are stored in the format they have always been stored in
+    assert result.howler.data == ["as is", '{"raw": "\\u00e9 \\u2603", "values": [1, 2.5]}']
+
+
 def test_convert_hit_event():
     obj = {
         "howler.analytic": "test",
@@ -68,3 +86,114 @@ def test_convert_hit_event():
     obj["event"] = {"kind": "alert"}
 
     assert result.event.created
+
+
+@patch("howler.services.hit_service.event_service")
+@patch("howler.services.hit_service.action_service")
+@patch("howler.services.hit_service.analytic_service")
+@patch("howler.services.hit_service.datastore")
+def test_create_hits_from_stream(datastore, analytic_service, action_service, event_service):
+    def bulk(plan):
+        return {
+            "items": [
+                {"create": {"status": 201, "_seq_no": i, "_primary_term": 1}} for i in range(len(plan.operations) // 2)
+            ]
+        }
+
+    datastore.return_value.hit.get_bulk_plan.side_effect = lambda: ElasticBulkPlan(["hit"], model=Hit)
+    datastore.return_value.hit.bulk.side_effect = bulk
+
+    hit = {"howler.analytic": "test", "howler.detection": "test", "howler.score": 1234}
+    lines = [json.dumps(hit).encode() for _ in range(5)]
+    lines.insert(2, b"{not json")
+    lines.insert(4, b"")
+    lines.insert(5, json.dumps({**hit, "howler.not_a_field": True}).encode())
+    lines.extend([b"5", b"[1]", b'"x"', b"null"])
+
+    chunks = list(hit_service.create_hits_from_stream(iter(lines), {"uname": "admin"}, chunk_size=2))
+
+    statuses = [status for chunk in chunks for status in chunk]
+    assert sorted(status["line"] for status in statuses) == [1, 2, 3, 4, 6, 7, 8, 9, 10, 11, 12]
+
+    assert datastore.return_value.hit.bulk.call_count == 3
+    assert analytic_service.save_from_hit.call_count == 3
+    assert action_service.bulk_execute_on_query.call_count == 3
+
+    errors = {status["line"]: status["error"] for status in statuses if "error" in status}
+    assert sorted(errors.keys()) == [3, 6, 9, 10, 11, 12]
+    assert all(errors[line].startswith("Invalid JSON") for line in [3, 9, 10, 11, 12])
+
+    assert all(status["id"] for status in statuses if "error" not in status)
+
+    # Every created hit is announced, like the hits created one at a time
+    events = [call.args for call in event_service.emit.call_args_list]
+    assert [event for event, _ in events] == ["hits"] * 5
+    assert sorted(data["hit"]["howler"]["id"] for _, data in events) == sorted(
+        status["id"] for status in statuses if "error" not in status
+    )
+    assert all(data["version"].endswith("---1") for _, data in events)
+
+
+@patch("howler.services.hit_service.dedup_service")
+@patch("howler.services.hit_service.event_service")
+@patch("howler.services.hit_service.action_service")
+@patch("howler.services.hit_service.analytic_service")
+@patch("howler.services.hit_service.datastore")
+def test_create_hits_from_stream_bulk_error(datastore, analytic_service, action_service, event_service, dedup_service):
+    def bulk(plan):
+        if datastore.return_value.hit.bulk.call_count == 2:
+            raise DataStoreException("Elasticsearch is unavailable")
+
+        return {
+            "items": [
+                {"create": {"status": 201, "_seq_no": i, "_primary_term": 1}} for i in range(len(plan.operations) // 2)
+            ]
+        }
+
+    datastore.return_value.hit.get_bulk_plan.side_effect = lambda: ElasticBulkPlan(["hit"], model=Hit)
+    datastore.return_value.hit.bulk.side_effect = bulk
+    dedup_service.find_duplicates.return_value = {}
+
+    hit = {"howler.analytic": "test", "howler.detection": "test", "howler.score": 1234}
+    lines = [json.dumps(hit).encode() for _ in range(6)]
+
+    # The failure of a chunk does not interrupt the stream, its lines are reported as failed
+    chunks = list(hit_service.create_hits_from_stream(iter(lines), {"uname": "admin"}, chunk_size=2))
+    statuses = {status["line"]: status for chunk in chunks for status in chunk}
+
+    assert sorted(statuses.keys()) == [1, 2, 3, 4, 5, 6]
+    assert [line for line, status in statuses.items() if "error" in status] == [3, 4]
+    assert "Elasticsearch is unavailable" in statuses[3]["error"]
+
+    assert datastore.return_value.hit.commit.call_count == 2
+    assert event_service.emit.call_count == 4
+
+    # And the hashes claimed for them are released
+    released = [hit for call in dedup_service.release.call_args_list for hit in call.args[0]]
+    assert len(released) == 2
+
+
+@patch("howler.services.hit_service.event_service")
+@patch("howler.services.hit_service.datastore")
+def test_sync_bundle_members(datastore, event_service):
+    child_ids = [f"child_{i}" for i in range(100_000)]
+    datastore.return_value.hit.stream_search.return_value = iter(
+        SimpleNamespace(howler=SimpleNamespace(id=child_id)) for child_id in child_ids
+    )
+    datastore.return_value.hit.count.return_value = {"count": 100_000}
+    datastore.return_value.hit.get.return_value = ({"howler": {"id": "bundle"}}, "1---1")
+
+    assert hit_service.sync_bundle_members("bundle", filters=["event.created:>now-1h"]) == 100_000
+
+    assert datastore.return_value.hit.stream_search.call_args.kwargs["filters"] == ["event.created:>now-1h"]
+
+    bundle_id, operations = datastore.return_value.hit.update.call_args.args
+    assert bundle_id == "bundle"
+    assert len(operations) == 2
+    assert operations[0].operation == ESCollection.UPDATE_MERGE
+    assert operations[0].key == "howler.hits"
+    assert operations[0].value == child_ids
+    assert operations[1].key == "howler.bundle_size"
+    assert operations[1].value == 100_000
+
+    event_service.emit.assert_called_once_with("hits", {"hit": {"howler": {"id": "bundle"}}, "version": "1---1"})
@@ -0,0 +1,75 @@
+from unittest.mock import patch
+
+import pytest
+
+from howler.services import overview_service, template_service
+
+TEMPLATES = [
+    {"template_id": "1", "analytic": "A", "detection": "D", "type": "global", "keys": []},
+    {"template_id": "2", "analytic": "A", "detection": None, "type": "personal", "owner": "goose", "keys": []},
+    {"template_id": "3", "analytic": "A", "detection": "D", "type": "personal", "owner": "goose", "keys": []},
+    {"template_id": "4", "analytic": "B", "detection": None, "type": "global", "keys": []},
+    {"template_id": "5", "analytic": "B", "detection": None, "type": "personal", "owner": "huey", "keys": []},
+]
+
+OVERVIEWS = [
+    {"overview_id": "1", "analytic": "A", "detection": "D", "content": ""},
+    {"overview_id": "2", "analytic": "A", "detection": None, "content": ""},
+]
+
+
+@pytest.fixture(autouse=True)
+def datastore():
+    with (
+        patch("howler.services.generation_service.get_generation", return_value=0),
+        patch("howler.services.generation_service.ensure_visible"),
+        patch("howler.services.template_service.datastore") as template_datastore,
+        patch("howler.services.overview_service.datastore") as overview_datastore,
+    ):
+        template_datastore.return_value.template.stream_search.return_value = iter(TEMPLATES[::-1])
+        overview_datastore.return_value.overview.stream_search.return_value = iter(OVERVIEWS)
+
+        template_service.TEMPLATE_INDEX.clear()
+        overview_service.OVERVIEW_INDEX.clear()
+        try:
+            yield
+        finally:
+            template_service.TEMPLATE_INDEX.clear()
+            overview_service.OVERVIEW_INDEX.clear()
+
+
+def _resolved(analytic, detection, uname):
+    template = template_service.resolve_template(analytic, detection, uname)
+    return template["template_id"] if template else None
+
+
+def test_resolve_template():
+    # Detection templates first, then personal templates first
+    assert _resolved("A", "D", "goose") == "3"
+    assert _resolved("A", "D", "huey") == "1"
+    assert _resolved("A", "other", "goose") == "2"
+    assert _resolved("A", "other", "huey") is None
+    assert _resolved("B", "D", "huey") == "5"
+    assert _resolved("B", None, "goose") == "4"
+    assert _resolved("C", None, "goose") is None
+
+
+def test_get_templates():
+    goose_templates = template_service.get_templates("goose")
+    huey_templates = template_service.get_templates("huey")
+
+    assert [template["template_id"] for template in goose_templates] == ["1", "2", "3", "4"]
+    assert [template["template_id"] for template in huey_templates] == ["1", "4", "5"]
+
+    assert template_service.get_template("A", "D", "personal", "goose")["template_id"] == "3"
+    assert template_service.get_template("A", "D", "personal", "huey") is None
+    assert template_service.get_template("B", None, "global")["template_id"] == "4"
+
+
+def test_resolve_overview():
+    assert overview_service.resolve_overview("A", "D")["overview_id"] == "1"
+    assert overview_service.resolve_overview("A", "other")["overview_id"] == "2"
+    assert overview_service.resolve_overview("A", None)["overview_id"] == "2"
+    assert overview_service.resolve_overview("B", "D") is None
+
+    assert overview_service.get_overview("A", "other") is None
@@ -0,0 +1,137 @@
+import io
+import logging
+import queue
+
+import pytest
+from flask import Flask
+from mock import MagicMock
+
+from howler.common.logging import audit
+from howler.common.logging.audit import AUDIT_RECORDS_DROPPED, AuditQueueHandler, BatchingQueueListener
+from howler.common.logging.format import HWL_AUDIT_FORMAT, HWL_ISO_DATE_FORMAT
+
+
+def _record(index: int) -> logging.LogRecord:
+    return logging.makeLogRecord(
+        {
+            "name": "howler.api.audit",
+            "levelno": logging.INFO,
+            "levelname": "INFO",
+            "msg": "",
+            "user": "goose",
+            "function": f"search(index='hit', query='howler.id:{index}')",
+            "method": "POST",
+            "path": "/api/v1/search/hit/",
+        }
+    )
+
+
+@pytest.fixture
+def stream_handler():
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(logging.Formatter(HWL_AUDIT_FORMAT, HWL_ISO_DATE_FORMAT))
+    return handler
+
+
+def test_batching_listener(stream_handler):
+    records = [_record(index) for index in range(25)]
+    expected = "".join(stream_handler.format(record) + "\n" for record in records)
+
+    record_queue: queue.Queue = queue.Queue()
+    for record in records:
+        record_queue.put(record)
+
+    stream_handler.flush = MagicMock()
+    listener = BatchingQueueListener(record_queue, stream_handler, batch_size=10)
+    listener.start()
+    listener.stop()
+
+    # The content of the audit logs is the same as when each record is written on its own, in fewer writes
+    assert stream_handler.stream.getvalue() == expected
+    assert stream_handler.flush.call_count == 3
+
+
+def test_batching_listener_respects_handler_level(stream_handler):
+    stream_handler.setLevel(logging.WARNING)
+
+    record_queue: queue.Queue = queue.Queue()
+    record_queue.put(_record(0))
+
+    listener = BatchingQueueListener(record_queue, stream_handler)
+    listener.start()
+    listener.stop()
+
+    assert stream_handler.stream.getvalue() == ""
+
+
+def test_overflow():
+    record_queue: queue.Queue = queue.Queue(maxsize=2)
+    handler = AuditQueueHandler(record_queue)
+
+    dropped = AUDIT_RECORDS_DROPPED._value.get()
+    for index in range(5):
+        handler.handle(_record(index))
+
+    assert record_queue.qsize() == 2
+    assert AUDIT_RECORDS_DROPPED._value.get() == dropped + 3
+
+    # Records are formatted by the listener, not when they are queued
+    assert record_queue.get().function == "search(index='hit', query='howler.id:0')"
+
+
+@pytest.fixture
+def audit_records():
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+
+    level = audit.AUDIT_LOG.level
+    audit.AUDIT_LOG.setLevel(logging.DEBUG)
+    audit.AUDIT_LOG.addHandler(handler)
+    try:
+        yield records
+    finally:
+        audit.AUDIT_LOG.removeHandler(handler)
+        audit.AUDIT_LOG.setLevel(level)
+
+
+def search(**kwargs):
+    pass
+
+
+@pytest.mark.skipif(audit.DEBUG, reason="Audit records are only structured outside of debug mode")
+def test_audit(audit_records):
+    app = Flask("test_app")
+
+    with app.test_request_context(
+        "/api/v1/search/hit/?offset=0", method="POST", json={"query": "howler.status:open", "rows": 10}
+    ):
+        audit.audit([], {"index": "hit"}, "goose", {"uname": "goose"}, search, impersonator="admin")
+
+    [record] = audit_records
+    assert record.user == "admin on behalf of goose"
+    assert record.function == "search(index='hit', query='howler.status:open')"
+    assert record.method == "POST"
+    assert record.path == "/api/v1/search/hit/"
+
+    # Operations run outside of requests (e.g. by rules) are audited as well
+    audit.audit([], {"query": "howler.id:*", "operation_id": "add_label"}, "goose", {"uname": "goose"}, search)
+
+    assert audit_records[1].function == "search(query='howler.id:*', operation_id='add_label')"
+    assert audit_records[1].path is None
+
+
+def test_stop_with_full_queue(stream_handler):
+    record_queue: queue.Queue = queue.Queue(maxsize=2)
+    record_queue.put(_record(0))
+    record_queue.put(_record(1))
+
+    listener = BatchingQueueListener(record_queue, stream_handler, stop_timeout=0.01)
+
+    # Stopping does not wait forever for room in the queue, the oldest record is dropped instead
+    dropped = AUDIT_RECORDS_DROPPED._value.get()
+    listener.enqueue_sentinel()
+
+    assert AUDIT_RECORDS_DROPPED._value.get() == dropped + 1
+    assert record_queue.get_nowait().function == "search(index='hit', query='howler.id:1')"
+    assert record_queue.get_nowait() is None
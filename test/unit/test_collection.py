@@ -0,0 +1,239 @@
+import base64
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from howler.datastore.collection import (
+    ESCollection,
+    contains_filter,
+    ids_filter,
+    parse_filter,
+    prefix_filter,
+    terms_filter,
+    value_matches,
+    value_regex,
+)
+from howler.datastore.exceptions import SearchException
+from howler.odm.models.config import Projection
+from howler.odm.models.hit import Hit
+
+
+def test_parse_filter():
+    assert parse_filter("howler.id:*") == {"query_string": {"query": "howler.id:*"}}
+    assert parse_filter(ids_filter(id for id in ["a", "b"])) == {"ids": {"values": ["a", "b"]}}
+    assert parse_filter(terms_filter("howler.id", {"a"})) == {"terms": {"howler.id": ["a"]}}
+    assert parse_filter(prefix_filter("howler.hash", "ab")) == {
+        "prefix": {"howler.hash": {"value": "ab", "case_insensitive": False}}
+    }
+    assert parse_filter(contains_filter("howler.hash", "a*b?", ignore_case=True)) == {
+        "wildcard": {"howler.hash": {"value": "*a\\*b\\?*", "case_insensitive": True}}
+    }
+
+    with pytest.raises(SearchException):
+        parse_filter({"script": {"script": "ctx._source.delete()"}})
+
+    with pytest.raises(SearchException):
+        parse_filter({"ids": {"values": ["a"]}, "terms": {"howler.id": ["a"]}})
+
+
+def test_value_regex():
+    assert value_regex(prefix="10.0.") == "(10\\.0\\..*)"
+    assert value_regex(contains="ab") == "(.*ab.*)"
+    assert value_regex(prefix="a", contains="b", ignore_case=True) == "([aA].*)&(.*[bB].*)"
+
+    assert value_matches("10.0.0.1", prefix="10.0.")
+    assert not value_matches("110.0.0.1", prefix="10.0.")
+    assert value_matches("Admin", prefix="ad", contains="MI", ignore_case=True)
+    assert not value_matches("Admin", contains="MI")
+
+
+@pytest.fixture
+def collection() -> ESCollection:
+    collection = ESCollection.__new__(ESCollection)
+    collection.name = "howler-hit"
+    collection.ilm_config = None
+    collection.model_class = Hit
+    collection.stored_fields = {name: field for name, field in Hit.flat_fields().items() if field.store}
+    collection.trusted_reads = True
+    collection.projections = {
+        "list": Projection({"exclude": ["howler.log", "howler.comment"]}),
+        "triage": Projection({"include": ["howler.id", "howler.status", "event"], "exclude": ["event.original"]}),
+    }
+    return collection
+
+
+def test_projections(collection: ESCollection):
+    fields = collection.get_projection("list")
+    assert "howler.id" in fields
+    assert "id" in fields
+    assert "howler.links.href" in fields
+    assert not [field for field in fields if field.startswith("howler.log.") or field.startswith("howler.comment.")]
+
+    fields = collection.get_projection("triage")
+    assert fields[:2] == ["howler.id", "howler.status"]
+    assert "event.created" in fields
+    assert "event.original" not in fields
+    assert not [field for field in fields if field.startswith("source.")]
+
+    args, _ = collection._prepare_search("howler.id:*", profile="triage")
+    _, _, query_body = collection._build_search_query(args)
+    assert query_body["_source"] == fields
+
+    # An explicit field list takes precedence over the profile
+    args, _ = collection._prepare_search("howler.id:*", fl="howler.id", profile="triage")
+    _, _, query_body = collection._build_search_query(args)
+    assert query_body["_source"] == ["howler.id"]
+
+    with pytest.raises(SearchException):
+        collection.get_projection("missing")
+
+
+def test_composite_paging(collection: ESCollection):
+    after = base64.urlsafe_b64encode(json.dumps({"source.ip": "10.0.0.1"}).encode()).decode()
+    args, format_result = collection._prepare_composite("source.ip", after=after, prefix="10.", rows=2)
+    _, _, query_body = collection._build_search_query(args)
+
+    # No documents are fetched, and the prefix is applied by the datastore
+    assert query_body["size"] == 0
+    assert query_body["aggregations"]["composite"]["composite"]["after"] == {"source.ip": "10.0.0.1"}
+    assert prefix_filter("source.ip", "10.") in query_body["query"]["bool"]["filter"]
+
+    result = format_result(
+        {
+            "hits": {"total": {"value": 3}},
+            "aggregations": {
+                "composite": {
+                    # Values of multi-valued fields that do not match the prefix are removed from the page
+                    "buckets": [
+                        {"key": {"source.ip": "10.0.0.2"}, "doc_count": 2},
+                        {"key": {"source.ip": "192.168.0.1"}, "doc_count": 1},
+                    ],
+                    "after_key": {"source.ip": "192.168.0.1"},
+                }
+            },
+        }
+    )
+    assert result["items"] == {"10.0.0.2": 2}
+    assert json.loads(base64.urlsafe_b64decode(result["next_after"])) == {"source.ip": "192.168.0.1"}
+
+    last_page = format_result(
+        {
+            "hits": {"total": {"value": 1}},
+            "aggregations": {
+                "composite": {
+                    "buckets": [{"key": {"source.ip": "10.0.0.3"}, "doc_count": 1}],
+                    "after_key": {"source.ip": "10.0.0.3"},
+                }
+            },
+        }
+    )
+    assert last_page["next_after"] is None
+
+    for invalid in ["not_a_cursor", base64.urlsafe_b64encode(b'{"howler.id": "a"}').decode()]:
+        with pytest.raises(SearchException):
+            collection._prepare_composite("source.ip", after=invalid)
+
+
+def test_grouped_composite(collection: ESCollection):
+    args, format_result = collection._prepare_composite(
+        "howler.hash", limit=2, group_sort="event.created desc", fl="howler.id", as_obj=False
+    )
+    _, _, query_body = collection._build_search_query(args)
+
+    top_hits = query_body["aggregations"]["composite"]["aggregations"]["group"]["top_hits"]
+    assert top_hits["size"] == 2
+    assert top_hits["_source"] == ["howler.id"]
+
+    result = format_result(
+        {
+            "hits": {"total": {"value": 2}},
+            "aggregations": {
+                "composite": {
+                    "buckets": [
+                        {
+                            "key": {"howler.hash": "abc"},
+                            "doc_count": 2,
+                            "group": {
+                                "hits": {
+                                    "hits": [
+                                        {"_id": "a", "_source": {"howler": {"id": "a"}}},
+                                        {"_id": "b", "_source": {"howler": {"id": "b"}}},
+                                    ]
+                                }
+                            },
+                        }
+                    ]
+                }
+            },
+        }
+    )
+    assert result["next_after"] is None
+    assert result["items"] == [
+        {"value": "abc", "total": 2, "items": [{"howler": {"id": "a"}}, {"howler": {"id": "b"}}]}
+    ]
+
+
+def test_facet_does_not_fetch_documents(collection: ESCollection):
+    args, _ = collection._prepare_facet("howler.status", rows=5, prefix="op", sort="asc")
+    _, _, query_body = collection._build_search_query(args)
+
+    assert query_body["size"] == 0
+    assert query_body["aggregations"]["howler.status"]["terms"] == {
+        "field": "howler.status",
+        "min_doc_count": 1,
+        "size": 5,
+        "include": "(op.*)",
+        "order": {"_key": "asc"},
+    }
+
+
+def test_stream_search_pages_cursor(collection: ESCollection):
+    collection.with_retries = lambda func, *args, **kwargs: func(*args, **kwargs)
+    collection.datastore = MagicMock()
+    collection.datastore.client.open_point_in_time.return_value = {"id": "pit"}
+    collection.datastore.client.search.return_value = {
+        "pit_id": "pit",
+        "hits": {"hits": [{"_id": str(i), "_source": {"howler": {"id": str(i)}}, "sort": [i]} for i in range(50)]},
+    }
+
+    _, cursor = next(collection.stream_search_pages("howler.id:*", fl="howler.id", item_buffer_size=50, as_obj=False))
+    assert cursor
+
+    # The cursor resumes the search it was issued for
+    _, next_cursor = next(
+        collection.stream_search_pages("howler.id:*", fl="howler.id", item_buffer_size=50, as_obj=False, cursor=cursor)
+    )
+    assert next_cursor
+    assert collection.datastore.client.search.call_args.kwargs["search_after"] == [49]
+
+    # But is rejected for any other query, filter, field list or index
+    for kwargs in [
+        {"query": "howler.status:open"},
+        {"filters": ["howler.status:open"]},
+        {"access_control": "howler.analytic:test"},
+        {"fl": "howler.id,howler.hash"},
+    ]:
+        with pytest.raises(SearchException):
+            next(
+                collection.stream_search_pages(
+                    **{"query": "howler.id:*", "fl": "howler.id", "item_buffer_size": 50, "cursor": cursor, **kwargs}
+                )
+            )
+
+    collection.name = "howler-user"
+    with pytest.raises(SearchException):
+        next(collection.stream_search_pages("howler.id:*", fl="howler.id", item_buffer_size=50, cursor=cursor))
+
+    # Tampering with the position or point in time invalidates the signature
+    pit_id, search_after, signature = json.loads(base64.urlsafe_b64decode(cursor))
+    for forged in [["other", search_after, signature], [pit_id, [0], signature], [pit_id, search_after]]:
+        with pytest.raises(SearchException):
+            next(
+                collection.stream_search_pages(
+                    "howler.id:*",
+                    fl="howler.id",
+                    item_buffer_size=50,
+                    cursor=base64.urlsafe_b64encode(json.dumps(forged).encode()).decode(),
+                )
+            )
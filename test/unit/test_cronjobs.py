@@ -0,0 +1,137 @@
+from mock import MagicMock, patch
+
+from howler import cronjobs
+
+
+@patch("howler.cronjobs.MEMBERS")
+def test_get_owner(members):
+    members.members.return_value = []
+    assert cronjobs.get_owner("job") is None
+
+    members.members.return_value = ["a", "b", "c"]
+    owners = {f"job_{i}": cronjobs.get_owner(f"job_{i}") for i in range(100)}
+    assert set(owners.values()) == {"a", "b", "c"}
+
+    # When an instance leaves, only the jobs it owned move
+    members.members.return_value = ["a", "c"]
+    for job_id, owner in owners.items():
+        if owner != "b":
+            assert cronjobs.get_owner(job_id) == owner
+        else:
+            assert cronjobs.get_owner(job_id) in ["a", "c"]
+
+
+@patch("howler.cronjobs.scheduler")
+@patch("howler.cronjobs.TICKS")
+@patch("howler.cronjobs.get_owner")
+def test_coordinated(get_owner, ticks, scheduler):
+    func = MagicMock()
+    job = cronjobs.coordinated("job")(func)
+
+    # The owner claims the tick and runs it right away
+    get_owner.return_value = cronjobs.INSTANCE_ID
+    ticks.claim.return_value = None
+    job("arg", kwarg=True)
+    func.assert_called_once_with("arg", kwarg=True)
+    scheduler.add_job.assert_not_called()
+
+    # Another instance only checks back later
+    func.reset_mock()
+    get_owner.return_value = "other"
+    job("arg", kwarg=True)
+    func.assert_not_called()
+
+    failover = scheduler.add_job.call_args.kwargs
+    assert failover["id"] == "job_failover"
+
+    # If the owner ran the tick in the meantime, the failover does nothing
+    ticks.claim.return_value = ("other", 3600)
+    failover["func"](*failover["args"], **failover["kwargs"])
+    func.assert_not_called()
+
+    # Otherwise, it runs the tick in its place
+    ticks.claim.return_value = None
+    failover["func"](*failover["args"], **failover["kwargs"])
+    func.assert_called_once_with("arg", kwarg=True)
+
+
+@patch("howler.cronjobs.scheduler")
+@patch("howler.cronjobs.TICKS")
+@patch("howler.cronjobs.LEADER")
+def test_coordinated_leader_only(leader, ticks, scheduler):
+    func = MagicMock()
+    job = cronjobs.coordinated("retention", leader_only=True)(func)
+    ticks.claim.return_value = None
+
+    leader.holder.return_value = "other"
+    job()
+    func.assert_not_called()
+    assert scheduler.add_job.call_args.kwargs["id"] == "retention_failover"
+
+    leader.holder.return_value = cronjobs.INSTANCE_ID
+    job()
+    func.assert_called_once_with()
+
+
+@patch("howler.cronjobs.time")
+@patch("howler.cronjobs.scheduler")
+@patch("howler.cronjobs.TICKS")
+@patch("howler.cronjobs.get_owner")
+def test_coordinated_late_instance(get_owner, ticks, scheduler, time):
+    job = cronjobs.coordinated("job")(MagicMock())
+    get_owner.return_value = cronjobs.INSTANCE_ID
+    ticks.claim.return_value = None
+
+    # One instance fires on time, the other one 40 seconds late: both must claim the same tick
+    for now in [1_700_000_040.5, 1_700_000_080.5]:
+        time.time.return_value = now
+        job()
+
+    first, second = [call.args[0] for call in ticks.claim.call_args_list]
+    assert first == second
+
+
+@patch("howler.cronjobs.rules.WATERMARKS")
+@patch("howler.cronjobs.rules.datastore")
+def test_stopped_rules(datastore, watermarks):
+    from apscheduler.schedulers.background import BackgroundScheduler
+
+    from howler.cronjobs import rules
+    from howler.odm.models.analytic import Analytic
+    from howler.odm.randomizer import random_model_obj
+
+    rule: Analytic = random_model_obj(Analytic)
+    rule.rule = "howler.id:*"
+    rule.rule_type = "lucene"
+    rule.rule_crontab = "0 0 * * *"
+
+    scheduler = BackgroundScheduler()
+    watermarks.get.return_value = None
+    datastore.return_value.analytic.stream_search.side_effect = lambda *args, **kwargs: iter([rule])
+    datastore.return_value.hit.search.side_effect = Exception("Bad rule")
+
+    with patch.object(rules, "__scheduler_instance", scheduler):
+        rules.register_rules(test_override=True)
+        job_id = f"rule_{rule.analytic_id}"
+        assert scheduler.get_job(job_id)
+
+        # The rule is stopped after an exception, and synchronizing the rules does not restart it
+        rules.create_executor(rule)()
+        assert not scheduler.get_job(job_id)
+
+        rules.register_rules(test_override=True)
+        assert not scheduler.get_job(job_id)
+
+        # Until it is modified
+        rule.rule = "howler.status:open"
+        rules.register_rules(test_override=True)
+        assert scheduler.get_job(job_id)
+
+        # Or explicitly registered again
+        rules.create_executor(rule)()
+        assert not scheduler.get_job(job_id)
+
+        rules.register_rules(rule, test_override=True)
+        assert scheduler.get_job(job_id)
+
+        scheduler.remove_all_jobs()
@@ -0,0 +1,231 @@
+import io
+import os
+
+import pytest
+from botocore.exceptions import ClientError
+
+from howler.common.exceptions import HowlerValueError
+from howler.filestore import FileStore, FileStoreException, create_transport
+from howler.filestore.transport.base import CHUNK_SIZE, TransportException
+from howler.filestore.transport.local import TransportLocal
+from howler.filestore.transport.s3 import TransportS3
+
+
+class StreamingBody(object):
+    "Stand-in for the streamed bodies of S3 responses"
+
+    def __init__(self, content: bytes):
+        self.stream = io.BytesIO(content)
+        self.closed = False
+
+    def iter_chunks(self, chunk_size: int):
+        while chunk := self.stream.read(chunk_size):
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+class FakeS3Client(object):
+    "Local stand-in for an S3 endpoint, storing objects in memory"
+
+    def __init__(self):
+        self.buckets: dict[str, dict[str, bytes]] = {}
+
+    @staticmethod
+    def _not_found(operation: str, code: str):
+        return ClientError({"Error": {"Code": code, "Message": "Not Found"}}, operation)
+
+    # Requests are sent with the keyword arguments of boto3, i.e. Bucket and Key
+    def head_bucket(self, **params):
+        if params["Bucket"] not in self.buckets:
+            raise self._not_found("HeadBucket", "404")
+
+    def create_bucket(self, **params):
+        self.buckets[params["Bucket"]] = {}
+
+    def head_object(self, **params):
+        if params["Key"] not in self.buckets[params["Bucket"]]:
+            raise self._not_found("HeadObject", "404")
+
+        return {"ContentLength": len(self.buckets[params["Bucket"]][params["Key"]])}
+
+    def get_object(self, **params):
+        if params["Key"] not in self.buckets[params["Bucket"]]:
+            raise self._not_found("GetObject", "NoSuchKey")
+
+        return {"Body": StreamingBody(self.buckets[params["Bucket"]][params["Key"]])}
+
+    def upload_fileobj(self, stream, bucket: str, key: str):
+        self.buckets[bucket][key] = stream.read()
+
+    def delete_object(self, **params):
+        self.buckets[params["Bucket"]].pop(params["Key"], None)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def s3_client():
+    return FakeS3Client()
+
+
+@pytest.fixture(params=["local", "s3"])
+def transport(request, tmp_path, s3_client):
+    if request.param == "local":
+        return TransportLocal(base=str(tmp_path))
+
+    return TransportS3(base="/hits/", s3_bucket="test-bucket", client=s3_client)
+
+
+def test_transport(transport):
+    assert not transport.exists("a/b/test.txt")
+    with pytest.raises(TransportException):
+        transport.get("a/b/test.txt")
+
+    transport.put("a/b/test.txt", "content")
+    assert transport.exists("a/b/test.txt")
+    assert transport.get("a/b/test.txt") == b"content"
+
+    # Files larger than a chunk are streamed in multiple chunks
+    content = os.urandom(CHUNK_SIZE * 2 + 10)
+    transport.write("large", io.BytesIO(content))
+    assert [len(chunk) for chunk in transport.read("large")] == [CHUNK_SIZE, CHUNK_SIZE, 10]
+    assert transport.get("large") == content
+
+    transport.delete("a/b/test.txt")
+    transport.delete("a/b/test.txt")
+    assert not transport.exists("a/b/test.txt")
+
+
+def test_transport_files(transport, tmp_path):
+    src = tmp_path / "src.txt"
+    src.write_bytes(b"uploaded")
+
+    transport.upload(str(src), "uploaded.txt")
+    transport.download("uploaded.txt", str(tmp_path / "downloads" / "dest.txt"))
+    assert (tmp_path / "downloads" / "dest.txt").read_bytes() == b"uploaded"
+
+    failed = transport.upload_batch([(str(src), "one.txt"), (str(tmp_path / "missing.txt"), "two.txt")])
+    assert [(src_path, dest_path) for src_path, dest_path, _ in failed] == [(str(tmp_path / "missing.txt"), "two.txt")]
+    assert transport.exists("one.txt")
+    assert not transport.exists("two.txt")
+
+
+def test_transport_local(tmp_path):
+    transport = TransportLocal(base=str(tmp_path))
+
+    with pytest.raises(TransportException):
+        transport.put("../outside.txt", b"content")
+
+    transport.put("/nested/file.txt", b"content")
+    assert (tmp_path / "nested" / "file.txt").read_bytes() == b"content"
+    assert os.listdir(tmp_path / "nested") == ["file.txt"]
+
+
+def test_transport_s3(s3_client):
+    transport = TransportS3(base="/base/", s3_bucket="bucket", client=s3_client)
+    transport.put("file.txt", b"content")
+    assert s3_client.buckets == {"bucket": {"base/file.txt": b"content"}}
+
+    # The streamed body is closed once read
+    body = StreamingBody(b"content")
+    s3_client.get_object = lambda **params: {"Body": body}
+    assert transport.get("file.txt") == b"content"
+    assert body.closed
+
+
+def test_create_transport(tmp_path):
+    transport = create_transport(f"file://{tmp_path}/store")
+    assert isinstance(transport, TransportLocal)
+    assert transport.base == f"{tmp_path}/store"
+
+    for url in ["gopher://localhost/base", f"file://{tmp_path}/store?s3_bucket=test"]:
+        with pytest.raises(FileStoreException):
+            create_transport(url)
+
+
+def test_create_transport_s3(monkeypatch):
+    params = {}
+
+    def fake_client(service, **kwargs):
+        params.update(kwargs)
+        return FakeS3Client()
+
+    monkeypatch.setattr("howler.filestore.transport.s3.boto3.client", fake_client)
+    transport = create_transport(
+        "s3://hwl_storage_key:Ch%40ngeTh%21sPa33w0rd@localhost:9000/base?s3_bucket=test&use_ssl=false"
+    )
+    assert isinstance(transport, TransportS3)
+    assert transport.base == "base"
+    assert transport.bucket == "test"
+
+    assert params["aws_access_key_id"] == "hwl_storage_key"
+    assert params["aws_secret_access_key"] == "Ch@ngeTh!sPa33w0rd"
+    assert params["endpoint_url"] == "http://localhost:9000"
+    assert params["verify"] is True
+
+    create_transport("s3://localhost:9000/base?verify=false&aws_region=ca-central-1")
+    assert params["endpoint_url"] == "https://localhost:9000"
+    assert params["verify"] is False
+    assert params["region_name"] == "ca-central-1"
+
+    with pytest.raises(FileStoreException):
+        create_transport("s3://localhost:9000/base?bucket=test")
+
+
+def test_filestore_locations(tmp_path):
+    with FileStore(f"file://{tmp_path}/near", f"file://{tmp_path}/far") as fs:
+        near, far = fs.transports
+
+        fs.put("near.txt", b"near", location="near")
+        fs.put("far.txt", b"far", location="far")
+        fs.put("all.txt", b"all")
+        assert near.exists("all.txt") and far.exists("all.txt")
+
+        # Reads fall back to farther locations
+        assert fs.get("far.txt") == b"far"
+        assert fs.get("far.txt", location="near") is None
+        assert fs.exists("near.txt")
+        assert not fs.exists("near.txt", location="far")
+        assert fs.get("missing.txt") is None
+        with pytest.raises(FileStoreException):
+            fs.read("missing.txt")
+
+        # Streams are written to every location, even though they can only be read once
+        fs.write("stream.txt", io.BytesIO(b"streamed"))
+        assert near.get("stream.txt") == far.get("stream.txt") == b"streamed"
+        assert b"".join(fs.read("stream.txt", location="far")) == b"streamed"
+
+        fs.put("empty.txt", b"")
+        assert b"".join(fs.read("empty.txt")) == b""
+
+        fs.download("far.txt", str(tmp_path / "downloaded.txt"))
+        assert (tmp_path / "downloaded.txt").read_bytes() == b"far"
+
+        fs.delete("all.txt", location="near")
+        assert not near.exists("all.txt") and far.exists("all.txt")
+
+        with pytest.raises(HowlerValueError):
+            fs.get("all.txt", location="middle")
+
+
+def test_filestore_tiering(tmp_path):
+    with FileStore(f"file://{tmp_path}/near", f"file://{tmp_path}/far") as fs:
+        near, far = fs.transports
+
+        fs.put("file.txt", b"content", location="near")
+        assert fs.demote("file.txt")
+        assert not near.exists("file.txt")
+        assert far.get("file.txt") == b"content"
+
+        assert fs.promote("file.txt")
+        assert near.get("file.txt") == b"content"
+        assert far.exists("file.txt")
+
+        assert not fs.promote("missing.txt")
+        assert not fs.demote("missing.txt")
+
+    with pytest.raises(FileStoreException):
+        FileStore()
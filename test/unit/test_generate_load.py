@@ -0,0 +1,134 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from howler.common.exceptions import HowlerRuntimeError, HowlerValueError
+from howler.external import generate_load
+from howler.external.generate_load import (
+    BulkWriter,
+    LoadProfile,
+    build_templates,
+    build_vocabulary,
+    generate_hits,
+    load_calls,
+)
+from howler.odm.models.hit import Hit
+
+PROFILE: LoadProfile = {
+    "hits": 200,
+    "analytics": 5,
+    "detections": 10,
+    "users": 8,
+    "observables": 20,
+    "bundle_ratio": 0.1,
+    "max_bundle_size": 5,
+    "comments": 1,
+    "logs": 2,
+    "days": 30,
+    "templates": 3,
+    "seed": 1,
+}
+
+
+@pytest.fixture(scope="module")
+def vocabulary():
+    return build_vocabulary(PROFILE)
+
+
+def test_vocabulary(vocabulary):
+    assert len(vocabulary["analytics"]) == PROFILE["analytics"]
+    assert len(vocabulary["users"]) == PROFILE["users"]
+    assert len(vocabulary["ips"]) == PROFILE["observables"]
+    assert len(vocabulary["hosts"]) == PROFILE["observables"]
+
+    # Every process must draw from the same values
+    assert build_vocabulary(PROFILE) == vocabulary
+
+
+def test_generate_hits(vocabulary):
+    templates = build_templates(vocabulary, PROFILE["templates"])
+    hits = list(generate_hits(PROFILE["hits"], templates, vocabulary, PROFILE))
+
+    assert len(hits) == PROFILE["hits"]
+    assert len({hit["howler"]["id"] for hit in hits}) == PROFILE["hits"]
+
+    analytics = dict(vocabulary["analytics"])
+    for hit in hits:
+        # Generated hits are written without validation, so they must be valid as they are
+        odm = Hit(hit)
+
+        assert odm.howler.detection in analytics[odm.howler.analytic]
+        assert set(odm.related.ip) <= set(vocabulary["ips"])
+        assert set(odm.related.hosts) <= set(vocabulary["hosts"])
+        assert all(comment.user in vocabulary["users"] for comment in odm.howler.comment)
+
+    by_id = {hit["howler"]["id"]: hit for hit in hits}
+    bundles = [hit for hit in hits if hit["howler"]["is_bundle"]]
+    assert bundles
+    for bundle in bundles:
+        assert bundle["howler"]["bundle_size"] == len(bundle["howler"]["hits"])
+        for child_id in bundle["howler"]["hits"]:
+            assert by_id[child_id]["howler"]["bundles"] == [bundle["howler"]["id"]]
+
+
+def _bulk_result(statuses):
+    return {
+        "items": [{"create": {"status": status, **({"error": {}} if status >= 300 else {})}} for status in statuses]
+    }
+
+
+@patch("howler.external.generate_load.time.sleep")
+def test_bulk_writer_back_pressure(sleep):
+    collection = MagicMock()
+    collection.index_list = ["hit"]
+
+    # Half of the first batch is rejected, and one document fails outright
+    collection.bulk.side_effect = [
+        _bulk_result([201, 429, 201, 429, 201, 429, 201, 429, 201, 400]),
+        _bulk_result([201] * 4),
+    ]
+
+    writer = BulkWriter(collection, batch_size=100)
+    writer.pending = [{"id": str(index), "doc": {"index": index}} for index in range(10)]
+    writer.flush()
+
+    assert writer.written == 9
+    assert writer.failed == 1
+    assert writer.rejected == 4
+    assert writer.batch_size < 100
+    sleep.assert_called_once_with(generate_load.INITIAL_BACKOFF)
+
+    retried = collection.bulk.call_args_list[1].args[0].get_plan_data()
+    assert [json.loads(line)["create"]["_id"] for line in retried.splitlines()[::2]] == ["1", "3", "5", "7"]
+
+
+@patch("howler.external.generate_load.time.sleep")
+def test_bulk_writer_gives_up(sleep):
+    collection = MagicMock()
+    collection.index_list = ["hit"]
+    collection.bulk.return_value = _bulk_result([429])
+
+    writer = BulkWriter(collection, batch_size=100, max_retries=3)
+    writer.add("id", {})
+
+    with pytest.raises(HowlerRuntimeError):
+        writer.flush()
+
+    assert sleep.call_count == 3
+
+
+def test_load_calls(tmp_path):
+    calls = [{"method": "GET", "path": "/api/v1/hit/abc/"}, {"method": "POST", "path": "/api/v1/search/hit/"}]
+
+    json_file = tmp_path / "calls.json"
+    json_file.write_text(json.dumps(calls))
+    assert load_calls(json_file) == calls
+
+    ndjson_file = tmp_path / "calls.ndjson"
+    ndjson_file.write_text("\n".join(json.dumps(call) for call in calls) + "\n")
+    assert load_calls(ndjson_file) == calls
+
+    json_file.write_text(json.dumps([{"path": "/api/v1/hit/abc/"}]))
+    with pytest.raises(HowlerValueError):
+        load_calls(json_file)
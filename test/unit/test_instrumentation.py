@@ -0,0 +1,66 @@
+import re
+
+from flask import Flask
+
+import howler.api as api
+from howler.common.instrumentation import instrumented, stop_tracking_request, timed, track_request
+from howler.odm.models.hit import Hit
+from howler.odm.randomizer import random_model_obj
+
+
+@instrumented("redis")
+def _redis_call(nested: bool = False):
+    if nested:
+        _redis_call()
+
+
+def test_instrumentation():
+    # Nothing is recorded outside of a tracked context
+    _redis_call()
+
+    stats = track_request()
+    try:
+        _redis_call()
+        _redis_call(nested=True)
+
+        with timed("events"):
+            _redis_call()
+
+        hit = random_model_obj(Hit)
+        hit.as_primitives()
+    finally:
+        assert stop_tracking_request() is stats
+
+    # Calls nested in a call to the same component are only counted once
+    assert stats.calls["redis"] == 3
+    assert stats.calls["events"] == 1
+    assert stats.durations["events"] > 0
+    assert stats.calls["odm"] == 1
+    assert stats.calls["serialization"] == 1
+    assert stats.calls["elasticsearch"] == 0
+
+
+def test_server_timing():
+    app = Flask("test_app")
+    app.config.update(SECRET_KEY="test test")
+
+    original = api.config.ui.server_timing
+    try:
+        for enabled in [False, True]:
+            api.config.ui.server_timing = enabled
+
+            with app.test_request_context():
+                api.start_request_tracking()
+                _redis_call()
+                response = api.end_request_tracking(api.ok())
+
+            if not enabled:
+                assert "Server-Timing" not in response.headers
+                continue
+
+            assert re.fullmatch(
+                r'redis;dur=[\d.]+;desc="1 calls", serialization;dur=[\d.]+;desc="1 calls", total;dur=[\d.]+',
+                response.headers["Server-Timing"],
+            )
+    finally:
+        api.config.ui.server_timing = original
@@ -1,5 +1,13 @@
+import gzip
+import json
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+import flask
 import pytest
-from flask import Flask
+from flask import Flask, jsonify
 
 import howler.api as api
 
@@ -82,3 +90,67 @@ def test_http_response_functions(request_context):
         service_unavailable_result = api.service_unavailable()
         assert service_unavailable_result.json["api_response"] == api.DEFAULT_DATA[False]
         assert service_unavailable_result.status_code == 503
+
+
+def test_stream_ndjson_response(request_context):
+    chunks = [[{"id": 1}, {"id": 2}], [], [{"id": 3}]]
+
+    with request_context.test_request_context():
+        result = api.stream_ndjson_response(iter(chunks))
+        assert result.status_code == 200
+        assert result.mimetype == "application/x-ndjson"
+        assert "Content-Encoding" not in result.headers
+
+        lines = b"".join(result.response).decode().splitlines()
+        assert [json.loads(line) for line in lines] == [{"id": 1}, {"id": 2}, {"id": 3}]
+
+        compressed_result = api.stream_ndjson_response(iter(chunks), compress=True)
+        assert compressed_result.headers["Content-Encoding"] == "gzip"
+
+        lines = gzip.decompress(b"".join(compressed_result.response)).decode().splitlines()
+        assert [json.loads(line) for line in lines] == [{"id": 1}, {"id": 2}, {"id": 3}]
+
+
+def test_response_matches_jsonify(request_context):
+    data = {
+        "b": [1, 2.5, None, True],
+        "a": {"date": datetime(2024, 1, 2, 3, 4, 5), "id": uuid.UUID(int=1), "amount": Decimal("1.5")},
+        "unicode": "é",
+    }
+
+    with request_context.test_request_context():
+        response = api.ok(data)
+
+        assert response.mimetype == "application/json"
+        assert response.json["api_response"] == json.loads(jsonify(data).get_data())
+
+
+def test_stream_ndjson_response_quota(request_context):
+    streamed = []
+
+    def chunks():
+        streamed.append(True)
+        yield [{"id": 1}]
+
+    with request_context.test_request_context(), patch("howler.api.QUOTA_TRACKER") as tracker:
+        flask.session["quota_user"] = "user"
+        flask.session["quota_set"] = True
+
+        result = api.stream_ndjson_response(chunks())
+
+        # The quota is only released once the response has been streamed
+        tracker.end.assert_not_called()
+        assert b"".join(result.response) == b'{"id":1}\n'
+        assert streamed
+        tracker.end.assert_called_once_with("user")
+
+        result.close()
+        tracker.end.assert_called_once_with("user")
+
+    with request_context.test_request_context(), patch("howler.api.QUOTA_TRACKER") as tracker:
+        flask.session["quota_user"] = "user"
+        flask.session["quota_set"] = True
+
+        # Responses closed before streaming anything still release it
+        api.stream_ndjson_response(chunks()).close()
+        tracker.end.assert_called_once_with("user")
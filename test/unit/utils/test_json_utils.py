@@ -0,0 +1,85 @@
+import json
+from datetime import datetime
+from hashlib import sha256
+
+import pytest
+
+from howler.utils import json_utils
+
+DOCUMENT = {
+    "howler": {"id": "abc", "score": 1.5, "labels": ["a", "b"], "data": [{"nested": None}]},
+    "unicode": "é ☃",
+    "flag": True,
+}
+
+
+@pytest.fixture(params=["json", "orjson"])
+def backend(request, monkeypatch):
+    if request.param == "orjson" and json_utils.orjson is None:
+        pytest.skip("orjson is not installed")
+
+    monkeypatch.setattr(json_utils, "BACKEND", request.param)
+    return request.param
+
+
+def test_round_trip(backend):
+    encoded = json_utils.dumpb(DOCUMENT)
+    assert isinstance(encoded, bytes)
+    assert json_utils.loads(encoded) == DOCUMENT
+    assert json_utils.loads(encoded.decode()) == DOCUMENT
+    assert json_utils.loads(json_utils.dumps(DOCUMENT)) == DOCUMENT
+
+    # Both backends produce the same compact output
+    assert encoded == json.dumps(DOCUMENT, ensure_ascii=False, separators=(",", ":")).encode()
+    assert (
+        json_utils.dumpb(DOCUMENT, sort_keys=True)
+        == json.dumps(DOCUMENT, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode()
+    )
+
+
+def test_fallback(backend):
+    # orjson cannot encode these, the standard library takes over
+    assert json_utils.loads(json_utils.dumpb({"big": 2**70})) == {"big": 2**70}
+    assert json_utils.loads(json_utils.dumpb({1: "a"})) == {"1": "a"}
+
+
+def test_non_finite(backend):
+    # Neither backend produces invalid JSON, even when the standard library takes over from orjson
+    assert json_utils.dumps({"nan": float("nan"), "inf": [float("inf"), -float("inf")]}) == (
+        '{"nan":null,"inf":[null,null]}'
+    )
+    assert json_utils.dumps({"nan": float("nan"), "big": 2**70}) == '{"nan":null,"big":1180591620717411303424}'
+
+
+def test_stored_is_stable(backend):
+    # howler.data entries keep the format of the standard library, whichever backend is used
+    entry = {"a": "é ☃", "b": [1, 2.5, None], "c": float("nan")}
+    assert json_utils.stored_dumps(entry) == '{"a": "\\u00e9 \\u2603", "b": [1, 2.5, null], "c": NaN}'
+    assert json_utils.stored_dumps(entry) == json.dumps(entry)
+
+
+def test_default(backend):
+    timestamp = datetime(2024, 1, 2, 3, 4, 5)
+    assert json_utils.loads(json_utils.dumpb({"t": timestamp}, default=lambda o: o.isoformat())) == {
+        "t": "2024-01-02T03:04:05"
+    }
+
+    with pytest.raises(TypeError):
+        json_utils.dumpb({"t": timestamp})
+
+
+def test_invalid(backend):
+    with pytest.raises(ValueError):
+        json_utils.loads(b"{invalid")
+
+
+def test_canonical_is_stable(backend):
+    # howler.hash is computed from this output, it must never change
+    hash_contents = {"analytic": "Anal ☃", "detection": "Détection", "raw_data": [{"b": 1, "a": [1.0, None]}]}
+    assert json_utils.canonical_dumpb(hash_contents) == (
+        b'{"analytic": "Anal \\u2603", "detection": "D\\u00e9tection", "raw_data": [{"a": [1.0, null], "b": 1}]}'
+    )
+    assert (
+        sha256(json_utils.canonical_dumpb(hash_contents)).hexdigest()
+        == sha256(json.dumps(hash_contents, sort_keys=True, ensure_ascii=True).encode("utf-8")).hexdigest()
+    )